@@ -4,22 +4,51 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
+import os
 import re
 import time
+import uuid
 import base64
-from fpdf import FPDF
-import matplotlib.pyplot as plt
 import numpy as np
 from io import BytesIO
-from utils.data_processor import clean_data, process_data
+from utils.data_processor import clean_data
 from utils.visualizations import (
     create_status_chart, 
     create_priority_chart, 
     create_age_histogram, 
     create_company_bar_chart,
     create_resource_allocation_chart,
-    create_ticket_trend_chart
+    create_ticket_trend_chart,
+    create_category_chart,
+    create_workload_heatmap,
+    create_backlog_chart,
+    create_burn_chart,
+    create_burn_history_chart
 )
+from utils.backlog import BacklogEngine, snapshot_date_from_frame
+from utils.snapshot_diff import fingerprint_rows, diff_snapshots, summarize_changes
+from utils.history_store import HistoryStore, SNAPSHOT_COLUMN
+from utils.filters import build_filters, apply_filters
+from utils.sql_backend import TicketDatabase
+from utils.connectwise_api import ConnectwiseClient
+from utils.refresher import SharedDataset, refresher_from_env
+from utils.webhook import webhook_from_env
+from utils.kpis import compute_kpis, numeric_age
+from utils.sla import SlaBreachIndex, time_to_breach
+from utils.business_hours import business_clocks
+from utils.timezones import display_now
+from utils.alert_rules import flag_mask, SUMMARY_ALERT_CATEGORIES
+from utils.search_index import SearchIndex
+from utils.near_duplicates import collapse_duplicates, CLUSTER_COLUMN
+from utils.categorizer import categorizer_from_env, CATEGORY_COLUMN
+from utils.workload import AssignmentIndex, workload_matrix, workload_summary
+from utils.rollups import build_rollups
+from utils.burn_rate import BurnHistory, burn_rollups, BURN_LEVELS
+from utils.threshold_alerts import AlertState, alert_engine_from_env
+from utils.cross_filter import CrossFilter, CROSS_FILTER_COLUMNS
+from utils.kpi_api import kpi_api_from_env
+from utils.profiling import StageTimer, stage, memory_profiling_from_env, top_allocations, frame_footprint
+from utils.pdf_report import create_pdf
 
 # Set page configuration
 st.set_page_config(
@@ -29,6 +58,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Collect per-stage timings for this rerun in the session's ring buffer
+# (plus peak and retained memory when TICKET_MEMORY_PROFILING is set)
+memory_profiling = memory_profiling_from_env()
+if 'stage_timer' not in st.session_state:
+    st.session_state.stage_timer = StageTimer()
+st.session_state.stage_timer.start_run()
+
 # Custom CSS for customer-centric, eye-catching styling
 st.markdown("""
 <style>
@@ -295,6 +331,219 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_history_store():
+    """Open the local history store shared by all sessions and keep it compacted."""
+    store = HistoryStore()
+    store.start_background_compaction()
+    return store
+
+@st.cache_resource
+def get_connectwise_client():
+    """Create the pooled Connectwise API client from the CW_* environment variables."""
+    return ConnectwiseClient.from_env()
+
+@st.cache_resource
+def get_alert_engine():
+    """Create the threshold alert engine configured by TICKET_THRESHOLD_RULES and TICKET_ALERT_*."""
+    return alert_engine_from_env()
+
+@st.cache_resource
+def get_shared_dataset():
+    """Create the dataset shared by all sessions and start its background refresher."""
+    dataset = SharedDataset(search_index=SearchIndex(), categorizer=categorizer_from_env())
+    # Every published refresh is evaluated against the threshold rules once
+    dataset.subscribe(get_alert_engine().on_publish)
+    refresher = refresher_from_env(dataset, get_connectwise_client())
+    if refresher is not None:
+        refresher.start()
+    return dataset, refresher
+
+@st.cache_resource
+def get_webhook_server():
+    """Start the Connectwise callback endpoint that applies ticket changes to the shared dataset."""
+    dataset, _ = get_shared_dataset()
+    return webhook_from_env(dataset)
+
+@st.cache_resource
+def get_kpi_api_server():
+    """Start the JSON KPI API over the shared dataset when TICKET_API_PORT is set."""
+    dataset, _ = get_shared_dataset()
+    return kpi_api_from_env(dataset)
+
+@st.cache_resource
+def get_ticket_database():
+    """Open the embedded SQL database used when the SQL backend is enabled."""
+    return TicketDatabase()
+
+@st.fragment
+def drill_down_panel(rollups):
+    """Drill through precomputed rollups; a selection only reruns this panel."""
+    hierarchy = st.radio("Drill down by", list(rollups), horizontal=True, key='drill_hierarchy')
+    rollup = rollups[hierarchy]
+    
+    # One selector per level, listing the children of the selection above it
+    path = []
+    for level in rollup.levels[:-1]:
+        choice = st.selectbox(level, ['All'] + rollup.children(path),
+                              key='drill_' + '/'.join([hierarchy, level] + path))
+        if choice == 'All':
+            break
+        path.append(choice)
+    
+    node = rollup.node(path)
+    cols = st.columns(4)
+    cols[0].metric("Tickets", int(node['Tickets']))
+    cols[1].metric("Average Age (Days)", node['Avg Age'])
+    cols[2].metric("SLA Issues", int(node['SLA Issues']))
+    cols[3].metric("SLA At Risk (24h)", int(node['SLA At Risk']))
+    if rollup.children(path):
+        st.dataframe(rollup.children_table(path), use_container_width=True)
+
+# Selection state key of each cross-filtering chart
+CHART_KEYS = {column: 'chart_' + column.lower() for column in CROSS_FILTER_COLUMNS}
+
+@st.fragment
+def analytics_charts(base_df, sql_source=None):
+    """
+    Status, priority, age, company and category charts that cross-filter each other.
+    
+    Clicking a slice or bar reruns this fragment, which applies the click
+    to the cached CrossFilter as a delta and then reruns the whole app, so
+    the KPIs, tables, rollups and burn charts follow the selection too.
+    Every chart is drawn from the rows the other charts' selections keep.
+    
+    Args:
+        base_df: Filtered tickets before the chart selections
+        sql_source: (database, table, filters) that base_df was fetched with
+            when the SQL backend is on; the chart counts are then grouped
+            inside the database
+    """
+    cross = st.session_state.cross_filter
+    with stage('cross_filter', rows=len(base_df)):
+        changed = False
+        for column, key in CHART_KEYS.items():
+            changed |= cross.apply_event(column, st.session_state.get(key))
+    # The rest of the page filters with the selections too; the next run sees no new event
+    if changed:
+        st.rerun()
+    
+    def chart_frame(column):
+        """Rows kept by every selection but the column's own, with just that column."""
+        return base_df.loc[cross.mask(exclude=column), [column]]
+    
+    def chart_counts(column):
+        """Tickets per value of a column counted in the SQL backend, or None without it."""
+        if sql_source is None:
+            return None
+        ticket_db, table, filters = sql_source
+        # The other charts' selections become IN predicates next to the sidebar filters
+        chart_filters = dict(filters, columns=dict(filters['columns']))
+        for selected_column, values in cross.selections.items():
+            if selected_column != column:
+                chart_filters['columns'][selected_column] = sorted(values)
+        with stage('count_sql'):
+            return ticket_db.count_by(column, chart_filters, table=table)
+    
+    if cross.active:
+        selected_col, clear_col = st.columns([4, 1])
+        selected_col.info(f"Chart selection: {cross.describe()} ({int(cross.mask().sum())} tickets)")
+        if clear_col.button("Clear chart selections", key='clear_cross_filter'):
+            cross.clear()
+            st.rerun()
+    
+    # Create two rows of visualizations with enhanced styling
+    row1_col1, row1_col2 = st.columns(2)
+    
+    with row1_col1:
+        # Ticket Status Chart with box styling
+        st.markdown("<p class='row-header'>Ticket Status Distribution</p>", unsafe_allow_html=True)
+        if 'Status' in base_df.columns:
+            status_fig = create_status_chart(chart_frame('Status'), chart_counts('Status'))
+            # Update layout for better styling
+            status_fig.update_layout(
+                margin=dict(l=20, r=20, t=30, b=20),
+                paper_bgcolor='white',
+                plot_bgcolor='white',
+                font=dict(family="Arial, sans-serif", size=12),
+                legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
+            )
+            st.plotly_chart(status_fig, use_container_width=True, key=CHART_KEYS['Status'],
+                            on_select='rerun', selection_mode='points')
+        else:
+            st.error("Status data not available in the uploaded file.")
+    
+    with row1_col2:
+        # Ticket Priority Chart with box styling
+        st.markdown("<p class='row-header'>Ticket Priority Breakdown</p>", unsafe_allow_html=True)
+        if 'Priority' in base_df.columns:
+            priority_fig = create_priority_chart(chart_frame('Priority'), chart_counts('Priority'))
+            # Update layout for better styling
+            priority_fig.update_layout(
+                margin=dict(l=20, r=20, t=30, b=20),
+                paper_bgcolor='white',
+                plot_bgcolor='white',
+                font=dict(family="Arial, sans-serif", size=12),
+                legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
+            )
+            st.plotly_chart(priority_fig, use_container_width=True, key=CHART_KEYS['Priority'],
+                            on_select='rerun', selection_mode='points')
+        else:
+            st.error("Priority data not available in the uploaded file.")
+    
+    row2_col1, row2_col2 = st.columns(2)
+    
+    with row2_col1:
+        # Ticket Age Distribution with box styling
+        st.markdown("<p class='row-header'>Ticket Age Distribution</p>", unsafe_allow_html=True)
+        if 'Age' in base_df.columns:
+            try:
+                age_fig = create_age_histogram(chart_frame('Age'))
+                # Update layout for better styling
+                age_fig.update_layout(
+                    margin=dict(l=20, r=20, t=30, b=20),
+                    paper_bgcolor='white',
+                    plot_bgcolor='white',
+                    font=dict(family="Arial, sans-serif", size=12)
+                )
+                st.plotly_chart(age_fig, use_container_width=True)
+            except:
+                st.error("Could not process Age data.")
+        else:
+            st.error("Age data not available in the uploaded file.")
+    
+    with row2_col2:
+        # Company Distribution with box styling
+        st.markdown("<p class='row-header'>Company Distribution</p>", unsafe_allow_html=True)
+        if 'Company' in base_df.columns:
+            company_fig = create_company_bar_chart(chart_frame('Company'), chart_counts('Company'))
+            # Update layout for better styling
+            company_fig.update_layout(
+                margin=dict(l=20, r=20, t=30, b=20),
+                paper_bgcolor='white',
+                plot_bgcolor='white',
+                font=dict(family="Arial, sans-serif", size=12)
+            )
+            st.plotly_chart(company_fig, use_container_width=True, key=CHART_KEYS['Company'],
+                            on_select='rerun', selection_mode='points')
+        else:
+            st.error("Company data not available in the uploaded file.")
+
+    # Categories learned from the ticket summaries
+    st.markdown("<h2 class='subheader'>Ticket Categories</h2>", unsafe_allow_html=True)
+    if CATEGORY_COLUMN in base_df.columns:
+        category_fig = create_category_chart(chart_frame(CATEGORY_COLUMN), chart_counts(CATEGORY_COLUMN))
+        category_fig.update_layout(
+            margin=dict(l=20, r=20, t=30, b=20),
+            paper_bgcolor='white',
+            plot_bgcolor='white',
+            font=dict(family="Arial, sans-serif", size=12)
+        )
+        st.plotly_chart(category_fig, use_container_width=True, key=CHART_KEYS[CATEGORY_COLUMN],
+                        on_select='rerun', selection_mode='points')
+    else:
+        st.error("Category data not available for the selected tickets.")
+
 # Application title with enhanced styling
 st.markdown("<h1 class='main-header'>Medicus Tickets Dashboard</h1>", unsafe_allow_html=True)
 
@@ -341,11 +590,19 @@ with st.sidebar:
             # Force refresh
             st.rerun()
     
+    # Latest dataset published by the background refresher, if any
+    shared_dataset, dataset_refresher = get_shared_dataset()
+    webhook_server = get_webhook_server()
+    get_kpi_api_server()
+    shared_snapshot = shared_dataset.current()
+    
     # Process uploaded file if available
     if uploaded_file is not None:
         try:
             # Read the uploaded file
-            df = pd.read_csv(uploaded_file, encoding='utf-8-sig')
+            with stage('read_csv') as span:
+                df = pd.read_csv(uploaded_file, encoding='utf-8-sig')
+                span['rows'] = len(df)
             
             # Display total count before any processing
             st.info(f"✅ Total tickets in uploaded CSV: {len(df)}")
@@ -380,18 +637,32 @@ with st.sidebar:
             st.success("Uploaded file processed successfully!")
         except Exception as e:
             st.error(f"Error processing uploaded file: {str(e)}")
+    # Use the dataset kept fresh by the background refresher when one is configured
+    elif shared_snapshot is not None and not st.session_state.uploaded:
+        # Swapping in a new version is just a reference change; ingest already happened
+        if st.session_state.get('data_version') != shared_snapshot.version:
+            st.session_state.data = shared_snapshot.data
+            st.session_state.data_version = shared_snapshot.version
+        st.write(f"Showing {len(shared_snapshot.data)} tickets from {shared_snapshot.source}")
+        st.write(f"Data last refreshed: {shared_snapshot.loaded_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        if dataset_refresher is not None and dataset_refresher.last_error:
+            st.warning(f"Last refresh failed: {dataset_refresher.last_error}")
+        if webhook_server is not None and webhook_server.last_error:
+            st.warning(f"Last callback batch failed: {webhook_server.last_error}")
     # Load sample data if no file is uploaded and no data is loaded yet
     elif st.session_state.data is None:
         try:
-            # Load sample tickets from the attached CSV file
-            csv_path = "attached_assets/srboard.csv"
+            # Load sample tickets from the attached CSV file (overridable for load tests)
+            csv_path = os.environ.get('TICKET_SAMPLE_CSV', "attached_assets/srboard.csv")
             
             # First, manually count lines to confirm we have 158 total lines (157 tickets + header)
             with open(csv_path, 'r') as f:
                 total_lines = sum(1 for line in f)
             
             # Now read with pandas
-            df = pd.read_csv(csv_path, encoding='utf-8-sig')
+            with stage('read_csv') as span:
+                df = pd.read_csv(csv_path, encoding='utf-8-sig')
+                span['rows'] = len(df)
             
             # Display total count before any processing
             st.write(f"Total tickets in sample CSV: {len(df)} (should be 157)")
@@ -425,6 +696,92 @@ with st.sidebar:
         except Exception as e:
             st.error(f"Error processing sample file: {str(e)}")
     
+    # Pull tickets straight from the Connectwise API when it is configured
+    connectwise_client = get_connectwise_client()
+    if connectwise_client is not None:
+        if st.button("Sync from Connectwise"):
+            try:
+                with st.spinner("Fetching tickets from Connectwise..."):
+                    # Later syncs only fetch tickets updated since the previous one
+                    raw_df, last_updated = connectwise_client.sync(
+                        st.session_state.get('api_raw_data'), st.session_state.get('api_last_updated')
+                    )
+                st.session_state.api_raw_data = raw_df
+                st.session_state.api_last_updated = last_updated
+                st.session_state.data = clean_data(raw_df)
+                st.session_state.uploaded = True
+                st.success(f"Synced {len(raw_df)} tickets from Connectwise")
+            except Exception as e:
+                st.error(f"Error syncing from Connectwise: {str(e)}")
+    
+    # Daily exports used to rebuild the open-ticket backlog over time
+    history_store = get_history_store()
+    if 'backlog_engine' not in st.session_state:
+        backlog_engine = BacklogEngine()
+        latest_snapshots = []
+        
+        # Replay the stored history, reading only the columns the backlog needs
+        backlog_columns = [backlog_engine.key_column] + backlog_engine.dimensions
+        for snapshot_date, snapshot_df in history_store.iter_snapshots(columns=backlog_columns):
+            backlog_engine.add_snapshot(snapshot_df, snapshot_date)
+        
+        # Running hours and budget totals replay from their own few columns
+        burn_history = BurnHistory()
+        burn_columns = [burn_history.key_column, 'Company', 'Total Hours', 'Budget']
+        for snapshot_date, snapshot_df in history_store.iter_snapshots(columns=burn_columns):
+            burn_history.add_snapshot(snapshot_df, snapshot_date)
+        
+        # Full rows are only loaded for the two latest snapshots
+        for snapshot_date in history_store.partitions()[-2:]:
+            snapshot_df = history_store.query(snapshot_date, snapshot_date).drop(columns=[SNAPSHOT_COLUMN])
+            latest_snapshots.append((snapshot_date, snapshot_df, fingerprint_rows(snapshot_df)))
+        
+        st.session_state.backlog_engine = backlog_engine
+        st.session_state.burn_history = burn_history
+        st.session_state.backlog_files = set()
+        # Last two snapshots with their row fingerprints for change tracking
+        st.session_state.latest_snapshots = latest_snapshots
+    
+    with st.expander("Backlog Snapshots"):
+        snapshot_files = st.file_uploader(
+            "Upload daily Connectwise exports",
+            type=["csv"],
+            accept_multiple_files=True,
+            help="Each export is added to the backlog history once, in snapshot date order"
+        )
+        
+        # Only ingest exports that haven't been seen yet
+        new_snapshots = []
+        for snapshot_file in snapshot_files or []:
+            if snapshot_file.name in st.session_state.backlog_files:
+                continue
+            try:
+                snapshot_df = clean_data(pd.read_csv(snapshot_file, encoding='utf-8-sig'))
+                new_snapshots.append((snapshot_date_from_frame(snapshot_df), snapshot_file.name, snapshot_df))
+            except Exception as e:
+                st.error(f"Error reading {snapshot_file.name}: {str(e)}")
+        
+        for snapshot_date, snapshot_name, snapshot_df in sorted(new_snapshots, key=lambda item: item[0]):
+            try:
+                st.session_state.backlog_engine.add_snapshot(snapshot_df, snapshot_date)
+                st.session_state.burn_history.add_snapshot(snapshot_df, snapshot_date)
+                st.session_state.backlog_files.add(snapshot_name)
+                history_store.append(snapshot_df, snapshot_date)
+                # Fingerprint once at ingest so comparing exports is just a hash join
+                if 'Selected_Sr_Service_Recid' in snapshot_df.columns:
+                    latest = st.session_state.latest_snapshots
+                    # A same-day re-export replaces the previous one
+                    if latest and latest[-1][0] == snapshot_date:
+                        latest.pop()
+                    latest.append((snapshot_date, snapshot_df, fingerprint_rows(snapshot_df)))
+                    st.session_state.latest_snapshots = latest[-2:]
+            except ValueError as e:
+                st.warning(f"Skipped {snapshot_name}: {str(e)}")
+        
+        if st.session_state.backlog_files:
+            st.write(f"{len(st.session_state.backlog_files)} snapshots added this session")
+        st.write(f"{len(history_store.partitions())} days in history store")
+    
     # Date filters (only show if data is loaded) - with custom time periods
     if st.session_state.data is not None:
         st.subheader("Date Range")
@@ -450,7 +807,7 @@ with st.sidebar:
         
         if days > 0:
             # Calculate date range
-            date_max = datetime.now().date()
+            date_max = display_now().date()
             date_min = date_max - timedelta(days=days)
         else:
             # All time - set very wide range
@@ -467,6 +824,18 @@ with st.sidebar:
         # Set default time period to "Daily" without showing selector
         time_period = "Daily"
         
+        # Categorize this session's own uploads from their summaries; a new dataset only teaches
+        # the categorizer its new tickets. The shared dataset is categorized when it is published
+        shared_categorized = shared_snapshot is not None and st.session_state.data is shared_snapshot.data
+        if (st.session_state.data is not None and not shared_categorized
+                and st.session_state.get('category_source') is not st.session_state.data):
+            if 'categorizer' not in st.session_state:
+                st.session_state.categorizer = categorizer_from_env()
+            with stage('categorize', rows=len(st.session_state.data)):
+                categories = st.session_state.categorizer.update(st.session_state.data)
+            st.session_state.data = st.session_state.data.assign(**{CATEGORY_COLUMN: categories})
+            st.session_state.category_source = st.session_state.data
+        
         # Filter options
         st.subheader("Filters")
         
@@ -483,8 +852,14 @@ with st.sidebar:
                 selected_company = st.selectbox("Company", company_options)
             
             if 'Resources' in st.session_state.data.columns:
-                # Get top 10 resources by ticket count + 'All' option
-                resource_counts = st.session_state.data['Resources'].value_counts().head(10).index.tolist()
+                # Split multi-assignee Resources once per dataset into engineer assignments
+                if st.session_state.get('assignment_index_source') is not st.session_state.data:
+                    with stage('assignment_index', rows=len(st.session_state.data)):
+                        st.session_state.assignment_index = AssignmentIndex(st.session_state.data)
+                    st.session_state.assignment_index_source = st.session_state.data
+                
+                # Get top 10 engineers by ticket count + 'All' option
+                resource_counts = st.session_state.assignment_index.ticket_counts().head(10).index.tolist()
                 resource_options = ['All'] + sorted(resource_counts)
                 selected_resource = st.selectbox("Resource", resource_options)
             
@@ -495,6 +870,11 @@ with st.sidebar:
                 subtype_options = ['All'] + sorted(subtypes)
                 selected_subtype = st.selectbox("Subtype", subtype_options)
             
+            # Category learned from the summaries, for tickets with a blank or inconsistent Subtype
+            if CATEGORY_COLUMN in st.session_state.data.columns:
+                category_options = ['All'] + sorted(st.session_state.data[CATEGORY_COLUMN].dropna().unique().tolist())
+                selected_category = st.selectbox("Category", category_options)
+            
             # Add Team filter if column exists (with multi-select option)
             if 'Team' in st.session_state.data.columns:
                 # Get unique teams, filtering out NaN values and convert to string
@@ -519,10 +899,22 @@ with st.sidebar:
                                                      service_board_options,
                                                      help="Filter tickets by service board")
                 
+            # Full-text search over summaries, contacts, items and vendor ticket numbers
+            search_query = st.text_input("Search tickets",
+                                         help='Words, "exact phrases" and prefix* terms; every term must match')
+            
+            # Show one ticket per near-duplicate cluster (alert storms)
+            collapse_near_duplicates = st.checkbox("Collapse near-duplicates",
+                                                   help="Keep the latest ticket of each group of near-identical summaries")
+            
             # Add checkbox for unassigned tickets
             st.markdown("---")
             show_unassigned_only = st.checkbox("Show Unassigned Tickets Only", 
                                              help="When checked, only tickets without assigned resources will be shown")
+            
+            # Optional embedded database for pushed-down filtering and ad-hoc SQL
+            use_sql_backend = st.checkbox("Query through SQL backend",
+                                          help="Load the data into a local SQLite database and filter it there")
 
 # Main content area
 if st.session_state.data is None:
@@ -530,66 +922,139 @@ if st.session_state.data is None:
 else:
     # Filter data based on date range and other filters
     df = st.session_state.data
+    # The shared dataset comes with its filter and search indexes and alert state
+    shared_data = shared_snapshot is not None and df is shared_snapshot.data
+    
+    # Collect the sidebar selections that exist for this dataset
+    selections = {}
+    if 'selected_status' in locals():
+        selections['Status'] = selected_status
+    if 'selected_company' in locals():
+        selections['Company'] = selected_company
+    if 'selected_resource' in locals():
+        selections['Resources'] = selected_resource
+    if 'selected_subtype' in locals():
+        selections['Subtype'] = selected_subtype
+    if 'selected_category' in locals():
+        selections[CATEGORY_COLUMN] = selected_category
+    if 'selected_teams' in locals():
+        selections['Team'] = selected_teams
+    if 'selected_service_board' in locals():
+        selections['Service Board'] = selected_service_board
+    
+    # "All Time" doesn't restrict the date range
+    date_filtered = date_options[selected_date_range] > 0
+    filters = build_filters(
+        date_min=date_min if date_filtered else None,
+        date_max=date_max if date_filtered else None,
+        selections=selections,
+        unassigned_only='show_unassigned_only' in locals() and show_unassigned_only
+    )
     
-    # Filter data by selected date range
-    filtered_df = df.copy()
-    
-    # Convert dates and filter by date range if 'Last Update' column exists
-    if 'Last Update' in filtered_df.columns:
-        filtered_df['Last Update'] = pd.to_datetime(filtered_df['Last Update'], errors='coerce')
-        
-        # Apply date filter if time period is not "All Time"
-        if date_options[selected_date_range] > 0:
-            # Create date range filter - make sure we're comparing datetime.date objects
-            filtered_df = filtered_df[
-                (filtered_df['Last Update'].dt.date >= date_min) & 
-                (filtered_df['Last Update'].dt.date <= date_max)
-            ]
-            st.sidebar.success(f"Showing {len(filtered_df)} tickets from the past {date_options[selected_date_range]} days.")
-    
-    # Apply additional filters
-    if 'selected_status' in locals() and selected_status != 'All':
-        filtered_df = filtered_df[filtered_df['Status'] == selected_status]
-    
-    if 'selected_company' in locals() and selected_company != 'All':
-        filtered_df = filtered_df[filtered_df['Company'] == selected_company]
-    
-    if 'selected_resource' in locals() and selected_resource != 'All':
-        filtered_df = filtered_df[filtered_df['Resources'] == selected_resource]
-        
-    # Apply Subtype filter if selected
-    if 'selected_subtype' in locals() and selected_subtype != 'All':
-        # Convert Subtype column to string to ensure consistent comparison
-        filtered_df['Subtype'] = filtered_df['Subtype'].astype(str)
-        filtered_df = filtered_df[filtered_df['Subtype'] == selected_subtype]
-        
-    # Apply Team filter if teams are selected in the multi-select
-    if 'selected_teams' in locals() and len(selected_teams) > 0:
-        # Convert Team column to string to ensure consistent comparison
-        filtered_df['Team'] = filtered_df['Team'].astype(str)
-        # Filter for tickets where Team is in the list of selected teams
-        filtered_df = filtered_df[filtered_df['Team'].isin(selected_teams)]
-        # Show which teams are being filtered
+    sql_source = None
+    if 'use_sql_backend' in locals() and use_sql_backend:
+        # Push the filters down to the embedded database, into a table of this session's own
+        ticket_db = get_ticket_database()
+        if 'sql_table' not in st.session_state:
+            st.session_state.sql_table = TicketDatabase.session_table(uuid.uuid4().hex)
+        # Tables of idle sessions expire, so a session coming back may have to load again
+        if st.session_state.get('sql_loaded_source') is not df or not ticket_db.has_tickets(st.session_state.sql_table):
+            with stage('load_sql', rows=len(df)):
+                ticket_db.load(df, table=st.session_state.sql_table)
+            st.session_state.sql_loaded_source = df
+        with stage('filter_sql') as span:
+            filtered_df = ticket_db.fetch(filters, table=st.session_state.sql_table)
+            span['rows'] = len(filtered_df)
+        sql_source = (ticket_db, st.session_state.sql_table, filters)
+    else:
+        # Apply all filters with a single boolean mask, using the prebuilt
+        # filter index when the data came from the shared dataset
+        filter_index = shared_snapshot.index if shared_data else None
+        with stage('filter', rows=len(df)):
+            filtered_df = apply_filters(df, filters, filter_index)
+    
+    # Threshold rules run once per new dataset; shared refreshes were evaluated when published.
+    # This session's own uploads keep their own alert state, so they never move the shared one
+    alert_engine = get_alert_engine()
+    if shared_data:
+        alert_state = alert_engine.state
+    else:
+        if 'alert_state' not in st.session_state:
+            st.session_state.alert_state = AlertState(source='upload')
+        alert_state = st.session_state.alert_state
+        if st.session_state.get('alert_source') is not df:
+            with stage('threshold_alerts', rows=len(df)):
+                alert_engine.evaluate(df, state=alert_state)
+            st.session_state.alert_source = df
+    
+    # The shared dataset's search index is kept current when it is published; this
+    # session's own uploads get an index of their own, re-tokenizing only changed tickets
+    if shared_data:
+        search_index = shared_snapshot.search_index
+    else:
+        if 'search_index' not in st.session_state:
+            st.session_state.search_index = SearchIndex()
+        if st.session_state.get('search_index_source') is not df:
+            with stage('search_index', rows=len(df)):
+                st.session_state.search_index.update(df)
+            st.session_state.search_index_source = df
+        search_index = st.session_state.search_index
+    
+    # Narrow the filtered tickets down to the full-text search matches
+    if 'search_query' in locals() and search_query.strip():
+        with stage('search') as span:
+            search_matches = search_index.search(search_query)
+            search_key = search_index.indexed_column
+            if search_matches is not None and search_key in filtered_df.columns:
+                search_keys = pd.to_numeric(filtered_df[search_key], errors='coerce')
+                filtered_df = filtered_df[search_keys.isin(search_matches)]
+            elif search_matches is not None:
+                # Tickets without an integer ID aren't indexed, so nothing matches
+                filtered_df = filtered_df.iloc[:0]
+            # The database doesn't know the search; charts count the matches in memory
+            sql_source = None
+            span['rows'] = len(filtered_df)
+        st.sidebar.info(f"{len(filtered_df)} tickets match \"{search_query}\"")
+    
+    # Collapse alert storms to their latest ticket after every other filter
+    if 'collapse_near_duplicates' in locals() and collapse_near_duplicates and CLUSTER_COLUMN in filtered_df.columns:
+        with stage('collapse_duplicates', rows=len(filtered_df)):
+            collapsed_count = len(filtered_df)
+            filtered_df = collapse_duplicates(filtered_df, filtered_df[CLUSTER_COLUMN])
+            sql_source = None
+        st.sidebar.info(f"Collapsed {collapsed_count - len(filtered_df)} near-duplicate tickets")
+    
+    # Chart selections narrow the tickets last; the index is rebuilt only when the tickets change
+    base_df = filtered_df
+    cross_filter_key = (repr(filters), locals().get('search_query'), locals().get('collapse_near_duplicates'))
+    if st.session_state.get('cross_filter_source') is not df or st.session_state.get('cross_filter_key') != cross_filter_key:
+        with stage('cross_filter_index', rows=len(base_df)):
+            cross = CrossFilter(base_df)
+            if 'cross_filter' in st.session_state:
+                cross.carry_over(st.session_state.cross_filter)
+        st.session_state.cross_filter = cross
+        st.session_state.cross_filter_source = df
+        st.session_state.cross_filter_key = cross_filter_key
+    if st.session_state.cross_filter.active:
+        filtered_df = base_df[st.session_state.cross_filter.mask()]
+        st.sidebar.info(f"Chart selection: {st.session_state.cross_filter.describe()}")
+    
+    if date_filtered:
+        st.sidebar.success(f"Showing {len(filtered_df)} tickets from the past {date_options[selected_date_range]} days.")
+    
+    # Show which teams are being filtered
+    if 'Team' in filters['columns']:
         if len(selected_teams) == 1:
             st.sidebar.success(f"Filtering by team: {selected_teams[0]}")
         else:
             st.sidebar.success(f"Filtering by {len(selected_teams)} teams")
-            
-    # Apply Service Board filter if selected
-    if 'selected_service_board' in locals() and selected_service_board != 'All':
-        # Convert Service Board column to string to ensure consistent comparison
-        filtered_df['Service Board'] = filtered_df['Service Board'].astype(str)
-        filtered_df = filtered_df[filtered_df['Service Board'] == selected_service_board]
+    
+    if 'Service Board' in filters['columns']:
         st.sidebar.success(f"Filtering by service board: {selected_service_board}")
     
-    # Filter for unassigned tickets if the checkbox is selected
-    if 'show_unassigned_only' in locals() and show_unassigned_only:
-        filtered_df = filtered_df[filtered_df['Resources'].isna() | (filtered_df['Resources'] == '')]
+    if filters['unassigned_only']:
         st.sidebar.info("Showing unassigned tickets only")
     
-    # Create processed data for visualization
-    processed_data = process_data(filtered_df, time_period.lower())
-    
     # Display summary metrics with enhanced eye-catching styling
     st.markdown("<h2 class='subheader'>Summary Metrics</h2>", unsafe_allow_html=True)
     
@@ -719,33 +1184,29 @@ else:
     """, unsafe_allow_html=True)
     
     # Get the metrics values
-    total_tickets = len(filtered_df)
+    kpis = compute_kpis(filtered_df)
+    total_tickets = kpis['total_tickets']
     
     # Average age of tickets
     avg_age = "N/A"
     if 'Age' in filtered_df.columns:
-        try:
-            # Extract numeric value from Age column
-            filtered_df.loc[:, 'Age_Numeric'] = filtered_df['Age'].astype(str).str.extract(r'(\d+\.?\d*)').astype(float)
-            avg_age = f"{filtered_df['Age_Numeric'].mean():.1f}"
-        except:
-            pass
+        # Keep a numeric age column for the oldest-ticket views and the PDF
+        filtered_df.loc[:, 'Age_Numeric'] = numeric_age(filtered_df)
+        if kpis['avg_age'] is not None:
+            avg_age = f"{kpis['avg_age']:.1f}"
+    
+    # Same age in business hours of each site's zone
+    business_age_note = ""
+    if kpis['avg_business_age_hours'] is not None:
+        business_age_note = f" · {kpis['avg_business_age_hours']:.0f} business hrs"
     
     # Unassigned tickets
-    unassigned = 0
-    unassigned_pct = "0%"
-    if 'Resources' in filtered_df.columns:
-        unassigned = filtered_df[filtered_df['Resources'].isna() | (filtered_df['Resources'] == '')].shape[0]
-        if len(filtered_df) > 0:
-            unassigned_pct = f"{unassigned/len(filtered_df)*100:.1f}%"
+    unassigned = kpis['unassigned']
+    unassigned_pct = f"{kpis['unassigned_pct']:.1f}%"
     
     # SLA issues
-    overdue = 0
-    overdue_pct = "0%"
-    if 'SLA Status' in filtered_df.columns:
-        overdue = filtered_df[filtered_df['SLA Status'].str.contains('late|overdue', case=False, na=False)].shape[0]
-        if len(filtered_df) > 0:
-            overdue_pct = f"{overdue/len(filtered_df)*100:.1f}%"
+    overdue = kpis['sla_issues']
+    overdue_pct = f"{kpis['sla_issues_pct']:.1f}%"
     
     # Create a more standard grid layout for metrics with eye-catching colors
     # Use Streamlit's built-in layout rather than custom HTML that could render incorrectly
@@ -790,7 +1251,7 @@ else:
                     box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);">
             <div style="font-size: 28px; font-weight: 700; color: #047857; margin-bottom: 5px;">""" + str(avg_age) + """</div>
             <div style="font-size: 16px; color: #4B5563; font-weight: 600;">Average Age</div>
-            <div style="margin-top: 10px; font-size: 14px; color: #6B7280;">Days in system</div>
+            <div style="margin-top: 10px; font-size: 14px; color: #6B7280;">Days in system""" + business_age_note + """</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -841,6 +1302,69 @@ else:
         
         st.markdown("</div>", unsafe_allow_html=True)
     
+    # Tickets close to or past their SLA deadline
+    with st.expander("SLA Breach Watch"):
+        # The deadline-ordered index is built once per dataset and reused by every lookup
+        if st.session_state.get('sla_index_source') is not st.session_state.data:
+            with stage('sla_index', rows=len(st.session_state.data)):
+                st.session_state.sla_index = SlaBreachIndex(st.session_state.data)
+            st.session_state.sla_index_source = st.session_state.data
+        sla_index = st.session_state.sla_index
+        
+        breach_hours = st.slider("Breaching within (hours)", min_value=1, max_value=72, value=8)
+        now_utc = pd.Timestamp.now(tz='UTC')
+        
+        # Look up in the full dataset, then keep the tickets passing the current filters
+        key_column = 'Selected_Sr_Service_Recid'
+        data = st.session_state.data
+        breached_rows = data.loc[sla_index.breached(now_utc)]
+        soon_rows = data.loc[sla_index.breaching_within(breach_hours, now_utc)]
+        if key_column in filtered_df.columns:
+            visible = filtered_df[key_column]
+            breached_rows = breached_rows[breached_rows[key_column].isin(visible)]
+            soon_rows = soon_rows[soon_rows[key_column].isin(visible)]
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Past SLA deadline", len(breached_rows))
+        with col2:
+            st.metric(f"Breaching within {breach_hours}h", len(soon_rows))
+        
+        if soon_rows.empty:
+            st.info(f"No tickets breach their SLA in the next {breach_hours} hours.")
+        else:
+            soon_view = soon_rows[[col for col in ['Ticket #', 'Company', 'Resources', 'Status', 'SLA Kind', 'SLA Deadline']
+                                   if col in soon_rows.columns]].copy()
+            soon_view['Time to Breach'] = time_to_breach(soon_rows, now_utc).dt.floor('min').astype(str)
+            soon_view['Business Hours Left'] = business_clocks(soon_rows, now_utc)['SLA Business Hours Left'].round(1)
+            st.dataframe(soon_view, hide_index=True, use_container_width=True)
+    
+    # Groups of near-identical tickets among the filtered ones
+    with st.expander("Near-Duplicate Clusters"):
+        if CLUSTER_COLUMN in filtered_df.columns:
+            clustered = filtered_df[filtered_df[CLUSTER_COLUMN] >= 0]
+            if 'Duplicates' in filtered_df.columns:
+                sizes = clustered.groupby(CLUSTER_COLUMN)['Duplicates'].sum()
+            else:
+                sizes = clustered[CLUSTER_COLUMN].value_counts()
+            sizes = sizes[sizes > 1].sort_values(ascending=False)
+            
+            if sizes.empty:
+                st.info("No near-duplicate tickets in the current selection.")
+            else:
+                st.metric("Tickets in near-duplicate clusters", int(sizes.sum()))
+                # One row per cluster, described by its latest ticket
+                latest = clustered.sort_values('Last Update', ascending=False) if 'Last Update' in clustered.columns else clustered
+                examples = latest.drop_duplicates(CLUSTER_COLUMN).set_index(CLUSTER_COLUMN)
+                cluster_view = pd.DataFrame({
+                    'Tickets': sizes,
+                    'Companies': clustered.groupby(CLUSTER_COLUMN)['Company'].nunique().reindex(sizes.index) if 'Company' in clustered.columns else None,
+                    'Latest Summary': examples['Summary Description'].reindex(sizes.index)
+                }).dropna(axis=1, how='all')
+                st.dataframe(cluster_view.head(20), use_container_width=True)
+        else:
+            st.info("Summary data not available to find near-duplicates.")
+    
     # Store the "Show Unassigned Tickets Only" state
     unassigned_only_view = 'show_unassigned_only' in locals() and show_unassigned_only
     
@@ -855,80 +1379,9 @@ else:
     </div>
     """, unsafe_allow_html=True)
     
-    # Create two rows of visualizations with enhanced styling
-    row1_col1, row1_col2 = st.columns(2)
-    
-    with row1_col1:
-        # Ticket Status Chart with box styling
-        st.markdown("<p class='row-header'>Ticket Status Distribution</p>", unsafe_allow_html=True)
-        if 'Status' in filtered_df.columns:
-            status_fig = create_status_chart(filtered_df)
-            # Update layout for better styling
-            status_fig.update_layout(
-                margin=dict(l=20, r=20, t=30, b=20),
-                paper_bgcolor='white',
-                plot_bgcolor='white',
-                font=dict(family="Arial, sans-serif", size=12),
-                legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
-            )
-            st.plotly_chart(status_fig, use_container_width=True)
-        else:
-            st.error("Status data not available in the uploaded file.")
-    
-    with row1_col2:
-        # Ticket Priority Chart with box styling
-        st.markdown("<p class='row-header'>Ticket Priority Breakdown</p>", unsafe_allow_html=True)
-        if 'Priority' in filtered_df.columns:
-            priority_fig = create_priority_chart(filtered_df)
-            # Update layout for better styling
-            priority_fig.update_layout(
-                margin=dict(l=20, r=20, t=30, b=20),
-                paper_bgcolor='white',
-                plot_bgcolor='white',
-                font=dict(family="Arial, sans-serif", size=12),
-                legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
-            )
-            st.plotly_chart(priority_fig, use_container_width=True)
-        else:
-            st.error("Priority data not available in the uploaded file.")
-    
-    row2_col1, row2_col2 = st.columns(2)
-    
-    with row2_col1:
-        # Ticket Age Distribution with box styling
-        st.markdown("<p class='row-header'>Ticket Age Distribution</p>", unsafe_allow_html=True)
-        if 'Age' in filtered_df.columns:
-            try:
-                age_fig = create_age_histogram(filtered_df)
-                # Update layout for better styling
-                age_fig.update_layout(
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    paper_bgcolor='white',
-                    plot_bgcolor='white',
-                    font=dict(family="Arial, sans-serif", size=12)
-                )
-                st.plotly_chart(age_fig, use_container_width=True)
-            except:
-                st.error("Could not process Age data.")
-        else:
-            st.error("Age data not available in the uploaded file.")
+    # Charts filter each other by their selections
+    analytics_charts(base_df, sql_source)
     
-    with row2_col2:
-        # Company Distribution with box styling
-        st.markdown("<p class='row-header'>Company Distribution</p>", unsafe_allow_html=True)
-        if 'Company' in filtered_df.columns:
-            company_fig = create_company_bar_chart(filtered_df)
-            # Update layout for better styling
-            company_fig.update_layout(
-                margin=dict(l=20, r=20, t=30, b=20),
-                paper_bgcolor='white',
-                plot_bgcolor='white',
-                font=dict(family="Arial, sans-serif", size=12)
-            )
-            st.plotly_chart(company_fig, use_container_width=True)
-        else:
-            st.error("Company data not available in the uploaded file.")
-
     # Time trend analysis with enhanced styling
     st.markdown("<h2 class='subheader'>Daily Ticket Trend</h2>", unsafe_allow_html=True)
     if 'Last Update' in filtered_df.columns:
@@ -944,11 +1397,51 @@ else:
     else:
         st.error("Date data not available for trend analysis.")
     
+    # Open-ticket backlog rebuilt from the uploaded daily snapshots
+    backlog_engine = st.session_state.backlog_engine
+    if backlog_engine.totals:
+        st.markdown("<h2 class='subheader'>Open Ticket Backlog</h2>", unsafe_allow_html=True)
+        backlog_dimension = st.selectbox("Break down backlog by", backlog_engine.dimensions)
+        backlog_fig = create_backlog_chart(backlog_engine.backlog_series(backlog_dimension), backlog_dimension)
+        # Update layout for better styling
+        backlog_fig.update_layout(
+            margin=dict(l=20, r=20, t=30, b=20),
+            paper_bgcolor='white',
+            plot_bgcolor='white',
+            font=dict(family="Arial, sans-serif", size=12)
+        )
+        st.plotly_chart(backlog_fig, use_container_width=True)
+    
+    # What changed between the two most recent snapshots
+    if len(st.session_state.latest_snapshots) == 2:
+        (old_date, old_df, old_fp), (new_date, new_df, new_fp) = st.session_state.latest_snapshots
+        st.markdown("<h2 class='subheader'>Changes Since Last Export</h2>", unsafe_allow_html=True)
+        st.write(f"Comparing export of {old_date.date()} with {new_date.date()}")
+        
+        changes = diff_snapshots(old_df, new_df, old_fingerprints=old_fp, new_fingerprints=new_fp)
+        change_summary = summarize_changes(changes)
+        
+        change_cols = st.columns(5)
+        change_cols[0].metric("New Tickets", change_summary['new'])
+        change_cols[1].metric("Closed Tickets", change_summary['closed'])
+        change_cols[2].metric("Status Changes", change_summary['status_changes'])
+        change_cols[3].metric("Resource Changes", change_summary['resources_changes'])
+        change_cols[4].metric("Priority Changes", change_summary['priority_changes'])
+        
+        st.dataframe(changes, hide_index=True, use_container_width=True)
+    
     # Resource allocation section - Only display when not in unassigned tickets mode
     if not unassigned_only_view:
         st.markdown("<h2 class='subheader'>Resource Allocation</h2>", unsafe_allow_html=True)
         if 'Resources' in filtered_df.columns:
-            resource_fig = create_resource_allocation_chart(filtered_df)
+            # Reuse the dataset's split assignments when the filtered rows can be mapped back to it
+            positions = df.index.get_indexer(filtered_df.index) if df.index.is_unique else np.array([-1])
+            if 'assignment_index' in st.session_state and len(positions) == len(filtered_df) and (positions >= 0).all():
+                filtered_assignments = st.session_state.assignment_index.subset(positions)
+            else:
+                filtered_assignments = AssignmentIndex(filtered_df)
+            
+            resource_fig = create_resource_allocation_chart(filtered_df, filtered_assignments)
             # Update layout for better styling
             resource_fig.update_layout(
                 margin=dict(l=20, r=20, t=30, b=20),
@@ -957,9 +1450,83 @@ else:
                 font=dict(family="Arial, sans-serif", size=12)
             )
             st.plotly_chart(resource_fig, use_container_width=True)
+            
+            # Engineer x priority x age workload and open hours
+            with stage('workload', rows=len(filtered_df)):
+                matrix = workload_matrix(filtered_df, filtered_assignments)
+                summary = workload_summary(filtered_df, filtered_assignments)
+            if not matrix.empty:
+                workload_fig = create_workload_heatmap(matrix)
+                workload_fig.update_layout(
+                    margin=dict(l=20, r=20, t=30, b=20),
+                    paper_bgcolor='white',
+                    font=dict(family="Arial, sans-serif", size=12)
+                )
+                st.plotly_chart(workload_fig, use_container_width=True)
+                st.dataframe(summary, use_container_width=True)
         else:
             st.error("Resource data not available in the uploaded file.")
     
+    # Hours against budget per company and engineer, with running totals from the snapshot history
+    st.markdown("<h2 class='subheader'>Budget Burn</h2>", unsafe_allow_html=True)
+    with stage('burn_rate', rows=len(filtered_df)):
+        burn = burn_rollups(filtered_df, locals().get('filtered_assignments'))
+    burn_levels = [level for level in BURN_LEVELS if level in burn]
+    if burn_levels:
+        ticket_burn = burn['Tickets']
+        burn_cols = st.columns(4)
+        burn_cols[0].metric("Over Budget Tickets", int(ticket_burn['Over Budget'].sum()))
+        burn_cols[1].metric("Overrun Hours", f"{ticket_burn['Overrun Hours'].sum():.1f}")
+        burn_cols[2].metric("Projected Overrun (7d)", f"{ticket_burn['Projected Overrun'].sum():.1f}")
+        burn_cols[3].metric("Hours / Budget", f"{burn[burn_levels[0]]['Hours'].sum():.1f} / {burn[burn_levels[0]]['Budget'].sum():.1f}")
+        
+        burn_level = st.radio("Burn by", burn_levels, horizontal=True, key='burn_level')
+        burn_summary = burn[burn_level]
+        burn_fig = create_burn_chart(burn_summary, burn_level)
+        burn_fig.update_layout(
+            margin=dict(l=20, r=20, t=30, b=20),
+            paper_bgcolor='white',
+            plot_bgcolor='white',
+            font=dict(family="Arial, sans-serif", size=12)
+        )
+        st.plotly_chart(burn_fig, use_container_width=True, key='burn_chart')
+        
+        # Only groups already over budget or heading there
+        over_budget = burn_summary[(burn_summary['Overrun Hours'] > 0) | (burn_summary['Projected Overrun'] > 0)]
+        if over_budget.empty:
+            st.info("No tickets are over budget or projected to go over.")
+        else:
+            st.dataframe(over_budget, use_container_width=True)
+        
+        burn_history = st.session_state.burn_history
+        if burn_history.history:
+            burn_history_fig = create_burn_history_chart(burn_history.totals_frame())
+            burn_history_fig.update_layout(
+                margin=dict(l=20, r=20, t=30, b=20),
+                paper_bgcolor='white',
+                plot_bgcolor='white',
+                font=dict(family="Arial, sans-serif", size=12)
+            )
+            st.plotly_chart(burn_history_fig, use_container_width=True, key='burn_history_chart')
+            with st.expander("Running totals by company"):
+                st.dataframe(burn_history.company_totals(), use_container_width=True)
+    else:
+        st.info("No company or resource data available to compare hours with budget.")
+    
+    # Region -> team -> engineer and company -> site rollups, grouped once per filter selection
+    st.markdown("<h2 class='subheader'>Drill-Down</h2>", unsafe_allow_html=True)
+    rollup_key = (repr(filters), locals().get('search_query'), locals().get('collapse_near_duplicates'),
+                  st.session_state.cross_filter.describe())
+    if st.session_state.get('rollup_source') is not df or st.session_state.get('rollup_key') != rollup_key:
+        with stage('rollups', rows=len(filtered_df)):
+            st.session_state.rollups = build_rollups(filtered_df)
+        st.session_state.rollup_source = df
+        st.session_state.rollup_key = rollup_key
+    if st.session_state.rollups:
+        drill_down_panel(st.session_state.rollups)
+    else:
+        st.info("No team or company data available to drill into.")
+    
     # Top 10 Oldest Tickets section with enhanced styling
     st.markdown("<h2 class='subheader'>Top 10 Oldest Tickets</h2>", unsafe_allow_html=True)
     if 'Age' in filtered_df.columns and 'Age_Numeric' in filtered_df.columns:
@@ -994,8 +1561,8 @@ else:
     if not unassigned_only_view:
         st.markdown("<h2 class='subheader'>Top 10 Alerts</h2>", unsafe_allow_html=True)
         if 'Summary Description' in filtered_df.columns:
-            # Find alerts in ticket descriptions 
-            alerts_mask = filtered_df['Summary Description'].str.contains('Alert|Warning|Critical|Urgent|Emergency|Endgame', case=False, na=False)
+            # Alert tickets from the flags tagged at ingest
+            alerts_mask = flag_mask(filtered_df, SUMMARY_ALERT_CATEGORIES)
             alert_tickets = filtered_df[alerts_mask].head(10)
             
             if not alert_tickets.empty:
@@ -1012,432 +1579,56 @@ else:
         else:
             st.error("Summary data not available to show alerts.")
     
+    # Groups currently over a threshold rule, from the last evaluation of the full dataset
+    st.markdown("<h2 class='subheader'>Threshold Alerts</h2>", unsafe_allow_html=True)
+    if alert_engine.last_error:
+        st.warning(f"Alert delivery failed: {alert_engine.last_error}")
+    active_alerts = alert_state.active_frame()
+    if active_alerts.empty:
+        st.info("No threshold rules are firing.")
+    else:
+        st.dataframe(active_alerts, hide_index=True, use_container_width=True)
+    if alert_state.recent:
+        with st.expander("Recent alert changes"):
+            recent_alerts = pd.DataFrame(list(alert_state.recent)[::-1])
+            st.dataframe(recent_alerts[['time', 'state', 'message']], hide_index=True, use_container_width=True)
+    with st.expander("Threshold rules"):
+        st.dataframe(
+            pd.DataFrame([{'Rule': rule.name, 'Condition': rule.describe()} for rule in alert_engine.rules]),
+            hide_index=True,
+            use_container_width=True
+        )
+    
     # Detailed data view with enhanced styling
     st.markdown("<h2 class='subheader'>Detailed Ticket Data</h2>", unsafe_allow_html=True)
-    st.dataframe(
-        filtered_df,
-        hide_index=True,
-        use_container_width=True
-    )
+    with stage('st.dataframe', rows=len(filtered_df)):
+        st.dataframe(
+            filtered_df,
+            hide_index=True,
+            use_container_width=True
+        )
     
-    # Create enhanced PDF export function for comprehensive executive report with customizable branding
-    def create_pdf(dataframe, company_name="COMPANY", brand_color=(41, 128, 185), logo_size=40, include_timestamp=True):
-        # Create a custom PDF class to add header with logo and footer
-        class PDF(FPDF):
-            def __init__(self, company_name, brand_color, logo_size, include_timestamp):
-                super().__init__()
-                self.company_name = company_name
-                self.brand_color = brand_color
-                self.logo_size = logo_size
-                self.include_timestamp = include_timestamp
-            
-            def header(self):
-                # Use Base64 encoded image as logo
-                # Read the Base64 string from file
-                try:
-                    with open('logo_base64.txt', 'r') as f:
-                        logo_b64 = f.read()
-                    
-                    # Create a temporary file for the image
-                    import tempfile
-                    import os
-                    import base64
-                    
-                    # Create temporary file
-                    temp = tempfile.NamedTemporaryFile(delete=False, suffix='.jpeg')
-                    temp_filename = temp.name
-                    
-                    # Write decoded base64 image to the temporary file
-                    with open(temp_filename, 'wb') as f:
-                        f.write(base64.b64decode(logo_b64))
-                    
-                    # Add image to PDF with custom size
-                    self.image(temp_filename, x=210-self.logo_size-10, y=8, w=self.logo_size)
-                    
-                    # Clean up the temporary file
-                    os.unlink(temp_filename)
-                    
-                except Exception as e:
-                    # Fallback to text-based logo if there's any error
-                    # Draw logo background with custom brand color
-                    self.set_fill_color(*self.brand_color)  # Use custom brand color
-                    x_pos = 210-self.logo_size-10  # Right-aligned position
-                    self.rect(x_pos, 8, self.logo_size, 18, style='F')
-                    
-                    # Add border - darker shade of brand color
-                    darker_color = tuple(max(0, c-40) for c in self.brand_color)
-                    self.set_draw_color(*darker_color)
-                    self.set_line_width(0.5)
-                    self.rect(x_pos, 8, self.logo_size, 18, style='D')
-                    
-                    # Add company name/text
-                    self.set_font('Arial', 'B', 12)
-                    self.set_text_color(255, 255, 255)  # White text
-                    self.set_xy(x_pos, 13)
-                    self.cell(self.logo_size, 8, self.company_name, 0, 0, 'C')
-                
-                # Add title with date in the format "Daily Insights Date, Month Year"
-                current_date = datetime.now().strftime("%d, %B %Y")
-                self.set_font('Arial', 'B', 15)
-                self.set_text_color(*self.brand_color)  # Use custom brand color
-                self.set_xy(10, 10)
-                self.cell(0, 10, f'Daily Insights {current_date}', 0, 1, 'C')
-                
-                # Add generation timestamp based on user preference
-                if self.include_timestamp:
-                    self.set_font('Arial', 'I', 10)
-                    self.set_text_color(100, 100, 100)
-                    self.cell(0, 5, 'Executive Report', 0, 1, 'C')
-                
-                # Add a line
-                self.set_draw_color(59, 130, 246)  # Blue line
-                self.line(10, 25, 200, 25)
-                self.ln(10)
-                
-            def footer(self):
-                # Position at 1.5 cm from bottom
-                self.set_y(-15)
-                self.set_font('Arial', 'I', 8)
-                self.set_text_color(100, 100, 100)
-                self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-                
-        # Create PDF object with custom branding
-        pdf = PDF(company_name, brand_color, logo_size, include_timestamp)
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.add_page()
-        
-        # Add executive summary
-        pdf.set_font('Arial', 'B', 14)
-        pdf.set_text_color(30, 58, 138)  # Dark blue color
-        pdf.cell(0, 10, 'Executive Summary', 0, 1, 'L')
-        
-        # Add a fancy box around summary stats
-        pdf.set_fill_color(239, 246, 255)  # Light blue background
-        pdf.set_draw_color(199, 210, 254)  # Border color
-        pdf.rect(10, pdf.get_y(), 190, 25, 'DF')
-        
-        # Add summary text
-        pdf.set_font('Arial', '', 10)
-        pdf.set_text_color(0, 0, 0)
-        pdf.set_xy(15, pdf.get_y() + 5)
-        
-        # Summary metrics in a cleaner format
-        if 'Age_Numeric' in dataframe.columns:
-            avg_age = dataframe['Age_Numeric'].mean()
-            urgent_count = len(dataframe[dataframe['Priority'].str.contains('Urgent', case=False, na=False)])
-            open_count = len(dataframe[dataframe['Status'].str.contains('Open|New|In Progress', case=False, na=False)])
-            
-            summary_text = (
-                f"This report contains details on {len(dataframe)} security tickets. "
-                f"The average ticket age is {avg_age:.1f} days with {urgent_count} urgent issues. "
-                f"Currently, {open_count} tickets require attention."
-            )
-            
-            # Add text with line breaks if needed
-            pdf.multi_cell(180, 5, summary_text)
-        else:
-            pdf.multi_cell(180, 5, f"This report contains details on {len(dataframe)} security tickets.")
-            
-        pdf.ln(10)
-        
-        # Add priority distribution section with colored legend
-        pdf.set_font('Arial', 'B', 14)
-        pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 10, 'Ticket Priority Distribution', 0, 1, 'L')
-        
-        # Count tickets by priority
-        priority_counts = {
-            'Urgent': len(dataframe[dataframe['Priority'].str.contains('Urgent', case=False, na=False)]),
-            'High': len(dataframe[dataframe['Priority'].str.contains('High', case=False, na=False)]),
-            'Medium': len(dataframe[dataframe['Priority'].str.contains('Medium', case=False, na=False)]),
-            'Low': len(dataframe[dataframe['Priority'].str.contains('Low', case=False, na=False)])
-        }
-        
-        # Create colored boxes for priorities
-        pdf.set_font('Arial', 'B', 10)
-        
-        # Urgent - Red
-        pdf.set_fill_color(239, 68, 68)
-        pdf.set_text_color(255, 255, 255)
-        pdf.rect(15, pdf.get_y() + 2, 8, 8, 'F')
-        pdf.set_text_color(0, 0, 0)
-        pdf.set_xy(25, pdf.get_y() + 2)
-        pdf.cell(30, 8, f"Urgent: {priority_counts['Urgent']}", 0, 0)
-        
-        # High - Orange
-        pdf.set_fill_color(245, 158, 11)
-        pdf.rect(65, pdf.get_y(), 8, 8, 'F')
-        pdf.set_xy(75, pdf.get_y())
-        pdf.cell(30, 8, f"High: {priority_counts['High']}", 0, 0)
-        
-        # Medium - Yellow
-        pdf.set_fill_color(251, 191, 36)
-        pdf.rect(115, pdf.get_y(), 8, 8, 'F')
-        pdf.set_xy(125, pdf.get_y())
-        pdf.cell(30, 8, f"Medium: {priority_counts['Medium']}", 0, 0)
-        
-        # Low - Green
-        pdf.set_fill_color(16, 185, 129)
-        pdf.rect(165, pdf.get_y(), 8, 8, 'F')
-        pdf.set_xy(175, pdf.get_y())
-        pdf.cell(30, 8, f"Low: {priority_counts['Low']}", 0, 1)
-        
-        # Add a clean page break between sections
-        pdf.add_page()
-        
-        # Add charts and visualizations from the dashboard
-        
-        # Create Ticket Status Distribution with matplotlib horizontal bar chart
-        pdf.ln(10)
-        pdf.set_font('Arial', 'B', 14)
-        pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 10, 'Ticket Status Distribution', 0, 1, 'L')
-        
-        # Get status data from actual dataframe
-        if 'Status' in dataframe.columns:
-            # Calculate status counts and percentages
-            status_counts = dataframe['Status'].value_counts()
-            total_tickets = len(dataframe)
-            
-            # Get top 8 statuses
-            top_statuses = status_counts.head(8)
-            
-            # Prepare data for plotting
-            statuses = list(top_statuses.index)
-            counts = list(top_statuses.values)
-            percentages = [(count / total_tickets) * 100 for count in counts]
-        
-        # Colors for each status
-        colors = [
-            "#4c81d1", "#f5a623", "#9b9b9b", "#f8e71c", 
-            "#bd10e0", "#7ed321", "#50e3c2", "#d0021b"
-        ]
-        
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Plot horizontal bars with only needed colors
-        colors_needed = colors[:len(statuses)]
-        bars = ax.barh(statuses, counts, color=colors_needed)
-        
-        # Adding text labels, right aligned
-        for i, (bar, pct) in enumerate(zip(bars, percentages)):
-            width = bar.get_width()
-            ax.text(width + 1, bar.get_y() + bar.get_height() / 2,
-                    f"{counts[i]} ({pct:.1f}%)", va='center', ha='left', fontsize=10)
-        
-        # Aesthetics
-        ax.set_xlabel('Number of Tickets')
-        ax.set_title('Ticket Status Distribution', fontsize=14, fontweight='bold')
-        ax.invert_yaxis()  # Highest value on top
-        ax.set_xlim(0, max(counts) + 20)  # Add margin for label visibility
-        plt.tight_layout()
-        
-        # Save the plot to a temporary file
-        temp_img_path = '/tmp/status_chart.png'
-        plt.savefig(temp_img_path, format='png', dpi=100, bbox_inches='tight')
-        plt.close(fig)
-        
-        # Add the plot to the PDF
-        pdf.image(temp_img_path, x=25, y=None, w=160)
-        
-        pdf.ln(10)
-        
-        # Top 10 Tickets by Company section - now on the same page, no add_page()
-        pdf.set_font('Arial', 'B', 14)
-        pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 10, 'Top 10 Tickets by Company', 0, 1, 'L')
-        
-        if 'Company' in dataframe.columns:
-            # Get top 10 companies by ticket count
-            company_counts = dataframe['Company'].value_counts().head(10)
-            
-            # Create table header with colored background
-            pdf.set_fill_color(239, 246, 255)  # Light blue background
-            pdf.set_text_color(30, 58, 138)    # Dark blue text
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(135, 8, 'Company Name', 1, 0, 'C', 1)
-            pdf.cell(45, 8, 'Ticket Count', 1, 1, 'C', 1)
-            
-            # Add table data
-            pdf.set_font('Arial', '', 10)
-            pdf.set_text_color(0, 0, 0)
-            
-            # Alternate row colors for better readability
-            row_color = False
-            
-            # Total for percentage calculation
-            total_tickets = len(dataframe)
-            
-            for company, count in company_counts.items():
-                # Format company name consistently
-                company_name = company
-                if len(company_name) > 35:
-                    company_name = company_name[:32] + '...'
-                
-                # Calculate percentage
-                percentage = (count / total_tickets) * 100
-                
-                # Set fill color for alternating rows
-                if row_color:
-                    pdf.set_fill_color(249, 250, 251)  # Light grey
-                else:
-                    pdf.set_fill_color(255, 255, 255)  # White
-                
-                # Add data cells
-                pdf.cell(135, 7, company_name, 1, 0, 'L', row_color)
-                pdf.cell(45, 7, str(count), 1, 1, 'C', row_color)
-                
-                row_color = not row_color  # Alternate row color
-        
-        pdf.ln(15)
-        
-        # Move to page 2
-        pdf.add_page()
-        
-        # Add Top of Done Yets table including Resources column
-        pdf.set_font('Arial', 'B', 14)
-        pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 10, 'Top Done Yets', 0, 1, 'L')
-        
-        # Add descriptive text for Done Yets table
-        pdf.set_font('Arial', '', 10)
-        pdf.set_text_color(0, 0, 0)
-        pdf.multi_cell(0, 5, 'The following table shows tickets with "Done yet?" status, requiring final verification:')
-        pdf.ln(5)
-        
-        # Get tickets with "Done yet?" status
-        if 'Status' in dataframe.columns:
-            done_yet_tickets = dataframe[dataframe['Status'].str.contains('Done yet', case=False, na=False)].head(5)
-            
-            if not done_yet_tickets.empty:
-                # Create table header with colored background
-                pdf.set_fill_color(239, 246, 255)  # Light blue background
-                pdf.set_text_color(30, 58, 138)    # Dark blue text
-                pdf.set_font('Arial', 'B', 9)
-                pdf.cell(20, 7, 'Ticket #', 1, 0, 'C', 1)
-                pdf.cell(15, 7, 'Age', 1, 0, 'C', 1)
-                pdf.cell(35, 7, 'Company', 1, 0, 'C', 1)
-                pdf.cell(35, 7, 'Resource', 1, 0, 'C', 1)
-                pdf.cell(85, 7, 'Summary', 1, 1, 'C', 1)
-                
-                # Add table data
-                pdf.set_font('Arial', '', 8)
-                pdf.set_text_color(0, 0, 0)
-                
-                # Alternate row colors for better readability
-                row_color = False
-                
-                for _, row in done_yet_tickets.iterrows():
-                    # Get values with fallback for missing columns
-                    ticket_num = str(row.get('Ticket #', 'N/A'))
-                    priority = str(row.get('Priority', 'N/A'))
-                    age = str(row.get('Age', 'N/A')) if 'Age' in row else 'N/A'
-                    company = str(row.get('Company', 'N/A'))
-                    resource = str(row.get('Resources', 'N/A'))
-                    summary = str(row.get('Summary Description', 'N/A'))
-                    
-                    # Truncate long fields
-                    if len(summary) > 45:
-                        summary = summary[:42] + '...'
-                    if len(company) > 12:
-                        company = company[:9] + '...'
-                    if len(resource) > 12:
-                        resource = resource[:9] + '...'
-                    
-                    # Set fill color for alternating rows
-                    if row_color:
-                        pdf.set_fill_color(249, 250, 251)  # Light grey
-                    else:
-                        pdf.set_fill_color(255, 255, 255)  # White
-                    
-                    # Add data cells
-                    pdf.cell(20, 7, ticket_num[:9], 1, 0, 'L', row_color)
-                    pdf.cell(15, 7, age[:9], 1, 0, 'L', row_color)
-                    pdf.cell(35, 7, company, 1, 0, 'L', row_color)
-                    pdf.cell(35, 7, resource, 1, 0, 'L', row_color)
-                    pdf.cell(85, 7, summary, 1, 1, 'L', row_color)
-                    
-                    row_color = not row_color  # Alternate row color
-            else:
-                pdf.set_font('Arial', 'I', 10)
-                pdf.cell(0, 10, 'No tickets with "Done yet?" status found in the current dataset.', 0, 1, 'L')
+    # Saved-query panel for ad-hoc SQL over the embedded database
+    if 'use_sql_backend' in locals() and use_sql_backend:
+        with st.expander("SQL Queries"):
+            ticket_db = get_ticket_database()
+            saved_queries = ticket_db.saved_queries()
+            query_name = st.selectbox("Saved query", ['New query'] + list(saved_queries.keys()))
+            query_sql = st.text_area("SQL", value=saved_queries.get(query_name, 'SELECT * FROM tickets LIMIT 100'))
             
-            pdf.ln(20)
-        
-        # Move to page 3 for Top 10 Oldest Tickets
-        pdf.add_page()
-        
-        # 4. Top 10 oldest tickets section - Now with Resources column
-        pdf.set_font('Arial', 'B', 14)
-        pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 10, 'Top 10 Oldest Tickets', 0, 1, 'L')
-        
-        if 'Age_Numeric' in dataframe.columns:
-            oldest = dataframe.sort_values('Age_Numeric', ascending=False).head(10)
-            
-            # Create table header with colored background
-            pdf.set_fill_color(239, 246, 255)  # Light blue background
-            pdf.set_text_color(30, 58, 138)    # Dark blue text
-            pdf.set_font('Arial', 'B', 9)
-            pdf.cell(20, 7, 'Ticket #', 1, 0, 'C', 1)
-            pdf.cell(15, 7, 'Age', 1, 0, 'C', 1)
-            pdf.cell(35, 7, 'Company', 1, 0, 'C', 1)
-            pdf.cell(35, 7, 'Resource', 1, 0, 'C', 1)
-            pdf.cell(85, 7, 'Summary', 1, 1, 'C', 1)
-            
-            # Add table data
-            pdf.set_font('Arial', '', 8)
-            pdf.set_text_color(0, 0, 0)
-            
-            # Alternate row colors for better readability
-            row_color = False
-            
-            for _, row in oldest.iterrows():
-                # Get values with fallback for missing columns
-                ticket_num = str(row.get('Ticket #', 'N/A'))
-                priority = str(row.get('Priority', 'N/A'))
-                age = str(row.get('Age', 'N/A'))
-                status = str(row.get('Status', 'N/A'))
-                company = str(row.get('Company', 'N/A'))
-                resource = str(row.get('Resources', 'N/A'))
-                summary = str(row.get('Summary Description', 'N/A'))
-                
-                # Truncate long fields
-                if len(summary) > 40:
-                    summary = summary[:37] + '...'
-                if len(company) > 12:
-                    company = company[:9] + '...'
-                if len(resource) > 12:
-                    resource = resource[:9] + '...'
-                
-                # Set fill color for alternating rows
-                if row_color:
-                    pdf.set_fill_color(249, 250, 251)  # Light grey
-                else:
-                    pdf.set_fill_color(255, 255, 255)  # White
-                
-                # Add data cells
-                pdf.cell(20, 7, ticket_num[:9], 1, 0, 'L', row_color)
-                pdf.cell(15, 7, age[:9], 1, 0, 'L', row_color)
-                pdf.cell(35, 7, company, 1, 0, 'L', row_color)
-                pdf.cell(35, 7, resource, 1, 0, 'L', row_color)
-                pdf.cell(85, 7, summary, 1, 1, 'L', row_color)
-                
-                row_color = not row_color  # Alternate row color
-        
-        # No contact information footer as requested
-        
-        # Fix for byte array encoding issue
-        try:
-            # First attempt with latin1 encoding
-            return pdf.output(dest='S').encode('latin1')
-        except (UnicodeEncodeError, AttributeError):
-            # Fallback if the first method fails
-            byte_string = pdf.output(dest='S')
-            if isinstance(byte_string, str):
-                return byte_string.encode('latin1')
-            return byte_string
+            run_col, save_col = st.columns(2)
+            with run_col:
+                if st.button("Run Query"):
+                    try:
+                        st.dataframe(ticket_db.run_query(query_sql, table=st.session_state.sql_table),
+                                     hide_index=True, use_container_width=True)
+                    except Exception as e:
+                        st.error(f"Query failed: {str(e)}")
+            with save_col:
+                new_query_name = st.text_input("Save as", value='' if query_name == 'New query' else query_name)
+                if st.button("Save Query") and new_query_name:
+                    ticket_db.save_query(new_query_name, query_sql)
+                    st.success(f"Saved query '{new_query_name}'")
     
     # Simple PDF export section - no heading
     # Add some spacing
@@ -1454,7 +1645,8 @@ else:
     
     with col2:
         try:
-            pdf_data = create_pdf(filtered_df, company_name, rgb_color, logo_size, include_timestamp)
+            with stage('create_pdf', rows=len(filtered_df)):
+                pdf_data = create_pdf(filtered_df, company_name, rgb_color, logo_size, include_timestamp)
             
             # Add custom styling to center the button
             st.markdown(
@@ -1485,3 +1677,39 @@ else:
             import traceback
             st.error(f"Error details: {traceback.format_exc()}")
             st.info("There was an issue with the PDF generation. Please try again.")
+
+# Optional debug panel with the stage timings of recent reruns
+with st.sidebar:
+    st.markdown("---")
+    if st.checkbox("Show performance panel", help="Per-stage timings of the last reruns of this session"):
+        stage_timer = st.session_state.stage_timer
+        st.subheader("Last Rerun")
+        st.dataframe(stage_timer.last_run_frame(), hide_index=True, use_container_width=True)
+        st.subheader("Recent Reruns")
+        st.dataframe(stage_timer.stage_summary(), hide_index=True, use_container_width=True)
+        st.download_button(
+            "Download Prometheus metrics",
+            data=stage_timer.to_prometheus(),
+            file_name="stage_timings.prom",
+            mime="text/plain"
+        )
+        st.download_button(
+            "Download JSON lines",
+            data=stage_timer.to_json_lines(),
+            file_name="stage_timings.jsonl",
+            mime="application/json"
+        )
+
+        # Memory reports, only available while tracemalloc is tracing
+        if memory_profiling:
+            session_frames = {key: value for key, value in st.session_state.items()}
+            if 'filtered_df' in globals():
+                session_frames['filtered_df'] = filtered_df
+            footprint = frame_footprint(session_frames)
+            st.subheader("Session Memory")
+            st.metric("Dataset footprint", f"{footprint['bytes'].sum() / 1024 ** 2:.1f} MB")
+            st.dataframe(footprint, hide_index=True, use_container_width=True)
+            st.subheader("Top Allocation Sites")
+            st.dataframe(top_allocations(), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Set TICKET_MEMORY_PROFILING=1 to record per-stage memory.")
@@ -0,0 +1,237 @@
+"""
+Concurrent-session load test for the Streamlit dashboard.
+
+Drives app.py headlessly through Streamlit's AppTest, one simulated engineer
+per thread, all in one process like the real server. Each session loads a
+synthetic export and then clicks through filters at random; every rerun
+also rebuilds the PDF report, as in the live app. Reports rerun latency
+percentiles, throughput and process RSS, e.g.:
+
+    python benchmarks/load_test.py --sessions 30 --actions 10 --rows 10000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+
+# Allow running the script directly from the repository root
+sys.path.insert(0, REPO_ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+from utils.synthetic import write_srboard_csv
+
+# Sidebar selectboxes an engineer clicks through at stand-up
+FILTER_SELECTBOXES = ['Select Time Period', 'Status', 'Company', 'Resource', 'Subtype']
+
+def current_rss():
+    """Resident set size of this process in bytes (peak RSS if /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class RssSampler:
+    """Background thread sampling process RSS while the load test runs."""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def start(self):
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self.samples.append(current_rss())
+            if self._stop.wait(self.interval):
+                break
+
+def random_action(app, rng):
+    """
+    Change one sidebar filter at random.
+
+    Args:
+        app: AppTest after at least one run
+        rng: random.Random of the session
+
+    Returns:
+        Name of the action taken
+    """
+    selectboxes = [box for box in app.selectbox if box.label in FILTER_SELECTBOXES]
+    checkbox = [box for box in app.checkbox if box.label == 'Show Unassigned Tickets Only']
+
+    # Mostly filter changes, now and then the unassigned toggle
+    if checkbox and rng.random() < 0.15:
+        checkbox[0].set_value(not checkbox[0].value)
+        return 'toggle_unassigned'
+
+    box = rng.choice(selectboxes)
+    box.select(rng.choice(box.options))
+    return f'select:{box.label}'
+
+def run_session(session_id, actions, seed, think_time, timeout, records):
+    """
+    Simulate one engineer: open the dashboard and click through filters.
+
+    Args:
+        session_id: Number of the session
+        actions: Filter changes after the initial load
+        seed: Seed of the session's click sequence
+        think_time: Maximum seconds to wait between clicks
+        timeout: Seconds a single rerun may take
+        records: Shared list the per-rerun records are appended to
+    """
+    rng = random.Random(seed + session_id)
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    action = 'initial_load'
+    for step in range(actions + 1):
+        if step:
+            time.sleep(rng.uniform(0, think_time))
+            action = random_action(app, rng)
+
+        started = time.perf_counter()
+        try:
+            app.run()
+            error = app.exception[0].message if app.exception else None
+        except Exception as e:
+            error = str(e)
+        records.append({
+            'session': session_id,
+            'step': step,
+            'action': action,
+            'seconds': time.perf_counter() - started,
+            'error': error
+        })
+
+def latency_summary(seconds):
+    """p50/p95/p99 and max of a list of latencies."""
+    if not seconds:
+        return {'count': 0}
+    values = np.asarray(seconds)
+    return {
+        'count': len(values),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'p99': float(np.percentile(values, 99)),
+        'max': float(values.max())
+    }
+
+def run_load_test(sessions=30, actions=10, rows=10_000, seed=0, think_time=1.0, timeout=300):
+    """
+    Run the load test against a synthetic export.
+
+    Args:
+        sessions: Number of concurrent simulated engineers
+        actions: Filter changes per session after the initial load
+        rows: Tickets in the synthetic export
+        seed: Seed of the export and the click sequences
+        think_time: Maximum seconds between clicks
+        timeout: Seconds a single rerun may take
+
+    Returns:
+        Dictionary with latency percentiles, throughput, RSS and errors
+    """
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'srboard.csv')
+        write_srboard_csv(csv_path, rows, seed=seed)
+        os.environ['TICKET_SAMPLE_CSV'] = csv_path
+
+        # The app opens its assets with relative paths
+        os.chdir(REPO_ROOT)
+
+        sampler = RssSampler()
+        sampler.start()
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=run_session,
+                args=(session_id, actions, seed, think_time, timeout, records),
+                name=f'session-{session_id}'
+            )
+            for session_id in range(sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - started
+        sampler.stop()
+
+    reruns = [record for record in records if record['error'] is None]
+    by_action = {}
+    for record in reruns:
+        by_action.setdefault(record['action'], []).append(record['seconds'])
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'sessions': sessions,
+        'actions': actions,
+        'rows': rows,
+        'wall_seconds': wall_seconds,
+        'reruns': len(records),
+        'throughput_per_s': len(reruns) / wall_seconds if wall_seconds else None,
+        'latency': latency_summary([record['seconds'] for record in reruns]),
+        'initial_load': latency_summary(by_action.get('initial_load', [])),
+        'by_action': {action: latency_summary(seconds) for action, seconds in sorted(by_action.items())},
+        'rss_peak_bytes': max(sampler.samples) if sampler.samples else None,
+        'rss_final_bytes': sampler.samples[-1] if sampler.samples else None,
+        'errors': [record for record in records if record['error'] is not None]
+    }
+
+def main():
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description='Load test the dashboard with concurrent simulated sessions')
+    parser.add_argument('--sessions', type=int, default=30)
+    parser.add_argument('--actions', type=int, default=10, help='Filter changes per session')
+    parser.add_argument('--rows', type=int, default=10_000, help='Tickets in the synthetic export')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--think-time', type=float, default=1.0, help='Maximum seconds between clicks')
+    parser.add_argument('--timeout', type=float, default=300, help='Seconds a single rerun may take')
+    parser.add_argument('--output', help='Write the full report as JSON to this file')
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.actions, args.rows, args.seed, args.think_time, args.timeout)
+
+    latency = report['latency']
+    print(f"{report['sessions']} sessions x {report['actions']} actions on {report['rows']:,} tickets")
+    if latency['count']:
+        print(f"Rerun latency  p50 {latency['p50']:.2f} s  p95 {latency['p95']:.2f} s  "
+              f"p99 {latency['p99']:.2f} s  max {latency['max']:.2f} s")
+    print(f"Throughput     {report['throughput_per_s']:.2f} reruns/s over {report['wall_seconds']:.1f} s")
+    if report['rss_peak_bytes']:
+        print(f"Process RSS    peak {report['rss_peak_bytes'] / 1024 ** 2:.0f} MB  "
+              f"final {report['rss_final_bytes'] / 1024 ** 2:.0f} MB")
+    print(f"Errors         {len(report['errors'])}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Scaling benchmarks for the dashboard pipeline.
+
+Generates synthetic srboard exports of increasing size and times each stage
+the dashboard runs on them. Results are written as JSON so runs can be
+compared, e.g.:
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+import pandas as pd
+
+# Allow running the script directly from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import visualizations
+from utils.backlog import BacklogEngine
+from utils.burn_rate import BurnHistory, burn_rollups
+from utils.categorizer import TfidfCategorizer
+from utils.data_processor import clean_data, process_data
+from utils.pdf_report import create_pdf
+from utils.synthetic import write_srboard_csv
+from utils.visualizations import (
+    create_status_chart,
+    create_priority_chart,
+    create_age_histogram,
+    create_company_bar_chart,
+    create_resource_allocation_chart,
+    create_workload_heatmap,
+    create_category_chart,
+    create_ticket_trend_chart,
+    create_backlog_chart,
+    create_burn_chart,
+    create_burn_history_chart
+)
+from utils.workload import AssignmentIndex, workload_matrix
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def _best_of(func, repeats):
+    """Run a function several times and return (best seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def chart_builders():
+    """Names of the chart builders defined in utils.visualizations."""
+    return [
+        name for name, func in inspect.getmembers(visualizations, inspect.isfunction)
+        if name.startswith('create_') and func.__module__ == visualizations.__name__
+    ]
+
+def benchmark_size(n_rows, seed=0, repeats=3, include_pdf=True):
+    """
+    Time every pipeline stage on one synthetic export.
+
+    Args:
+        n_rows: Number of tickets in the export
+        seed: Random seed for the generator
+        repeats: Runs per stage; the fastest run is reported
+        include_pdf: Whether to time the PDF report
+
+    Returns:
+        Dictionary of stage name -> best time in seconds
+    """
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'srboard.csv')
+        write_srboard_csv(path, n_rows, seed=seed)
+
+        timings['read_csv'], raw_df = _best_of(
+            lambda: pd.read_csv(path, encoding='utf-8-sig'), repeats
+        )
+
+    timings['clean_data'], df = _best_of(lambda: clean_data(raw_df), repeats)
+    timings['process_data'], _ = _best_of(
+        lambda: process_data(df, 'daily', fields=('time_group', 'date', 'day', 'week', 'month', 'year')),
+        repeats
+    )
+
+    # Inputs of the charts that plot derived data, built once outside the timings
+    categorized_df = df.assign(Category=TfidfCategorizer().update(df))
+    matrix = workload_matrix(df, AssignmentIndex(df))
+    backlog_engine = BacklogEngine()
+    burn_history = BurnHistory()
+    for snapshot_date in pd.date_range(end=pd.Timestamp.now().normalize(), periods=2):
+        backlog_engine.add_snapshot(df, snapshot_date)
+        burn_history.add_snapshot(df, snapshot_date)
+    burn_summary = burn_rollups(df)['Company']
+
+    # Chart builders, called the way the dashboard calls them
+    charts = {
+        'create_status_chart': lambda: create_status_chart(df),
+        'create_priority_chart': lambda: create_priority_chart(df),
+        'create_age_histogram': lambda: create_age_histogram(df),
+        'create_company_bar_chart': lambda: create_company_bar_chart(df),
+        'create_resource_allocation_chart': lambda: create_resource_allocation_chart(df),
+        'create_workload_heatmap': lambda: create_workload_heatmap(matrix),
+        'create_category_chart': lambda: create_category_chart(categorized_df),
+        'create_ticket_trend_chart': lambda: create_ticket_trend_chart(df, 'daily'),
+        'create_backlog_chart': lambda: create_backlog_chart(backlog_engine.backlog_series('Status'), 'Status'),
+        'create_burn_chart': lambda: create_burn_chart(burn_summary, 'Company'),
+        'create_burn_history_chart': lambda: create_burn_history_chart(burn_history.totals_frame())
+    }
+    # A builder added to the module without a benchmark would go unmeasured
+    missing = sorted(set(chart_builders()) - set(charts))
+    if missing:
+        raise RuntimeError(f"No benchmark for chart builders: {', '.join(missing)}")
+    for name, build in charts.items():
+        timings[name], _ = _best_of(build, repeats)
+
+    # The report renders matplotlib charts, so one run is enough
+    if include_pdf:
+        timings['create_pdf'], _ = _best_of(lambda: create_pdf(df), 1)
+
+    return timings
+
+def compare(current, previous):
+    """
+    Compare two result files stage by stage.
+
+    Args:
+        current: Results dictionary of this run
+        previous: Results dictionary of an earlier run
+
+    Returns:
+        DataFrame with both timings and the speedup per size and stage
+    """
+    rows = []
+    for size, timings in current['results'].items():
+        before = previous['results'].get(size, {})
+        for stage, seconds in timings.items():
+            if stage in before:
+                rows.append({
+                    'rows': int(size),
+                    'stage': stage,
+                    'before_s': before[stage],
+                    'after_s': seconds,
+                    'speedup': before[stage] / seconds if seconds else None
+                })
+    return pd.DataFrame(rows, columns=['rows', 'stage', 'before_s', 'after_s', 'speedup'])
+
+def main():
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard pipeline on synthetic exports')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Export sizes in tickets (add 1000000 for the large run)')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per stage; the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-pdf', action='store_true', help='Do not time the PDF report')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'seed': args.seed,
+        'repeats': args.repeats,
+        'results': {}
+    }
+
+    for size in args.sizes:
+        print(f'Benchmarking {size:,} tickets...', flush=True)
+        timings = benchmark_size(size, args.seed, args.repeats, include_pdf=not args.skip_pdf)
+        results['results'][str(size)] = timings
+        for stage, seconds in timings.items():
+            print(f'  {stage:<34} {seconds:9.4f} s')
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(compare(results, previous).to_string(index=False, float_format='{:.4f}'.format))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import json
+
+import pandas as pd
+
+from utils.alert_rules import AlertRules, REQUIRED_ALERT_CATEGORIES, alert_rules_from_env, flag_mask
+
+def tickets():
+    return pd.DataFrame({
+        'Summary Description': ['Disk ALERT on SQL01', 'Password reset', 'Critical: backup failed'],
+        'Status': ['New', 'Done yet?', 'In Progress'],
+        'Priority': ['Urgent', 'Low', 'High']
+    })
+
+def test_flags_match_keywords_case_insensitively():
+    df = tickets()
+    rules = AlertRules()
+    df['Alert Flags'] = rules.tag(df)
+
+    assert flag_mask(df, ['alert', 'critical'], rules).tolist() == [True, False, True]
+    assert flag_mask(df, 'done_yet', rules).tolist() == [False, True, False]
+    assert rules.counts(df['Alert Flags'])['priority_urgent'] == 1
+
+def test_unknown_categories_match_nothing():
+    rules = AlertRules({'vip': ('Summary Description', ['ceo'])})
+
+    assert rules.mask(rules.tag(tickets()), 'priority_urgent').tolist() == [False, False, False]
+
+def test_rules_file_keeps_the_required_categories(tmp_path, monkeypatch):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({'vip': {'column': 'Summary Description', 'keywords': ['backup']},
+                                'open': {'column': 'Status', 'keywords': ['in progress']}}))
+    monkeypatch.setenv('TICKET_ALERT_RULES', str(path))
+
+    rules = alert_rules_from_env()
+    flags = rules.tag(tickets())
+
+    assert set(REQUIRED_ALERT_CATEGORIES) <= set(rules.categories)
+    assert rules.mask(flags, 'vip').tolist() == [False, False, True]
+    assert rules.mask(flags, 'open').tolist() == [False, False, True]
+    assert rules.mask(flags, 'priority_urgent').tolist() == [True, False, False]
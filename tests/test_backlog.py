@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from utils.backlog import BacklogEngine, snapshot_date_from_frame
+
+def export(rows):
+    return pd.DataFrame(rows, columns=['Selected_Sr_Service_Recid', 'Status', 'Priority', 'Company'])
+
+DAY_ONE = export([
+    (1, 'New', 'High', 'A'),
+    (2, 'In Progress', 'Low', 'B'),
+    (3, 'Closed', 'Low', 'A')
+])
+
+DAY_TWO = export([
+    (1, 'In Progress', 'High', 'A'),
+    (2, 'Closed', 'Low', 'B'),
+    (4, 'New', 'Medium', 'C')
+])
+
+def test_deltas_give_the_same_counts_as_a_recount():
+    engine = BacklogEngine()
+    first = engine.add_snapshot(DAY_ONE, '2026-01-05')
+    second = engine.add_snapshot(DAY_TWO, '2026-01-06')
+
+    assert (first['open'], first['opened'], first['closed']) == (2, 2, 0)
+    assert (second['open'], second['opened'], second['closed']) == (2, 1, 1)
+
+    recount = BacklogEngine()
+    recount.add_snapshot(DAY_TWO, '2026-01-06')
+    for dim in engine.dimensions:
+        assert engine.counts[dim].sort_index().to_dict() == recount.counts[dim].sort_index().to_dict()
+
+def test_backlog_series_fills_days_without_an_export():
+    engine = BacklogEngine()
+    engine.add_snapshot(DAY_ONE, '2026-01-05')
+    engine.add_snapshot(DAY_TWO, '2026-01-07')
+
+    series = engine.backlog_series('Status')
+
+    assert list(series.index) == list(pd.date_range('2026-01-05', '2026-01-07'))
+    assert series.loc['2026-01-06', 'New'] == 1
+    assert series.loc['2026-01-07', 'In Progress'] == 1
+    assert series.loc['2026-01-07', 'New'] == 1
+
+def test_same_day_export_replaces_the_previous_one():
+    engine = BacklogEngine()
+    engine.add_snapshot(DAY_ONE, '2026-01-05')
+    engine.add_snapshot(DAY_ONE, '2026-01-06')
+    replaced = engine.add_snapshot(DAY_TWO, '2026-01-06')
+
+    assert len(engine.totals) == 2
+    assert (replaced['opened'], replaced['closed']) == (1, 1)
+    assert engine.totals_frame()['open'].tolist() == [2, 2]
+
+def test_older_snapshots_are_rejected():
+    engine = BacklogEngine()
+    engine.add_snapshot(DAY_TWO, '2026-01-06')
+
+    with pytest.raises(ValueError):
+        engine.add_snapshot(DAY_ONE, '2026-01-05')
+
+def test_snapshot_date_is_the_latest_update():
+    df = pd.DataFrame({'Last Update': ['2026-01-04 09:00', '2026-01-05 17:30', None]})
+
+    assert snapshot_date_from_frame(df) == pd.Timestamp('2026-01-05')
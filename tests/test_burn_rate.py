@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from utils.burn_rate import BurnHistory
+
+def export(rows):
+    return pd.DataFrame(rows, columns=['Selected_Sr_Service_Recid', 'Company', 'Total Hours', 'Budget'])
+
+DAY_ONE = export([(1, 'A', 2.0, 4.0), (2, 'A', 5.0, 3.0), (3, 'B', 1.0, 0.0)])
+DAY_TWO = export([(1, 'A', 6.0, 4.0), (3, 'B', 1.0, 0.0), (4, 'B', 2.0, 1.0)])
+
+def recount(*exports):
+    """Company totals computed from the latest row of every ticket ever seen."""
+    history = BurnHistory()
+    history.add_snapshot(pd.concat(exports, ignore_index=True), '2026-01-01')
+    return history.company_totals()
+
+def test_running_totals_keep_tickets_that_left_the_board():
+    history = BurnHistory()
+    history.add_snapshot(DAY_ONE, '2026-01-05')
+    summary = history.add_snapshot(DAY_TWO, '2026-01-06')
+
+    # Ticket 1 moved and ticket 4 is new; ticket 2 keeps its final hours
+    assert summary['changed'] == 2
+    assert summary['hours'] == 6 + 5 + 1 + 2
+    assert summary['overrun_hours'] == 2 + 2 + 1
+    pd.testing.assert_frame_equal(history.company_totals(), recount(DAY_ONE, DAY_TWO))
+
+def test_same_day_export_replaces_the_previous_one():
+    history = BurnHistory()
+    history.add_snapshot(DAY_ONE, '2026-01-05')
+    history.add_snapshot(DAY_ONE, '2026-01-06')
+    history.add_snapshot(DAY_ONE.assign(**{'Total Hours': 0.0}), '2026-01-06')
+    summary = history.add_snapshot(DAY_TWO, '2026-01-06')
+
+    assert len(history.history) == 2
+    assert summary['hours'] == 14
+    pd.testing.assert_frame_equal(history.company_totals(), recount(DAY_ONE, DAY_TWO))
+
+    totals = history.totals_frame()
+    assert totals['date'].tolist() == [pd.Timestamp('2026-01-05'), pd.Timestamp('2026-01-06')]
+    assert totals['Hours'].tolist() == [8, 14]
+    assert totals['Over Budget'].tolist() == [1, 3]
+
+def test_replacing_the_first_snapshot_starts_over():
+    history = BurnHistory()
+    history.add_snapshot(DAY_ONE, '2026-01-05')
+    history.add_snapshot(DAY_TWO, '2026-01-05')
+
+    pd.testing.assert_frame_equal(history.company_totals(), recount(DAY_TWO))
+
+def test_older_snapshots_are_rejected():
+    history = BurnHistory()
+    history.add_snapshot(DAY_TWO, '2026-01-06')
+
+    with pytest.raises(ValueError):
+        history.add_snapshot(DAY_ONE, '2026-01-05')
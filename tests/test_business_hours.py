@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from utils.business_hours import BusinessCalendar, business_clocks
+
+def minutes(calendar, start, end, zone=None):
+    return calendar.business_minutes(pd.to_datetime(start), pd.to_datetime(end), zone).tolist()
+
+def test_minutes_are_clipped_to_opening_hours_and_working_days():
+    calendar = BusinessCalendar(holidays=[])
+
+    # Monday 10:00-12:00, Monday 6:00-20:00, Friday 16:00 to Monday 9:00
+    assert minutes(calendar, ['2026-03-16 10:00', '2026-03-16 06:00', '2026-03-20 16:00'],
+                   ['2026-03-16 12:00', '2026-03-16 20:00', '2026-03-23 09:00']) == [120, 540, 120]
+    # Saturday to Sunday counts nothing
+    assert minutes(calendar, ['2026-03-21 09:00'], ['2026-03-22 15:00']) == [0]
+
+def test_minutes_are_negative_backwards_and_nan_when_missing():
+    calendar = BusinessCalendar(holidays=[])
+
+    result = minutes(calendar, ['2026-03-16 12:00', None], ['2026-03-16 10:00', '2026-03-16 10:00'])
+
+    assert result[0] == -120
+    assert np.isnan(result[1])
+
+def test_holidays_apply_to_every_zone_or_just_their_own():
+    calendar = BusinessCalendar(holidays=['2026-03-18'], zone_holidays={'America/Phoenix': ['2026-03-17']})
+    start, end = ['2026-03-16 16:00'], ['2026-03-19 09:00']
+
+    assert minutes(calendar, start, end) == [60 + 540 + 60]
+    assert minutes(calendar, start, end, zone='America/Phoenix') == [60 + 60]
+
+def test_clocks_count_in_each_sites_local_hours():
+    df = pd.DataFrame({
+        'Age': [1, 1, None],
+        'Last Update UTC': pd.to_datetime(['2026-03-17 14:00'] * 3).tz_localize('UTC'),
+        'Site Time Zone': ['US Eastern (UTC-04)', 'India (UTC+05:30)', 'US Eastern (UTC-04)'],
+        'SLA Deadline': pd.to_datetime(['2026-03-17 19:00', None, None]).tz_localize('UTC')
+    }, index=[5, 6, 7])
+
+    clocks = business_clocks(df, now=pd.Timestamp('2026-03-17 16:00', tz='UTC'),
+                             calendar=BusinessCalendar(holidays=[]))
+
+    # Opened Monday 10:00 EDT and 19:30 IST; now Tuesday 12:00 EDT and 21:30 IST
+    assert clocks['Business Age Hours'].iloc[:2].tolist() == [11, 9]
+    assert clocks['SLA Business Hours Left'].iloc[0] == 3
+    assert clocks['SLA Business Hours Left'].iloc[1:].isna().all()
+    assert np.isnan(clocks.loc[7, 'Business Age Hours'])
+
+def test_business_age_does_not_depend_on_the_filtered_tickets():
+    from utils.data_processor import clean_data
+
+    export = pd.DataFrame({
+        'Selected_Sr_Service_Recid': [1, 2, 3],
+        'Company': ['A', 'B', 'B'],
+        'Age': ['2', '1', '3'],
+        'Last Update': ['03/19/2026 4:00 pm', '03/18/2026 9:00 am', '03/17/2026 11:00 am'],
+        'Site Time Zone': 'US Eastern (UTC-04)'
+    })
+    df = clean_data(export)
+    now = pd.Timestamp('2026-03-19 21:00', tz='UTC')
+    calendar = BusinessCalendar(holidays=[])
+
+    full = business_clocks(df, now, calendar)['Business Age Hours']
+    company_b = business_clocks(df[df['Company'] == 'B'], now, calendar)['Business Age Hours']
+
+    assert company_b.tolist() == full.loc[company_b.index].tolist()
+    # Opened two days before the export was taken (Thursday 16:00 EDT), counted to 17:00 EDT
+    assert full.iloc[0] == 9 + 9 + 1
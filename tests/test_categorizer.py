@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from utils.categorizer import UNCATEGORIZED, SparseRows, TfidfCategorizer
+
+SEEDS = {'Printers': ['printer', 'toner'], 'Accounts': ['password', 'login']}
+
+def tickets(summaries, keys=None):
+    return pd.DataFrame({
+        'Selected_Sr_Service_Recid': keys or list(range(1, len(summaries) + 1)),
+        'Summary Description': summaries
+    })
+
+def to_dense(matrix):
+    dense = np.zeros((matrix.n_rows, matrix.n_columns))
+    np.add.at(dense, (matrix.row_ids(), matrix.indices), matrix.data)
+    return dense
+
+def random_rows(rng, n_rows, n_columns, empty_rows=()):
+    dense = rng.random((n_rows, n_columns)) * (rng.random((n_rows, n_columns)) < 0.3)
+    dense[list(empty_rows)] = 0
+    rows, columns = np.nonzero(dense)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_rows))])
+    return SparseRows(indptr, columns, dense[rows, columns], n_columns), dense
+
+def test_tickets_are_assigned_to_the_category_of_their_seed_words():
+    categorizer = TfidfCategorizer(SEEDS)
+    categories = categorizer.update(tickets(['Printer out of toner', 'Password reset for login',
+                                             'Coffee machine broken', None]))
+
+    assert categories.tolist() == ['Printers', 'Accounts', UNCATEGORIZED, UNCATEGORIZED]
+    assert len(categorizer) == 4
+
+def test_seen_tickets_are_not_learned_twice():
+    categorizer = TfidfCategorizer(SEEDS)
+    first = categorizer.update(tickets(['printer jam', 'login failed']))
+    doc_freq, centroids, n_docs = categorizer.doc_freq.copy(), categorizer.centroids.copy(), categorizer.n_docs
+
+    # The same (ticket, summary) pairs again, in another order
+    second = categorizer.update(tickets(['login failed', 'printer jam'], keys=[2, 1]))
+    assert second.tolist() == first.tolist()[::-1]
+    assert categorizer.n_docs == n_docs == 2
+    assert np.array_equal(categorizer.doc_freq, doc_freq)
+    assert np.array_equal(categorizer.centroids, centroids)
+
+    # A ticket whose summary changed is learned again
+    categorizer.update(tickets(['printer jam again', 'login failed']))
+    assert categorizer.n_docs == 3
+    assert len(categorizer) == 3
+
+def test_document_frequencies_count_each_ticket_once_per_term():
+    categorizer = TfidfCategorizer(SEEDS)
+    categorizer.update(tickets(['printer printer jam', 'printer offline', 'printer offline']))
+    doc_freq = pd.Series(categorizer.doc_freq, index=categorizer.vocabulary)
+
+    assert categorizer.n_docs == 3
+    assert doc_freq[['printer', 'jam', 'offline', 'toner']].tolist() == [3, 1, 2, 0]
+    assert np.allclose(categorizer.idf(), np.log(4 / (1 + categorizer.doc_freq)) + 1)
+
+def test_centroids_learn_the_unit_term_frequencies_of_confident_matches():
+    categorizer = TfidfCategorizer(SEEDS)
+    categorizer.update(tickets(['printer jam']))
+    centroids = pd.DataFrame(categorizer.centroids, index=categorizer.vocabulary, columns=list(SEEDS))
+
+    # 'printer jam' has unit term frequencies of 1/sqrt(2) and goes to Printers only
+    assert np.isclose(centroids.loc['jam', 'Printers'], 1 / np.sqrt(2))
+    assert centroids.loc['jam', 'Accounts'] == 0
+    # Every seed word starts at the seed weight over the seed text's length
+    assert np.isclose(centroids.loc['toner', 'Printers'], 3 / np.sqrt(2))
+
+    # Learned words carry tickets without a seed word to the category
+    assert categorizer.update(tickets(['jam'], keys=[2])).tolist() == ['Printers']
+
+def test_tickets_below_the_learning_similarity_leave_the_centroids_alone():
+    categorizer = TfidfCategorizer(SEEDS, learn_similarity=0.99)
+    centroids = categorizer.centroids.copy()
+    categorizer.update(tickets(['printer jam on floor two']))
+
+    assert np.array_equal(categorizer.centroids[:len(centroids)], centroids)
+    assert not categorizer.centroids[len(centroids):].any()
+
+def test_copies_learn_independently():
+    categorizer = TfidfCategorizer(SEEDS)
+    categorizer.update(tickets(['printer jam']))
+    copied = categorizer.copy()
+    copied.update(tickets(['login locked', 'printer offline'], keys=[2, 3]))
+
+    assert categorizer.n_docs == 1 and copied.n_docs == 3
+    assert len(categorizer.vocabulary) < len(copied.vocabulary)
+    assert categorizer.centroids.shape[0] == len(categorizer.vocabulary)
+
+def test_sparse_rows_match_dense_arithmetic():
+    rng = np.random.default_rng(7)
+    matrix, dense = random_rows(rng, 40, 12, empty_rows=[0, 17, 39])
+    other, other_dense = random_rows(rng, 5, 12)
+    assert np.array_equal(to_dense(matrix), dense)
+
+    rows = np.array([17, 3, 3, 39, 25])
+    assert np.array_equal(to_dense(matrix.take(rows)), dense[rows])
+    assert to_dense(matrix.take(np.array([], dtype=np.int64))).shape == (0, 12)
+    assert np.array_equal(to_dense(matrix.append(other)), np.vstack([dense, other_dense]))
+
+    weights = rng.random(12)
+    assert np.allclose(to_dense(matrix.scale_columns(weights)), dense * weights)
+
+    norms = np.linalg.norm(dense, axis=1, keepdims=True)
+    assert np.allclose(to_dense(matrix.normalize_rows()), dense / np.where(norms == 0, 1, norms))
+
+    factors = rng.random((12, 3))
+    # Small batches split the rows, including batches that start on empty rows
+    for batch_rows in (1, 7, 100):
+        assert np.allclose(matrix.dot(factors, batch_rows=batch_rows), dense @ factors)
+
+    groups = rng.integers(-1, 3, 40)
+    row_weights = rng.random(40)
+    expected = np.stack([(dense * row_weights[:, None])[groups == g].sum(axis=0) for g in range(3)], axis=1)
+    assert np.allclose(matrix.column_sums(groups, 3, row_weights), expected)
@@ -0,0 +1,91 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from utils.connectwise_api import ConnectwiseClient
+from utils.data_processor import clean_data
+
+def ticket(ticket_id, updated, closed=False):
+    return {
+        'id': ticket_id,
+        'summary': f'Ticket {ticket_id}',
+        'status': {'name': 'Closed' if closed else 'New'},
+        'priority': {'name': 'Priority 3 - Normal'},
+        'company': {'name': 'Acme'},
+        'closedFlag': closed,
+        '_info': {'lastUpdated': updated}
+    }
+
+@pytest.fixture
+def board():
+    """Mock Connectwise server answering from a mutable ticket list."""
+    state = {'tickets': [], 'conditions': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            conditions = params.get('conditions', [''])[0]
+            watermark = conditions.split('lastUpdated > [')[1][:20] if 'lastUpdated' in conditions else None
+            matching = [t for t in state['tickets']
+                        if watermark is None or pd.Timestamp(t['_info']['lastUpdated']) > pd.Timestamp(watermark)]
+            if url.path.endswith('/count'):
+                state['conditions'].append(conditions)
+                body = {'count': len(matching)}
+            else:
+                page, size = int(params['page'][0]), int(params['pageSize'][0])
+                body = matching[(page - 1) * size:page * size]
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = ConnectwiseClient(f'http://127.0.0.1:{server.server_port}', 'co', 'pub', 'priv', 'client', page_size=2)
+    yield client, state
+    client.close()
+    server.shutdown()
+
+def test_incremental_sync_merges_updates_and_drops_closed_tickets(board):
+    client, state = board
+    state['tickets'] = [ticket(1, '2025-04-01T10:00:00Z'), ticket(2, '2025-04-01T11:00:00Z'),
+                        ticket(3, '2025-04-01T12:00:00Z')]
+    raw_df, last_updated = client.sync()
+    assert sorted(raw_df['Ticket #']) == [1, 2, 3]
+    assert last_updated == pd.Timestamp('2025-04-01T12:00:00Z')
+
+    state['tickets'][0] = ticket(1, '2025-04-02T09:00:00Z', closed=True)
+    state['tickets'].append(ticket(4, '2025-04-02T10:00:00Z'))
+    raw_df, last_updated = client.sync(raw_df, last_updated)
+
+    assert 'lastUpdated > [2025-04-01T12:00:00Z]' in state['conditions'][-1]
+    assert sorted(raw_df['Ticket #']) == [2, 3, 4]
+    assert last_updated == pd.Timestamp('2025-04-02T10:00:00Z')
+
+def test_shared_client_keeps_no_watermark_between_callers(board):
+    client, state = board
+    state['tickets'] = [ticket(1, '2025-04-01T10:00:00Z')]
+    client.sync()
+
+    # A second session's first sync still pulls the whole board
+    raw_df, _ = client.sync()
+    assert 'lastUpdated' not in state['conditions'][-1]
+    assert raw_df['Ticket #'].tolist() == [1]
+
+def test_api_dates_are_read_back_as_utc(board):
+    client, state = board
+    state['tickets'] = [ticket(1, '2025-07-01T14:30:00Z')]
+    raw_df, _ = client.sync()
+
+    cleaned = clean_data(raw_df)
+    assert cleaned['Last Update UTC'].iloc[0] == pd.Timestamp('2025-07-01T14:30:00Z')
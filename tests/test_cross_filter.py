@@ -0,0 +1,70 @@
+import pandas as pd
+
+from utils.cross_filter import CrossFilter, selected_values
+
+def tickets():
+    return pd.DataFrame({
+        'Status': ['New', 'New', 'Closed', 'In Progress'],
+        'Priority': ['High', 'Low', 'High', 'High'],
+        'Company': ['A', 'B', 'A', 'C']
+    })
+
+def event(*values):
+    return {'selection': {'points': [{'customdata': [value]} for value in values]}}
+
+def test_selections_intersect_except_for_the_charts_own():
+    cross = CrossFilter(tickets())
+    cross.select('Status', ['New'])
+    cross.select('Priority', ['High'])
+
+    assert cross.mask().tolist() == [True, False, False, False]
+    assert cross.mask(exclude='Status').tolist() == [True, False, True, True]
+    assert cross.mask(exclude='Priority').tolist() == [True, True, False, False]
+    assert cross.describe() == 'Status = New; Priority = High'
+
+def test_changing_a_selection_updates_only_its_rows():
+    cross = CrossFilter(tickets())
+    cross.select('Company', ['A', 'B'])
+    cross.select('Company', ['B', 'C'])
+
+    assert cross.mask().tolist() == [False, True, False, True]
+    assert cross.select('Company', []) is True
+    assert cross.mask().all()
+    assert not cross.active
+
+def test_events_apply_once_and_empty_events_clear():
+    cross = CrossFilter(tickets())
+
+    assert cross.apply_event('Status', event('New')) is True
+    assert cross.apply_event('Status', event('New')) is False
+    assert cross.apply_event('Status', None) is False
+    assert cross.selections == {'Status': frozenset({'New'})}
+
+    # The user deselected the chart's points
+    assert cross.apply_event('Status', event()) is True
+    assert not cross.active
+    assert cross.apply_event('Status', event()) is False
+
+def test_cleared_selection_is_not_reapplied_from_the_same_event():
+    cross = CrossFilter(tickets())
+    cross.apply_event('Priority', event('Low'))
+    cross.clear()
+
+    assert cross.apply_event('Priority', event('Low')) is False
+    assert cross.mask().all()
+    assert cross.apply_event('Priority', event('High')) is True
+
+def test_carry_over_keeps_selections_on_new_tickets():
+    previous = CrossFilter(tickets())
+    previous.apply_event('Company', event('A'))
+    cross = CrossFilter(tickets().iloc[1:].reset_index(drop=True))
+    cross.carry_over(previous)
+
+    assert cross.mask().tolist() == [False, True, False]
+    assert cross.apply_event('Company', event('A')) is False
+
+def test_selected_values_fall_back_to_labels_and_x():
+    points = {'selection': {'points': [{'label': 'New'}, {'x': 'Acme'}, {'customdata': 3}]}}
+
+    assert selected_values(points) == frozenset({'New', 'Acme', '3'})
+    assert selected_values(None) == frozenset()
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from utils.data_processor import derive_time_field, period_labels, process_data
+
+DATES = pd.Series(pd.to_datetime([
+    '2025-01-06 08:00', '2025-02-28 23:59', '2025-03-01 00:00', '2025-04-21 11:21',
+    '2025-04-27 18:00', '2025-07-14 09:30', '2025-12-28 12:00'
+]))
+
+def legacy_time_group(dates, time_period):
+    """time_group strings as process_data built them before it used period ordinals."""
+    if time_period == 'daily':
+        return dates.dt.date.astype(str)
+    if time_period == 'weekly':
+        return dates.dt.year.astype(str) + '-W' + dates.dt.isocalendar().week.astype(str).str.zfill(2)
+    return dates.dt.year.astype(str) + '-' + dates.dt.month.astype(str).str.zfill(2)
+
+@pytest.mark.parametrize('time_period', ['daily', 'weekly', 'monthly'])
+def test_period_labels_match_the_legacy_labels(time_period):
+    codes = derive_time_field(DATES, 'time_group', time_period)
+    assert period_labels(codes, time_period).tolist() == legacy_time_group(DATES, time_period).tolist()
+
+def test_weeks_across_new_year_take_their_iso_year():
+    # The legacy label paired the calendar year with the ISO week, so these read "2024-W01"
+    dates = pd.Series(pd.to_datetime(['2024-12-30 10:00', '2025-01-05 10:00', '2021-01-03 10:00']))
+    codes = derive_time_field(dates, 'time_group', 'weekly')
+    assert period_labels(codes, 'weekly').tolist() == ['2025-W01', '2025-W01', '2020-W53']
+
+def test_time_group_codes_order_like_the_periods():
+    for time_period in ['daily', 'weekly', 'monthly']:
+        codes = derive_time_field(DATES, 'time_group', time_period)
+        assert codes.is_monotonic_increasing
+        assert codes.index.equals(DATES.index)
+
+def test_default_call_only_adds_time_group():
+    df = pd.DataFrame({'Ticket #': [1, 2], 'Last Update': DATES.iloc[:2].to_numpy()})
+    processed = process_data(df, 'monthly')
+
+    assert processed.columns.tolist() == ['Ticket #', 'Last Update', 'time_group']
+    assert period_labels(processed['time_group'], 'monthly').tolist() == ['2025-01', '2025-02']
+    assert df.columns.tolist() == ['Ticket #', 'Last Update']
+
+def test_requested_fields_are_added():
+    df = pd.DataFrame({'Last Update': DATES.to_numpy()})
+    processed = process_data(df, fields=('date', 'day', 'week', 'month', 'year'))
+
+    assert processed.columns.tolist() == ['Last Update', 'date', 'day', 'week', 'month', 'year']
+    assert processed['date'].tolist() == DATES.dt.date.tolist()
+    assert processed['week'].tolist() == DATES.dt.isocalendar().week.tolist()
+    assert processed['year'].unique().tolist() == [2025]
+
+def test_nothing_is_added_without_fields_or_dates():
+    df = pd.DataFrame({'Last Update': DATES.to_numpy()})
+    assert process_data(df, fields=()) is df
+    no_dates = pd.DataFrame({'Ticket #': [1]})
+    assert process_data(no_dates) is no_dates
+
+def test_missing_dates_fall_in_the_current_period():
+    df = pd.DataFrame({'Last Update': [DATES.iloc[0], pd.NaT]})
+    labels = period_labels(process_data(df)['time_group'])
+    assert labels.tolist() == ['2025-01-06', str(pd.Timestamp('today').date())]
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError):
+        derive_time_field(DATES, 'quarter')
@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+
+from utils.history_store import HistoryStore, SNAPSHOT_COLUMN
+
+def export(statuses):
+    """Small cleaned export with one ticket per status."""
+    return pd.DataFrame({
+        'Selected_Sr_Service_Recid': [str(i) for i in range(len(statuses))],
+        'Status': statuses
+    })
+
+def test_query_prunes_to_date_range(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append(export(['New']), '2025-01-01')
+    store.append(export(['New', 'Closed']), '2025-01-02')
+
+    assert store.partitions() == [pd.Timestamp('2025-01-01'), pd.Timestamp('2025-01-02')]
+    result = store.query('2025-01-02', '2025-01-02')
+    assert len(result) == 2
+    assert (result[SNAPSHOT_COLUMN] == pd.Timestamp('2025-01-02')).all()
+
+def test_same_day_append_replaces_the_export(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append(export(['New', 'New']), '2025-01-01')
+    store.append(export(['Closed']), '2025-01-01')
+
+    result = store.query()
+    assert list(result['Status']) == ['Closed']
+    assert len(store._part_files(pd.Timestamp('2025-01-01'))) == 1
+
+def test_multi_part_partition_keeps_latest_row_per_ticket(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    day = pd.Timestamp('2025-01-01')
+    partition_dir = store._partition_dir(day)
+    os.makedirs(partition_dir)
+    export(['New', 'New']).assign(**{SNAPSHOT_COLUMN: day}).to_parquet(os.path.join(partition_dir, 'part-1.parquet'))
+    export(['Closed']).assign(**{SNAPSHOT_COLUMN: day}).to_parquet(os.path.join(partition_dir, 'part-2.parquet'))
+
+    # Reading a column subset still merges on the ticket key
+    assert sorted(store.query(columns=['Status'])['Status']) == ['Closed', 'New']
+
+    assert store.compact() == 1
+    assert os.listdir(partition_dir) == ['part-2.parquet']
+    assert sorted(store.query()['Status']) == ['Closed', 'New']
+
+def test_compaction_merges_into_the_newest_part_name(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    day = pd.Timestamp('2025-01-01')
+    partition_dir = store._partition_dir(day)
+    os.makedirs(partition_dir)
+    for i in range(3):
+        export(['New']).assign(**{SNAPSHOT_COLUMN: day}).to_parquet(os.path.join(partition_dir, f'part-{i}.parquet'))
+
+    store.compact()
+    # A part appended later still sorts after the merged file
+    assert os.listdir(partition_dir) == ['part-2.parquet']
+
+def file_count(root):
+    return sum(len([name for name in names if name.endswith('.parquet')]) for _, _, names in os.walk(root))
+
+def test_roll_up_merges_past_months_into_monthly_files(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    days = list(pd.date_range('2025-01-01', '2025-02-28')) + [pd.Timestamp('2025-03-01')]
+    for i, day in enumerate(days):
+        store.append(export(['New'] * (i % 3) + ['Closed']), day)
+    before = store.query(columns=['Status'])
+    assert file_count(tmp_path) == 60
+
+    assert store.compact() == 59
+
+    # One file per past month; the current month stays daily
+    assert file_count(tmp_path) == 3
+    assert sorted(os.listdir(tmp_path)) == ['snapshot_date=2025-03-01', 'snapshot_month=2025-01', 'snapshot_month=2025-02']
+    assert store.partitions() == days
+    pd.testing.assert_frame_equal(store.query(columns=['Status']), before, check_dtype=False)
+
+    # Reading a range only returns its days
+    result = store.query('2025-02-10', '2025-02-11')
+    assert sorted(result[SNAPSHOT_COLUMN].unique()) == [pd.Timestamp('2025-02-10'), pd.Timestamp('2025-02-11')]
+    assert len(result) == (40 % 3 + 1) + (41 % 3 + 1)
+
+def test_days_exported_again_after_a_roll_up_replace_the_rolled_up_day(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append(export(['New', 'New']), '2025-01-05')
+    store.append(export(['New']), '2025-01-06')
+    store.roll_up(before='2025-02-01')
+    assert file_count(tmp_path) == 1
+
+    store.append(export(['Closed']), '2025-01-05')
+    assert list(store.query('2025-01-05', '2025-01-05')['Status']) == ['Closed']
+
+    # The next roll-up folds the new export into the month file
+    assert store.roll_up(before='2025-02-01') == 1
+    assert file_count(tmp_path) == 1
+    assert list(store.query('2025-01-05', '2025-01-05')['Status']) == ['Closed']
+    assert list(store.query('2025-01-06', '2025-01-06')['Status']) == ['New']
+
+def test_rolled_up_months_keep_columns_added_later_and_empty_days(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append(export(['New']), '2025-01-01')
+    store.append(export([]), '2025-01-02')
+    store.append(export(['Closed']).assign(Company='A'), '2025-01-03')
+    store.roll_up(before='2025-02-01')
+
+    assert store.partitions() == list(pd.date_range('2025-01-01', '2025-01-03'))
+    assert store.query('2025-01-02', '2025-01-02').empty
+    assert list(store.query('2025-01-03', '2025-01-03', columns=['Company'])['Company']) == ['A']
+    assert store.query('2025-01-01', '2025-01-01')['Company'].isna().all()
@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+import requests
+
+import utils.kpi_api as kpi_api
+from utils.categorizer import TfidfCategorizer
+from utils.filters import apply_filters, build_filters
+from utils.kpi_api import KPI_PATH, VERSION_PATH, KpiApiServer, canonical_query, filters_from_query
+from utils.refresher import SharedDataset
+
+def tickets(statuses):
+    return pd.DataFrame({
+        'Selected_Sr_Service_Recid': range(1, len(statuses) + 1),
+        'Ticket #': range(1, len(statuses) + 1),
+        'Status': statuses,
+        'Company': ['A', 'B'] * (len(statuses) // 2) + ['A'] * (len(statuses) % 2),
+        'Resources': 'amy',
+        'Summary Description': ['phishing email reported', 'disk full on server'] * (len(statuses) // 2)
+                               + ['phishing link clicked'] * (len(statuses) % 2)
+    })
+
+@pytest.fixture
+def server():
+    dataset = SharedDataset()
+    server = KpiApiServer(dataset, port=0)
+    server.start()
+    yield server
+    server.stop()
+
+def get(server, path, **kwargs):
+    return requests.get(f'http://127.0.0.1:{server.port}{path}', timeout=5, **kwargs)
+
+def test_requests_before_any_data_get_503(server):
+    assert get(server, KPI_PATH).status_code == 503
+    assert get(server, VERSION_PATH).json() == {'version': None}
+
+def test_etag_is_the_same_for_reordered_parameters(server):
+    server.dataset.publish(tickets(['New', 'Open', 'New']))
+    first = get(server, KPI_PATH + '?status=New&company=A')
+    second = get(server, KPI_PATH + '?company=A&status=New')
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert first.json()['kpis']['total_tickets'] == 2
+    assert get(server, KPI_PATH + '?status=Open').headers['ETag'] != first.headers['ETag']
+
+def test_matching_if_none_match_gets_304_without_a_body(server):
+    server.dataset.publish(tickets(['New', 'Open']))
+    etag = get(server, KPI_PATH).headers['ETag']
+
+    cached = get(server, KPI_PATH, headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.content == b''
+    assert get(server, KPI_PATH, headers={'If-None-Match': '"stale"'}).status_code == 200
+
+def test_repeated_queries_are_answered_from_the_cache(server, monkeypatch):
+    computed = []
+    compute_kpis = kpi_api.compute_kpis
+    def counting_compute_kpis(df, **kwargs):
+        computed.append(len(df))
+        return compute_kpis(df, **kwargs)
+    monkeypatch.setattr(kpi_api, 'compute_kpis', counting_compute_kpis)
+
+    server.dataset.publish(tickets(['New', 'Open', 'New']))
+    get(server, KPI_PATH + '?status=New&resource=amy')
+    get(server, KPI_PATH + '?resource=amy&status=New')
+    get(server, KPI_PATH + '?status=Open')
+    assert computed == [2, 1]
+
+def test_a_new_version_invalidates_cached_responses(server):
+    server.dataset.publish(tickets(['New', 'Open']))
+    before = get(server, KPI_PATH + '?status=New')
+
+    server.dataset.publish(tickets(['New', 'New', 'New']))
+    after = get(server, KPI_PATH + '?status=New', headers={'If-None-Match': before.headers['ETag']})
+
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert after.json()['version'] == get(server, VERSION_PATH).json()['version'] == before.json()['version'] + 1
+    assert after.json()['kpis']['total_tickets'] == 3
+
+def test_category_parameter_filters_on_the_published_categories():
+    dataset = SharedDataset(categorizer=TfidfCategorizer())
+    snapshot = dataset.publish(tickets(['New', 'New', 'Open']))
+    category = snapshot.data['Category'].iloc[0]
+    expected = len(apply_filters(snapshot.data, build_filters(selections={'Category': category})))
+
+    server = KpiApiServer(dataset, port=0)
+    server.start()
+    try:
+        response = get(server, KPI_PATH, params={'category': category})
+    finally:
+        server.stop()
+    assert response.json()['kpis']['total_tickets'] == expected
+
+def test_filters_from_query_reads_every_parameter():
+    query = {'status': ['New', 'Open'], 'team': ['A', 'B'], 'category': ['Phishing'],
+             'date_min': ['2025-04-01'], 'unassigned_only': ['yes']}
+    filters = filters_from_query(query)
+
+    # Single-value columns take the last value, multi-value columns all of them
+    assert filters['columns'] == {'Status': 'Open', 'Team': ['A', 'B'], 'Category': 'Phishing'}
+    assert filters['date_min'] == pd.Timestamp('2025-04-01').date()
+    assert filters['unassigned_only'] is True
+    assert canonical_query(query) == canonical_query(dict(reversed(list(query.items()))))
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from utils.near_duplicates import (MinHasher, SignatureCache, collapse_duplicates, near_duplicate_clusters,
+                                   normalize_summaries)
+
+STORM = [
+    'Phish Alert: New Case Opened [Case #00880250]',
+    'Phish Alert: New Case Opened [Case #00880251]',
+    'Phish Alert: New Case Opened [Case #00880313]'
+]
+
+def test_clusters_are_named_after_their_smallest_ticket():
+    summaries = pd.Series([STORM[0], 'Printer offline on floor 2', STORM[1], None, STORM[2]])
+    keys = pd.Series([105, 101, 103, 104, 102])
+
+    clusters = near_duplicate_clusters(summaries, keys=keys)
+
+    assert clusters.tolist() == [102, 101, 102, -1, 102]
+
+def test_cluster_ids_agree_between_a_batch_and_the_full_board():
+    board = pd.Series(STORM + ['Disk full on SQL01'])
+    board_keys = pd.Series([7, 9, 11, 8])
+
+    full = near_duplicate_clusters(board, keys=board_keys)
+    batch = near_duplicate_clusters(board.iloc[:2], keys=board_keys.iloc[:2])
+
+    assert full.iloc[:2].tolist() == batch.tolist() == [7, 7]
+
+def test_numbering_without_keys_starts_at_the_largest_cluster():
+    clusters = near_duplicate_clusters(pd.Series(['Disk full on SQL01'] + STORM))
+
+    assert clusters.tolist() == [1, 0, 0, 0]
+
+class CountingHasher(MinHasher):
+    def __init__(self):
+        super().__init__()
+        self.signed = 0
+
+    def signatures(self, texts, batch_shingles=1 << 17):
+        self.signed += len(texts)
+        return super().signatures(texts, batch_shingles)
+
+def test_signature_cache_only_signs_new_texts():
+    hasher = CountingHasher()
+    cache = SignatureCache(hasher)
+    first = cache.signatures(['alpha beta', 'gamma delta'])
+    second = cache.signatures(['gamma delta', 'epsilon'])
+
+    assert hasher.signed == 3
+    assert np.array_equal(second[0], first[1])
+    assert np.array_equal(second, MinHasher().signatures(['gamma delta', 'epsilon']))
+
+def test_signature_cache_normalizes_like_normalize_summaries():
+    cache = SignatureCache()
+    first = pd.Series(['Case  #123 FAILED', 'Disk 9 full'])
+    second = pd.Series(['Disk 9 full', 'VPN 10.0.0.1 down'], index=[5, 6])
+
+    assert cache.normalize(first).equals(normalize_summaries(first).astype(object))
+    assert cache.normalize(second).tolist() == normalize_summaries(second).tolist()
+    assert cache.normalize(second).index.tolist() == [5, 6]
+    assert cache.raw_texts.tolist() == second.tolist()
+
+def test_collapse_keeps_the_latest_ticket_per_cluster():
+    df = pd.DataFrame({
+        'Summary Description': STORM + ['Printer offline'],
+        'Last Update': pd.to_datetime(['2025-04-01', '2025-04-03', '2025-04-02', '2025-04-01'])
+    })
+    collapsed = collapse_duplicates(df, near_duplicate_clusters(df['Summary Description']))
+
+    assert collapsed.index.tolist() == [1, 3]
+    assert collapsed['Duplicates'].tolist() == [3, 1]
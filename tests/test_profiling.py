@@ -0,0 +1,68 @@
+import contextvars
+import tracemalloc
+
+import pytest
+
+from utils.profiling import StageTimer, stage, timed
+
+def run_in_context(func):
+    """Run func in a copied context so the active timer doesn't leak into other tests."""
+    return contextvars.copy_context().run(func)
+
+def test_stage_records_rows_set_inside_the_block():
+    def run():
+        timer = StageTimer()
+        timer.start_run()
+        with stage('clean', rows=10) as span:
+            span['rows'] = 8
+        return timer.last_run_frame()
+
+    frame = run_in_context(run)
+
+    assert frame['stage'].tolist() == ['clean']
+    assert frame['rows'].tolist() == [8]
+
+def test_stage_records_a_raising_block():
+    def run():
+        timer = StageTimer()
+        timer.start_run()
+        with pytest.raises(ValueError):
+            with stage('parse', rows=3):
+                raise ValueError('bad export')
+        return timer.last_run_frame()
+
+    frame = run_in_context(run)
+
+    assert frame['stage'].tolist() == ['parse']
+    assert frame['rows'].tolist() == [3]
+    assert frame['seconds'].iloc[0] >= 0
+
+def test_raising_stages_record_memory_and_nest():
+    @timed('chart')
+    def build(rows):
+        raise RuntimeError('no data')
+
+    def run():
+        timer = StageTimer()
+        timer.start_run()
+        tracemalloc.start()
+        try:
+            with pytest.raises(RuntimeError):
+                with stage('charts'):
+                    build([1, 2])
+        finally:
+            tracemalloc.stop()
+        return timer.last_run_frame()
+
+    frame = run_in_context(run)
+
+    assert frame['stage'].tolist() == ['chart', 'charts']
+    assert frame['peak_bytes'].notna().all()
+
+def test_stage_without_timer_does_nothing():
+    def run():
+        with stage('idle') as span:
+            span['rows'] = 1
+        return span
+
+    assert run_in_context(run) == {'rows': 1}
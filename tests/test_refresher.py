@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from utils.refresher import SharedDataset
+from utils.search_index import SearchIndex
+
+def tickets(summaries):
+    return pd.DataFrame({
+        'Selected_Sr_Service_Recid': range(1, len(summaries) + 1),
+        'Status': 'New',
+        'Summary Description': summaries
+    })
+
+def test_each_snapshot_keeps_its_own_search_index():
+    dataset = SharedDataset(search_index=SearchIndex())
+    first = dataset.publish(tickets(['printer jam', 'vpn down']))
+    assert first.search_index is dataset.search_index
+    assert sorted(first.search_index.search('printer')) == [1]
+
+    second = dataset.publish(tickets(['printer jam', 'printer offline', 'disk full']))
+    assert second.search_index is dataset.search_index
+    assert sorted(second.search_index.search('printer')) == [1, 2]
+    assert list(second.search_index.search('vpn')) == []
+
+    # Sessions still on the first snapshot search the tickets of their frame
+    assert sorted(first.search_index.search('printer')) == [1]
+    assert sorted(first.search_index.search('vpn')) == [2]
+    assert list(first.search_index.search('disk')) == []
+
+def test_failed_publish_leaves_the_index_and_categorizer_unchanged(monkeypatch):
+    from utils.categorizer import TfidfCategorizer
+
+    dataset = SharedDataset(search_index=SearchIndex(), categorizer=TfidfCategorizer())
+    dataset.publish(tickets(['printer jam']))
+    search_index, categorizer = dataset.search_index, dataset.categorizer
+    learned = len(categorizer)
+
+    def fail(self, df, rows=None):
+        raise RuntimeError('index update failed')
+    monkeypatch.setattr(SearchIndex, 'update', fail)
+    with pytest.raises(RuntimeError):
+        dataset.publish(tickets(['printer jam', 'phishing email']))
+
+    assert dataset.current().version == 1
+    assert dataset.search_index is search_index
+    assert dataset.categorizer is categorizer
+    assert len(categorizer) == learned
+
+def test_listeners_see_every_published_snapshot():
+    dataset = SharedDataset()
+    seen = []
+    dataset.subscribe(lambda snapshot: seen.append(snapshot.version))
+
+    dataset.publish(tickets(['a']))
+    dataset.publish(tickets(['b']))
+    assert seen == [1, 2]
+
+def test_publish_categorizes_and_indexes_the_categories():
+    from utils.categorizer import TfidfCategorizer
+    from utils.filters import apply_filters, build_filters
+
+    dataset = SharedDataset(categorizer=TfidfCategorizer())
+    snapshot = dataset.publish(tickets(['phishing email reported', 'disk full on server', 'phishing link clicked']),
+                               index={})
+
+    assert 'Category' in snapshot.data.columns
+    category = snapshot.data['Category'].iloc[0]
+    filters = build_filters(selections={'Category': category})
+    assert apply_filters(snapshot.data, filters, snapshot.index).equals(apply_filters(snapshot.data, filters))
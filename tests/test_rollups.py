@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from utils.rollups import DEFAULT_MISSING_LABEL, ROLLUP_COLUMNS, HierarchyRollup, build_rollups
+
+NOW = pd.Timestamp('2025-04-01 12:00', tz='UTC')
+
+def tickets():
+    return pd.DataFrame({
+        'Territory Team': ['East', 'East', 'East', 'West', 'West', None],
+        'Team': ['SOC', 'SOC', 'NOC', 'SOC', ' ', 'SOC'],
+        'Resources': ['amy', 'amy, bob', '', 'carl', 'bob', None],
+        'Company': ['Acme', 'Acme', 'Beta', 'Beta', 'Beta', 'Acme'],
+        'Age': [1.0, 3.0, 5.0, 7.0, 9.0, 11.0],
+        'SLA Deadline': [NOW - pd.Timedelta(hours=1), NOW + pd.Timedelta(hours=2), pd.NaT,
+                         NOW + pd.Timedelta(days=3), NOW + pd.Timedelta(hours=23), pd.NaT]
+    })
+
+def test_every_depth_has_one_node_per_path():
+    rollup = HierarchyRollup(tickets(), ['Territory Team', 'Team', 'Resources'], NOW)
+    depths = pd.Series([len(path) for path in rollup.nodes]).value_counts().sort_index()
+
+    # Territories East, West, (none); teams East/SOC, East/NOC, West/SOC, West/(none), (none)/SOC;
+    # engineers amy and bob under East/SOC and one under each other team
+    assert depths.to_dict() == {0: 1, 1: 3, 2: 5, 3: 6}
+    assert rollup.node()['Tickets'] == 6
+    assert rollup.node(['East'])['Tickets'] == 3
+    assert rollup.node(['East', 'SOC'])['Avg Age'] == 2.0
+
+def test_missing_values_get_the_level_labels():
+    rollup = HierarchyRollup(tickets(), ['Territory Team', 'Team', 'Resources'], NOW)
+
+    assert rollup.children() == ['East', 'West', DEFAULT_MISSING_LABEL]
+    assert sorted(rollup.children(['West'])) == sorted(['SOC', DEFAULT_MISSING_LABEL])
+    assert rollup.children(['East', 'NOC']) == ['Unassigned']
+    assert rollup.children([DEFAULT_MISSING_LABEL, 'SOC']) == ['Unassigned']
+
+def test_engineer_counts_count_shared_tickets_for_each_engineer():
+    rollup = HierarchyRollup(tickets(), ['Territory Team', 'Team', 'Resources'], NOW)
+
+    # Ticket 2 is shared by amy and bob, so the engineers of East/SOC add up to one more than the team
+    engineers = rollup.children_table(['East', 'SOC'])
+    assert engineers['Tickets'].to_dict() == {'amy': 2, 'bob': 1}
+    assert engineers['Tickets'].sum() == rollup.node(['East', 'SOC'])['Tickets'] + 1
+    # Without shared tickets the children add up to their parent
+    for path in [(), ('East',), ('West',), ('West', 'SOC')]:
+        assert rollup.children_table(path)['Tickets'].sum() == rollup.node(path)['Tickets'], path
+
+def test_sla_issues_and_risk_are_summed_per_node():
+    rollup = HierarchyRollup(tickets(), ['Company'], NOW)
+
+    # Acme: one breached, one due in 2 hours; Beta: one due in 23 hours, one in 3 days
+    assert rollup.node(['Acme'])['SLA Issues'] == 1
+    assert rollup.node(['Acme'])['SLA At Risk'] == 1
+    assert rollup.node(['Beta'])['SLA Issues'] == 0
+    assert rollup.node(['Beta'])['SLA At Risk'] == 1
+    assert rollup.node()['Max Age'] == 11.0
+    assert rollup.node(['Beta'])['Median Age'] == 7.0
+
+def test_children_table_lists_the_busiest_first():
+    df = tickets()
+    df.loc[5, 'Territory Team'] = 'North'
+    df.loc[[0, 1], 'Territory Team'] = 'West'
+    rollup = HierarchyRollup(df, ['Territory Team', 'Resources'], NOW)
+    table = rollup.children_table()
+
+    assert table.index.name == 'Territory Team'
+    assert table.columns.tolist() == ROLLUP_COLUMNS
+    assert table.index.tolist() == ['West', 'East', 'North']
+    assert table['Tickets'].tolist() == [4, 1, 1]
+
+    engineers = rollup.children_table(['West'])
+    assert engineers.index.name == 'Resources'
+    assert engineers.index[0] == 'amy' and engineers.loc['amy', 'Tickets'] == 2
+    assert engineers['Tickets'].is_monotonic_decreasing
+
+    leaf = rollup.children_table(['West', 'bob'])
+    assert leaf.empty and leaf.index.name == 'Node'
+
+def test_build_rollups_skips_hierarchies_without_any_level():
+    df = tickets().drop(columns=['Territory Team', 'Team', 'Resources'])
+    rollups = build_rollups(df, now=NOW)
+
+    assert list(rollups) == ['Company']
+    # Missing levels of a hierarchy are left out
+    assert rollups['Company'].levels == ['Company']
+
+def test_rollups_of_no_tickets_have_an_empty_root():
+    rollup = HierarchyRollup(tickets().iloc[:0], ['Company'], NOW)
+    assert rollup.node()['Tickets'] == 0
+    assert np.isnan(rollup.node()['Avg Age'])
+    assert rollup.children() == []
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from utils.search_index import SearchIndex, parse_query, search_key_column, tokenize
+
+def tickets():
+    return pd.DataFrame({
+        'Selected_Sr_Service_Recid': [11, 12, 13, 14],
+        'Ticket #': [101, 102, 103, 104],
+        'Summary Description': [
+            'Phishing email reported [Case #00880250]',
+            'Email quarantine release',
+            'Disk space low on WS-12',
+            'Reported phishing, user clicked link'
+        ],
+        'Contact': ['Ann Lee', 'Bob Ray', None, 'Cat Poe']
+    })
+
+def test_tokens_and_query_terms():
+    assert tokenize('[Case #00880250] WS-12') == ['case', '00880250', 'ws', '12']
+    assert parse_query('phish* "case #0088" ws') == [(['phish'], True), (['case', '0088'], False), (['ws'], False)]
+
+def test_words_phrases_and_prefixes():
+    index = SearchIndex()
+    index.build(tickets())
+
+    assert index.search('email').tolist() == [11, 12]
+    assert index.search('"phishing email"').tolist() == [11]
+    # Phrases only match adjacent tokens in order
+    assert index.search('"email phishing"').tolist() == []
+    assert index.search('phish*').tolist() == [11, 14]
+    assert index.search('"reported phishing"').tolist() == [14]
+    assert index.search('reported phish*').tolist() == [11, 14]
+    assert index.search('ws* 12').tolist() == [13]
+    assert index.search('ann email').tolist() == [11]
+    assert index.search('   ') is None
+
+def test_phrases_do_not_span_columns():
+    index = SearchIndex()
+    index.build(tickets())
+
+    assert index.search('"link cat"').tolist() == []
+
+def test_updates_only_reindex_changed_tickets():
+    index = SearchIndex()
+    index.build(tickets())
+
+    changed = tickets().iloc[1:].copy()
+    changed.loc[2, 'Summary Description'] = 'Printer offline'
+    added = pd.DataFrame({'Selected_Sr_Service_Recid': [15], 'Ticket #': [105],
+                          'Summary Description': ['Printer jam'], 'Contact': ['Dan']})
+
+    assert index.update(pd.concat([changed, added], ignore_index=True)) == 2
+    assert len(index) == 4
+    assert index.search('printer').tolist() == [13, 15]
+    assert index.search('disk').tolist() == []
+    # Ticket 11 left the board
+    assert index.search('phishing').tolist() == [14]
+
+def test_compaction_keeps_the_results():
+    index = SearchIndex(max_segments=100)
+    df = tickets()
+    index.build(df)
+    for i in range(3):
+        df = df.assign(**{'Contact': df['Contact'].fillna('') + f' v{i}'})
+        index.update(df)
+    before = {query: index.search(query).tolist() for query in ['phish*', 'v2', 'v0', 'email']}
+
+    index.compact()
+
+    assert len(index.segments) == 1
+    assert {query: index.search(query).tolist() for query in before} == before
+
+def test_exports_without_the_service_key_use_ticket_numbers():
+    df = tickets().drop(columns=['Selected_Sr_Service_Recid'])
+    index = SearchIndex()
+    index.update(df)
+
+    assert index.indexed_column == 'Ticket #'
+    assert index.search('email').tolist() == [101, 102]
+
+def test_exports_without_an_integer_id_are_not_indexed():
+    df = tickets().drop(columns=['Selected_Sr_Service_Recid'])
+    df['Ticket #'] = 'T-' + df['Ticket #'].astype(str)
+    index = SearchIndex()
+    index.build(tickets())
+
+    assert search_key_column(df) is None
+    assert index.update(df) == 0
+    assert index.indexed_column is None
+    assert len(index) == 0
+    assert np.array_equal(index.search('email'), [])
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from utils.sla import SlaBreachIndex, breached_mask, parse_sla_deadlines, time_to_breach
+
+NOW = pd.Timestamp('2026-03-18 12:00', tz='UTC')
+
+def tickets():
+    deadlines = pd.to_datetime([
+        '2026-03-18 15:00', '2026-03-18 11:00', None, '2026-03-19 12:00', '2026-03-18 13:00'
+    ]).tz_localize('UTC')
+    return pd.DataFrame({'SLA Deadline': deadlines}, index=[10, 11, 12, 13, 14])
+
+def test_deadlines_parse_with_their_utc_offset():
+    status = pd.Series([
+        'Plan by Tue 03/18 5:28 PM UTC+05:30 Tue 03/18 7:58 AM EDT',
+        'Resolve by Wed 03/18 9:00 AM UTC-04:00 Wed 03/18 9:00 AM EDT',
+        'Waiting'
+    ])
+
+    parsed = parse_sla_deadlines(status, reference=NOW)
+
+    assert parsed['SLA Kind'].iloc[:2].tolist() == ['Plan', 'Resolve']
+    assert parsed['SLA Deadline'].iloc[0] == pd.Timestamp('2026-03-18 11:58', tz='UTC')
+    assert parsed['SLA Deadline'].iloc[1] == pd.Timestamp('2026-03-18 13:00', tz='UTC')
+    assert pd.isna(parsed['SLA Deadline'].iloc[2])
+
+def test_deadlines_across_new_year_take_the_nearest_year():
+    status = pd.Series(['Resolve by Thu 01/02 9:00 AM UTC+00:00 Thu 01/02 4:00 AM EST'])
+
+    parsed = parse_sla_deadlines(status, reference=pd.Timestamp('2025-12-30', tz='UTC'))
+
+    assert parsed['SLA Deadline'].iloc[0] == pd.Timestamp('2026-01-02 09:00', tz='UTC')
+
+def test_breach_windows_match_a_full_scan():
+    df = tickets()
+    index = SlaBreachIndex(df)
+    left = time_to_breach(df, NOW)
+
+    assert len(index) == 4
+    assert index.breached(NOW).tolist() == [11]
+    assert index.breaching_within(4, NOW).tolist() == [14, 10]
+    assert set(index.breaching_within(4, NOW)) == set(df.index[(left >= pd.Timedelta(0)) & (left < pd.Timedelta(hours=4))])
+    assert index.between(None, None).tolist() == [11, 14, 10, 13]
+    assert breached_mask(df, NOW).tolist() == [False, True, False, False, False]
+
+def test_index_accepts_naive_and_other_time_zone_bounds():
+    index = SlaBreachIndex(tickets())
+
+    assert index.between(pd.Timestamp('2026-03-18 10:00', tz='US/Eastern'), None).tolist() == [10, 13]
+    assert index.between(None, pd.Timestamp('2026-03-18 13:00')).tolist() == [11]
+
+def test_frames_without_deadlines_have_an_empty_index():
+    df = pd.DataFrame({'Status': ['New']})
+
+    assert len(SlaBreachIndex(df)) == 0
+    assert SlaBreachIndex(df).breached(NOW).tolist() == []
+    assert time_to_breach(df, NOW).isna().all()
@@ -0,0 +1,82 @@
+import pandas as pd
+
+from utils.snapshot_diff import diff_snapshots, fingerprint_rows, summarize_changes
+
+def export(rows):
+    return pd.DataFrame(rows, columns=[
+        'Selected_Sr_Service_Recid', 'Ticket #', 'Company', 'Summary Description',
+        'Status', 'Resources', 'Priority', 'Age'
+    ])
+
+OLD = export([
+    (1, 101, 'A', 'Printer jam', 'New', 'ann', 'Low', 1),
+    (2, 102, 'B', 'VPN down', 'In Progress', 'bob', 'High', 3),
+    (3, 103, 'A', 'Disk full', 'New', 'ann', 'Medium', 2),
+    (4, 104, 'C', 'Password reset', 'New', 'cat', 'Low', 5)
+])
+
+NEW = export([
+    (1, 101, 'A', 'Printer jam', 'New', 'ann', 'Low', 1),
+    (2, 102, 'B', 'VPN down', 'Waiting', 'dan', 'High', 3),
+    (3, 103, 'A', 'Disk full', 'New', 'ann', 'Medium', 7),
+    (5, 105, 'D', 'New laptop', 'New', 'eve', 'Low', 0)
+])
+
+def test_changes_are_classified_by_fingerprint():
+    changes = diff_snapshots(OLD, NEW).set_index('Selected_Sr_Service_Recid')
+
+    assert changes['Change'].to_dict() == {2: 'Updated', 3: 'Updated', 4: 'Closed', 5: 'New'}
+    assert changes.loc[2, 'Changed Fields'] == 'Status, Resources'
+    assert (changes.loc[2, 'Old Status'], changes.loc[2, 'New Status']) == ('In Progress', 'Waiting')
+    # Changes outside the tracked columns are still reported
+    assert changes.loc[3, 'Changed Fields'] == 'Other'
+    assert changes.loc[4, 'Company'] == 'C'
+
+def test_precomputed_fingerprints_give_the_same_diff():
+    expected = diff_snapshots(OLD, NEW)
+    changes = diff_snapshots(OLD, NEW, old_fingerprints=fingerprint_rows(OLD),
+                             new_fingerprints=fingerprint_rows(NEW))
+
+    pd.testing.assert_frame_equal(changes, expected)
+
+def test_identical_snapshots_have_no_changes():
+    changes = diff_snapshots(OLD, OLD.copy())
+
+    assert changes.empty
+    assert 'Changed Fields' in changes.columns
+
+def test_fingerprints_keep_the_last_row_of_a_ticket():
+    doubled = pd.concat([OLD, OLD.iloc[[0]].assign(Status='Closed')], ignore_index=True)
+    fingerprints = fingerprint_rows(doubled)
+
+    assert len(fingerprints) == 4
+    assert fingerprints[1] != fingerprint_rows(OLD)[1]
+
+def test_summary_counts_changes_per_field():
+    summary = summarize_changes(diff_snapshots(OLD, NEW))
+
+    assert summary == {
+        'new': 1, 'closed': 1, 'updated': 2,
+        'status_changes': 1, 'resources_changes': 1, 'priority_changes': 0
+    }
+
+def test_derived_columns_do_not_make_tickets_updated():
+    from utils.data_processor import clean_data
+
+    storm = pd.DataFrame({
+        'Selected_Sr_Service_Recid': range(1, 7),
+        'Ticket #': range(501, 507),
+        'Company': 'A',
+        'Summary Description': [f'Backup job failed on server SRV-{n:02d} at night' for n in range(1, 7)],
+        'Status': 'New',
+        'Last Update': '03/18/2026 9:00 am',
+        'Site Time Zone': 'US Eastern (UTC-04)'
+    })
+    old = clean_data(storm)
+    # The cluster's smallest ticket closes, which renames the cluster
+    new = clean_data(storm.iloc[1:])
+    assert old['Duplicate Cluster'].iloc[1] != new['Duplicate Cluster'].iloc[0]
+
+    changes = diff_snapshots(old, new)
+
+    assert changes['Change'].tolist() == ['Closed']
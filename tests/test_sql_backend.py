@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.filters import apply_filters, build_filters
+from utils.sql_backend import TicketDatabase
+
+def tickets():
+    return pd.DataFrame({
+        'Ticket #': [1, 2, 3, 4],
+        'Status': ['New', 'Closed', None, 'New'],
+        'Company': ['A', 'B', 'A', np.nan],
+        'Resources': ['amy, bob', 'bob', '', None],
+        'Last Update': pd.to_datetime(['2024-03-01', '2024-03-02', '2024-03-03', '2024-03-04'])
+    })
+
+def test_session_tables_are_isolated(tmp_path):
+    db = TicketDatabase(str(tmp_path / 'tickets.db'))
+    first, second = TicketDatabase.session_table('one'), TicketDatabase.session_table('two')
+    db.load(tickets(), table=first)
+    db.load(tickets().iloc[:1], table=second)
+
+    assert db.count(table=first) == 4
+    assert db.count(table=second) == 1
+    assert db.run_query('SELECT COUNT(*) AS n FROM tickets', table=second)['n'].iloc[0] == 1
+
+def test_session_tables_of_an_earlier_run_are_dropped(tmp_path):
+    path = str(tmp_path / 'tickets.db')
+    TicketDatabase(path).load(tickets(), table=TicketDatabase.session_table('old'))
+
+    assert not TicketDatabase(path).has_tickets(TicketDatabase.session_table('old'))
+
+def test_single_value_filters_match_the_in_memory_filters(tmp_path):
+    db = TicketDatabase(str(tmp_path / 'tickets.db'))
+    df = tickets()
+    db.load(df)
+
+    for selections in [{'Status': 'New'}, {'Ticket #': 2}, {'Company': 'nan'}, {'Status': ['New', 'None']}]:
+        filters = build_filters(selections=selections)
+        expected = apply_filters(df, filters)['Ticket #'].tolist()
+        assert db.fetch(filters)['Ticket #'].tolist() == expected, selections
+
+def test_count_by_skips_missing_values_like_value_counts(tmp_path):
+    db = TicketDatabase(str(tmp_path / 'tickets.db'))
+    df = tickets()
+    db.load(df)
+
+    counts = db.count_by('Status', build_filters(selections={'Company': 'A'}))
+
+    expected = df[df['Company'] == 'A']['Status'].value_counts()
+    assert dict(zip(counts['Status'], counts['Count'])) == expected.to_dict()
+
+def test_idle_session_tables_expire(tmp_path):
+    db = TicketDatabase(str(tmp_path / 'tickets.db'), session_ttl=60)
+    idle, active = TicketDatabase.session_table('idle'), TicketDatabase.session_table('active')
+    db.load(tickets(), table=idle)
+    db.load(tickets(), table=active)
+
+    assert db.expire_session_tables(time.monotonic() + 30) == []
+    # Two minutes on, only the table used since stays
+    later = time.monotonic() + 120
+    db._last_used[active] = later - 10
+    assert db.expire_session_tables(later) == [idle]
+    assert not db.has_tickets(idle)
+    assert db.has_tickets(active)
+
+def test_loading_sweeps_out_expired_session_tables(tmp_path):
+    db = TicketDatabase(str(tmp_path / 'tickets.db'), session_ttl=0)
+    first, second = TicketDatabase.session_table('one'), TicketDatabase.session_table('two')
+    db.load(tickets(), table=first)
+    time.sleep(0.01)
+    db.load(tickets(), table=second)
+
+    assert not db.has_tickets(first)
+    assert db.count(table=second) == 4
+
+def test_ad_hoc_queries_only_read_the_session_table(tmp_path):
+    db = TicketDatabase(str(tmp_path / 'tickets.db'))
+    mine, other = TicketDatabase.session_table('mine'), TicketDatabase.session_table('other')
+    db.load(tickets(), table=mine)
+    db.load(tickets(), table=other)
+
+    query = 'SELECT "Status", COUNT(*) AS n FROM tickets WHERE "Company" = \'A\' GROUP BY "Status"'
+    assert db.run_query(query, table=mine)['n'].sum() == 2
+    assert db.run_query(f'SELECT COUNT(*) AS n FROM {mine}', table=mine)['n'].iloc[0] == 4
+    for sql in [f'SELECT * FROM {other}',
+                f'SELECT * FROM tickets JOIN {other} USING ("Ticket #")',
+                f'SELECT * FROM tickets WHERE "Ticket #" IN (SELECT "Ticket #" FROM {other})',
+                'SELECT name FROM sqlite_master',
+                'SELECT * FROM saved_queries',
+                f"ATTACH DATABASE '{tmp_path / 'tickets.db'}' AS copy"]:
+        with pytest.raises(pd.errors.DatabaseError):
+            db.run_query(sql, table=mine)
@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from utils.threshold_alerts import AlertEngine, AlertState, WebhookSink
+
+NOW = pd.Timestamp('2025-04-01 12:00', tz='UTC')
+
+UNASSIGNED_RULE = {'name': 'Unassigned', 'where': {'unassigned': True}, 'group_by': 'Company',
+                   'stat': 'count', 'op': '>', 'threshold': 1}
+RISK_RULE = {'name': 'Risk spike', 'group_by': 'Territory Team', 'stat': 'sum', 'measure': 'sla_at_risk',
+             'compare': 'increase', 'op': '>=', 'threshold': 2}
+
+def tickets(unassigned_a=3, at_risk_x=0):
+    """Company A's unassigned tickets and team X's tickets breaching within the hour."""
+    rows = [{'Company': 'A', 'Resources': '', 'Territory Team': 'Y', 'SLA Deadline': pd.NaT}
+            for _ in range(unassigned_a)]
+    rows += [{'Company': 'B', 'Resources': 'amy', 'Territory Team': 'X', 'SLA Deadline': NOW + pd.Timedelta(hours=1)}
+             for _ in range(at_risk_x)]
+    rows.append({'Company': 'B', 'Resources': 'bob', 'Territory Team': 'X', 'SLA Deadline': pd.NaT})
+    df = pd.DataFrame(rows)
+    df['Status'] = 'New'
+    df['SLA Deadline'] = pd.to_datetime(df['SLA Deadline'], utc=True)
+    return df
+
+def test_groups_fire_once_and_resolve():
+    engine = AlertEngine([UNASSIGNED_RULE])
+
+    assert [(e['group'], e['state']) for e in engine.evaluate(tickets(3), NOW)] == [('A', 'firing')]
+    assert engine.evaluate(tickets(4), NOW) == []
+    assert [(e['group'], e['state']) for e in engine.evaluate(tickets(1), NOW)] == [('A', 'resolved')]
+
+def test_increase_compares_with_the_previous_evaluation_of_the_same_source():
+    engine = AlertEngine([RISK_RULE])
+
+    assert engine.evaluate(tickets(at_risk_x=1), NOW) == []
+    events = engine.evaluate(tickets(at_risk_x=3), NOW)
+    assert [(e['group'], e['state'], e['value']) for e in events] == [('X', 'firing', 2.0)]
+    # No further increase, so the spike is over
+    assert [e['state'] for e in engine.evaluate(tickets(at_risk_x=3), NOW)] == ['resolved']
+
+def test_sources_keep_separate_state():
+    engine = AlertEngine([UNASSIGNED_RULE, RISK_RULE])
+    upload = AlertState(source='upload')
+
+    engine.evaluate(tickets(3, at_risk_x=3), NOW)
+    upload_events = engine.evaluate(tickets(1, at_risk_x=0), NOW, state=upload)
+    shared_events = engine.evaluate(tickets(3, at_risk_x=3), NOW)
+
+    assert upload_events == []
+    assert shared_events == []
+    assert engine.active_frame()['Group'].tolist() == ['A']
+    assert upload.active_frame().empty
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    received = []
+    delay = 0
+
+    def do_POST(self):
+        time.sleep(self.delay)
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        RecordingHandler.received.append(json.loads(body))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def sink_server():
+    RecordingHandler.received = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+def test_webhook_sink_receives_events_without_blocking_the_evaluation(sink_server):
+    RecordingHandler.delay = 0.5
+    engine = AlertEngine([UNASSIGNED_RULE], [WebhookSink(f'http://127.0.0.1:{sink_server.server_port}/alerts')])
+
+    started = time.monotonic()
+    events = engine.evaluate(tickets(3), NOW)
+    assert time.monotonic() - started < RecordingHandler.delay
+
+    assert engine.flush(timeout=5)
+    assert RecordingHandler.received == [{'events': events}]
+    assert engine.last_error is None
+
+def test_failed_delivery_is_reported():
+    engine = AlertEngine([UNASSIGNED_RULE], [WebhookSink('http://127.0.0.1:9/alerts', timeout=1)])
+    engine.evaluate(tickets(3), NOW)
+
+    assert engine.flush(timeout=5)
+    assert engine.last_error.startswith('WebhookSink')
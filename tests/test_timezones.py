@@ -0,0 +1,77 @@
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from utils.timezones import DEFAULT_ZONE, normalize_timezones, parse_zone_label, zone_groups
+
+def tickets(last_updates, zones):
+    return pd.DataFrame({
+        'Last Update': pd.to_datetime(last_updates),
+        'Site Time Zone': zones
+    })
+
+def utc(*values):
+    return [pd.Timestamp(value, tz='UTC') for value in values]
+
+def test_ambiguous_wall_times_are_read_as_standard_time():
+    # 01:30 happens twice on 2 Nov 2025 in New York; standard time is UTC-5
+    df = tickets(['2025-11-02 01:30', '2025-11-02 00:30'], 'US Eastern (UTC-05)')
+    normalized = normalize_timezones(df, display_zone='UTC')
+    assert normalized['Last Update UTC'].tolist() == utc('2025-11-02 06:30', '2025-11-02 04:30')
+
+def test_nonexistent_wall_times_are_shifted_forward():
+    # Clocks jump from 02:00 to 03:00 EDT on 9 Mar 2025 in Chicago and New York
+    df = tickets(['2025-03-09 02:30', '2025-03-09 02:30'], ['US Central (UTC-06)', 'US Eastern (UTC-05)'])
+    normalized = normalize_timezones(df, display_zone='UTC')
+    assert normalized['Last Update UTC'].tolist() == utc('2025-03-09 08:00', '2025-03-09 07:00')
+
+def test_unknown_zone_names_use_the_offset_in_their_label():
+    zone = parse_zone_label('Atlantis (UTC+05:30)')
+    assert zone.utcoffset(None) == timedelta(hours=5, minutes=30)
+    assert parse_zone_label('Atlantis (UTC-3)').utcoffset(None) == timedelta(hours=-3)
+
+    df = tickets(['2025-07-01 12:00'], 'Atlantis (UTC+05:30)')
+    assert normalize_timezones(df, display_zone='UTC')['Last Update UTC'].tolist() == utc('2025-07-01 06:30')
+
+def test_labels_without_an_offset_and_blank_zones_use_the_default_zone():
+    assert parse_zone_label('Somewhere') == ZoneInfo(DEFAULT_ZONE)
+    assert parse_zone_label(None) == parse_zone_label('  ') == ZoneInfo(DEFAULT_ZONE)
+    assert parse_zone_label('India (UTC+05:30)') == ZoneInfo('Asia/Kolkata')
+
+    df = tickets(['2025-07-01 12:00'] * 3, ['Somewhere', None, ''])
+    expected = pd.Timestamp('2025-07-01 12:00', tz=DEFAULT_ZONE).tz_convert('UTC')
+    assert normalize_timezones(df)['Last Update UTC'].tolist() == [expected] * 3
+
+def test_zone_groups_merge_labels_of_the_same_zone():
+    zones = pd.Series(['US Eastern (UTC-04)', 'US Pacific (UTC-07)', 'US Eastern (UTC-05)', 'Atlantis (UTC+01)'])
+    groups = zone_groups(zones)
+
+    assert len(groups) == 3
+    assert groups[ZoneInfo('America/New_York')].tolist() == [0, 2]
+    assert groups[ZoneInfo('America/Los_Angeles')].tolist() == [1]
+    assert zone_groups(pd.Series([None, None]))[ZoneInfo(DEFAULT_ZONE)].tolist() == [0, 1]
+
+def test_utc_columns_are_added_and_date_columns_shown_in_the_display_zone():
+    df = tickets(['2025-07-01 09:00', None], ['US Pacific (UTC-07)', 'US Pacific (UTC-07)'])
+    df['Due Date'] = pd.to_datetime(['2025-07-02 17:00', '2025-07-03 08:00'])
+    normalized = normalize_timezones(df, display_zone='America/New_York')
+
+    assert normalized['Last Update UTC'].dt.tz is not None
+    assert normalized['Last Update UTC'].iloc[0] == pd.Timestamp('2025-07-01 16:00', tz='UTC')
+    assert normalized['Due Date UTC'].tolist() == utc('2025-07-03 00:00', '2025-07-03 15:00')
+    # Display columns are naive New York wall times; missing dates stay missing
+    assert normalized['Last Update'].dt.tz is None
+    assert normalized['Last Update'].iloc[0] == pd.Timestamp('2025-07-01 12:00')
+    assert pd.isna(normalized['Last Update'].iloc[1]) and pd.isna(normalized['Last Update UTC'].iloc[1])
+    assert 'Next Date UTC' not in normalized.columns
+
+    # The input keeps its site wall times
+    assert df['Last Update'].iloc[0] == pd.Timestamp('2025-07-01 09:00')
+    assert 'Last Update UTC' not in df.columns
+
+def test_tz_aware_columns_are_only_converted():
+    df = pd.DataFrame({'Last Update': [pd.Timestamp('2025-07-01 09:00', tz='Asia/Kolkata')],
+                       'Site Time Zone': ['US Pacific (UTC-07)']})
+    normalized = normalize_timezones(df, display_zone='UTC')
+    assert normalized['Last Update UTC'].tolist() == utc('2025-07-01 03:30')
@@ -0,0 +1,110 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import requests
+
+from utils.filters import apply_filters, build_filter_index, build_filters
+from utils.refresher import SharedDataset
+from utils.webhook import CALLBACK_PATH, LiveTicketStore, WebhookServer, parse_callback
+
+def entity(ticket_id, status, company, closed=False):
+    return {
+        'id': ticket_id,
+        'summary': f'Ticket {ticket_id}',
+        'status': {'name': status},
+        'company': {'name': company},
+        'resources': 'amy' if ticket_id % 2 else 'bob, amy',
+        'closedFlag': closed,
+        '_info': {'lastUpdated': '2025-04-01T10:00:00Z'}
+    }
+
+def event(ticket_id, status, company, closed=False):
+    return parse_callback({'Type': 'ticket', 'Action': 'updated', 'ID': ticket_id,
+                           'Entity': json.dumps(entity(ticket_id, status, company, closed))})
+
+def assert_index_matches_rebuild(index, data):
+    rebuilt = build_filter_index(data)
+    assert set(index) == set(rebuilt)
+    for col, values in rebuilt.items():
+        assert {v: sorted(p.tolist()) for v, p in index[col].items()} == \
+            {v: sorted(p.tolist()) for v, p in values.items()}, col
+
+def test_batches_patch_the_published_index():
+    dataset = SharedDataset()
+    store = LiveTicketStore(dataset)
+    store.apply_batch([event(i, 'New', 'A' if i < 5 else 'B') for i in range(1, 9)])
+    store.apply_batch([event(2, 'Closed', 'A', closed=True), event(6, 'In Progress', 'A'), event(9, 'New', 'C')])
+
+    snapshot = dataset.current()
+    assert sorted(snapshot.data['Selected_Sr_Service_Recid']) == [1, 3, 4, 5, 6, 7, 8, 9]
+    assert_index_matches_rebuild(snapshot.index, snapshot.data)
+
+    filters = build_filters(selections={'Company': 'A', 'Resources': 'bob'})
+    indexed = apply_filters(snapshot.data, filters, snapshot.index)
+    assert sorted(indexed['Ticket #']) == sorted(apply_filters(snapshot.data, filters)['Ticket #']) == [4, 6]
+
+def test_batches_continue_from_a_dataset_published_by_the_refresher():
+    dataset = SharedDataset()
+    store = LiveTicketStore(dataset)
+    store.apply_batch([event(1, 'New', 'A')])
+
+    refreshed = store.to_frame().assign(Status='Waiting')
+    dataset.publish(refreshed, source='refresher')
+    store.apply_batch([event(2, 'New', 'B')])
+
+    data = dataset.current().data
+    assert data.set_index('Ticket #')['Status'].to_dict() == {1: 'Waiting', 2: 'New'}
+
+def test_non_object_bodies_are_rejected_with_400():
+    server = WebhookServer(LiveTicketStore(), port=0, batch_interval=0.05)
+    server.start()
+    try:
+        url = f'http://127.0.0.1:{server.port}{CALLBACK_PATH}'
+        for body in ['[1, 2]', '"ticket"', '{not json']:
+            response = requests.post(url, data=body, timeout=5)
+            assert response.status_code == 400, body
+        response = requests.post(url, json={'Type': 'ticket', 'Action': 'deleted', 'ID': 1}, timeout=5)
+        assert response.status_code == 202
+    finally:
+        server.stop()
+
+def test_new_tickets_join_the_clusters_of_the_board():
+    dataset = SharedDataset()
+    store = LiveTicketStore(dataset)
+    storm = [{'Type': 'ticket', 'Action': 'added', 'ID': i,
+              'Entity': json.dumps(dict(entity(i, 'New', 'A'), summary=f'Phish Alert: New Case [Case #0088{i:04d}]'))}
+             for i in (5, 8)]
+    store.apply_batch([parse_callback(storm[0]), event(6, 'New', 'A')])
+    store.apply_batch([parse_callback(storm[1])])
+
+    clusters = dataset.current().data.set_index('Ticket #')['Duplicate Cluster']
+    assert clusters[5] == clusters[8] == 5
+    assert clusters[6] == 6
+
+def test_batches_only_categorize_and_search_their_own_tickets(monkeypatch):
+    from utils.categorizer import TfidfCategorizer
+    from utils.search_index import SearchIndex
+
+    categorized = []
+    update = TfidfCategorizer.update
+    def counting_update(self, df):
+        categorized.append(len(df))
+        return update(self, df)
+    monkeypatch.setattr(TfidfCategorizer, 'update', counting_update)
+
+    dataset = SharedDataset(search_index=SearchIndex(), categorizer=TfidfCategorizer())
+    store = LiveTicketStore(dataset)
+    store.apply_batch([event(i, 'New', 'A') for i in range(1, 9)])
+    before = dataset.current().data.set_index('Ticket #')['Category']
+    store.apply_batch([event(3, 'In Progress', 'B'), event(9, 'New', 'C'), event(5, 'Closed', 'A', closed=True)])
+
+    assert categorized == [8, 2]
+    snapshot = dataset.current()
+    after = snapshot.data.set_index('Ticket #')['Category']
+    assert after.drop([3, 9]).equals(before.drop([3, 5]))
+    assert_index_matches_rebuild(snapshot.index, snapshot.data)
+    assert sorted(snapshot.search_index.search('ticket')) == [1, 2, 3, 4, 6, 7, 8, 9]
+    assert list(snapshot.search_index.search('5')) == []
+    assert sorted(snapshot.search_index.search('9')) == [9]
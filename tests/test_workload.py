@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from utils.workload import AssignmentIndex, split_resources, workload_matrix, workload_summary
+
+def tickets():
+    return pd.DataFrame({
+        'Ticket #': [1, 2, 3, 4, 5, 6, 7],
+        'Resources': ['amy', 'bob, amy', '', None, 'carl,amy ,', 'bob', 'amy'],
+        'Priority': ['High', 'Urgent', 'Low', 'High', 'Medium', 'Low', 'High'],
+        'Age': [0.5, 2.0, 40.0, 3.0, 10.0, None, 31.0],
+        'Status': ['New', 'In Progress', 'New', 'New', 'Closed', 'New', 'Pending Closure'],
+        'Total Hours': [1.0, 4.0, 2.0, 1.0, 6.0, 3.0, 5.0]
+    })
+
+def exploded(df):
+    """Assignments the slow way: one row per (ticket, engineer)."""
+    engineers = df['Resources'].fillna('').astype(str).str.split(',').explode().str.strip()
+    assignments = df.loc[engineers.index].assign(Engineer=engineers.to_numpy())
+    assignments = assignments[assignments['Engineer'] != '']
+    return assignments.assign(Share=assignments.groupby(level=0)['Engineer'].transform('size'))
+
+def index_pairs(index, df):
+    return sorted(zip(df['Ticket #'].to_numpy()[index.rows].tolist(), index.engineers[index.engineer_codes].tolist()))
+
+def reference_pairs(df):
+    reference = exploded(df)
+    return sorted(zip(reference['Ticket #'].tolist(), reference['Engineer'].tolist()))
+
+def test_split_resources_splits_each_distinct_value_once():
+    codes, value_ids, names = split_resources(pd.Series(['bob, amy', None, 'bob, amy', ' , carl']))
+    assert codes.tolist() == [0, -1, 0, 1]
+    assert list(zip(value_ids.tolist(), names.tolist())) == [(0, 'bob'), (0, 'amy'), (1, 'carl')]
+
+def test_assignments_match_an_exploded_reference():
+    df = tickets()
+    index = AssignmentIndex(df)
+
+    assert index_pairs(index, df) == reference_pairs(df)
+    assert index.engineers.tolist() == ['amy', 'bob', 'carl']
+    # Blank and missing Resources have no engineer
+    assert index.assignees.tolist() == [1, 2, 0, 0, 2, 1, 1]
+    assert {name: sorted(rows.tolist()) for name, rows in index.positions().items()} == \
+        {'amy': [0, 1, 4, 6], 'bob': [1, 5], 'carl': [4]}
+    assert index.ticket_counts().to_dict() == {'amy': 4, 'bob': 2, 'carl': 1}
+    assert index.ticket_counts(np.array([True, True, False, False, False, False, False])).to_dict() == \
+        {'amy': 2, 'bob': 1, 'carl': 0}
+
+def test_frames_without_resources_have_no_assignments():
+    index = AssignmentIndex(pd.DataFrame({'Ticket #': [1, 2]}))
+    assert len(index) == 0
+    assert index.assignees.tolist() == [0, 0]
+    assert index.positions() == {}
+
+def test_subset_matches_the_index_of_the_subset_frame():
+    df = tickets()
+    index = AssignmentIndex(df)
+    for positions in ([6, 1, 2, 4], [3], [], [5, 0]):
+        subset_df = df.iloc[positions]
+        subset = index.subset(np.array(positions, dtype=np.int64))
+
+        assert subset.n_rows == len(positions)
+        assert index_pairs(subset, subset_df) == reference_pairs(subset_df)
+        assert subset.assignees.tolist() == AssignmentIndex(subset_df).assignees.tolist()
+
+def test_workload_matrix_counts_every_engineer_of_a_ticket():
+    df = tickets()
+    matrix = workload_matrix(df)
+
+    assert matrix.columns.get_level_values('Priority').unique().tolist() == ['Urgent', 'High', 'Medium', 'Low']
+    reference = exploded(df).dropna(subset=['Age'])
+    buckets = pd.cut(reference['Age'], [0, 1, 3, 7, 14, 30, np.inf], right=False,
+                     labels=['<1d', '1-3d', '3-7d', '7-14d', '14-30d', '30d+'])
+    expected = reference.groupby(['Engineer', 'Priority', buckets], observed=True).size()
+    counts = matrix.stack(['Priority', 'Age'], future_stack=True)
+    assert counts[counts > 0].to_dict() == {key: count for key, count in expected.items()}
+    # Ticket 6 (bob, no age) and the unassigned tickets 3 and 4 aren't counted
+    assert matrix.sum(axis=1).to_dict() == {'amy': 4, 'bob': 1, 'carl': 1}
+
+def test_workload_matrix_of_no_tickets_is_empty():
+    matrix = workload_matrix(tickets().iloc[:0])
+    assert matrix.shape == (0, 0)
+
+def test_workload_summary_shares_hours_between_engineers():
+    df = tickets()
+    summary = workload_summary(df)
+
+    reference = exploded(df)
+    open_reference = reference[~reference['Status'].str.contains('closed|closure', case=False)]
+    expected = pd.DataFrame({
+        'Tickets': reference.groupby('Engineer').size(),
+        'Open Tickets': open_reference.groupby('Engineer').size(),
+        'Open Hours': (open_reference['Total Hours'] / open_reference['Share']).groupby(open_reference['Engineer']).sum(),
+        'Avg Age': reference.groupby('Engineer')['Age'].mean().round(1)
+    }).fillna(0)
+
+    assert summary.index.tolist() == ['amy', 'bob', 'carl']
+    for column in expected.columns:
+        assert np.allclose(summary[column], expected.loc[summary.index, column]), column
+    assert summary.loc['carl', 'Open Tickets'] == 0
@@ -0,0 +1,158 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Category -> column and keywords (case-insensitive substrings). Each
+# category gets one bit of the 'Alert Flags' column, in this order.
+DEFAULT_ALERT_RULES = {
+    'alert': ('Summary Description', ['alert']),
+    'warning': ('Summary Description', ['warning']),
+    'critical': ('Summary Description', ['critical']),
+    'urgent': ('Summary Description', ['urgent']),
+    'emergency': ('Summary Description', ['emergency']),
+    'endgame': ('Summary Description', ['endgame']),
+    'done_yet': ('Status', ['done yet']),
+    'open': ('Status', ['open', 'new', 'in progress']),
+    'priority_urgent': ('Priority', ['urgent']),
+    'priority_high': ('Priority', ['high']),
+    'priority_medium': ('Priority', ['medium']),
+    'priority_low': ('Priority', ['low'])
+}
+
+# Categories shown in the dashboard's alert views
+SUMMARY_ALERT_CATEGORIES = ['alert', 'warning', 'critical', 'urgent', 'emergency', 'endgame']
+
+# Categories the dashboard and the PDF report read; a rules file that
+# leaves one out gets its default rule
+REQUIRED_ALERT_CATEGORIES = SUMMARY_ALERT_CATEGORIES + [
+    'done_yet', 'open', 'priority_urgent', 'priority_high', 'priority_medium', 'priority_low'
+]
+
+FLAGS_COLUMN = 'Alert Flags'
+
+class AlertRules:
+    """
+    Keyword rules compiled once into a keyword -> bits table per column.
+
+    Tagging scans each distinct text of a column only once, however many
+    tickets share it, with one vectorized substring match per keyword over
+    the lowercased distinct values. The matches become a bitmask per
+    ticket, so alert views test bits instead of searching text on every rerun.
+    """
+
+    def __init__(self, rules=None):
+        """
+        Args:
+            rules: Dictionary of category -> (column, list of keywords);
+                defaults to DEFAULT_ALERT_RULES (at most 64 categories)
+        """
+        rules = rules or DEFAULT_ALERT_RULES
+        if len(rules) > 64:
+            raise ValueError("At most 64 alert categories fit in the flags column")
+
+        self.categories = list(rules)
+        self.bits = {category: np.uint64(1) << np.uint64(i) for i, category in enumerate(self.categories)}
+
+        # Column -> lowercase keyword -> bits of every category using it
+        self.keyword_bits = {}
+        for category, (column, keywords) in rules.items():
+            column_bits = self.keyword_bits.setdefault(column, {})
+            for keyword in keywords:
+                keyword = keyword.lower()
+                column_bits[keyword] = column_bits.get(keyword, np.uint64(0)) | self.bits[category]
+
+        self.dtype = np.uint64 if len(self.categories) > 32 else np.uint32
+
+    def tag(self, df):
+        """
+        Compute the alert bitmask of every ticket.
+
+        Args:
+            df: Cleaned DataFrame
+
+        Returns:
+            Array of flags (one bit per category), aligned to df's rows
+        """
+        flags = np.zeros(len(df), dtype=np.uint64)
+        for column, column_bits in self.keyword_bits.items():
+            if column not in df.columns:
+                continue
+            codes, values = pd.factorize(df[column])
+            texts = pd.Series(values, dtype=str).str.lower()
+
+            # One extra empty entry for missing values, which have code -1
+            value_flags = np.zeros(len(values) + 1, dtype=np.uint64)
+            for keyword, bits in column_bits.items():
+                matches = texts.str.contains(keyword, regex=False, na=False).to_numpy(dtype=bool)
+                value_flags[:-1][matches] |= bits
+            flags |= value_flags[codes]
+        return flags.astype(self.dtype)
+
+    def mask(self, flags, categories):
+        """
+        Boolean mask of tickets flagged with any of the given categories.
+
+        Args:
+            flags: Series or array from tag()
+            categories: Category name or list of names; categories without
+                a rule match no ticket
+
+        Returns:
+            Boolean numpy array
+        """
+        if isinstance(categories, str):
+            categories = [categories]
+        wanted = np.uint64(0)
+        for category in categories:
+            wanted |= self.bits.get(category, np.uint64(0))
+        return (np.asarray(flags, dtype=np.uint64) & wanted) != 0
+
+    def counts(self, flags):
+        """Number of tickets flagged with each category."""
+        flags = np.asarray(flags, dtype=np.uint64)
+        return {category: int(((flags & bit) != 0).sum()) for category, bit in self.bits.items()}
+
+def alert_rules_from_env():
+    """
+    Load the alert rules from the JSON file in TICKET_ALERT_RULES, if set.
+
+    The file maps each category to {"column": ..., "keywords": [...]}.
+    Categories of REQUIRED_ALERT_CATEGORIES it leaves out keep their
+    default rule.
+
+    Returns:
+        AlertRules with the configured or the default rules
+    """
+    path = os.environ.get('TICKET_ALERT_RULES')
+    if not path:
+        return AlertRules()
+    with open(path) as f:
+        config = json.load(f)
+    rules = {
+        category: (rule['column'], rule['keywords'])
+        for category, rule in config.items()
+    }
+    for category in REQUIRED_ALERT_CATEGORIES:
+        rules.setdefault(category, DEFAULT_ALERT_RULES[category])
+    return AlertRules(rules)
+
+# Rules used at ingest, compiled once per process
+ALERT_RULES = alert_rules_from_env()
+
+def flag_mask(df, categories, rules=ALERT_RULES):
+    """
+    Boolean mask of tickets in any of the categories, using the ingest flags.
+
+    Falls back to tagging the frame on the fly when it has no flags column.
+
+    Args:
+        df: Cleaned DataFrame
+        categories: Category name or list of names
+        rules: AlertRules the flags were computed with
+
+    Returns:
+        Boolean Series aligned to df's index
+    """
+    flags = df[FLAGS_COLUMN].to_numpy() if FLAGS_COLUMN in df.columns else rules.tag(df)
+    return pd.Series(rules.mask(flags, categories), index=df.index)
@@ -0,0 +1,193 @@
+import pandas as pd
+import numpy as np
+
+# Dimensions the open-ticket backlog is broken down by
+BACKLOG_DIMENSIONS = ['Status', 'Priority', 'Company']
+
+# Statuses that mean a ticket has left the board even if it is still exported
+CLOSED_STATUSES = ['Closed', 'Completed', 'Resolved', 'Cancelled']
+
+def snapshot_date_from_frame(df):
+    """Use the latest 'Last Update' in an export as its snapshot date."""
+    if 'Last Update' not in df.columns:
+        return pd.Timestamp('today').normalize()
+
+    dates = pd.to_datetime(df['Last Update'], errors='coerce').dropna()
+    if dates.empty:
+        return pd.Timestamp('today').normalize()
+    return dates.max().normalize()
+
+class BacklogEngine:
+    """
+    Rebuild open-ticket counts per day from a series of board snapshots.
+
+    Each snapshot is compared against the state left by the previous one, so
+    adding a day costs one pass over that export plus the tickets that
+    changed; the history already ingested is never recomputed.
+    """
+
+    def __init__(self, dimensions=None, key_column='Selected_Sr_Service_Recid'):
+        self.dimensions = list(dimensions or BACKLOG_DIMENSIONS)
+        self.key_column = key_column
+
+        # Open tickets of the last snapshot, indexed by ticket key
+        self.state = None
+        # Open counts of the last snapshot per dimension (value -> count)
+        self.counts = {}
+        # One small frame of counts per snapshot and dimension
+        self.history = {dim: [] for dim in self.dimensions}
+        # Daily totals with opened/closed ticket counts
+        self.totals = []
+        self.last_snapshot_date = None
+
+        # State before the last snapshot so a same-day re-export can replace it
+        self._previous = None
+
+    def add_snapshot(self, df, snapshot_date=None):
+        """
+        Ingest one cleaned export and record the backlog for its day.
+
+        Args:
+            df: DataFrame with the cleaned Connectwise data for one day
+            snapshot_date: Day the export was taken (defaults to the latest 'Last Update')
+
+        Returns:
+            Dictionary with the snapshot date and open, opened and closed counts
+        """
+        if snapshot_date is None:
+            snapshot_date = snapshot_date_from_frame(df)
+        snapshot_date = pd.Timestamp(snapshot_date).normalize()
+
+        if self.last_snapshot_date is not None:
+            if snapshot_date < self.last_snapshot_date:
+                raise ValueError(
+                    f"Snapshot for {snapshot_date.date()} is older than the last "
+                    f"ingested snapshot ({self.last_snapshot_date.date()})"
+                )
+            if snapshot_date == self.last_snapshot_date:
+                # Re-export of the same day replaces the previous one
+                self._rollback()
+
+        new_state = self._open_tickets(df)
+
+        self._previous = (self.state, self.counts, self.last_snapshot_date)
+
+        if self.state is None:
+            # First snapshot: counts come straight from the export
+            counts = {dim: new_state[dim].value_counts() for dim in self.dimensions}
+            opened = len(new_state)
+            closed = 0
+        else:
+            counts, opened, closed = self._apply_delta(self.state, new_state)
+
+        self.state = new_state
+        self.counts = counts
+        self.last_snapshot_date = snapshot_date
+
+        for dim in self.dimensions:
+            day_counts = counts[dim]
+            self.history[dim].append(pd.DataFrame({
+                'date': snapshot_date,
+                dim: day_counts.index,
+                'Count': day_counts.to_numpy()
+            }))
+
+        summary = {
+            'date': snapshot_date,
+            'open': len(new_state),
+            'opened': opened,
+            'closed': closed
+        }
+        self.totals.append(summary)
+        return summary
+
+    def backlog_series(self, dimension, fill_gaps=True):
+        """
+        Get open-ticket counts per day broken down by one dimension.
+
+        Args:
+            dimension: One of the engine's dimensions (e.g. 'Status')
+            fill_gaps: Carry the last snapshot forward over days without an export
+
+        Returns:
+            DataFrame indexed by date with one column per dimension value
+        """
+        if dimension not in self.history:
+            raise KeyError(f"Backlog is not tracked by {dimension}")
+        if not self.history[dimension]:
+            return pd.DataFrame()
+
+        long_df = pd.concat(self.history[dimension], ignore_index=True)
+        wide_df = long_df.pivot_table(
+            index='date', columns=dimension, values='Count', aggfunc='sum', fill_value=0
+        )
+
+        if fill_gaps and len(wide_df) > 1:
+            full_range = pd.date_range(wide_df.index.min(), wide_df.index.max(), freq='D')
+            wide_df = wide_df.reindex(full_range).ffill().fillna(0).astype('int64')
+            wide_df.index.name = 'date'
+        return wide_df
+
+    def totals_frame(self):
+        """Get the daily open, opened and closed totals as a DataFrame."""
+        return pd.DataFrame(self.totals, columns=['date', 'open', 'opened', 'closed'])
+
+    def _open_tickets(self, df):
+        """Reduce an export to its open tickets keyed by ticket ID."""
+        key = self.key_column if self.key_column in df.columns else 'Ticket #'
+
+        columns = [dim for dim in self.dimensions if dim in df.columns]
+        state = df[[key] + columns].drop_duplicates(subset=key, keep='last')
+
+        if 'Status' in state.columns:
+            state = state[~state['Status'].isin(CLOSED_STATUSES)]
+
+        state = state.set_index(key)
+        for dim in self.dimensions:
+            if dim not in state.columns:
+                state[dim] = 'Unknown'
+            else:
+                state[dim] = state[dim].fillna('Unknown').astype(str)
+        return state
+
+    def _apply_delta(self, old_state, new_state):
+        """Update the previous counts with the tickets that opened, closed or moved."""
+        old_keys = old_state.index
+        new_keys = new_state.index
+
+        closed_mask = ~old_keys.isin(new_keys)
+        opened_mask = ~new_keys.isin(old_keys)
+
+        # Tickets in both snapshots only matter where a dimension value changed
+        common = new_keys[~opened_mask]
+        old_common = old_state.loc[common, self.dimensions]
+        new_common = new_state.loc[common, self.dimensions]
+
+        counts = {}
+        for dim in self.dimensions:
+            moved = old_common[dim].to_numpy() != new_common[dim].to_numpy()
+
+            removed = pd.concat([
+                old_state.loc[closed_mask, dim],
+                old_common.loc[moved, dim]
+            ]).value_counts()
+            added = pd.concat([
+                new_state.loc[opened_mask, dim],
+                new_common.loc[moved, dim]
+            ]).value_counts()
+
+            dim_counts = self.counts[dim].sub(removed, fill_value=0).add(added, fill_value=0)
+            dim_counts = dim_counts[dim_counts > 0].astype('int64')
+            counts[dim] = dim_counts.sort_values(ascending=False)
+
+        return counts, int(opened_mask.sum()), int(closed_mask.sum())
+
+    def _rollback(self):
+        """Drop the last snapshot so it can be replaced."""
+        if self._previous is None:
+            return
+        self.state, self.counts, self.last_snapshot_date = self._previous
+        self._previous = None
+        for dim in self.dimensions:
+            self.history[dim].pop()
+        self.totals.pop()
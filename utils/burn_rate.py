@@ -0,0 +1,263 @@
+import numpy as np
+import pandas as pd
+
+from utils.backlog import snapshot_date_from_frame
+from utils.kpis import numeric_age
+from utils.workload import AssignmentIndex, open_mask
+
+HOURS_COLUMN = 'Total Hours'
+BUDGET_COLUMN = 'Budget'
+
+# Open tickets are projected forward this many days at their burn rate so far
+PROJECTION_DAYS = 7
+
+# Tickets younger than this are projected as if they were this old, so a
+# ticket opened an hour ago doesn't project a day of work per hour
+MIN_BURN_AGE_DAYS = 1
+
+TICKET_BURN_COLUMNS = ['Burn Ratio', 'Over Budget', 'Overrun Hours', 'Projected Hours', 'Projected Overrun']
+
+# Levels the burn is summarized at, besides single tickets
+BURN_LEVELS = ['Company', 'Resources']
+
+def _hours_and_budget(df):
+    """Total Hours and Budget as float arrays, 0 where missing."""
+    columns = []
+    for col in [HOURS_COLUMN, BUDGET_COLUMN]:
+        if col in df.columns:
+            columns.append(pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=float))
+        else:
+            columns.append(np.zeros(len(df)))
+    return columns
+
+def ticket_burn(df):
+    """
+    Hours against budget of every ticket.
+
+    A ticket without a budget (0) has no ratio and is never over budget;
+    its hours are unbudgeted. Open tickets are projected PROJECTION_DAYS
+    ahead at their hours per day of age so far.
+
+    Args:
+        df: Cleaned DataFrame with 'Total Hours' and 'Budget'
+
+    Returns:
+        DataFrame aligned to df with the TICKET_BURN_COLUMNS
+    """
+    hours, budget = _hours_and_budget(df)
+    budgeted = budget > 0
+    age = np.nan_to_num(numeric_age(df).to_numpy(dtype=float), nan=MIN_BURN_AGE_DAYS)
+
+    ratio = np.full(len(df), np.nan)
+    np.divide(hours, budget, out=ratio, where=budgeted)
+
+    # Hours per day so far, carried forward for tickets still being worked
+    rate = hours / np.maximum(age, MIN_BURN_AGE_DAYS)
+    projected = hours + np.where(open_mask(df), rate * PROJECTION_DAYS, 0)
+
+    return pd.DataFrame({
+        'Burn Ratio': ratio.round(2),
+        'Over Budget': budgeted & (hours > budget),
+        'Overrun Hours': np.where(budgeted, np.maximum(hours - budget, 0), 0).round(2),
+        'Projected Hours': projected.round(2),
+        'Projected Overrun': np.where(budgeted, np.maximum(projected - budget, 0), 0).round(2)
+    }, index=df.index)
+
+def _summarize(codes, names, weights, measures):
+    """
+    Burn summary of groups from per-row measures with bincounts.
+
+    Args:
+        codes: Group code of every row
+        names: Group names, one per code
+        weights: Share of every row's hours counted for its group; a row
+            always counts as a whole ticket
+        measures: Dictionary of per-row arrays from burn_rollups
+    """
+    n = len(names)
+
+    def total(values):
+        return np.bincount(codes, weights=values * weights, minlength=n)
+
+    hours, budget = total(measures['hours']), total(measures['budget'])
+    ratio = np.full(n, np.nan)
+    np.divide(hours, budget, out=ratio, where=budget > 0)
+    summary = pd.DataFrame({
+        'Tickets': np.bincount(codes, minlength=n),
+        'Hours': hours.round(2),
+        'Budget': budget.round(2),
+        'Burn Ratio': ratio.round(2),
+        'Over Budget': np.bincount(codes, weights=measures['over'], minlength=n).astype(np.int64),
+        'Overrun Hours': total(measures['overrun']).round(2),
+        'Projected Overrun': total(measures['projected_overrun']).round(2),
+        'Unbudgeted Hours': total(measures['unbudgeted']).round(2)
+    }, index=names)
+    return summary.sort_values(['Overrun Hours', 'Projected Overrun'], ascending=False, kind='stable')
+
+def burn_rollups(df, index=None):
+    """
+    Hours-versus-budget burn of every ticket, company and engineer.
+
+    The ticket measures are computed once and every level is a bincount
+    over them. Hours and budget of a ticket shared by several engineers
+    are split equally between them; the ticket counts once per engineer.
+
+    Args:
+        df: Cleaned DataFrame
+        index: AssignmentIndex of df (built when not given and needed)
+
+    Returns:
+        Dictionary with 'Tickets' (ticket_burn of df) and one summary
+        DataFrame per level of BURN_LEVELS present in df, largest overrun first
+    """
+    tickets = ticket_burn(df)
+    hours, budget = _hours_and_budget(df)
+    measures = {
+        'hours': hours,
+        'budget': budget,
+        'over': tickets['Over Budget'].to_numpy(dtype=float),
+        'overrun': tickets['Overrun Hours'].to_numpy(),
+        'projected_overrun': tickets['Projected Overrun'].to_numpy(),
+        'unbudgeted': np.where(budget > 0, 0, hours)
+    }
+    rollups = {'Tickets': tickets}
+
+    if 'Company' in df.columns:
+        codes, names = pd.factorize(df['Company'].fillna('(none)').astype(str))
+        rollups['Company'] = _summarize(codes, pd.Index(names, name='Company'), np.ones(len(df)), measures)
+
+    if 'Resources' in df.columns:
+        index = index if index is not None else AssignmentIndex(df)
+        rows = index.rows
+        shared = {name: values[rows] for name, values in measures.items()}
+        rollups['Resources'] = _summarize(index.engineer_codes, pd.Index(index.engineers, name='Engineer'),
+                                          1 / index.assignees[rows], shared)
+    return rollups
+
+class BurnHistory:
+    """
+    Running hours and budget totals per company across daily snapshots.
+
+    Tickets keep their hours and budget from one export to the next, so
+    summing every snapshot would count them again each day. The latest
+    hours and budget of every ticket ever seen are kept instead, and each
+    new snapshot only moves the company totals by the tickets whose values
+    changed. Tickets that leave the board keep their final hours.
+    """
+
+    def __init__(self, key_column='Selected_Sr_Service_Recid'):
+        self.key_column = key_column
+
+        # Latest Company, Hours and Budget of every ticket seen, indexed by ticket key
+        self.state = None
+        # Running totals per company
+        self.totals = None
+        # One small frame of company totals per snapshot
+        self.history = []
+        self.last_snapshot_date = None
+
+        # State before the last snapshot so a same-day re-export can replace it
+        self._previous = None
+
+    def add_snapshot(self, df, snapshot_date=None):
+        """
+        Ingest one cleaned export and record the company totals for its day.
+
+        Args:
+            df: DataFrame with the cleaned Connectwise data for one day
+            snapshot_date: Day the export was taken (defaults to the latest 'Last Update')
+
+        Returns:
+            Dictionary with the snapshot date, total hours, budget and
+            overrun hours, and the number of tickets that changed
+        """
+        if snapshot_date is None:
+            snapshot_date = snapshot_date_from_frame(df)
+        snapshot_date = pd.Timestamp(snapshot_date).normalize()
+
+        if self.last_snapshot_date is not None:
+            if snapshot_date < self.last_snapshot_date:
+                raise ValueError(
+                    f"Snapshot for {snapshot_date.date()} is older than the last "
+                    f"ingested snapshot ({self.last_snapshot_date.date()})"
+                )
+            if snapshot_date == self.last_snapshot_date:
+                # Re-export of the same day replaces the previous one
+                self.state, self.totals, self.last_snapshot_date = self._previous
+                self.history.pop()
+
+        new_state = self._ticket_state(df)
+        self._previous = (self.state, self.totals, self.last_snapshot_date)
+
+        if self.state is None:
+            changed, replaced = new_state, new_state.iloc[:0]
+            state = new_state
+        else:
+            # Only new tickets and tickets whose values moved touch the totals
+            positions = self.state.index.get_indexer(new_state.index)
+            seen = positions >= 0
+            previous = self.state.iloc[positions[seen]]
+            moved = np.ones(len(new_state), dtype=bool)
+            moved[seen] = (previous.to_numpy() != new_state[seen].to_numpy()).any(axis=1)
+            changed = new_state[moved]
+            replaced = previous[moved[seen]]
+
+            # Copied rather than updated in place so a re-export can restore the previous state
+            state = self.state.copy()
+            updated = changed[seen[moved]]
+            for j, col in enumerate(state.columns):
+                state.iloc[positions[seen & moved], j] = updated[col].to_numpy()
+            state = pd.concat([state, changed[~seen[moved]]])
+
+        delta = self._company_totals(changed).sub(self._company_totals(replaced), fill_value=0)
+        totals = delta if self.totals is None else self.totals.add(delta, fill_value=0)
+
+        self.state = state
+        self.totals = totals
+        self.last_snapshot_date = snapshot_date
+        self.history.append(totals.reset_index().assign(date=snapshot_date))
+
+        return {
+            'date': snapshot_date,
+            'hours': float(totals['Hours'].sum()),
+            'budget': float(totals['Budget'].sum()),
+            'overrun_hours': float(totals['Overrun Hours'].sum()),
+            'changed': len(changed)
+        }
+
+    def company_totals(self):
+        """Running totals per company, largest overrun first."""
+        if self.totals is None:
+            return pd.DataFrame(columns=['Hours', 'Budget', 'Overrun Hours', 'Over Budget'])
+        totals = self.totals.astype({'Over Budget': np.int64}).round(2)
+        return totals.sort_values('Overrun Hours', ascending=False, kind='stable')
+
+    def totals_frame(self):
+        """Total hours, budget and overrun hours per snapshot day."""
+        if not self.history:
+            return pd.DataFrame(columns=['date', 'Hours', 'Budget', 'Overrun Hours', 'Over Budget'])
+        long_df = pd.concat(self.history, ignore_index=True)
+        totals = long_df.groupby('date', as_index=False)[['Hours', 'Budget', 'Overrun Hours', 'Over Budget']].sum()
+        return totals.round({'Hours': 2, 'Budget': 2, 'Overrun Hours': 2}).astype({'Over Budget': np.int64})
+
+    def _ticket_state(self, df):
+        """Reduce an export to the Company, Hours and Budget of each ticket."""
+        key = self.key_column if self.key_column in df.columns else 'Ticket #'
+        hours, budget = _hours_and_budget(df)
+        companies = df['Company'].fillna('(none)').astype(str) if 'Company' in df.columns else '(none)'
+        state = pd.DataFrame({'Company': companies, 'Hours': hours, 'Budget': budget}, index=df.index)
+        state.index = pd.Index(df[key].astype(str).to_numpy(dtype=object), name=key)
+        return state[~state.index.duplicated(keep='last')]
+
+    @staticmethod
+    def _company_totals(state):
+        """Hours, budget, overrun hours and over-budget tickets per company of a ticket state."""
+        budgeted = state['Budget'] > 0
+        measures = pd.DataFrame({
+            'Company': state['Company'],
+            'Hours': state['Hours'],
+            'Budget': state['Budget'],
+            'Overrun Hours': (state['Hours'] - state['Budget']).clip(lower=0).where(budgeted, 0),
+            'Over Budget': (budgeted & (state['Hours'] > state['Budget'])).astype(np.int64)
+        })
+        return measures.groupby('Company').sum()
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+from utils.timezones import zone_groups
+
+class BusinessCalendar:
+    """
+    Working hours, working days and holidays, per site time zone.
+
+    Business time is counted with numpy.busday_count for whole days plus
+    clipping of the first and last day to the opening hours, so a batch of
+    tickets is computed with array operations only.
+    """
+
+    def __init__(self, open_hour=8, close_hour=17, weekmask='Mon Tue Wed Thu Fri',
+                 holidays=None, zone_holidays=None):
+        """
+        Args:
+            open_hour: Hour the working day starts, in the site's local time
+            close_hour: Hour the working day ends
+            weekmask: Working days in numpy.busdaycalendar notation
+            holidays: Holiday dates for every zone (defaults to US federal holidays)
+            zone_holidays: Dictionary of zone name (str of the tzinfo, e.g.
+                'America/Phoenix') -> extra holiday dates for that zone
+        """
+        self.open_minute = int(open_hour * 60)
+        self.close_minute = int(close_hour * 60)
+        self.weekmask = weekmask
+        if holidays is None:
+            holidays = USFederalHolidayCalendar().holidays('2000-01-01', '2040-12-31')
+        self.holidays = pd.DatetimeIndex(holidays).values.astype('datetime64[D]')
+        self.zone_holidays = zone_holidays or {}
+        self._calendars = {}
+
+    @property
+    def day_minutes(self):
+        """Length of a working day in minutes."""
+        return self.close_minute - self.open_minute
+
+    def busdaycalendar(self, zone=None):
+        """numpy busdaycalendar with the holidays that apply in a zone."""
+        key = str(zone) if zone is not None else None
+        if key not in self._calendars:
+            extra = pd.DatetimeIndex(self.zone_holidays.get(key, [])).values.astype('datetime64[D]')
+            self._calendars[key] = np.busdaycalendar(
+                weekmask=self.weekmask,
+                holidays=np.union1d(self.holidays, extra)
+            )
+        return self._calendars[key]
+
+    def business_minutes(self, start, end, zone=None):
+        """
+        Business minutes between local wall times, negative when end is before start.
+
+        Args:
+            start: Array-like of naive local datetimes
+            end: Array-like of naive local datetimes
+            zone: Time zone whose holidays apply
+
+        Returns:
+            Float array of minutes (NaN where either end is missing)
+        """
+        start = np.asarray(start, dtype='datetime64[m]')
+        end = np.asarray(end, dtype='datetime64[m]')
+        calendar = self.busdaycalendar(zone)
+
+        result = np.full(start.shape, np.nan)
+        valid = ~(np.isnat(start) | np.isnat(end))
+        if not valid.any():
+            return result
+        start, end = start[valid], end[valid]
+
+        start_day = start.astype('datetime64[D]')
+        end_day = end.astype('datetime64[D]')
+        whole_days = np.busday_count(start_day, end_day, busdaycal=calendar)
+
+        # Business minutes already elapsed on the day of each timestamp
+        def elapsed(timestamps, days):
+            minutes = (timestamps - days.astype('datetime64[m]')).astype(np.int64)
+            clipped = np.clip(minutes, self.open_minute, self.close_minute) - self.open_minute
+            return np.where(np.is_busday(days, busdaycal=calendar), clipped, 0)
+
+        result[valid] = whole_days * self.day_minutes - elapsed(start, start_day) + elapsed(end, end_day)
+        return result
+
+# Column clean_data stores each ticket's opening time in, as tz-aware UTC
+OPENED_COLUMN = 'Opened UTC'
+
+# Built on first use; the holiday table takes a moment to generate
+_default_calendar = None
+
+def default_calendar():
+    """Shared 8:00-17:00 weekday calendar with US federal holidays."""
+    global _default_calendar
+    if _default_calendar is None:
+        _default_calendar = BusinessCalendar()
+    return _default_calendar
+
+def _export_time(df):
+    """Time the export was taken, approximated by the latest Last Update, as UTC."""
+    column = 'Last Update UTC' if 'Last Update UTC' in df.columns else 'Last Update'
+    if column not in df.columns or df[column].isna().all():
+        return pd.Timestamp.now(tz='UTC')
+    latest = pd.Timestamp(df[column].max())
+    return latest.tz_localize('UTC') if latest.tzinfo is None else latest.tz_convert('UTC')
+
+def opened_times(df):
+    """
+    Time every ticket was opened: Age days before the export was taken.
+
+    The export time is taken over the whole frame, so call this on a full
+    export (clean_data does, storing the result in OPENED_COLUMN) rather
+    than on a filtered subset.
+
+    Args:
+        df: Cleaned DataFrame with Age and Last Update
+
+    Returns:
+        Series of tz-aware UTC timestamps (NaT without an age)
+    """
+    age_days = pd.to_numeric(df['Age'], errors='coerce') if 'Age' in df.columns else pd.Series(np.nan, index=df.index)
+    return pd.Series(_export_time(df), index=df.index) - pd.to_timedelta(age_days.to_numpy(dtype=float), unit='D')
+
+def business_clocks(df, now=None, calendar=None):
+    """
+    Business-hours age and SLA time left for every ticket, in each site's zone.
+
+    Opening times come from OPENED_COLUMN, set once per export by
+    clean_data, so a ticket's age doesn't depend on which other tickets
+    df holds; frames without it fall back to opened_times(df). Rows are
+    grouped by Site Time Zone and each group is converted and counted as
+    one block, so there is no per-row Python.
+
+    Args:
+        df: Cleaned DataFrame with Opened UTC (or Age and Last Update),
+            Site Time Zone and SLA Deadline
+        now: Tz-aware time to measure up to; defaults to now
+        calendar: BusinessCalendar to count with (defaults to 8:00-17:00 weekdays)
+
+    Returns:
+        DataFrame with 'Business Age Hours' and 'SLA Business Hours Left'
+        (negative once the deadline has passed), aligned to df's index
+    """
+    calendar = calendar or default_calendar()
+    now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now).tz_convert('UTC')
+
+    opened = df[OPENED_COLUMN] if OPENED_COLUMN in df.columns else opened_times(df)
+    if 'SLA Deadline' in df.columns:
+        deadline = df['SLA Deadline']
+    else:
+        deadline = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns, UTC]')
+
+    age_minutes = np.full(len(df), np.nan)
+    left_minutes = np.full(len(df), np.nan)
+    zones = df['Site Time Zone'] if 'Site Time Zone' in df.columns else pd.Series(np.nan, index=df.index)
+
+    for zone, positions in zone_groups(zones).items():
+        # Local wall times of this zone's rows, converted as one block
+        local_now = np.full(len(positions), now.tz_convert(zone).tz_localize(None).to_datetime64())
+        local_opened = opened.iloc[positions].dt.tz_convert(zone).dt.tz_localize(None).to_numpy()
+        local_deadline = deadline.iloc[positions].dt.tz_convert(zone).dt.tz_localize(None).to_numpy()
+
+        age_minutes[positions] = calendar.business_minutes(local_opened, local_now, zone)
+        left_minutes[positions] = calendar.business_minutes(local_now, local_deadline, zone)
+
+    return pd.DataFrame({
+        'Business Age Hours': age_minutes / 60,
+        'SLA Business Hours Left': left_minutes / 60
+    }, index=df.index)
@@ -0,0 +1,292 @@
+import copy
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from utils.search_index import tokenize, KEY_COLUMN
+
+# Column the assigned category of every ticket is kept in
+CATEGORY_COLUMN = 'Category'
+
+UNCATEGORIZED = 'Uncategorized'
+
+# Category -> seed keywords; the categories' vocabularies are then learned
+# from the tickets assigned to them
+DEFAULT_CATEGORY_SEEDS = {
+    'Phishing & Email': ['phish', 'phishing', 'spam', 'email', 'hacked', 'suspicious email', 'sign-in'],
+    'Endpoint Threats': ['endgame alert', 'detection', 'shellcode', 'injection', 'malware', 'malicious',
+                         'sentinelone', 'threatlocker', 'virus', 'soc alert'],
+    'Antivirus Coverage': ['av', 'antivirus', 'missing', 'not reporting', 'third party av', 'agent'],
+    'Vulnerability & Reporting': ['vulnerability', 'scan', 'network detective', 'security report',
+                                  'listening ports', 'assessment', 'grade'],
+    'Accounts & Access': ['password', 'login', 'logins', 'account', 'mfa', 'locked out', 'expiration'],
+    'Devices & Network': ['offline', 'device', 'laptop', 'workstation', 'server', 'disk', 'firewall',
+                          'network', 'backup', 'azure', 'pc'],
+    'Onboarding & Admin': ['onboarding', 'huddle', 'audit', 'recurring', 'whitelist', 'uninstallation']
+}
+
+# Cosine similarity a ticket needs with a category to be assigned to it,
+# and the higher one it needs for the category to learn from it
+MIN_SIMILARITY = 0.05
+LEARN_SIMILARITY = 0.15
+
+# Weight of the seed keywords against the tickets learned into a category
+SEED_WEIGHT = 3.0
+
+# Rows multiplied per batch in sparse products
+BATCH_ROWS = 1 << 15
+
+class SparseRows:
+    """
+    Compressed sparse row matrix with the few operations TF-IDF needs.
+
+    indptr, indices and data follow the usual CSR layout: the nonzeros of
+    row i are data[indptr[i]:indptr[i + 1]] in the columns at the same
+    positions of indices.
+    """
+
+    def __init__(self, indptr, indices, data, n_columns):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_columns = n_columns
+
+    @property
+    def n_rows(self):
+        return len(self.indptr) - 1
+
+    def row_ids(self):
+        """Row number of every nonzero."""
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def take(self, rows):
+        """Matrix of the given rows, in that order."""
+        lengths = np.diff(self.indptr)[rows]
+        ends = np.cumsum(lengths)
+        positions = np.repeat(self.indptr[rows] - (ends - lengths), lengths) + np.arange(ends[-1] if len(ends) else 0)
+        return SparseRows(np.concatenate([[0], ends]), self.indices[positions], self.data[positions], self.n_columns)
+
+    def append(self, other):
+        """Matrix with the rows of other below these rows."""
+        return SparseRows(
+            np.concatenate([self.indptr, other.indptr[1:] + self.indptr[-1]]),
+            np.concatenate([self.indices, other.indices]),
+            np.concatenate([self.data, other.data]),
+            max(self.n_columns, other.n_columns)
+        )
+
+    def scale_columns(self, weights):
+        """Matrix with every column multiplied by its weight."""
+        return SparseRows(self.indptr, self.indices, self.data * weights[self.indices], self.n_columns)
+
+    def normalize_rows(self):
+        """Matrix with every nonempty row scaled to unit length."""
+        norms = np.sqrt(np.bincount(self.row_ids(), weights=self.data ** 2, minlength=self.n_rows))
+        norms[norms == 0] = 1
+        return SparseRows(self.indptr, self.indices, self.data / norms[self.row_ids()], self.n_columns)
+
+    def dot(self, dense, batch_rows=BATCH_ROWS):
+        """
+        Product with a dense (n_columns x k) matrix, in batches of rows.
+
+        Returns:
+            Dense (n_rows x k) array
+        """
+        result = np.zeros((self.n_rows, dense.shape[1]))
+        for first in range(0, self.n_rows, batch_rows):
+            last = min(first + batch_rows, self.n_rows)
+            start, end = self.indptr[first], self.indptr[last]
+            if end == start:
+                continue
+            products = self.data[start:end, None] * dense[self.indices[start:end]]
+            # Sum each row's products; rows without nonzeros stay zero
+            offsets = self.indptr[first:last] - start
+            nonempty = np.diff(self.indptr[first:last + 1]) > 0
+            result[first:last][nonempty] = np.add.reduceat(products, offsets[nonempty], axis=0)
+        return result
+
+    def column_sums(self, row_groups, n_groups, row_weights=None):
+        """
+        Weighted sum of the rows of each group, as a dense (n_columns x n_groups) array.
+
+        Args:
+            row_groups: Group of every row (-1 to leave the row out)
+            n_groups: Number of groups
+            row_weights: Weight of every row (defaults to 1)
+        """
+        rows = self.row_ids()
+        groups = row_groups[rows]
+        weights = self.data if row_weights is None else self.data * row_weights[rows]
+        kept = groups >= 0
+        flat = self.indices[kept] * n_groups + groups[kept]
+        sums = np.bincount(flat, weights=weights[kept], minlength=self.n_columns * n_groups)
+        return sums.reshape(self.n_columns, n_groups)
+
+class TfidfCategorizer:
+    """
+    Incremental nearest-centroid categorization of ticket summaries.
+
+    Summaries become sparse TF-IDF vectors over a vocabulary that grows as
+    new words appear. Each category is a centroid of term frequencies that
+    starts from its seed keywords and accumulates the tickets confidently
+    matched to it. Inverse document frequencies weight the summaries only
+    when scoring, so document counts can change without touching the
+    centroids. update() learns from tickets it has not seen before and
+    scores every distinct summary with one batched sparse-dense product.
+    """
+
+    def __init__(self, seeds=None, min_similarity=MIN_SIMILARITY, learn_similarity=LEARN_SIMILARITY,
+                 seed_weight=SEED_WEIGHT, key_column=KEY_COLUMN):
+        """
+        Args:
+            seeds: Dictionary of category -> list of seed keywords
+                (defaults to DEFAULT_CATEGORY_SEEDS)
+            min_similarity: Cosine similarity below which a ticket stays uncategorized
+            learn_similarity: Cosine similarity a new ticket needs to be learned into a category
+            seed_weight: Weight of the seed keywords, in tickets
+            key_column: Column identifying a ticket across snapshots
+        """
+        seeds = seeds or DEFAULT_CATEGORY_SEEDS
+        self.categories = list(seeds)
+        self.min_similarity = min_similarity
+        self.learn_similarity = learn_similarity
+        self.key_column = key_column
+
+        self.vocabulary = pd.Index([], dtype=object)
+        self.doc_freq = np.zeros(0)
+        self.n_docs = 0
+        # Hashes of the (ticket, summary) pairs already learned from
+        self.seen = pd.Index([], dtype=np.uint64)
+        # Summaries tokenized so far and their term counts, one row each
+        self.texts = pd.Index([], dtype=object)
+        self.term_counts = SparseRows(np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), 0)
+
+        # Term frequencies of each category's centroid, one column per category
+        self.centroids = np.zeros((0, len(self.categories)))
+
+        # Seed keywords become the starting term frequencies of each centroid
+        seed_texts = [' '.join(keywords) for keywords in seeds.values()]
+        seed_matrix = self._vectorize(seed_texts).normalize_rows()
+        self.centroids += seed_matrix.column_sums(np.arange(len(self.categories)), len(self.categories)) * seed_weight
+
+    def __len__(self):
+        return len(self.seen)
+
+    def copy(self):
+        """
+        Independent categorizer with what this one has learned so far.
+
+        Only doc_freq and centroids are changed in place by update(); the
+        vocabulary, texts and term counts are replaced, so they are shared.
+        """
+        categorizer = copy.copy(self)
+        categorizer.doc_freq = self.doc_freq.copy()
+        categorizer.centroids = self.centroids.copy()
+        return categorizer
+
+    def update(self, df):
+        """
+        Learn from the new tickets of a snapshot and categorize all of them.
+
+        Args:
+            df: Cleaned DataFrame with 'Summary Description'
+
+        Returns:
+            Series of category names aligned to df's index
+        """
+        if 'Summary Description' not in df.columns:
+            return pd.Series(UNCATEGORIZED, index=df.index)
+
+        summaries = df['Summary Description'].fillna('').astype(str)
+        codes, distinct = pd.factorize(summaries)
+
+        # Only summaries never seen before are tokenized
+        distinct = pd.Index(distinct, dtype=object)
+        unseen = distinct.difference(self.texts)
+        if len(unseen):
+            self.term_counts = self.term_counts.append(self._vectorize(unseen))
+            self.texts = self.texts.append(unseen)
+        matrix = self.term_counts.take(self.texts.get_indexer(distinct))
+        matrix.n_columns = len(self.vocabulary)
+
+        # Tickets (or summaries) not learned from yet, counted per distinct summary
+        if self.key_column in df.columns:
+            pairs = pd.DataFrame({'key': df[self.key_column].astype(str), 'summary': summaries})
+        else:
+            pairs = pd.DataFrame({'summary': summaries})
+        hashes = pd.util.hash_pandas_object(pairs, index=False).to_numpy()
+        new = ~pd.Index(hashes).isin(self.seen)
+        new_counts = np.bincount(codes[new], minlength=len(distinct)).astype(float)
+
+        # Document frequencies count each new ticket once per term it contains
+        has_term = SparseRows(matrix.indptr, matrix.indices, np.ones(len(matrix.data)), matrix.n_columns)
+        self.doc_freq += has_term.column_sums(np.zeros(matrix.n_rows, dtype=np.int64), 1, new_counts)[:, 0]
+        self.n_docs += int(new.sum())
+
+        # Centroids learn the new tickets they already match confidently
+        unit_tf = matrix.normalize_rows()
+        confident = self._assign(unit_tf, self.learn_similarity)
+        self.centroids += unit_tf.column_sums(confident, len(self.categories), new_counts)
+        self.seen = self.seen.append(pd.Index(np.unique(hashes[new])))
+
+        # Assigning after learning picks up the vocabulary just learned
+        assigned = self._assign(unit_tf, self.min_similarity)
+        names = np.array(self.categories + [UNCATEGORIZED], dtype=object)
+        return pd.Series(names[assigned[codes]], index=df.index)
+
+    def idf(self):
+        """Smoothed inverse document frequency of every vocabulary term."""
+        return np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1
+
+    def _assign(self, unit_tf, min_similarity):
+        """Best category of every row, or -1 below min_similarity."""
+        documents = unit_tf.scale_columns(self.idf()).normalize_rows()
+        norms = np.linalg.norm(self.centroids, axis=0)
+        centroids = self.centroids / np.where(norms == 0, 1, norms)
+
+        scores = documents.dot(centroids)
+        best = scores.argmax(axis=1)
+        best[scores.max(axis=1) < min_similarity] = -1
+        return best
+
+    def _vectorize(self, texts):
+        """
+        Term counts of texts, adding unseen words to the vocabulary.
+
+        Words without a letter (ticket numbers, dates) are left out.
+        """
+        token_lists = [[token for token in tokenize(text) if not token.isdigit()] for text in texts]
+        lengths = np.array([len(tokens) for tokens in token_lists], dtype=np.int64)
+        flat_tokens = pd.Index([token for tokens in token_lists for token in tokens], dtype=object)
+
+        # Grow the vocabulary (and the arrays sized by it) with the new words
+        new_words = flat_tokens.unique().difference(self.vocabulary)
+        if len(new_words):
+            self.vocabulary = self.vocabulary.append(new_words)
+            self.doc_freq = np.concatenate([self.doc_freq, np.zeros(len(new_words))])
+            self.centroids = np.vstack([self.centroids, np.zeros((len(new_words), self.centroids.shape[1]))])
+        term_ids = self.vocabulary.get_indexer(flat_tokens)
+
+        # Merge repeated words of a text into one entry with their count
+        rows = np.repeat(np.arange(len(token_lists)), lengths)
+        entries, counts = np.unique(rows * len(self.vocabulary) + term_ids, return_counts=True)
+        entry_rows = entries // len(self.vocabulary) if len(self.vocabulary) else entries
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(entry_rows, minlength=len(token_lists)))])
+        indices = entries % len(self.vocabulary) if len(self.vocabulary) else entries
+        return SparseRows(indptr, indices, counts.astype(float), len(self.vocabulary))
+
+def categorizer_from_env():
+    """
+    Create a categorizer with the seeds from the JSON file in TICKET_CATEGORY_SEEDS, if set.
+
+    The file maps each category to a list of seed keywords.
+
+    Returns:
+        TfidfCategorizer with the configured or the default seeds
+    """
+    path = os.environ.get('TICKET_CATEGORY_SEEDS')
+    if not path:
+        return TfidfCategorizer()
+    with open(path) as f:
+        return TfidfCategorizer(json.load(f))
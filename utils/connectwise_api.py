@@ -0,0 +1,270 @@
+import asyncio
+import base64
+import os
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+# Column names of a board export as read by pd.read_csv
+EXPORT_COLUMNS = [
+    'Selected_Sr_Service_Recid', 'Ticket #', 'Priority', 'Age', 'Status', 'Schedule',
+    'Company', 'Summary Description', 'Resources', 'Total Hours', 'Budget', 'SLA Status',
+    'Contact', 'Subtype', 'Item', 'Last Update', 'Due Date', 'Next Date', 'Board Icon',
+    'Site Time Zone', 'Site', 'Level', 'Source', 'Customer Updated',
+    'Escalated From Client IT', 'Assign to Tech Bench', 'Required Skill Level',
+    'Solution Design ', 'Vendor Tkt#', 'Territory Team', 'Change Mgmt Date',
+    'Change Mgmt Time', 'Change Mgmt Date.1', 'Change Mgmt Time.1'
+]
+
+# Date format used by board exports, e.g. "04/21/2025 11:21 am"
+EXPORT_DATE_FORMAT = '%m/%d/%Y %I:%M %p'
+
+# Site Time Zone of API rows; their dates are written in UTC, not site wall time
+API_TIME_ZONE = 'UTC (UTC+00)'
+
+TICKETS_ENDPOINT = '/service/tickets'
+
+# Keywords in Connectwise priority names mapped to the dashboard's levels
+PRIORITY_KEYWORDS = [
+    ('Urgent', ['emergency', 'critical', 'urgent', 'priority 1']),
+    ('High', ['high', 'priority 2']),
+    ('Medium', ['medium', 'normal', 'priority 3']),
+    ('Low', ['low', 'priority 4', 'priority 5'])
+]
+
+def map_priority(priority_name):
+    """Map a Connectwise priority name onto Low/Medium/High/Urgent."""
+    if not priority_name:
+        return ''
+    lowered = priority_name.lower()
+    for level, keywords in PRIORITY_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return level
+    return priority_name
+
+def _name(value):
+    """Get the name of a Connectwise reference object."""
+    if isinstance(value, dict):
+        return value.get('name') or value.get('identifier') or ''
+    return value or ''
+
+def _export_date(value):
+    """Format an API timestamp the way board exports do, in UTC (see API_TIME_ZONE)."""
+    if not value:
+        return ''
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp.strftime(EXPORT_DATE_FORMAT).lower()
+
+def ticket_to_row(ticket, now=None):
+    """
+    Map one service ticket from the REST API onto the board export columns.
+
+    Args:
+        ticket: Ticket dictionary as returned by /service/tickets
+        now: Reference time for the ticket age (defaults to now, UTC)
+
+    Returns:
+        Dictionary with one value per export column
+    """
+    now = now or pd.Timestamp.now(tz='UTC')
+    info = ticket.get('_info') or {}
+
+    age = ''
+    if ticket.get('dateEntered'):
+        entered = pd.Timestamp(ticket['dateEntered'])
+        if entered.tzinfo is None:
+            entered = entered.tz_localize('UTC')
+        age = f"{(now - entered).total_seconds() / 86400:.1f}"
+
+    row = dict.fromkeys(EXPORT_COLUMNS, '')
+    row.update({
+        'Selected_Sr_Service_Recid': ticket.get('id'),
+        'Ticket #': ticket.get('id'),
+        'Priority': map_priority(_name(ticket.get('priority'))),
+        'Age': age,
+        'Status': _name(ticket.get('status')),
+        'Company': _name(ticket.get('company')),
+        'Summary Description': ticket.get('summary', ''),
+        'Resources': ticket.get('resources') or '',
+        'Total Hours': ticket.get('actualHours'),
+        'Budget': ticket.get('budgetHours'),
+        'SLA Status': ticket.get('slaStatus') or '',
+        'Contact': ticket.get('contactName') or _name(ticket.get('contact')),
+        'Subtype': _name(ticket.get('subType')),
+        'Item': _name(ticket.get('item')),
+        'Last Update': _export_date(info.get('lastUpdated')),
+        'Due Date': _export_date(ticket.get('requiredDate')),
+        'Site Time Zone': API_TIME_ZONE,
+        'Site': ticket.get('siteName') or _name(ticket.get('site')),
+        'Source': _name(ticket.get('source')),
+        'Customer Updated': str(bool(ticket.get('customerUpdatedFlag', False))),
+        'Territory Team': _name(ticket.get('team'))
+    })
+    # Boards are not part of the export but the dashboard can filter on them
+    row['Service Board'] = _name(ticket.get('board'))
+    return row
+
+def newest_update(tickets, last_updated=None):
+    """
+    Advance a lastUpdated watermark past a batch of fetched tickets.
+
+    Args:
+        tickets: Ticket dictionaries from the API
+        last_updated: Watermark before the batch (optional)
+
+    Returns:
+        Newest lastUpdated of the batch or last_updated, whichever is later
+    """
+    updated = [t.get('_info', {}).get('lastUpdated') for t in tickets]
+    updated = [pd.Timestamp(value) for value in updated if value]
+    if not updated:
+        return last_updated
+    newest = max(updated)
+    return newest if last_updated is None or newest > last_updated else last_updated
+
+def tickets_to_frame(tickets, now=None):
+    """Map API tickets onto a DataFrame with the export column schema."""
+    rows = [ticket_to_row(ticket, now) for ticket in tickets]
+    return pd.DataFrame(rows, columns=EXPORT_COLUMNS + ['Service Board'])
+
+class ConnectwiseClient:
+    """
+    Pull service tickets from the Connectwise Manage REST API.
+
+    Pages are fetched concurrently over a pooled HTTP session, and each sync
+    only asks for tickets updated since the previous one. The client is
+    shared, so it holds no sync state: the caller keeps the lastUpdated
+    watermark next to the frame it belongs to and passes both back in.
+    ``base_url`` can point at a local mock server.
+    """
+
+    def __init__(self, base_url, company_id, public_key, private_key, client_id,
+                 conditions=None, page_size=1000, max_concurrency=4, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.conditions = conditions
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        credentials = f'{company_id}+{public_key}:{private_key}'
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': 'Basic ' + base64.b64encode(credentials.encode()).decode(),
+            'clientId': client_id,
+            'Accept': 'application/json'
+        })
+        # One pooled connection per concurrent page request
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a client from CW_* environment variables.
+
+        Returns:
+            ConnectwiseClient, or None if the connection isn't configured
+        """
+        required = ['CW_BASE_URL', 'CW_COMPANY_ID', 'CW_PUBLIC_KEY', 'CW_PRIVATE_KEY', 'CW_CLIENT_ID']
+        if not all(os.environ.get(name) for name in required):
+            return None
+
+        return cls(
+            base_url=os.environ['CW_BASE_URL'],
+            company_id=os.environ['CW_COMPANY_ID'],
+            public_key=os.environ['CW_PUBLIC_KEY'],
+            private_key=os.environ['CW_PRIVATE_KEY'],
+            client_id=os.environ['CW_CLIENT_ID'],
+            conditions=os.environ.get('CW_CONDITIONS') or None,
+            max_concurrency=int(os.environ.get('CW_MAX_CONCURRENCY', '4'))
+        )
+
+    def sync(self, previous_df=None, last_updated=None):
+        """
+        Bring a raw ticket frame up to date with the board.
+
+        The first sync pulls every matching ticket; later syncs only pull
+        tickets updated since the previous one and merge them by ticket ID,
+        dropping tickets the API reports as closed.
+
+        Args:
+            previous_df: Raw frame returned by the previous sync (optional)
+            last_updated: Watermark returned with previous_df (optional)
+
+        Returns:
+            Tuple of (DataFrame with the export column schema, ready for
+            clean_data, and the watermark to pass to the next sync)
+        """
+        incremental = previous_df is not None and last_updated is not None
+        tickets = asyncio.run(self.fetch_tickets_async(last_updated if incremental else None))
+        last_updated = newest_update(tickets, last_updated)
+
+        open_tickets = [t for t in tickets if not t.get('closedFlag')]
+        updates_df = tickets_to_frame(open_tickets)
+        if not incremental:
+            return updates_df, last_updated
+
+        # Replace every ticket the API returned, then add back the open ones
+        changed_ids = {t.get('id') for t in tickets}
+        kept_df = previous_df[~previous_df['Selected_Sr_Service_Recid'].isin(changed_ids)]
+        return pd.concat([kept_df, updates_df], ignore_index=True), last_updated
+
+    async def fetch_tickets_async(self, last_updated=None):
+        """
+        Fetch all pages of matching tickets concurrently.
+
+        Args:
+            last_updated: Only fetch tickets updated after this time (optional)
+
+        Returns:
+            List of ticket dictionaries
+        """
+        conditions = self._conditions(last_updated)
+        total = await asyncio.to_thread(self._count, conditions)
+        page_count = max(1, -(-total // self.page_size))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_page(page):
+            async with semaphore:
+                return await asyncio.to_thread(self._get_page, conditions, page)
+
+        pages = await asyncio.gather(*(fetch_page(page) for page in range(1, page_count + 1)))
+        return [ticket for page in pages for ticket in page]
+
+    def close(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
+
+    def _conditions(self, last_updated):
+        """Combine the configured conditions with the lastUpdated watermark."""
+        parts = []
+        if self.conditions:
+            parts.append(f'({self.conditions})')
+        if last_updated is not None:
+            watermark = last_updated.tz_convert('UTC') if last_updated.tzinfo else last_updated
+            parts.append(f'lastUpdated > [{watermark:%Y-%m-%dT%H:%M:%SZ}]')
+        return ' and '.join(parts) or None
+
+    def _count(self, conditions):
+        """Ask the API how many tickets match so pages can be requested in parallel."""
+        params = {'conditions': conditions} if conditions else {}
+        response = self.session.get(
+            f'{self.base_url}{TICKETS_ENDPOINT}/count', params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return int(response.json().get('count', 0))
+
+    def _get_page(self, conditions, page):
+        """Fetch one page of tickets."""
+        params = {'page': page, 'pageSize': self.page_size, 'orderBy': 'id asc'}
+        if conditions:
+            params['conditions'] = conditions
+        response = self.session.get(
+            f'{self.base_url}{TICKETS_ENDPOINT}', params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
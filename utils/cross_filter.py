@@ -0,0 +1,153 @@
+import numpy as np
+
+# Chart dimensions that can be selected by clicking a slice or bar
+CROSS_FILTER_COLUMNS = ['Status', 'Priority', 'Company', 'Category']
+
+def selected_values(event):
+    """
+    Values picked in a Plotly chart selection event.
+
+    Charts put the value of their dimension in the first custom data field;
+    pie labels and bar x values are used when it is missing.
+
+    Args:
+        event: Selection state of a chart from st.plotly_chart (or None)
+
+    Returns:
+        Frozenset of selected values as strings (empty without a selection)
+    """
+    if not event or 'selection' not in event:
+        return frozenset()
+    values = set()
+    for point in event['selection'].get('points', []):
+        customdata = point.get('customdata')
+        if customdata:
+            value = customdata[0] if isinstance(customdata, (list, tuple)) else customdata
+        else:
+            value = point.get('label', point.get('x'))
+        if value is not None:
+            values.add(str(value))
+    return frozenset(values)
+
+class CrossFilter:
+    """
+    Chart selections applied to a fixed set of tickets through a cached index.
+
+    The rows of every value of each dimension are found once, when the
+    filter is built. A selection change then only touches the rows of the
+    values added to or removed from that dimension's selection, keeping a
+    count per row of the dimensions it falls outside of. A chart sees the
+    rows outside no dimension but its own, so its other slices stay visible.
+    """
+
+    def __init__(self, df, columns=CROSS_FILTER_COLUMNS):
+        """
+        Args:
+            df: DataFrame of the tickets to cross-filter
+            columns: Dimensions that can be selected
+        """
+        self.columns = [col for col in columns if col in df.columns]
+        self.n_rows = len(df)
+        self.positions = {}
+        for col in self.columns:
+            values = df[col].astype(str)
+            self.positions[col] = values.groupby(values, sort=False).indices
+
+        self.selections = {}
+        # Rows outside each selected dimension, and how many dimensions each row is outside of
+        self.outside = {}
+        self.outside_count = np.zeros(self.n_rows, dtype=np.int16)
+        # Last selection event seen from each dimension's chart
+        self.events = {}
+
+    @property
+    def active(self):
+        """Whether any dimension has a selection."""
+        return bool(self.selections)
+
+    def select(self, column, values):
+        """
+        Set the selected values of a dimension, updating only the rows that change.
+
+        Args:
+            column: Dimension to select on
+            values: Values to keep (empty to drop the dimension's selection)
+
+        Returns:
+            True when the selection changed
+        """
+        values = frozenset(str(v) for v in values)
+        previous = self.selections.get(column, frozenset())
+        if column not in self.positions or values == previous:
+            return False
+
+        if not values:
+            # Every row is back inside this dimension
+            self.outside_count -= self.outside.pop(column)
+            del self.selections[column]
+            return True
+
+        if not previous:
+            # A new dimension starts with every row outside it
+            self.outside[column] = np.ones(self.n_rows, dtype=bool)
+            self.outside_count += 1
+        outside = self.outside[column]
+        empty = np.array([], dtype=np.int64)
+        for value in values - previous:
+            rows = self.positions[column].get(value, empty)
+            outside[rows] = False
+            self.outside_count[rows] -= 1
+        for value in previous - values:
+            rows = self.positions[column].get(value, empty)
+            outside[rows] = True
+            self.outside_count[rows] += 1
+        self.selections[column] = values
+        return True
+
+    def apply_event(self, column, event):
+        """
+        Take a chart's selection event into account if it is new.
+
+        An empty event from a chart whose last event had a selection (the
+        user deselected its points) clears that dimension. A chart without
+        selection state (None) leaves its dimension as it is.
+
+        Args:
+            column: Dimension of the chart
+            event: Selection state of the chart from st.plotly_chart (or None)
+
+        Returns:
+            True when the selection changed
+        """
+        values = selected_values(event)
+        if event is None or values == self.events.get(column, frozenset()):
+            return False
+        self.events[column] = values
+        return self.select(column, values)
+
+    def clear(self):
+        """Drop every selection."""
+        self.selections = {}
+        self.outside = {}
+        self.outside_count[:] = 0
+
+    def mask(self, exclude=None):
+        """
+        Boolean array of the rows inside every selection.
+
+        Args:
+            exclude: Dimension whose own selection is ignored (for its chart)
+        """
+        if exclude in self.outside:
+            return (self.outside_count - self.outside[exclude]) == 0
+        return self.outside_count == 0
+
+    def carry_over(self, previous):
+        """Reapply the selections and seen events of a filter built over earlier tickets."""
+        for column, values in previous.selections.items():
+            self.select(column, values)
+        self.events = dict(previous.events)
+
+    def describe(self):
+        """Short text of the current selections, e.g. "Status = New; Company = A, B"."""
+        return '; '.join(f"{column} = {', '.join(sorted(values))}" for column, values in self.selections.items())
@@ -2,7 +2,20 @@ import pandas as pd
 import numpy as np
 import re
 from datetime import datetime, timedelta
+from utils.profiling import timed
+from utils.sla import parse_sla_deadlines
+from utils.business_hours import opened_times, OPENED_COLUMN
+from utils.timezones import normalize_timezones, SITE_DATE_COLUMNS
+from utils.alert_rules import ALERT_RULES, FLAGS_COLUMN
+from utils.near_duplicates import near_duplicate_clusters, CLUSTER_COLUMN
 
+# Columns clean_data derives rather than reads from the export. They can
+# change while the ticket doesn't, e.g. every ticket of a cluster is renamed
+# when the cluster's smallest ticket closes
+DERIVED_COLUMNS = (['SLA Kind', 'SLA Deadline', OPENED_COLUMN, FLAGS_COLUMN, CLUSTER_COLUMN]
+                   + [col + ' UTC' for col in SITE_DATE_COLUMNS])
+
+@timed()
 def clean_data(df):
     """
     Clean the Connectwise CSV data by removing image paths and converting data types.
@@ -44,10 +57,16 @@ def clean_data(df):
         )
     
     # Convert date columns to datetime if they exist
-    date_columns = ['Last Update', 'Due Date', 'Next Date']
-    for col in date_columns:
+    for col in SITE_DATE_COLUMNS:
         if col in cleaned_df.columns:
-            cleaned_df[col] = pd.to_datetime(cleaned_df[col], errors='coerce')
+            cleaned_df[col] = parse_export_dates(cleaned_df[col])
+    
+    # Keep the SLA deadlines the status text above was reduced from
+    if 'SLA Status' in df.columns:
+        reference = cleaned_df['Last Update'].max() if 'Last Update' in cleaned_df.columns else None
+        sla = parse_sla_deadlines(df['SLA Status'], reference)
+        cleaned_df['SLA Kind'] = sla['SLA Kind']
+        cleaned_df['SLA Deadline'] = sla['SLA Deadline']
     
     # Convert numeric columns
     numeric_columns = ['Total Hours', 'Budget']
@@ -55,8 +74,45 @@ def clean_data(df):
         if col in cleaned_df.columns:
             cleaned_df[col] = pd.to_numeric(cleaned_df[col], errors='coerce')
     
+    # Site wall times to UTC and to the dashboard's display zone
+    cleaned_df = normalize_timezones(cleaned_df)
+    
+    # Opening times against the whole export, so filtering never moves a ticket's business age
+    cleaned_df[OPENED_COLUMN] = opened_times(cleaned_df)
+    
+    # Tag alert categories once here so the alert views only test bits
+    cleaned_df[FLAGS_COLUMN] = ALERT_RULES.tag(cleaned_df)
+    
+    # Group near-identical summaries (alert and phishing storms) into clusters named
+    # after their smallest ticket number, so the IDs don't depend on the row order
+    if 'Summary Description' in cleaned_df.columns:
+        keys = cleaned_df['Ticket #'] if 'Ticket #' in cleaned_df.columns else None
+        cleaned_df[CLUSTER_COLUMN] = near_duplicate_clusters(cleaned_df['Summary Description'], keys=keys)
+    
     return cleaned_df
 
+# Date format of the Connectwise board export, e.g. "04/21/2025 7:54 pm"
+EXPORT_DATE_FORMAT = '%m/%d/%Y %I:%M %p'
+
+def parse_export_dates(values):
+    """
+    Parse export date strings, using the export's format where it matches.
+
+    Args:
+        values: Series of date strings (or datetimes)
+
+    Returns:
+        Series of naive datetimes (NaT where a value can't be parsed)
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    dates = pd.to_datetime(values, format=EXPORT_DATE_FORMAT, errors='coerce')
+    # Anything in another format (e.g. ISO dates) is parsed value by value
+    leftover = dates.isna() & values.notna() & (values.astype(str).str.strip() != '')
+    if leftover.any():
+        dates[leftover] = pd.to_datetime(values[leftover], format='mixed', errors='coerce')
+    return dates
+
 def extract_priority(priority_str):
     """Extract priority level from image path."""
     if 'lime.gif' in priority_str:
@@ -105,48 +161,86 @@ def clean_sla_status(sla_str):
     else:
         return sla_str
 
-def process_data(df, time_period='daily'):
+# Pandas period frequency used for each supported time period
+PERIOD_FREQUENCIES = {
+    'daily': 'D',
+    'weekly': 'W',
+    'monthly': 'M'
+}
+
+@timed()
+def process_data(df, time_period='daily', fields=('time_group',)):
     """
     Process the data for visualization based on the selected time period.
     
+    Derived time fields are only built when a consumer asks for them through
+    ``fields``, so the default call adds nothing but ``time_group``.
+    
     Args:
         df: DataFrame with the cleaned Connectwise data
         time_period: The time period to aggregate by ('daily', 'weekly', or 'monthly')
+        fields: Derived time fields to add ('date', 'day', 'week', 'month',
+            'year' and/or 'time_group')
     
     Returns:
         DataFrame with processed data for visualization
     """
-    # Make a copy to avoid modifying original data
-    processed_df = df.copy()
-    
     # Ensure we have Last Update column for time-based analysis
-    if 'Last Update' not in processed_df.columns:
-        return processed_df
-    
-    # Create a safe version of the date column with default values for invalid dates
-    has_valid_date = ~processed_df['Last Update'].isna()
-    
-    # For rows with invalid dates, use a default date to avoid losing data
-    if has_valid_date.sum() < len(processed_df):
-        # Fill missing dates with today's date to keep all rows
-        default_date = pd.Timestamp('today')
-        processed_df.loc[~has_valid_date, 'Last Update'] = default_date
-    
-    # Create date components - safely handle any remaining NaT values
-    processed_df['date'] = processed_df['Last Update'].dt.date
-    processed_df['day'] = processed_df['Last Update'].dt.day
-    processed_df['week'] = processed_df['Last Update'].dt.isocalendar().week
-    processed_df['month'] = processed_df['Last Update'].dt.month
-    processed_df['year'] = processed_df['Last Update'].dt.year
-    
-    # Group by appropriate time period
-    if time_period == 'daily':
-        processed_df['time_group'] = processed_df['Last Update'].dt.date
-    elif time_period == 'weekly':
-        # Create a week-year combination
-        processed_df['time_group'] = processed_df['year'].astype(str) + '-W' + processed_df['week'].astype(str).str.zfill(2)
-    elif time_period == 'monthly':
-        # Create a month-year combination
-        processed_df['time_group'] = processed_df['year'].astype(str) + '-' + processed_df['month'].astype(str).str.zfill(2)
+    if 'Last Update' not in df.columns or not fields:
+        return df
+    
+    # Shallow copy so new columns don't leak into the caller's frame
+    # without duplicating any of the existing column data
+    processed_df = df.copy(deep=False)
+    
+    # Fill invalid dates with today's date to keep all rows
+    last_update = pd.to_datetime(df['Last Update'], errors='coerce')
+    if last_update.isna().any():
+        last_update = last_update.fillna(pd.Timestamp('today'))
+    
+    for field in fields:
+        processed_df[field] = derive_time_field(last_update, field, time_period)
     
     return processed_df
+
+def derive_time_field(dates, field, time_period='daily'):
+    """
+    Build a single derived time field from a datetime Series.
+    
+    ``time_group`` is returned as integer period ordinals rather than strings;
+    use ``period_labels`` to turn only the distinct codes into display labels.
+    
+    Args:
+        dates: Series of datetimes
+        field: Name of the derived field to build
+        time_period: The time period used for ``time_group``
+    
+    Returns:
+        Series with the derived values, aligned with ``dates``
+    """
+    if field == 'time_group':
+        freq = PERIOD_FREQUENCIES.get(time_period, 'D')
+        codes = dates.dt.to_period(freq).array.asi8
+        return pd.Series(codes, index=dates.index, name='time_group')
+    elif field == 'date':
+        return dates.dt.date
+    elif field == 'day':
+        return dates.dt.day
+    elif field == 'week':
+        return dates.dt.isocalendar().week
+    elif field == 'month':
+        return dates.dt.month
+    elif field == 'year':
+        return dates.dt.year
+    
+    raise ValueError(f"Unknown time field: {field}")
+
+def period_labels(codes, time_period='daily'):
+    """Convert integer period ordinals into display labels ('2025-04-21', '2025-W17' or '2025-04')."""
+    freq = PERIOD_FREQUENCIES.get(time_period, 'D')
+    periods = pd.PeriodIndex.from_ordinals(np.asarray(codes, dtype='int64'), freq=freq)
+    if freq == 'W':
+        # Weeks run Monday to Sunday, so their first day gives the ISO year and week
+        iso = periods.start_time.isocalendar()
+        return pd.Index(iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2), dtype=str)
+    return periods.astype(str)
@@ -0,0 +1,195 @@
+import pandas as pd
+import numpy as np
+
+from utils.workload import AssignmentIndex, split_resources
+
+# Sidebar filters that select a single value of a column
+SINGLE_VALUE_FILTERS = ['Status', 'Company', 'Resources', 'Subtype', 'Service Board', 'Category']
+
+# Sidebar filters that select any of several values of a column
+MULTI_VALUE_FILTERS = ['Team']
+
+# Columns listing several engineers; a selected engineer matches any ticket they are on
+MULTI_ASSIGNEE_COLUMNS = ['Resources']
+
+def build_filters(date_min=None, date_max=None, selections=None, unassigned_only=False):
+    """
+    Collect the sidebar selections into a filter dictionary.
+
+    Args:
+        date_min: First 'Last Update' day to include (None for no lower bound)
+        date_max: Last 'Last Update' day to include (None for no upper bound)
+        selections: Dictionary of column -> selected value or list of values
+        unassigned_only: Keep only tickets without a resource
+
+    Returns:
+        Dictionary understood by apply_filters and the SQL backend
+    """
+    filters = {
+        'date_min': date_min,
+        'date_max': date_max,
+        'unassigned_only': unassigned_only,
+        'columns': {}
+    }
+
+    for col, value in (selections or {}).items():
+        # 'All' and empty multi-selects don't restrict anything
+        if value is None or (isinstance(value, str) and value == 'All'):
+            continue
+        if isinstance(value, (list, tuple, set)):
+            if len(value) == 0:
+                continue
+            value = list(value)
+        filters['columns'][col] = value
+
+    return filters
+
+def build_filter_index(df, columns=None):
+    """
+    Precompute the row positions of every value of the filter columns.
+
+    Args:
+        df: DataFrame with the cleaned Connectwise data
+        columns: Columns to index (defaults to all sidebar filter columns)
+
+    Returns:
+        Dictionary of column -> {value as string: numpy array of row positions}
+    """
+    columns = columns or SINGLE_VALUE_FILTERS + MULTI_VALUE_FILTERS
+    index = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if col in MULTI_ASSIGNEE_COLUMNS:
+            # Key by engineer, from the exploded assignments
+            index[col] = AssignmentIndex(df).positions()
+            continue
+        # Key by the string form, the same way filter values are compared
+        values = df[col].astype(str)
+        index[col] = values.groupby(values, sort=False).indices
+    return index
+
+def patch_filter_index(index, keep, added_index):
+    """
+    Filter index of a frame made of some rows of an indexed frame followed by new rows.
+
+    Only row positions are renumbered; no column is grouped again, so a
+    small change to a large frame doesn't cost a full build_filter_index.
+
+    Args:
+        index: Filter index of the original frame
+        keep: Boolean array of the original rows that stay, in their order
+        added_index: Filter index of the rows appended after the kept ones
+
+    Returns:
+        Filter index of the combined frame
+    """
+    # New position of every original row, -1 for dropped rows
+    new_rows = np.cumsum(keep) - 1
+    new_rows[~keep] = -1
+    n_kept = int(keep.sum())
+
+    patched = {}
+    for col in list(index) + [col for col in added_index if col not in index]:
+        values = {}
+        for value, positions in index.get(col, {}).items():
+            moved = new_rows[positions]
+            moved = moved[moved >= 0]
+            if len(moved):
+                values[value] = moved
+        for value, positions in added_index.get(col, {}).items():
+            shifted = positions + n_kept
+            values[value] = np.concatenate([values[value], shifted]) if value in values else shifted
+        patched[col] = values
+    return patched
+
+def extend_filter_index(index, df, rows, columns):
+    """
+    Filter index with some rows of df added to the entries of a few columns.
+
+    Args:
+        index: Filter index that doesn't cover the rows yet
+        df: DataFrame the index is for
+        rows: Positions of the rows to add (after the indexed ones, so entries stay sorted)
+        columns: Columns whose entries get the rows
+
+    Returns:
+        Filter index of the same form (index itself is not modified)
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    extended = dict(index)
+    for col, values in build_filter_index(df.iloc[rows], columns).items():
+        entries = dict(index.get(col, {}))
+        for value, positions in values.items():
+            positions = rows[positions]
+            entries[value] = np.concatenate([entries[value], positions]) if value in entries else positions
+        extended[col] = entries
+    return extended
+
+def filter_mask(df, filters, index=None):
+    """
+    Build one boolean mask for all filters without materializing intermediate frames.
+
+    Args:
+        df: DataFrame with the cleaned Connectwise data
+        filters: Dictionary returned by build_filters
+        index: Filter index from build_filter_index for df (optional)
+
+    Returns:
+        Boolean numpy array aligned with df
+    """
+    mask = np.ones(len(df), dtype=bool)
+
+    if 'Last Update' in df.columns and (filters.get('date_min') or filters.get('date_max')):
+        last_update = pd.to_datetime(df['Last Update'], errors='coerce')
+        if filters.get('date_min'):
+            mask &= (last_update >= pd.Timestamp(filters['date_min'])).to_numpy()
+        if filters.get('date_max'):
+            # Include the whole last day
+            day_after = pd.Timestamp(filters['date_max']) + pd.Timedelta(days=1)
+            mask &= (last_update < day_after).to_numpy()
+
+    for col, value in filters.get('columns', {}).items():
+        if col not in df.columns:
+            continue
+        if index is not None and col in index:
+            # Look the matching rows up instead of scanning the column
+            values = value if isinstance(value, list) else [value]
+            selected = np.zeros(len(df), dtype=bool)
+            for v in values:
+                positions = index[col].get(str(v))
+                if positions is not None:
+                    selected[positions] = True
+            mask &= selected
+            continue
+        if col in MULTI_ASSIGNEE_COLUMNS:
+            # Rows whose Resources value lists any selected engineer
+            codes, value_ids, names = split_resources(df[col])
+            wanted = [str(v) for v in value] if isinstance(value, list) else [str(value)]
+            mask &= np.isin(codes, value_ids[np.isin(names, wanted)])
+            continue
+        # Compare as strings so numeric-looking values match the sidebar labels
+        values = df[col].astype(str)
+        if isinstance(value, list):
+            mask &= values.isin([str(v) for v in value]).to_numpy()
+        else:
+            mask &= (values == str(value)).to_numpy()
+
+    if filters.get('unassigned_only') and 'Resources' in df.columns:
+        mask &= (df['Resources'].isna() | (df['Resources'] == '')).to_numpy()
+
+    return mask
+
+def apply_filters(df, filters, index=None):
+    """
+    Filter the cleaned data by date range and sidebar selections.
+
+    Args:
+        df: DataFrame with the cleaned Connectwise data
+        filters: Dictionary returned by build_filters
+        index: Filter index from build_filter_index for df (optional)
+
+    Returns:
+        DataFrame with the matching tickets
+    """
+    return df[filter_mask(df, filters, index)]
@@ -0,0 +1,472 @@
+import json
+import os
+import threading
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.backlog import snapshot_date_from_frame
+
+# Default location of the local ticket history
+DEFAULT_STORE_PATH = os.environ.get('TICKET_HISTORY_PATH', 'data/history')
+
+# Column added to every stored row with the day of its export
+SNAPSHOT_COLUMN = 'Snapshot Date'
+
+PARTITION_PREFIX = 'snapshot_date='
+
+# Partitions holding a whole month of snapshot days, one row group per day
+MONTH_PREFIX = 'snapshot_month='
+
+# Month file metadata key mapping each day to its row group (-1 for an empty export)
+DAYS_METADATA_KEY = b'snapshot_days'
+
+# Columns identifying a ticket within a partition, in order of preference
+KEY_COLUMNS = ['Selected_Sr_Service_Recid', 'Ticket #']
+
+class HistoryStore:
+    """
+    Local history of cleaned exports stored as date-partitioned Parquet files.
+
+    Every export is written as a new part file under the partition for its
+    snapshot day, replacing the parts of an earlier export of the same day.
+    Date-range queries only open the partitions in range. A partition left
+    with several parts (an interrupted append, or a store written before
+    same-day exports replaced each other) is read with the latest row of
+    each ticket, and compaction merges its parts into a single file.
+
+    Compaction also rolls the daily partitions of past months into one
+    file per month, with one row group per day and the day of every row
+    group in the file metadata, so reading a day still only reads that
+    day's rows. A day exported again after its month was rolled up gets
+    a daily partition again, which takes precedence until the next roll-up.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_PATH):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+        # Guards the part file listing against a concurrent compaction
+        self._lock = threading.Lock()
+        self._compaction_thread = None
+        self._stop_compaction = threading.Event()
+
+    def append(self, df, snapshot_date=None):
+        """
+        Store one cleaned export, replacing any earlier export of the same day.
+
+        Args:
+            df: DataFrame with the cleaned Connectwise data
+            snapshot_date: Day the export was taken (defaults to the latest 'Last Update')
+
+        Returns:
+            Path of the written part file
+        """
+        if snapshot_date is None:
+            snapshot_date = snapshot_date_from_frame(df)
+        snapshot_date = pd.Timestamp(snapshot_date).normalize()
+
+        partition_dir = self._partition_dir(snapshot_date)
+        os.makedirs(partition_dir, exist_ok=True)
+
+        stored_df = _prepare_for_parquet(df)
+        stored_df[SNAPSHOT_COLUMN] = snapshot_date
+
+        # Write to a temporary name first so readers never see a partial file
+        part_path = os.path.join(partition_dir, f'part-{time.time_ns()}.parquet')
+        temp_path = part_path + '.tmp'
+        stored_df.to_parquet(temp_path, index=False)
+        with self._lock:
+            superseded = self._part_files(snapshot_date)
+            os.replace(temp_path, part_path)
+            for path in superseded:
+                os.remove(path)
+
+        return part_path
+
+    def partitions(self, start=None, end=None):
+        """
+        List the snapshot days held in the store.
+
+        Args:
+            start: First day to include (optional)
+            end: Last day to include (optional)
+
+        Returns:
+            Sorted list of partition dates as Timestamps
+        """
+        start = pd.Timestamp(start).normalize() if start is not None else None
+        end = pd.Timestamp(end).normalize() if end is not None else None
+
+        dates = set(self._daily_partitions())
+        for month in self._months():
+            # Month files are only opened (for their footer) when the month overlaps the range
+            if start is not None and month + pd.offsets.MonthEnd(0) < start:
+                continue
+            if end is not None and month > end:
+                continue
+            dates.update(self._month_days(month))
+
+        return sorted(
+            partition_date for partition_date in dates
+            if (start is None or partition_date >= start) and (end is None or partition_date <= end)
+        )
+
+    def query(self, start=None, end=None, columns=None):
+        """
+        Load the stored rows for a date range.
+
+        Args:
+            start: First snapshot day to include (optional)
+            end: Last snapshot day to include (optional)
+            columns: Columns to read; other columns are never loaded (optional)
+
+        Returns:
+            DataFrame with the matching rows, including the snapshot date column
+        """
+        frames = [snapshot_df for _, snapshot_df in self.iter_snapshots(start, end, columns)]
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+        return pd.concat(frames, ignore_index=True)
+
+    def iter_snapshots(self, start=None, end=None, columns=None):
+        """
+        Yield one DataFrame per snapshot day so callers can stream long histories.
+
+        Args:
+            start: First snapshot day to include (optional)
+            end: Last snapshot day to include (optional)
+            columns: Columns to read (optional)
+
+        Yields:
+            Tuples of (snapshot date, DataFrame)
+        """
+        if columns is not None and SNAPSHOT_COLUMN not in columns:
+            columns = list(columns) + [SNAPSHOT_COLUMN]
+
+        for partition_date in self.partitions(start, end):
+            with self._lock:
+                part_files = self._part_files(partition_date)
+                if len(part_files) == 1:
+                    snapshot_df = pd.read_parquet(part_files[0], columns=columns)
+                elif part_files:
+                    snapshot_df = _merge_parts(part_files, columns)
+                else:
+                    snapshot_df = self._read_month_day(partition_date, columns)
+                    if snapshot_df is None:
+                        continue
+
+            yield partition_date, snapshot_df
+
+    def compact(self, min_files=2, roll_up_before=None):
+        """
+        Merge the part files of every partition that has at least ``min_files``,
+        then roll the daily partitions of past months into monthly files.
+
+        Args:
+            min_files: Number of part files that makes a partition worth merging
+            roll_up_before: Day partitions of months before this day's month
+                are rolled up (defaults to the newest day's month, which
+                stays daily while exports are still arriving)
+
+        Returns:
+            Number of partitions that were compacted
+        """
+        compacted = 0
+        for partition_date in self._daily_partitions():
+            part_files = self._part_files(partition_date)
+            if len(part_files) < min_files:
+                continue
+
+            # Merge outside the lock; only the swap has to be exclusive. The
+            # merged file takes the newest part's name, so a part appended
+            # meanwhile still sorts after it
+            merged_df = _merge_parts(part_files)
+            merged_path = part_files[-1]
+            temp_path = merged_path + '.tmp'
+            merged_df.to_parquet(temp_path, index=False)
+
+            with self._lock:
+                if not os.path.exists(merged_path):
+                    # A same-day append replaced these parts while they were merged
+                    os.remove(temp_path)
+                    continue
+                os.replace(temp_path, merged_path)
+                for path in part_files[:-1]:
+                    if os.path.exists(path):
+                        os.remove(path)
+            compacted += 1
+
+        return compacted + self.roll_up(roll_up_before)
+
+    def roll_up(self, before=None):
+        """
+        Merge the daily partitions of every month before ``before`` into one file per month.
+
+        Args:
+            before: Day whose month and later months stay daily (defaults to
+                the newest daily partition)
+
+        Returns:
+            Number of daily partitions merged into monthly files
+        """
+        days = self._daily_partitions()
+        if not days:
+            return 0
+        first_kept_month = _month_start(before if before is not None else days[-1])
+
+        months = {}
+        for partition_date in days:
+            if partition_date < first_kept_month:
+                months.setdefault(_month_start(partition_date), []).append(partition_date)
+
+        return sum(self._roll_up_month(month, month_days) for month, month_days in sorted(months.items()))
+
+    def start_background_compaction(self, interval=600, min_files=2):
+        """Compact the store periodically in a daemon thread."""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+
+        self._stop_compaction.clear()
+
+        def run():
+            while not self._stop_compaction.wait(interval):
+                try:
+                    self.compact(min_files)
+                except Exception:
+                    # A failed compaction leaves the original parts in place
+                    pass
+
+        self._compaction_thread = threading.Thread(target=run, name='history-compaction', daemon=True)
+        self._compaction_thread.start()
+
+    def stop_background_compaction(self):
+        """Stop the background compaction thread."""
+        self._stop_compaction.set()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    def _partition_dir(self, partition_date):
+        """Directory holding the part files of one snapshot day."""
+        return os.path.join(self.root, f'{PARTITION_PREFIX}{partition_date:%Y-%m-%d}')
+
+    def _month_dir(self, month):
+        """Directory holding the file of one rolled-up month."""
+        return os.path.join(self.root, f'{MONTH_PREFIX}{month:%Y-%m}')
+
+    def _daily_partitions(self):
+        """Snapshot days that have a daily partition directory, oldest first."""
+        return self._listed_dates(PARTITION_PREFIX)
+
+    def _months(self):
+        """First days of the rolled-up months, oldest first."""
+        return self._listed_dates(MONTH_PREFIX)
+
+    def _listed_dates(self, prefix):
+        """Dates parsed from the directory names with a prefix."""
+        dates = []
+        for name in os.listdir(self.root):
+            if not name.startswith(prefix):
+                continue
+            try:
+                dates.append(pd.Timestamp(name[len(prefix):]))
+            except ValueError:
+                continue
+        return sorted(dates)
+
+    def _month_file(self, month):
+        """Newest file of a rolled-up month, or None."""
+        month_dir = self._month_dir(month)
+        if not os.path.isdir(month_dir):
+            return None
+        names = sorted(name for name in os.listdir(month_dir) if name.endswith('.parquet'))
+        return os.path.join(month_dir, names[-1]) if names else None
+
+    def _month_days(self, month, path=None):
+        """Day -> row group of a rolled-up month, read from its file footer."""
+        path = path or self._month_file(month)
+        if path is None:
+            return {}
+        days = json.loads(pq.read_metadata(path).metadata[DAYS_METADATA_KEY])
+        return {pd.Timestamp(day): row_group for day, row_group in days.items()}
+
+    def _read_month_day(self, partition_date, columns=None):
+        """One day's rows from its rolled-up month (None if the month doesn't hold it)."""
+        path = self._month_file(_month_start(partition_date))
+        if path is None:
+            return None
+        row_group = self._month_days(_month_start(partition_date), path).get(partition_date)
+        if row_group is None:
+            return None
+
+        parquet_file = pq.ParquetFile(path)
+        schema = parquet_file.schema_arrow
+        if columns is not None:
+            schema = pa.schema([schema.field(col) for col in columns if col in schema.names])
+        if row_group < 0:
+            return schema.empty_table().to_pandas()
+        return parquet_file.read_row_group(row_group, columns=schema.names).to_pandas()
+
+    def _roll_up_month(self, month, days):
+        """Write the daily partitions (and any earlier rolled-up days) of one month as one file."""
+        day_parts = {day: self._part_files(day) for day in days}
+        day_parts = {day: parts for day, parts in day_parts.items() if parts}
+        if not day_parts:
+            return 0
+        old_path = self._month_file(month)
+        old_days = self._month_days(month, old_path) if old_path else {}
+
+        # Days exported again after an earlier roll-up replace the rolled-up ones
+        sources = {day: ('month', row_group) for day, row_group in old_days.items()}
+        sources.update({day: ('parts', parts) for day, parts in day_parts.items()})
+
+        schemas = [_stored_schema(parts[-1]) for parts in day_parts.values()]
+        if old_path:
+            schemas.append(_stored_schema(old_path))
+        schema = _unify_schemas(schemas)
+
+        month_dir = self._month_dir(month)
+        os.makedirs(month_dir, exist_ok=True)
+        month_path = os.path.join(month_dir, f'part-{time.time_ns()}.parquet')
+        temp_path = month_path + '.tmp'
+
+        # Each day is read, conformed to the month's schema and written on its own
+        row_groups = {}
+        written = 0
+        with pq.ParquetWriter(temp_path, schema) as writer:
+            for day, (kind, source) in sorted(sources.items()):
+                if kind == 'parts':
+                    table = pq.read_table(source[0]) if len(source) == 1 else \
+                        pa.Table.from_pandas(_merge_parts(source), preserve_index=False)
+                elif source >= 0:
+                    table = pq.ParquetFile(old_path).read_row_group(source)
+                else:
+                    table = schema.empty_table()
+                if len(table) == 0:
+                    row_groups[day] = -1
+                    continue
+                row_groups[day] = written
+                writer.write_table(_conform(table, schema), row_group_size=len(table))
+                written += 1
+            writer.add_key_value_metadata({DAYS_METADATA_KEY: json.dumps(
+                {f'{day:%Y-%m-%d}': row_group for day, row_group in row_groups.items()}
+            )})
+
+        with self._lock:
+            changed = any(self._part_files(day) != parts for day, parts in day_parts.items())
+            if changed or self._month_file(month) != old_path:
+                # An append or another roll-up changed these days while they were merged
+                os.remove(temp_path)
+                return 0
+            os.replace(temp_path, month_path)
+            if old_path:
+                os.remove(old_path)
+            for day, parts in day_parts.items():
+                for path in parts:
+                    os.remove(path)
+                try:
+                    os.rmdir(self._partition_dir(day))
+                except OSError:
+                    # An append of this day is writing its part; the day stays daily
+                    pass
+
+        return len(day_parts)
+
+    def _part_files(self, partition_date):
+        """Completed part files of one partition, oldest first."""
+        partition_dir = self._partition_dir(partition_date)
+        if not os.path.isdir(partition_dir):
+            return []
+        names = sorted(name for name in os.listdir(partition_dir) if name.endswith('.parquet'))
+        return [os.path.join(partition_dir, name) for name in names]
+
+def _merge_parts(part_files, columns=None):
+    """
+    Rows of several parts of one partition, keeping each ticket's row from the newest part.
+
+    Args:
+        part_files: Part file paths, oldest first
+        columns: Columns to return (optional); the key column is read for
+            the merge either way
+    """
+    schema_names = pq.read_schema(part_files[-1]).names
+    key = next((col for col in KEY_COLUMNS if col in schema_names), None)
+    read_columns = columns
+    if columns is not None and key is not None and key not in columns:
+        read_columns = list(columns) + [key]
+
+    merged_df = pd.concat([pd.read_parquet(path, columns=read_columns) for path in part_files], ignore_index=True)
+    if key is not None:
+        merged_df = merged_df.drop_duplicates(subset=key, keep='last').reset_index(drop=True)
+    if read_columns is not columns:
+        merged_df = merged_df.drop(columns=[key])
+    return merged_df
+
+def _month_start(day):
+    """First day of a day's month."""
+    return pd.Timestamp(day).normalize().replace(day=1)
+
+def _stored_schema(path):
+    """Schema of a Parquet file with the columns that only hold nulls typed as null."""
+    metadata = pq.read_metadata(path)
+    schema = pq.read_schema(path)
+    null_columns = set(schema.names)
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        for j in range(row_group.num_columns):
+            chunk = row_group.column(j)
+            statistics = chunk.statistics
+            if statistics is None or not statistics.has_null_count or statistics.null_count < row_group.num_rows:
+                null_columns.discard(chunk.path_in_schema)
+    return pa.schema([
+        pa.field(field.name, pa.null()) if field.name in null_columns and metadata.num_rows else field
+        for field in schema
+    ])
+
+def _unify_schemas(schemas):
+    """
+    One schema holding the columns of several exports.
+
+    A column left empty in one export takes the type of the others;
+    integer and float columns become floats, and columns whose types
+    still disagree are stored as strings.
+    """
+    types = {}
+    for schema in schemas:
+        for field in schema:
+            types.setdefault(field.name, []).append(field.type)
+
+    fields = []
+    for name, column_types in types.items():
+        column_types = list(dict.fromkeys(column_types))
+        if len(column_types) > 1:
+            column_types = [t for t in column_types if not pa.types.is_null(t)] or column_types
+        if len(column_types) > 1 and all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in column_types):
+            column_types = [pa.float64()]
+        if len(column_types) > 1:
+            column_types = [pa.large_string()]
+        if pa.types.is_null(column_types[0]):
+            column_types = [pa.large_string()]
+        fields.append(pa.field(name, column_types[0]))
+    return pa.schema(fields)
+
+def _conform(table, schema):
+    """Table with the columns of a schema, in its order, with nulls for missing ones."""
+    columns = []
+    for field in schema:
+        column = table.column(field.name) if field.name in table.column_names else None
+        if column is None or column.null_count == len(column):
+            columns.append(pa.nulls(len(table), field.type))
+        else:
+            columns.append(column.cast(field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def _prepare_for_parquet(df):
+    """Make mixed-type object columns storable as Parquet strings."""
+    stored_df = df.copy(deep=False)
+    for col in stored_df.columns:
+        if stored_df[col].dtype == object:
+            stored_df[col] = stored_df[col].astype('string')
+    return stored_df
@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+
+from utils.categorizer import CATEGORY_COLUMN, categorizer_from_env
+from utils.connectwise_api import ConnectwiseClient
+from utils.data_processor import clean_data
+from utils.filters import build_filters, apply_filters, MULTI_VALUE_FILTERS
+from utils.kpis import compute_kpis
+from utils.refresher import SharedDataset, refresher_from_env
+
+KPI_PATH = '/api/kpis'
+VERSION_PATH = '/api/version'
+
+# Query parameters naming the filter columns, e.g. ?status=Open&team=A&team=B
+FILTER_PARAMETERS = {
+    'status': 'Status',
+    'company': 'Company',
+    'resource': 'Resources',
+    'subtype': 'Subtype',
+    'team': 'Team',
+    'service_board': 'Service Board',
+    'category': CATEGORY_COLUMN
+}
+
+def filters_from_query(query):
+    """
+    Turn URL query parameters into a filter dictionary.
+
+    Args:
+        query: Dictionary from urllib.parse.parse_qs
+
+    Returns:
+        Dictionary understood by apply_filters
+    """
+    selections = {}
+    for param, col in FILTER_PARAMETERS.items():
+        values = query.get(param)
+        if not values:
+            continue
+        selections[col] = values if col in MULTI_VALUE_FILTERS else values[-1]
+
+    def date_param(name):
+        value = query.get(name, [None])[-1]
+        return pd.Timestamp(value).date() if value else None
+
+    unassigned_only = query.get('unassigned_only', ['false'])[-1].lower() in ('1', 'true', 'yes')
+    return build_filters(date_param('date_min'), date_param('date_max'), selections, unassigned_only)
+
+def canonical_query(query):
+    """Order query parameters so equivalent requests share a cache entry."""
+    return '&'.join(f'{key}={value}' for key in sorted(query) for value in sorted(query[key]))
+
+class KpiCache:
+    """Small LRU cache of rendered KPI responses keyed by dataset version and query."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a cached (etag, body) pair or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        """Store an (etag, body) pair, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class KpiApiServer:
+    """
+    Read-only HTTP/JSON API serving dashboard KPIs for any filter combination.
+
+    Responses carry an ETag derived from the dataset version, the current
+    minute and the query, so pollers get a 304 until the data changes or SLA
+    breaches may have moved, and repeated queries are answered from the
+    response cache without recomputing anything.
+    """
+
+    def __init__(self, dataset, host='127.0.0.1', port=8766, cache_size=256):
+        self.dataset = dataset
+        self.host = host
+        self.port = port
+        self.cache = KpiCache(cache_size)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='kpi-api', daemon=True)
+        self._thread.start()
+
+    def serve_forever(self):
+        """Serve requests on the calling thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self.port = self._server.server_address[1]
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def kpi_response(self, query):
+        """
+        Build (or fetch from cache) the KPI response for a query.
+
+        Args:
+            query: Dictionary from urllib.parse.parse_qs
+
+        Returns:
+            Tuple of (etag, JSON body bytes), or None if no data is loaded
+        """
+        snapshot = self.dataset.current()
+        if snapshot is None:
+            return None
+
+        # SLA breaches depend on the clock, so responses also expire every minute
+        now = pd.Timestamp.now(tz='UTC').floor('min')
+        canonical = canonical_query(query)
+        key = (snapshot.version, now, canonical)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        filters = filters_from_query(query)
+        filtered_df = apply_filters(snapshot.data, filters, snapshot.index)
+        body = {
+            'version': snapshot.version,
+            'loaded_at': snapshot.loaded_at.isoformat(),
+            'filters': {k: v for k, v in query.items()},
+            'kpis': compute_kpis(filtered_df, now=now)
+        }
+
+        etag = '"' + hashlib.sha1(f'{snapshot.version}@{now.isoformat()}?{canonical}'.encode()).hexdigest() + '"'
+        entry = (etag, json.dumps(body).encode())
+        self.cache.put(key, entry)
+        return entry
+
+    def _handler_class(self):
+        """Build the request handler bound to this server."""
+        server = self
+
+        class KpiHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == VERSION_PATH:
+                    snapshot = server.dataset.current()
+                    version = snapshot.version if snapshot is not None else None
+                    self._send(200, json.dumps({'version': version}).encode())
+                    return
+                if url.path != KPI_PATH:
+                    self._send(404, b'{"error": "not found"}')
+                    return
+
+                try:
+                    response = server.kpi_response(parse_qs(url.query))
+                except ValueError as e:
+                    self._send(400, json.dumps({'error': str(e)}).encode())
+                    return
+                if response is None:
+                    self._send(503, b'{"error": "no data loaded"}')
+                    return
+
+                etag, body = response
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, None, etag)
+                else:
+                    self._send(200, body, etag)
+
+            def _send(self, status, body, etag=None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Cache-Control', 'no-cache')
+                if etag:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body) if body else 0))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+        return KpiHandler
+
+def kpi_api_from_env(dataset):
+    """
+    Start the KPI API in the background if TICKET_API_PORT is set.
+
+    Args:
+        dataset: SharedDataset to serve
+
+    Returns:
+        Running KpiApiServer, or None if not configured
+    """
+    if not os.environ.get('TICKET_API_PORT'):
+        return None
+
+    server = KpiApiServer(
+        dataset,
+        host=os.environ.get('TICKET_API_HOST', '127.0.0.1'),
+        port=int(os.environ['TICKET_API_PORT'])
+    )
+    server.start()
+    return server
+
+def main():
+    """Run the KPI API on its own, without a Streamlit session."""
+    parser = argparse.ArgumentParser(description='Serve ticket KPIs as JSON')
+    parser.add_argument('--csv', help='Connectwise export to serve')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    # Categorize like the dashboard so ?category= selects the same tickets
+    dataset = SharedDataset(categorizer=categorizer_from_env())
+    if args.csv:
+        dataset.publish(clean_data(pd.read_csv(args.csv, encoding='utf-8-sig')), source=args.csv)
+
+    # Keep the data fresh with the same refresher configuration as the dashboard
+    refresher = refresher_from_env(dataset, ConnectwiseClient.from_env())
+    if refresher is not None:
+        refresher.start()
+
+    KpiApiServer(dataset, args.host, args.port).serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import pandas as pd
+import numpy as np
+
+from utils.business_hours import business_clocks
+from utils.sla import breached_mask
+
+# SLA Status values counted as SLA issues when no deadline could be parsed
+SLA_ISSUE_PATTERN = 'late|overdue'
+
+def numeric_age(df):
+    """Get the Age column as floats, extracting the number from text if needed."""
+    if 'Age' not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    if pd.api.types.is_numeric_dtype(df['Age']):
+        return df['Age'].astype(float)
+    return df['Age'].astype(str).str.extract(r'(\d+\.?\d*)')[0].astype(float)
+
+def unassigned_mask(df):
+    """Boolean mask of tickets without a resource."""
+    if 'Resources' not in df.columns:
+        return pd.Series(False, index=df.index)
+    return df['Resources'].isna() | (df['Resources'] == '')
+
+def sla_issue_mask(df, now=None):
+    """Boolean mask of tickets past their SLA deadline or flagged late in the status text."""
+    mask = breached_mask(df, now)
+    if 'SLA Status' in df.columns:
+        mask = mask | df['SLA Status'].str.contains(SLA_ISSUE_PATTERN, case=False, na=False)
+    return mask
+
+def compute_kpis(df, top_companies=10, now=None):
+    """
+    Compute the dashboard's summary numbers for a set of tickets.
+
+    Args:
+        df: DataFrame with the (filtered) cleaned Connectwise data
+        top_companies: Number of companies to include in the company counts
+        now: Tz-aware time SLA deadlines are checked against; defaults to now
+
+    Returns:
+        Dictionary of JSON-serializable KPI values
+    """
+    total = len(df)
+
+    age = numeric_age(df)
+    avg_age = float(age.mean()) if age.notna().any() else None
+
+    # Age counted in business hours of each site's zone, as the contracts do
+    business_age = business_clocks(df, now)['Business Age Hours']
+    avg_business_age = float(business_age.mean()) if business_age.notna().any() else None
+
+    unassigned = int(unassigned_mask(df).sum())
+
+    sla_issues = int(sla_issue_mask(df, now).sum())
+
+    def counts(col, limit=None):
+        if col not in df.columns:
+            return {}
+        value_counts = df[col].value_counts()
+        if limit is not None:
+            value_counts = value_counts.head(limit)
+        return {str(value): int(count) for value, count in value_counts.items()}
+
+    return {
+        'total_tickets': total,
+        'avg_age': round(avg_age, 1) if avg_age is not None else None,
+        'avg_business_age_hours': round(avg_business_age, 1) if avg_business_age is not None else None,
+        'unassigned': unassigned,
+        'unassigned_pct': round(unassigned / total * 100, 1) if total else 0.0,
+        'sla_issues': sla_issues,
+        'sla_issues_pct': round(sla_issues / total * 100, 1) if total else 0.0,
+        'status_counts': counts('Status'),
+        'priority_counts': counts('Priority'),
+        'company_counts': counts('Company', top_companies)
+    }
@@ -0,0 +1,283 @@
+import numpy as np
+import pandas as pd
+
+# Column the near-duplicate cluster of every ticket is kept in
+CLUSTER_COLUMN = 'Duplicate Cluster'
+
+# Shingles are runs of this many bytes of the normalized summary
+SHINGLE_SIZE = 5
+
+# 64 hash functions in 16 bands of 4: summaries sharing roughly half their
+# shingles or more are likely to collide in at least one band
+NUM_PERM = 64
+BANDS = 16
+
+# Estimated Jaccard similarity a bucket member needs to join the cluster
+SIMILARITY_THRESHOLD = 0.6
+
+# Shingle hashes per batch; each batch holds a (shingles x NUM_PERM) array
+BATCH_SHINGLES = 1 << 17
+
+def normalize_summaries(summaries):
+    """
+    Lowercase summaries and blank out what varies within an alert storm.
+
+    Digit runs (case numbers, IP octets, counters) become a single 0 and
+    whitespace runs a single space, so "Case #00880250" and "Case #00880251"
+    shingle the same.
+    """
+    return (summaries.astype(str).str.lower()
+            .str.replace(r'\d+', '0', regex=True)
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip())
+
+class MinHasher:
+    """
+    MinHash signatures of byte shingles, computed in vectorized batches.
+
+    Every text is encoded into one byte buffer; the shingles of all texts
+    are read from it as sliding windows packed into 64-bit integers, and
+    each hash function is a multiply-shift of those integers. A batch's
+    minimums per text are taken with one numpy reduceat, so there is no
+    Python loop over texts or shingles.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+        """
+        Args:
+            num_perm: Number of hash functions (signature length)
+            shingle_size: Bytes per shingle (at most 8)
+            seed: Seed of the hash function parameters
+        """
+        if not 1 <= shingle_size <= 8:
+            raise ValueError("Shingles must be 1 to 8 bytes long")
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers keep the multiply-shift hashes universal
+        self.multipliers = rng.integers(0, 2**63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.increments = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def normalize(self, summaries):
+        """Normalized summaries to sign, see normalize_summaries."""
+        return normalize_summaries(summaries)
+
+    def signatures(self, texts, batch_shingles=BATCH_SHINGLES):
+        """
+        MinHash signature of every text.
+
+        Args:
+            texts: Sequence of strings
+            batch_shingles: Approximate number of shingles hashed per batch
+
+        Returns:
+            uint32 array of shape (len(texts), num_perm)
+        """
+        texts = pd.Series(texts, dtype=str).str.pad(self.shingle_size, side='right')
+        encoded = [text.encode('utf-8') for text in texts]
+        lengths = np.array([len(text) for text in encoded], dtype=np.int64)
+        buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+        text_starts = np.cumsum(lengths) - lengths
+        shingle_counts = lengths - self.shingle_size + 1
+
+        # Sliding windows of the buffer packed into integers, one per byte offset
+        window_count = max(len(buffer) - self.shingle_size + 1, 0)
+        windows = np.zeros(window_count, dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            windows |= buffer[offset:offset + window_count] << np.uint64(8 * offset)
+        # Mix the packed bytes so nearby shingles get unrelated hashes
+        windows *= np.uint64(0x9E3779B97F4A7C15)
+        windows ^= windows >> np.uint64(29)
+
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        shingle_ends = np.cumsum(shingle_counts)
+        first = 0
+        while first < len(texts):
+            # Texts up to about batch_shingles shingles, at least one text
+            done = shingle_ends[first - 1] if first else 0
+            last = max(int(np.searchsorted(shingle_ends, done + batch_shingles, side='right')), first + 1)
+
+            # Window offsets of the shingles of each text in the batch
+            counts = shingle_counts[first:last]
+            batch_starts = np.cumsum(counts) - counts
+            starts = np.repeat(text_starts[first:last] - batch_starts, counts) + np.arange(counts.sum())
+            hashes = (windows[starts, None] * self.multipliers + self.increments) >> np.uint64(32)
+            result[first:last] = np.minimum.reduceat(hashes, batch_starts, axis=0)
+            first = last
+        return result
+
+class SignatureCache:
+    """
+    MinHasher front that only signs texts it didn't sign on the previous call.
+
+    Callers that cluster a whole board again after a small change (webhook
+    batches) pass the same distinct summaries every time; the cache keeps
+    the signatures and normalized forms of the last call's texts, so it
+    never outgrows a board.
+    """
+
+    def __init__(self, hasher=None):
+        self.hasher = hasher or MinHasher()
+        self.num_perm = self.hasher.num_perm
+        self.texts = pd.Index([], dtype=object)
+        self.values = np.empty((0, self.num_perm), dtype=np.uint32)
+        self.raw_texts = pd.Index([], dtype=object)
+        self.normalized = pd.Series([], dtype=object)
+
+    def normalize(self, summaries):
+        """Normalized summaries like normalize_summaries, only normalizing texts not seen last call."""
+        raw_texts = pd.Index(summaries, dtype=object)
+        positions = self.raw_texts.get_indexer(raw_texts)
+        missing = positions < 0
+
+        result = np.empty(len(raw_texts), dtype=object)
+        result[~missing] = self.normalized.to_numpy()[positions[~missing]]
+        if missing.any():
+            result[missing] = normalize_summaries(pd.Series(raw_texts[missing], dtype=object)).to_numpy()
+        self.raw_texts, self.normalized = raw_texts, pd.Series(result, dtype=object)
+        return pd.Series(result, index=summaries.index, dtype=object)
+
+    def signatures(self, texts):
+        """MinHash signature of every distinct text, like MinHasher.signatures."""
+        texts = pd.Index(texts, dtype=object)
+        positions = self.texts.get_indexer(texts)
+        missing = positions < 0
+
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        result[~missing] = self.values[positions[~missing]]
+        if missing.any():
+            result[missing] = self.hasher.signatures(texts[missing])
+        self.texts, self.values = texts, result
+        return result
+
+def lsh_clusters(signatures, bands=BANDS, threshold=SIMILARITY_THRESHOLD):
+    """
+    Group signatures into near-duplicate clusters with LSH banding.
+
+    Each band of rows is hashed to a bucket key; a bucket member joins the
+    bucket's first member when their signatures agree on at least threshold
+    of their positions. Clusters are the connected components of those
+    links, found with vectorized label propagation.
+
+    Args:
+        signatures: Array of shape (n, num_perm) from MinHasher.signatures
+        bands: Number of bands (must divide num_perm)
+        threshold: Minimum estimated Jaccard similarity of a link
+
+    Returns:
+        Int64 array of cluster labels (the smallest member position)
+    """
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError("The number of bands must divide the signature length")
+    rows = num_perm // bands
+    labels = np.arange(n, dtype=np.int64)
+    if n < 2:
+        return labels
+
+    sources, targets = [], []
+    for band in range(bands):
+        # One 64-bit bucket key per signature for this band's rows
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = np.zeros(n, dtype=np.uint64)
+        for column in range(rows):
+            keys = keys * np.uint64(0x100000001B3) + block[:, column]
+        codes, _ = pd.factorize(keys)
+
+        # Link every member of a shared bucket to the bucket's first member
+        first_member = pd.Series(np.arange(n)).groupby(codes).transform('min').to_numpy()
+        members = np.flatnonzero(first_member != np.arange(n))
+        if len(members) == 0:
+            continue
+        agreement = (signatures[members] == signatures[first_member[members]]).mean(axis=1)
+        linked = members[agreement >= threshold]
+        sources.append(linked)
+        targets.append(first_member[linked])
+
+    if not sources:
+        return labels
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+
+    # Propagate the smallest label along the links until nothing changes
+    while True:
+        smallest = np.minimum(labels[sources], labels[targets])
+        updated = labels.copy()
+        np.minimum.at(updated, sources, smallest)
+        np.minimum.at(updated, targets, smallest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+def near_duplicate_clusters(summaries, threshold=SIMILARITY_THRESHOLD, hasher=None, bands=BANDS, keys=None):
+    """
+    Near-duplicate cluster of every ticket's summary.
+
+    Each distinct summary is normalized and each distinct normalized
+    summary hashed only once, so an alert storm of identical texts costs
+    one signature.
+
+    Args:
+        summaries: Series of Summary Description text
+        threshold: Minimum estimated Jaccard similarity within a cluster
+        hasher: MinHasher (or SignatureCache) to sign the summaries with
+            (defaults to a new MinHasher)
+        bands: Number of LSH bands
+        keys: Ticket numbers aligned to summaries (optional)
+
+    Returns:
+        Series of cluster IDs aligned to summaries (-1 for blank summaries).
+        With keys, a cluster's ID is its smallest ticket number, so the
+        same tickets get the same ID whichever call clustered them;
+        without, clusters are numbered from the largest down.
+    """
+    hasher = hasher or MinHasher()
+    raw_codes, raw_distinct = pd.factorize(summaries)
+    normalized = hasher.normalize(pd.Series(raw_distinct, dtype=object))
+    normalized_codes, distinct = pd.factorize(normalized)
+
+    labels = lsh_clusters(hasher.signatures(distinct), bands, threshold)
+    # Missing summaries (code -1) are blank
+    ticket_labels = np.append(labels[normalized_codes], -1)[raw_codes]
+    blank = np.append((normalized == '').to_numpy(), True)[raw_codes]
+
+    if keys is not None:
+        # The smallest ticket number of each cluster names it
+        key_values = pd.to_numeric(pd.Series(keys), errors='coerce').to_numpy(dtype=float)
+        cluster_keys = pd.Series(key_values[~blank]).groupby(ticket_labels[~blank]).min()
+        clusters = cluster_keys.reindex(ticket_labels).fillna(-1).to_numpy(dtype=np.int64, copy=True)
+    else:
+        # Number clusters by size so cluster 0 is the biggest storm
+        sizes = pd.Series(ticket_labels[~blank]).value_counts()
+        numbers = pd.Series(np.arange(len(sizes)), index=sizes.index)
+        clusters = numbers.reindex(ticket_labels).fillna(-1).to_numpy(dtype=np.int64, copy=True)
+    clusters[blank] = -1
+    return pd.Series(clusters, index=summaries.index, dtype=np.int64)
+
+def collapse_duplicates(df, clusters, order_column='Last Update'):
+    """
+    Keep one ticket per near-duplicate cluster, with the cluster's size.
+
+    Args:
+        df: DataFrame of tickets
+        clusters: Series of cluster numbers aligned to df
+        order_column: Column whose latest value picks the kept ticket
+
+    Returns:
+        DataFrame with the most recent ticket of each cluster (tickets
+        without a cluster are all kept) and a 'Duplicates' column
+    """
+    clusters = clusters.reindex(df.index)
+    sizes = clusters.map(clusters[clusters >= 0].value_counts()).fillna(1).astype(np.int64)
+
+    if order_column in df.columns:
+        order = df[order_column].rank(method='first', ascending=False, na_option='bottom')
+    else:
+        order = pd.Series(np.arange(len(df)), index=df.index)
+    ordered = clusters.loc[order.sort_values(kind='stable').index]
+    keep = ~ordered.duplicated() | (ordered < 0)
+    kept = keep[keep].index
+
+    collapsed = df.loc[df.index.isin(kept)].copy()
+    collapsed['Duplicates'] = sizes.loc[collapsed.index]
+    return collapsed
@@ -0,0 +1,434 @@
+import os
+import tempfile
+import base64
+from datetime import datetime
+import matplotlib.pyplot as plt
+from fpdf import FPDF
+
+from utils.alert_rules import flag_mask
+
+def create_pdf(dataframe, company_name="COMPANY", brand_color=(41, 128, 185), logo_size=40, include_timestamp=True):
+    """
+    Create the executive PDF report with customizable branding.
+    
+    Args:
+        dataframe: DataFrame with the filtered Connectwise data
+        company_name: Text used for the fallback logo
+        brand_color: RGB tuple used for the title and fallback logo
+        logo_size: Logo width in millimetres
+        include_timestamp: Add the report subtitle under the title
+    
+    Returns:
+        PDF file contents as bytes
+    """
+    # Create a custom PDF class to add header with logo and footer
+    class PDF(FPDF):
+        def __init__(self, company_name, brand_color, logo_size, include_timestamp):
+            super().__init__()
+            self.company_name = company_name
+            self.brand_color = brand_color
+            self.logo_size = logo_size
+            self.include_timestamp = include_timestamp
+        
+        def header(self):
+            # Use Base64 encoded image as logo
+            # Read the Base64 string from file
+            try:
+                with open('logo_base64.txt', 'r') as f:
+                    logo_b64 = f.read()
+                
+                # Create temporary file
+                temp = tempfile.NamedTemporaryFile(delete=False, suffix='.jpeg')
+                temp_filename = temp.name
+                
+                # Write decoded base64 image to the temporary file
+                with open(temp_filename, 'wb') as f:
+                    f.write(base64.b64decode(logo_b64))
+                
+                # Add image to PDF with custom size
+                self.image(temp_filename, x=210-self.logo_size-10, y=8, w=self.logo_size)
+                
+                # Clean up the temporary file
+                os.unlink(temp_filename)
+                
+            except Exception as e:
+                # Fallback to text-based logo if there's any error
+                # Draw logo background with custom brand color
+                self.set_fill_color(*self.brand_color)  # Use custom brand color
+                x_pos = 210-self.logo_size-10  # Right-aligned position
+                self.rect(x_pos, 8, self.logo_size, 18, style='F')
+                
+                # Add border - darker shade of brand color
+                darker_color = tuple(max(0, c-40) for c in self.brand_color)
+                self.set_draw_color(*darker_color)
+                self.set_line_width(0.5)
+                self.rect(x_pos, 8, self.logo_size, 18, style='D')
+                
+                # Add company name/text
+                self.set_font('Arial', 'B', 12)
+                self.set_text_color(255, 255, 255)  # White text
+                self.set_xy(x_pos, 13)
+                self.cell(self.logo_size, 8, self.company_name, 0, 0, 'C')
+            
+            # Add title with date in the format "Daily Insights Date, Month Year"
+            current_date = datetime.now().strftime("%d, %B %Y")
+            self.set_font('Arial', 'B', 15)
+            self.set_text_color(*self.brand_color)  # Use custom brand color
+            self.set_xy(10, 10)
+            self.cell(0, 10, f'Daily Insights {current_date}', 0, 1, 'C')
+            
+            # Add generation timestamp based on user preference
+            if self.include_timestamp:
+                self.set_font('Arial', 'I', 10)
+                self.set_text_color(100, 100, 100)
+                self.cell(0, 5, 'Executive Report', 0, 1, 'C')
+            
+            # Add a line
+            self.set_draw_color(59, 130, 246)  # Blue line
+            self.line(10, 25, 200, 25)
+            self.ln(10)
+            
+        def footer(self):
+            # Position at 1.5 cm from bottom
+            self.set_y(-15)
+            self.set_font('Arial', 'I', 8)
+            self.set_text_color(100, 100, 100)
+            self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+            
+    # Create PDF object with custom branding
+    pdf = PDF(company_name, brand_color, logo_size, include_timestamp)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    
+    # Add executive summary
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(30, 58, 138)  # Dark blue color
+    pdf.cell(0, 10, 'Executive Summary', 0, 1, 'L')
+    
+    # Add a fancy box around summary stats
+    pdf.set_fill_color(239, 246, 255)  # Light blue background
+    pdf.set_draw_color(199, 210, 254)  # Border color
+    pdf.rect(10, pdf.get_y(), 190, 25, 'DF')
+    
+    # Add summary text
+    pdf.set_font('Arial', '', 10)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_xy(15, pdf.get_y() + 5)
+    
+    # Summary metrics in a cleaner format
+    if 'Age_Numeric' in dataframe.columns:
+        avg_age = dataframe['Age_Numeric'].mean()
+        urgent_count = int(flag_mask(dataframe, 'priority_urgent').sum())
+        open_count = int(flag_mask(dataframe, 'open').sum())
+        
+        summary_text = (
+            f"This report contains details on {len(dataframe)} security tickets. "
+            f"The average ticket age is {avg_age:.1f} days with {urgent_count} urgent issues. "
+            f"Currently, {open_count} tickets require attention."
+        )
+        
+        # Add text with line breaks if needed
+        pdf.multi_cell(180, 5, summary_text)
+    else:
+        pdf.multi_cell(180, 5, f"This report contains details on {len(dataframe)} security tickets.")
+        
+    pdf.ln(10)
+    
+    # Add priority distribution section with colored legend
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(30, 58, 138)
+    pdf.cell(0, 10, 'Ticket Priority Distribution', 0, 1, 'L')
+    
+    # Count tickets by priority
+    priority_counts = {
+        'Urgent': int(flag_mask(dataframe, 'priority_urgent').sum()),
+        'High': int(flag_mask(dataframe, 'priority_high').sum()),
+        'Medium': int(flag_mask(dataframe, 'priority_medium').sum()),
+        'Low': int(flag_mask(dataframe, 'priority_low').sum())
+    }
+    
+    # Create colored boxes for priorities
+    pdf.set_font('Arial', 'B', 10)
+    
+    # Urgent - Red
+    pdf.set_fill_color(239, 68, 68)
+    pdf.set_text_color(255, 255, 255)
+    pdf.rect(15, pdf.get_y() + 2, 8, 8, 'F')
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_xy(25, pdf.get_y() + 2)
+    pdf.cell(30, 8, f"Urgent: {priority_counts['Urgent']}", 0, 0)
+    
+    # High - Orange
+    pdf.set_fill_color(245, 158, 11)
+    pdf.rect(65, pdf.get_y(), 8, 8, 'F')
+    pdf.set_xy(75, pdf.get_y())
+    pdf.cell(30, 8, f"High: {priority_counts['High']}", 0, 0)
+    
+    # Medium - Yellow
+    pdf.set_fill_color(251, 191, 36)
+    pdf.rect(115, pdf.get_y(), 8, 8, 'F')
+    pdf.set_xy(125, pdf.get_y())
+    pdf.cell(30, 8, f"Medium: {priority_counts['Medium']}", 0, 0)
+    
+    # Low - Green
+    pdf.set_fill_color(16, 185, 129)
+    pdf.rect(165, pdf.get_y(), 8, 8, 'F')
+    pdf.set_xy(175, pdf.get_y())
+    pdf.cell(30, 8, f"Low: {priority_counts['Low']}", 0, 1)
+    
+    # Add a clean page break between sections
+    pdf.add_page()
+    
+    # Add charts and visualizations from the dashboard
+    
+    # Create Ticket Status Distribution with matplotlib horizontal bar chart
+    pdf.ln(10)
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(30, 58, 138)
+    pdf.cell(0, 10, 'Ticket Status Distribution', 0, 1, 'L')
+    
+    # Get status data from actual dataframe
+    if 'Status' in dataframe.columns:
+        # Calculate status counts and percentages
+        status_counts = dataframe['Status'].value_counts()
+        total_tickets = len(dataframe)
+        
+        # Get top 8 statuses
+        top_statuses = status_counts.head(8)
+        
+        # Prepare data for plotting
+        statuses = list(top_statuses.index)
+        counts = list(top_statuses.values)
+        percentages = [(count / total_tickets) * 100 for count in counts]
+    
+    # Colors for each status
+    colors = [
+        "#4c81d1", "#f5a623", "#9b9b9b", "#f8e71c", 
+        "#bd10e0", "#7ed321", "#50e3c2", "#d0021b"
+    ]
+    
+    # Create figure and axis
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    # Plot horizontal bars with only needed colors
+    colors_needed = colors[:len(statuses)]
+    bars = ax.barh(statuses, counts, color=colors_needed)
+    
+    # Adding text labels, right aligned
+    for i, (bar, pct) in enumerate(zip(bars, percentages)):
+        width = bar.get_width()
+        ax.text(width + 1, bar.get_y() + bar.get_height() / 2,
+                f"{counts[i]} ({pct:.1f}%)", va='center', ha='left', fontsize=10)
+    
+    # Aesthetics
+    ax.set_xlabel('Number of Tickets')
+    ax.set_title('Ticket Status Distribution', fontsize=14, fontweight='bold')
+    ax.invert_yaxis()  # Highest value on top
+    ax.set_xlim(0, max(counts) + 20)  # Add margin for label visibility
+    plt.tight_layout()
+    
+    # Save the plot to a temporary file
+    temp_img_path = '/tmp/status_chart.png'
+    plt.savefig(temp_img_path, format='png', dpi=100, bbox_inches='tight')
+    plt.close(fig)
+    
+    # Add the plot to the PDF
+    pdf.image(temp_img_path, x=25, y=None, w=160)
+    
+    pdf.ln(10)
+    
+    # Top 10 Tickets by Company section - now on the same page, no add_page()
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(30, 58, 138)
+    pdf.cell(0, 10, 'Top 10 Tickets by Company', 0, 1, 'L')
+    
+    if 'Company' in dataframe.columns:
+        # Get top 10 companies by ticket count
+        company_counts = dataframe['Company'].value_counts().head(10)
+        
+        # Create table header with colored background
+        pdf.set_fill_color(239, 246, 255)  # Light blue background
+        pdf.set_text_color(30, 58, 138)    # Dark blue text
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(135, 8, 'Company Name', 1, 0, 'C', 1)
+        pdf.cell(45, 8, 'Ticket Count', 1, 1, 'C', 1)
+        
+        # Add table data
+        pdf.set_font('Arial', '', 10)
+        pdf.set_text_color(0, 0, 0)
+        
+        # Alternate row colors for better readability
+        row_color = False
+        
+        # Total for percentage calculation
+        total_tickets = len(dataframe)
+        
+        for company, count in company_counts.items():
+            # Format company name consistently
+            company_name = company
+            if len(company_name) > 35:
+                company_name = company_name[:32] + '...'
+            
+            # Calculate percentage
+            percentage = (count / total_tickets) * 100
+            
+            # Set fill color for alternating rows
+            if row_color:
+                pdf.set_fill_color(249, 250, 251)  # Light grey
+            else:
+                pdf.set_fill_color(255, 255, 255)  # White
+            
+            # Add data cells
+            pdf.cell(135, 7, company_name, 1, 0, 'L', row_color)
+            pdf.cell(45, 7, str(count), 1, 1, 'C', row_color)
+            
+            row_color = not row_color  # Alternate row color
+    
+    pdf.ln(15)
+    
+    # Move to page 2
+    pdf.add_page()
+    
+    # Add Top of Done Yets table including Resources column
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(30, 58, 138)
+    pdf.cell(0, 10, 'Top Done Yets', 0, 1, 'L')
+    
+    # Add descriptive text for Done Yets table
+    pdf.set_font('Arial', '', 10)
+    pdf.set_text_color(0, 0, 0)
+    pdf.multi_cell(0, 5, 'The following table shows tickets with "Done yet?" status, requiring final verification:')
+    pdf.ln(5)
+    
+    # Get tickets with "Done yet?" status
+    if 'Status' in dataframe.columns:
+        done_yet_tickets = dataframe[flag_mask(dataframe, 'done_yet')].head(5)
+        
+        if not done_yet_tickets.empty:
+            # Create table header with colored background
+            pdf.set_fill_color(239, 246, 255)  # Light blue background
+            pdf.set_text_color(30, 58, 138)    # Dark blue text
+            pdf.set_font('Arial', 'B', 9)
+            pdf.cell(20, 7, 'Ticket #', 1, 0, 'C', 1)
+            pdf.cell(15, 7, 'Age', 1, 0, 'C', 1)
+            pdf.cell(35, 7, 'Company', 1, 0, 'C', 1)
+            pdf.cell(35, 7, 'Resource', 1, 0, 'C', 1)
+            pdf.cell(85, 7, 'Summary', 1, 1, 'C', 1)
+            
+            # Add table data
+            pdf.set_font('Arial', '', 8)
+            pdf.set_text_color(0, 0, 0)
+            
+            # Alternate row colors for better readability
+            row_color = False
+            
+            for _, row in done_yet_tickets.iterrows():
+                # Get values with fallback for missing columns
+                ticket_num = str(row.get('Ticket #', 'N/A'))
+                priority = str(row.get('Priority', 'N/A'))
+                age = str(row.get('Age', 'N/A')) if 'Age' in row else 'N/A'
+                company = str(row.get('Company', 'N/A'))
+                resource = str(row.get('Resources', 'N/A'))
+                summary = str(row.get('Summary Description', 'N/A'))
+                
+                # Truncate long fields
+                if len(summary) > 45:
+                    summary = summary[:42] + '...'
+                if len(company) > 12:
+                    company = company[:9] + '...'
+                if len(resource) > 12:
+                    resource = resource[:9] + '...'
+                
+                # Set fill color for alternating rows
+                if row_color:
+                    pdf.set_fill_color(249, 250, 251)  # Light grey
+                else:
+                    pdf.set_fill_color(255, 255, 255)  # White
+                
+                # Add data cells
+                pdf.cell(20, 7, ticket_num[:9], 1, 0, 'L', row_color)
+                pdf.cell(15, 7, age[:9], 1, 0, 'L', row_color)
+                pdf.cell(35, 7, company, 1, 0, 'L', row_color)
+                pdf.cell(35, 7, resource, 1, 0, 'L', row_color)
+                pdf.cell(85, 7, summary, 1, 1, 'L', row_color)
+                
+                row_color = not row_color  # Alternate row color
+        else:
+            pdf.set_font('Arial', 'I', 10)
+            pdf.cell(0, 10, 'No tickets with "Done yet?" status found in the current dataset.', 0, 1, 'L')
+        
+        pdf.ln(20)
+    
+    # Move to page 3 for Top 10 Oldest Tickets
+    pdf.add_page()
+    
+    # 4. Top 10 oldest tickets section - Now with Resources column
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(30, 58, 138)
+    pdf.cell(0, 10, 'Top 10 Oldest Tickets', 0, 1, 'L')
+    
+    if 'Age_Numeric' in dataframe.columns:
+        oldest = dataframe.sort_values('Age_Numeric', ascending=False).head(10)
+        
+        # Create table header with colored background
+        pdf.set_fill_color(239, 246, 255)  # Light blue background
+        pdf.set_text_color(30, 58, 138)    # Dark blue text
+        pdf.set_font('Arial', 'B', 9)
+        pdf.cell(20, 7, 'Ticket #', 1, 0, 'C', 1)
+        pdf.cell(15, 7, 'Age', 1, 0, 'C', 1)
+        pdf.cell(35, 7, 'Company', 1, 0, 'C', 1)
+        pdf.cell(35, 7, 'Resource', 1, 0, 'C', 1)
+        pdf.cell(85, 7, 'Summary', 1, 1, 'C', 1)
+        
+        # Add table data
+        pdf.set_font('Arial', '', 8)
+        pdf.set_text_color(0, 0, 0)
+        
+        # Alternate row colors for better readability
+        row_color = False
+        
+        for _, row in oldest.iterrows():
+            # Get values with fallback for missing columns
+            ticket_num = str(row.get('Ticket #', 'N/A'))
+            priority = str(row.get('Priority', 'N/A'))
+            age = str(row.get('Age', 'N/A'))
+            status = str(row.get('Status', 'N/A'))
+            company = str(row.get('Company', 'N/A'))
+            resource = str(row.get('Resources', 'N/A'))
+            summary = str(row.get('Summary Description', 'N/A'))
+            
+            # Truncate long fields
+            if len(summary) > 40:
+                summary = summary[:37] + '...'
+            if len(company) > 12:
+                company = company[:9] + '...'
+            if len(resource) > 12:
+                resource = resource[:9] + '...'
+            
+            # Set fill color for alternating rows
+            if row_color:
+                pdf.set_fill_color(249, 250, 251)  # Light grey
+            else:
+                pdf.set_fill_color(255, 255, 255)  # White
+            
+            # Add data cells
+            pdf.cell(20, 7, ticket_num[:9], 1, 0, 'L', row_color)
+            pdf.cell(15, 7, age[:9], 1, 0, 'L', row_color)
+            pdf.cell(35, 7, company, 1, 0, 'L', row_color)
+            pdf.cell(35, 7, resource, 1, 0, 'L', row_color)
+            pdf.cell(85, 7, summary, 1, 1, 'L', row_color)
+            
+            row_color = not row_color  # Alternate row color
+    
+    # No contact information footer as requested
+    
+    # Fix for byte array encoding issue
+    try:
+        # First attempt with latin1 encoding
+        return pdf.output(dest='S').encode('latin1')
+    except (UnicodeEncodeError, AttributeError):
+        # Fallback if the first method fails
+        byte_string = pdf.output(dest='S')
+        if isinstance(byte_string, str):
+            return byte_string.encode('latin1')
+        return byte_string
@@ -0,0 +1,285 @@
+import contextvars
+import functools
+import json
+import linecache
+import os
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+import pandas as pd
+
+# Timer collecting spans for the rerun running on the current thread
+_active_timer = contextvars.ContextVar('active_timer', default=None)
+
+# Open memory-measured stages on the current thread, innermost last
+_memory_frames = contextvars.ContextVar('memory_frames', default=())
+
+SPAN_COLUMNS = ['stage', 'seconds', 'rows', 'peak_bytes', 'retained_bytes']
+
+class StageTimer:
+    """
+    Per-session collector of stage timings for the last few reruns.
+
+    Each rerun is a list of spans (stage name, seconds, row count) kept in a
+    ring buffer, so memory stays bounded however long a session runs.
+    """
+
+    def __init__(self, max_runs=50):
+        self.runs = deque(maxlen=max_runs)
+        self._run_counter = 0
+
+    def start_run(self, label='rerun'):
+        """Start collecting spans for a new rerun and make this timer active."""
+        self._run_counter += 1
+        self.runs.append({
+            'run': self._run_counter,
+            'label': label,
+            'started': time.time(),
+            'spans': []
+        })
+        _active_timer.set(self)
+
+    def record(self, name, seconds, rows=None, peak_bytes=None, retained_bytes=None):
+        """Add a finished span to the current run."""
+        if not self.runs:
+            self.start_run()
+        self.runs[-1]['spans'].append({
+            'stage': name,
+            'seconds': seconds,
+            'rows': rows,
+            'peak_bytes': peak_bytes,
+            'retained_bytes': retained_bytes
+        })
+
+    def last_run_frame(self):
+        """Spans of the most recent run as a DataFrame."""
+        if not self.runs:
+            return pd.DataFrame(columns=SPAN_COLUMNS)
+        return pd.DataFrame(self.runs[-1]['spans'], columns=SPAN_COLUMNS)
+
+    def stage_summary(self):
+        """Count, mean and max seconds and max peak memory per stage over all buffered runs."""
+        columns = ['stage', 'count', 'mean_seconds', 'max_seconds', 'max_peak_bytes', 'mean_retained_bytes']
+        spans = [dict(span, run=run['run']) for run in self.runs for span in run['spans']]
+        if not spans:
+            return pd.DataFrame(columns=columns)
+        summary = pd.DataFrame(spans, columns=SPAN_COLUMNS + ['run']).groupby('stage').agg(
+            count=('seconds', 'count'),
+            mean_seconds=('seconds', 'mean'),
+            max_seconds=('seconds', 'max'),
+            max_peak_bytes=('peak_bytes', 'max'),
+            mean_retained_bytes=('retained_bytes', 'mean')
+        )
+        return summary.sort_values('mean_seconds', ascending=False).reset_index()[columns]
+
+    def to_json_lines(self):
+        """Export every buffered span as one JSON object per line."""
+        lines = []
+        for run in self.runs:
+            for span in run['spans']:
+                lines.append(json.dumps({
+                    'run': run['run'],
+                    'label': run['label'],
+                    'started': run['started'],
+                    **span
+                }))
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def to_prometheus(self, prefix='ticket_dashboard'):
+        """Export per-stage totals in the Prometheus text exposition format."""
+        totals = {}
+        for run in self.runs:
+            for span in run['spans']:
+                total = totals.setdefault(span['stage'], {'sum': 0.0, 'count': 0, 'rows': None, 'peak': None})
+                total['sum'] += span['seconds']
+                total['count'] += 1
+                if span['rows'] is not None:
+                    total['rows'] = span['rows']
+                if span.get('peak_bytes') is not None:
+                    total['peak'] = max(total['peak'] or 0, span['peak_bytes'])
+
+        lines = [
+            f'# HELP {prefix}_stage_seconds Time spent in each dashboard stage',
+            f'# TYPE {prefix}_stage_seconds summary'
+        ]
+        for stage, total in sorted(totals.items()):
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {total["sum"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {total["count"]}')
+
+        lines += [
+            f'# HELP {prefix}_stage_rows Rows handled by the latest run of each stage',
+            f'# TYPE {prefix}_stage_rows gauge'
+        ]
+        for stage, total in sorted(totals.items()):
+            if total['rows'] is not None:
+                lines.append(f'{prefix}_stage_rows{{stage="{stage}"}} {total["rows"]}')
+
+        # Memory is only measured while tracemalloc is tracing
+        if any(total['peak'] is not None for total in totals.values()):
+            lines += [
+                f'# HELP {prefix}_stage_peak_bytes Highest traced memory above the stage start',
+                f'# TYPE {prefix}_stage_peak_bytes gauge'
+            ]
+            for stage, total in sorted(totals.items()):
+                if total['peak'] is not None:
+                    lines.append(f'{prefix}_stage_peak_bytes{{stage="{stage}"}} {total["peak"]}')
+
+        return '\n'.join(lines) + '\n'
+
+def active_timer():
+    """Timer of the rerun running on the current thread, if any."""
+    return _active_timer.get()
+
+def _row_count(value):
+    """Row count of a stage result when it has one."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+@contextmanager
+def _measure_memory():
+    """
+    Measure peak and retained traced memory of a block.
+
+    Nested blocks are handled by handing each block's peak up to the
+    enclosing one, since tracemalloc only keeps one process-wide peak.
+    Yields a dictionary that holds 'peak_bytes' and 'retained_bytes' once
+    the block has finished (both None while tracemalloc isn't tracing).
+    """
+    result = {'peak_bytes': None, 'retained_bytes': None}
+    if not tracemalloc.is_tracing():
+        yield result
+        return
+
+    parents = _memory_frames.get()
+    current, peak = tracemalloc.get_traced_memory()
+    if parents:
+        parents[-1]['peak'] = max(parents[-1]['peak'], peak)
+    tracemalloc.reset_peak()
+
+    frame = {'start': current, 'peak': current}
+    token = _memory_frames.set(parents + (frame,))
+    try:
+        yield result
+    finally:
+        _memory_frames.reset(token)
+        current, peak = tracemalloc.get_traced_memory()
+        frame['peak'] = max(frame['peak'], peak)
+        if parents:
+            parents[-1]['peak'] = max(parents[-1]['peak'], frame['peak'])
+        result['peak_bytes'] = frame['peak'] - frame['start']
+        result['retained_bytes'] = current - frame['start']
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Time a block of code as one stage of the current rerun.
+
+    Yields a dictionary whose 'rows' entry can be set inside the block when
+    the row count is only known afterwards. Does nothing without an active
+    timer. While tracemalloc is tracing, the peak and retained memory of
+    the block are recorded as well.
+    """
+    timer = _active_timer.get()
+    span = {'rows': rows}
+    if timer is None:
+        yield span
+        return
+
+    # A stage that raises is still recorded, with the time it ran until then
+    try:
+        with _measure_memory() as memory:
+            started = time.perf_counter()
+            try:
+                yield span
+            finally:
+                seconds = time.perf_counter() - started
+    finally:
+        timer.record(name, seconds, span['rows'], memory['peak_bytes'], memory['retained_bytes'])
+
+def timed(name=None):
+    """Decorator timing every call of a function as a stage of the current rerun."""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_timer.get() is None:
+                return func(*args, **kwargs)
+
+            with stage(stage_name) as span:
+                result = func(*args, **kwargs)
+                # Prefer the input size; charts return figures rather than frames
+                rows = _row_count(args[0]) if args else None
+                span['rows'] = rows if rows is not None else _row_count(result)
+            return result
+
+        return wrapper
+    return decorator
+
+def memory_profiling_from_env():
+    """
+    Start tracemalloc if TICKET_MEMORY_PROFILING is set.
+
+    Tracing slows the whole process down noticeably, so it is opt-in. The
+    value is the number of stack frames kept per allocation (default 1).
+
+    Returns:
+        True if memory is being traced
+    """
+    setting = os.environ.get('TICKET_MEMORY_PROFILING')
+    if not setting:
+        return tracemalloc.is_tracing()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(int(setting) if setting.isdigit() and int(setting) > 1 else 1)
+    return True
+
+def top_allocations(limit=10):
+    """
+    Source lines holding the most traced memory right now.
+
+    Args:
+        limit: Number of allocation sites to return
+
+    Returns:
+        DataFrame with the file, line, source, size in bytes and block count
+    """
+    columns = ['file', 'line', 'source', 'size_bytes', 'blocks']
+    if not tracemalloc.is_tracing():
+        return pd.DataFrame(columns=columns)
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        tracemalloc.Filter(False, '<unknown>')
+    ])
+    rows = []
+    for statistic in snapshot.statistics('lineno')[:limit]:
+        frame = statistic.traceback[0]
+        rows.append({
+            'file': frame.filename,
+            'line': frame.lineno,
+            'source': linecache.getline(frame.filename, frame.lineno).strip(),
+            'size_bytes': statistic.size,
+            'blocks': statistic.count
+        })
+    return pd.DataFrame(rows, columns=columns)
+
+def frame_footprint(frames):
+    """
+    Deep memory usage of the DataFrames a session holds on to.
+
+    Args:
+        frames: Dictionary of name -> object; non-DataFrame values are skipped
+
+    Returns:
+        DataFrame with the name, rows and bytes of each frame, largest first
+    """
+    rows = [
+        {'name': name, 'rows': len(value), 'bytes': int(value.memory_usage(deep=True).sum())}
+        for name, value in frames.items()
+        if isinstance(value, pd.DataFrame)
+    ]
+    footprint = pd.DataFrame(rows, columns=['name', 'rows', 'bytes'])
+    return footprint.sort_values('bytes', ascending=False).reset_index(drop=True)
@@ -0,0 +1,246 @@
+import glob
+import os
+import threading
+import time
+import pandas as pd
+
+from utils.categorizer import CATEGORY_COLUMN
+from utils.data_processor import clean_data
+from utils.filters import build_filter_index, extend_filter_index
+
+class DatasetSnapshot:
+    """One immutable version of the cleaned dataset, its filter index and its search index."""
+
+    def __init__(self, version, data, index, source, loaded_at, search_index=None):
+        self.version = version
+        self.data = data
+        self.index = index
+        self.source = source
+        self.loaded_at = loaded_at
+        self.search_index = search_index
+
+class SharedDataset:
+    """
+    Latest cleaned dataset shared by every session.
+
+    Readers take the current snapshot in one reference read, and writers
+    publish a fully built snapshot by swapping that reference, so a session
+    never sees a half-built dataset. When given a SearchIndex, each publish
+    updates a copy of the previous version's index (see SearchIndex.copy),
+    which only re-tokenizes the tickets that changed; sessions still on an
+    older snapshot keep searching that snapshot's index. When given a
+    categorizer, a copy of it learns each published version's new tickets
+    once and the published data carries their categories. The copies
+    replace search_index and categorizer only once the snapshot is swapped
+    in, so a failed publish leaves both as they were.
+    """
+
+    def __init__(self, search_index=None, categorizer=None):
+        self.search_index = search_index
+        self.categorizer = categorizer
+        self._snapshot = None
+        self._lock = threading.Lock()
+        # Serializes the index updates of concurrent publishers
+        self._publish_lock = threading.Lock()
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """Call callback(snapshot) after every publish, on the publishing thread."""
+        self._listeners.append(callback)
+
+    def current(self):
+        """Get the current snapshot (None until the first refresh)."""
+        return self._snapshot
+
+    def publish(self, data, index=None, source='', changed=None):
+        """
+        Swap in a new cleaned dataset for all sessions.
+
+        Args:
+            data: DataFrame with the cleaned Connectwise data
+            index: Filter index for data (built here if not given)
+            source: Description of where the data came from
+            changed: Positions of the rows that are new or changed since the
+                current snapshot (optional). The other rows must be rows of
+                the current snapshot, categories and all, and index must
+                cover them; only the changed rows are then categorized and
+                searched again, and the other tickets keep their category
+
+        Returns:
+            The published DatasetSnapshot
+        """
+        with self._publish_lock:
+            # Published versions keep their own search index, so the new one is built on copies
+            categorizer = self.categorizer.copy() if self.categorizer is not None else None
+            search_index = self.search_index.copy() if self.search_index is not None else None
+
+            incremental = changed is not None and self._snapshot is not None and index is not None
+            if categorizer is not None and incremental and CATEGORY_COLUMN in data.columns:
+                # Only the changed tickets are categorized and added to the category index
+                categories = data[CATEGORY_COLUMN].copy()
+                categories.iloc[changed] = categorizer.update(data.iloc[changed]).to_numpy()
+                data = data.assign(**{CATEGORY_COLUMN: categories})
+                index = extend_filter_index(index, data, changed, [CATEGORY_COLUMN])
+            elif categorizer is not None:
+                # Every ticket's category can move as the categorizer learns, so its index entry is rebuilt
+                data = data.assign(**{CATEGORY_COLUMN: categorizer.update(data)})
+                if index is not None:
+                    index = dict(index, **build_filter_index(data, [CATEGORY_COLUMN]))
+            if index is None:
+                index = build_filter_index(data)
+            if search_index is not None:
+                search_index.update(data, changed if incremental else None)
+            with self._lock:
+                version = self._snapshot.version + 1 if self._snapshot is not None else 1
+                snapshot = DatasetSnapshot(version, data, index, source, pd.Timestamp.now(), search_index)
+                self._snapshot = snapshot
+                self.search_index = search_index
+                self.categorizer = categorizer
+
+        for callback in self._listeners:
+            callback(snapshot)
+        return snapshot
+
+class DirectorySource:
+    """Load the newest CSV export dropped into a watched directory."""
+
+    def __init__(self, path, pattern='*.csv'):
+        self.path = path
+        self.pattern = pattern
+        self._last_seen = None
+
+    def describe(self):
+        """Human readable description of the source."""
+        return f"directory {self.path}"
+
+    def load(self):
+        """
+        Read the newest export if it changed since the last load.
+
+        Returns:
+            Raw DataFrame, or None when there is nothing new
+        """
+        files = glob.glob(os.path.join(self.path, self.pattern))
+        if not files:
+            return None
+
+        newest = max(files, key=os.path.getmtime)
+        stat = os.stat(newest)
+        signature = (newest, stat.st_mtime_ns, stat.st_size)
+        if signature == self._last_seen:
+            return None
+
+        raw_df = pd.read_csv(newest, encoding='utf-8-sig')
+        self._last_seen = signature
+        return raw_df
+
+class ApiSource:
+    """Load tickets through a ConnectwiseClient, syncing incrementally."""
+
+    def __init__(self, client):
+        self.client = client
+        self._raw_df = None
+        # Watermark of _raw_df; the client is shared with the sessions and keeps none
+        self._last_updated = None
+
+    def describe(self):
+        """Human readable description of the source."""
+        return f"Connectwise API {self.client.base_url}"
+
+    def load(self):
+        """
+        Sync with the API.
+
+        Returns:
+            Raw DataFrame with the export column schema
+        """
+        self._raw_df, self._last_updated = self.client.sync(self._raw_df, self._last_updated)
+        return self._raw_df
+
+class BackgroundRefresher:
+    """
+    Re-ingest a source on a schedule in a daemon thread.
+
+    Reading, cleaning and indexing all happen on the refresher thread; the
+    finished dataset is then published to the shared dataset in one swap.
+    """
+
+    def __init__(self, source, dataset, interval=300):
+        self.source = source
+        self.dataset = dataset
+        self.interval = interval
+
+        self.last_error = None
+        self.last_run = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def refresh_now(self):
+        """
+        Run one refresh on the calling thread.
+
+        Returns:
+            The published snapshot, or None if the source had nothing new
+        """
+        self.last_run = pd.Timestamp.now()
+        raw_df = self.source.load()
+        if raw_df is None:
+            return None
+
+        cleaned_df = clean_data(raw_df)
+        index = build_filter_index(cleaned_df)
+        return self.dataset.publish(cleaned_df, index, self.source.describe())
+
+    def start(self):
+        """Start refreshing in the background."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                started = time.monotonic()
+                try:
+                    self.refresh_now()
+                    self.last_error = None
+                except Exception as e:
+                    # Keep serving the previous dataset when a refresh fails
+                    self.last_error = str(e)
+                self._stop.wait(max(0, self.interval - (time.monotonic() - started)))
+
+        self._thread = threading.Thread(target=run, name='dataset-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def refresher_from_env(dataset, client=None):
+    """
+    Build a refresher from TICKET_REFRESH_* environment variables.
+
+    TICKET_REFRESH_DIR selects a watched directory; otherwise
+    TICKET_REFRESH_SOURCE=api uses the given Connectwise client.
+    TICKET_REFRESH_INTERVAL sets the schedule in seconds.
+
+    Args:
+        dataset: SharedDataset to publish into
+        client: ConnectwiseClient for the API source (optional)
+
+    Returns:
+        BackgroundRefresher, or None if no source is configured
+    """
+    interval = int(os.environ.get('TICKET_REFRESH_INTERVAL', '300'))
+
+    if os.environ.get('TICKET_REFRESH_DIR'):
+        source = DirectorySource(os.environ['TICKET_REFRESH_DIR'])
+    elif os.environ.get('TICKET_REFRESH_SOURCE') == 'api' and client is not None:
+        source = ApiSource(client)
+    else:
+        return None
+
+    return BackgroundRefresher(source, dataset, interval)
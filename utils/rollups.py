@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from utils.kpis import numeric_age, sla_issue_mask
+from utils.sla import time_to_breach
+from utils.workload import AssignmentIndex
+
+# Drill-down hierarchies, top level first; levels missing from the data are skipped
+HIERARCHIES = {
+    'Territory': ['Territory Team', 'Team', 'Resources'],
+    'Company': ['Company', 'Site']
+}
+
+# Label of tickets without a value at a level
+MISSING_LABELS = {'Resources': 'Unassigned'}
+DEFAULT_MISSING_LABEL = '(none)'
+
+# Tickets breaching within this many hours count as at risk
+SLA_RISK_HOURS = 24
+
+ROLLUP_COLUMNS = ['Tickets', 'Avg Age', 'Median Age', 'Max Age', 'SLA Issues', 'SLA At Risk']
+
+class HierarchyRollup:
+    """
+    Ticket statistics for every node of a drill-down hierarchy.
+
+    All levels are grouped once when the rollup is built: one groupby per
+    depth over the path of level values. Nodes are then kept in
+    dictionaries keyed by their path tuple, so showing a node's children
+    is a lookup rather than a regroup of the tickets. A ticket with
+    several Resources counts once for each engineer at the Resources
+    level and once at the levels above.
+    """
+
+    def __init__(self, df, levels, now=None):
+        """
+        Args:
+            df: Cleaned DataFrame of the tickets to roll up
+            levels: Columns from the top level down
+            now: Tz-aware time to measure SLA risk from; defaults to now
+        """
+        self.levels = [level for level in levels if level in df.columns]
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+
+        # Per-ticket measures, computed once for every level
+        left = time_to_breach(df, now)
+        measures = pd.DataFrame({
+            'age': numeric_age(df).to_numpy(dtype=float),
+            'sla_issue': sla_issue_mask(df, now).to_numpy(dtype=bool),
+            'sla_at_risk': ((left >= pd.Timedelta(0)) & (left < pd.Timedelta(hours=SLA_RISK_HOURS))).to_numpy(dtype=bool)
+        })
+        for level in self.levels:
+            measures[level] = self._labels(df, level)
+
+        # Rows at and below a Resources level are one per engineer assignment
+        exploded = None
+        if 'Resources' in self.levels:
+            assignments = AssignmentIndex(df)
+            exploded = measures.iloc[np.concatenate([assignments.rows, np.flatnonzero(assignments.assignees == 0)])]
+            engineers = np.concatenate([
+                np.asarray(assignments.engineers, dtype=object)[assignments.engineer_codes],
+                np.full(int((assignments.assignees == 0).sum()), MISSING_LABELS['Resources'], dtype=object)
+            ])
+            exploded = exploded.assign(Resources=engineers)
+
+        self.nodes = {(): self._stats(measures).to_dict('records')[0]}
+        self.children_of = {}
+        for depth in range(1, len(self.levels) + 1):
+            path_columns = self.levels[:depth]
+            source = exploded if exploded is not None and 'Resources' in path_columns else measures
+            stats = self._stats(source, path_columns)
+            for path, row in zip(stats.index, stats.to_dict('records')):
+                path = path if isinstance(path, tuple) else (path,)
+                self.nodes[path] = row
+                self.children_of.setdefault(path[:-1], []).append(path[-1])
+
+        # Children are listed busiest first
+        for parent, names in self.children_of.items():
+            names.sort(key=lambda name: -self.nodes[parent + (name,)]['Tickets'])
+
+    def node(self, path=()):
+        """Statistics of the node at a path of level values (the root for ())."""
+        return self.nodes.get(tuple(path))
+
+    def children(self, path=()):
+        """Child names of the node at a path, busiest first."""
+        return self.children_of.get(tuple(path), [])
+
+    def children_table(self, path=()):
+        """
+        Statistics of the children of a node.
+
+        Returns:
+            DataFrame with one row per child, indexed by the child level's values
+        """
+        path = tuple(path)
+        names = self.children(path)
+        level = self.levels[len(path)] if len(path) < len(self.levels) else 'Node'
+        table = pd.DataFrame([self.nodes[path + (name,)] for name in names], columns=ROLLUP_COLUMNS)
+        table.index = pd.Index(names, name=level)
+        return table
+
+    @staticmethod
+    def _labels(df, level):
+        """Level values as strings, with a label for missing ones."""
+        missing = MISSING_LABELS.get(level, DEFAULT_MISSING_LABEL)
+        values = df[level].astype(str).str.strip().to_numpy(dtype=object)
+        blank = df[level].isna().to_numpy() | (values == '')
+        values[blank] = missing
+        return values
+
+    @staticmethod
+    def _stats(measures, by=None):
+        """Rollup statistics of every group of measures (one row for the root)."""
+        grouped = measures.groupby(by, sort=False) if by else measures.groupby(np.zeros(len(measures), dtype=int))
+        stats = grouped.agg(
+            **{
+                'Tickets': ('age', 'size'),
+                'Avg Age': ('age', 'mean'),
+                'Median Age': ('age', 'median'),
+                'Max Age': ('age', 'max'),
+                'SLA Issues': ('sla_issue', 'sum'),
+                'SLA At Risk': ('sla_at_risk', 'sum')
+            }
+        )
+        for col in ['Avg Age', 'Median Age', 'Max Age']:
+            stats[col] = stats[col].round(1)
+        if stats.empty and not by:
+            stats.loc[0] = [0, np.nan, np.nan, np.nan, 0, 0]
+        return stats
+
+def build_rollups(df, hierarchies=None, now=None):
+    """
+    Roll up the tickets along every drill-down hierarchy.
+
+    Args:
+        df: Cleaned DataFrame of the tickets to roll up
+        hierarchies: Dictionary of name -> levels (defaults to HIERARCHIES)
+        now: Tz-aware time to measure SLA risk from; defaults to now
+
+    Returns:
+        Dictionary of hierarchy name -> HierarchyRollup, for hierarchies
+        with at least one level present in df
+    """
+    hierarchies = hierarchies or HIERARCHIES
+    return {
+        name: HierarchyRollup(df, levels, now)
+        for name, levels in hierarchies.items()
+        if any(level in df.columns for level in levels)
+    }
@@ -0,0 +1,369 @@
+import re
+import string
+import threading
+import numpy as np
+import pandas as pd
+
+# Columns whose text is searchable
+SEARCH_COLUMNS = ['Summary Description', 'Contact', 'Item', 'Vendor Tkt#']
+
+KEY_COLUMN = 'Selected_Sr_Service_Recid'
+
+# Integer ticket ID columns the index can be keyed on, in order of preference
+FALLBACK_KEY_COLUMNS = ['Ticket #']
+
+# Tokens are runs of characters between whitespace and ASCII punctuation,
+# so "[Case #00880250]" gives the tokens case and 00880250
+_SEPARATORS = str.maketrans({char: ' ' for char in string.punctuation})
+
+# Postings pack a ticket key and a token position into one integer
+POSITION_BITS = 12
+# Positions of each column start this far apart so phrases never span columns
+COLUMN_POSITIONS = 1 << (POSITION_BITS - 2)
+
+# Query terms: "quoted phrases" or single words, optionally ending in * for a prefix
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+def tokenize(text):
+    """Split text into lowercase search tokens."""
+    return str(text).lower().translate(_SEPARATORS).split()
+
+def parse_query(query):
+    """
+    Split a search query into terms.
+
+    Args:
+        query: Text typed into the search box, e.g. 'phish "case #0088" ws-12*'
+
+    Returns:
+        List of (tokens, prefix) tuples; prefix means the last token is a prefix
+    """
+    terms = []
+    for phrase, word in QUERY_PATTERN.findall(query):
+        text = phrase if phrase else word
+        prefix = not phrase and text.endswith('*')
+        tokens = tokenize(text)
+        if tokens:
+            terms.append((tokens, prefix))
+    return terms
+
+def search_key_column(df, preferred=KEY_COLUMN):
+    """
+    Column of integer ticket IDs to key the index on.
+
+    Args:
+        df: Cleaned DataFrame with the tickets
+        preferred: Column tried before the FALLBACK_KEY_COLUMNS
+
+    Returns:
+        Column name, or None if no column holds an integer ID for every ticket
+    """
+    for col in [preferred] + [col for col in FALLBACK_KEY_COLUMNS if col != preferred]:
+        if col not in df.columns:
+            continue
+        keys = pd.to_numeric(df[col], errors='coerce')
+        if keys.notna().all() and (keys == keys.round()).all():
+            return col
+    return None
+
+def _column_postings(keys, values, column_offset):
+    """
+    Tokens and packed (key, position) postings of one column.
+
+    Each distinct value is tokenized once; its tokens are then repeated for
+    every ticket sharing the value with array operations.
+    """
+    codes, distinct = pd.factorize(values)
+    token_lists = [tokenize(value) for value in distinct]
+    lengths = np.array([len(tokens) for tokens in token_lists], dtype=np.int64)
+    flat_tokens = np.array([token for tokens in token_lists for token in tokens], dtype=object)
+    starts = np.cumsum(lengths) - lengths
+
+    # Missing values (code -1) have no tokens
+    present = codes >= 0
+    keys, codes = keys[present], codes[present]
+    row_lengths = lengths[codes]
+    total = int(row_lengths.sum())
+    positions = np.arange(total) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+    token_index = np.repeat(starts[codes], row_lengths) + positions
+
+    positions = np.minimum(positions, COLUMN_POSITIONS - 1) + column_offset
+    postings = (np.repeat(keys, row_lengths) << POSITION_BITS) | positions
+    return flat_tokens[token_index], postings
+
+def _segment_from_postings(all_tokens, all_postings):
+    """Sort token occurrences into a segment: vocabulary, offsets and postings."""
+    if not all_tokens:
+        return {'vocabulary': np.array([], dtype=object), 'offsets': np.zeros(1, dtype=np.int64),
+                'postings': np.array([], dtype=np.int64)}
+
+    token_ids, vocabulary = pd.factorize(np.concatenate(all_tokens), sort=True)
+    postings = np.concatenate(all_postings)
+    # Sorted by token, then by posting, so lookups can skip sorting
+    order = np.lexsort((postings, token_ids))
+    return {
+        'vocabulary': np.asarray(vocabulary, dtype=object),
+        'offsets': np.searchsorted(token_ids[order], np.arange(len(vocabulary) + 1)),
+        'postings': postings[order]
+    }
+
+def _sorted_unique(values):
+    """Distinct values of a sorted array."""
+    if len(values) == 0:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+def _sorted_intersect(left, right):
+    """Values of sorted array left that also appear in sorted array right."""
+    if len(left) == 0 or len(right) == 0:
+        return left[:0]
+    # Binary search the smaller array's values in the larger one
+    if len(left) > len(right):
+        left, right = right, left
+    positions = np.minimum(np.searchsorted(right, left), len(right) - 1)
+    return left[right[positions] == left]
+
+def _build_segment(keys, frame, columns):
+    """Posting lists of one batch of tickets."""
+    all_tokens, all_postings = [], []
+    for column_number, col in enumerate(columns):
+        if col not in frame.columns:
+            continue
+        tokens, postings = _column_postings(keys, frame[col], column_number * COLUMN_POSITIONS)
+        all_tokens.append(tokens)
+        all_postings.append(postings)
+    return _segment_from_postings(all_tokens, all_postings)
+
+class SearchIndex:
+    """
+    Positional token inverted index over the searchable ticket text.
+
+    Each batch of indexed tickets becomes a segment of posting lists (a
+    sorted token vocabulary with the packed ticket key and position of
+    every occurrence), so updates only tokenize the changed tickets. A
+    ticket's latest segment owns it; older postings of updated or removed
+    tickets are skipped at query time and dropped by compact(). Phrases
+    are matched by shifting positions, without looking at the text again.
+    """
+
+    def __init__(self, columns=SEARCH_COLUMNS, key_column=KEY_COLUMN, max_segments=8):
+        self.columns = list(columns)
+        self.key_column = key_column
+        self.max_segments = max_segments
+        self.segments = {}
+        # Ticket key -> segment holding its postings, and hash of its searchable columns
+        self.owner = pd.Series(dtype=np.int64)
+        self.hashes = pd.Series(dtype=np.uint64)
+        # Segment -> number of its tickets that were updated or removed since
+        self.dead = {}
+        # Column the indexed keys come from (None when the data had no usable ID)
+        self.indexed_column = None
+        self._next_segment = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.owner)
+
+    def copy(self):
+        """
+        Independent index over the same tickets, sharing the segment arrays.
+
+        Segments are never changed once built, and owner and hashes are
+        replaced rather than changed in place, so only the dictionaries
+        have to be copied; updating the copy leaves this index as it is.
+        """
+        with self._lock:
+            index = SearchIndex(self.columns, self.key_column, self.max_segments)
+            index.segments = dict(self.segments)
+            index.dead = dict(self.dead)
+            index.owner = self.owner
+            index.hashes = self.hashes
+            index.indexed_column = self.indexed_column
+            index._next_segment = self._next_segment
+            return index
+
+    def build(self, df):
+        """Index a whole dataset from scratch."""
+        with self._lock:
+            self._clear()
+            self.update(df)
+
+    def update(self, df, rows=None):
+        """
+        Bring the index in line with a new version of the dataset.
+
+        Only tickets whose searchable columns changed, and new tickets, are
+        tokenized again; tickets missing from df are removed. Tickets are
+        keyed on key_column, or on 'Ticket #' when an export lacks it (see
+        indexed_column); without an integer ID column the index is emptied.
+
+        Args:
+            df: Cleaned DataFrame with the current tickets
+            rows: Positions of the only rows that can have changed since the
+                last update (optional); the text of the other rows is then
+                neither hashed nor compared
+
+        Returns:
+            Number of tickets (re)indexed
+        """
+        key = search_key_column(df, self.key_column)
+        if key is None:
+            with self._lock:
+                self._clear()
+            return 0
+
+        all_keys = pd.Index(pd.to_numeric(df[key]).to_numpy(dtype=np.int64))
+        if rows is not None and key == self.indexed_column:
+            source, keys = df.iloc[rows], all_keys[rows]
+        else:
+            source, keys = df, all_keys
+        frame = source[[col for col in self.columns if col in source.columns]]
+        frame.index = keys
+        frame = frame[~frame.index.duplicated(keep='last')]
+        hashes = pd.util.hash_pandas_object(frame.astype(str), index=False)
+
+        with self._lock:
+            if key != self.indexed_column:
+                # Keys of another column can't be compared with the indexed ones
+                self._clear()
+                self.indexed_column = key
+            previous = self.hashes.reindex(hashes.index)
+            changed = (previous.isna() | (previous != hashes)).to_numpy()
+            self._remove(self.hashes.index.difference(all_keys))
+            if changed.any():
+                self._add(frame[changed], hashes[changed])
+            if len(self.segments) > self.max_segments:
+                self.compact()
+            return int(changed.sum())
+
+    def remove(self, keys):
+        """Drop tickets from the index."""
+        with self._lock:
+            self._remove(pd.Index(keys))
+
+    def compact(self):
+        """Merge all segments into one without superseded postings."""
+        with self._lock:
+            if len(self.segments) <= 1 and not any(self.dead.values()):
+                return
+            all_tokens, all_postings = [], []
+            for segment_id, segment in self.segments.items():
+                tokens = np.repeat(segment['vocabulary'], np.diff(segment['offsets']))
+                postings = segment['postings']
+                live = self.owner.reindex(postings >> POSITION_BITS).to_numpy() == segment_id
+                all_tokens.append(tokens[live])
+                all_postings.append(postings[live])
+
+            segment_id = self._next_segment
+            self._next_segment += 1
+            self.segments = {segment_id: _segment_from_postings(all_tokens, all_postings)}
+            self.dead = {segment_id: 0}
+            self.owner = pd.Series(segment_id, index=self.owner.index, dtype=np.int64)
+
+    def search(self, query):
+        """
+        Find the tickets matching every term of a query.
+
+        Args:
+            query: Words, "quoted phrases" and prefix* terms, all required
+
+        Returns:
+            Sorted array of matching ticket keys (None for an empty query)
+        """
+        terms = parse_query(query)
+        if not terms:
+            return None
+
+        with self._lock:
+            # Rarest terms first keeps the intersections small
+            term_keys = sorted((self._term_keys(tokens, prefix) for tokens, prefix in terms), key=len)
+            result = term_keys[0]
+            for keys in term_keys[1:]:
+                if len(result) == 0:
+                    break
+                result = _sorted_intersect(result, keys)
+            return result
+
+    def _term_keys(self, tokens, prefix):
+        """Keys of tickets containing the tokens of a term next to each other."""
+        matches = self._postings(tokens[0], prefix and len(tokens) == 1)
+        for i, token in enumerate(tokens[1:], start=1):
+            # Keep occurrences followed by the next token at the next position
+            following = self._postings(token, prefix and i == len(tokens) - 1)
+            matches = _sorted_intersect(matches + 1, following)
+            if len(matches) == 0:
+                break
+        return _sorted_unique(matches >> POSITION_BITS)
+
+    def _postings(self, token, is_prefix=False):
+        """Live postings of a token (or of every token starting with it)."""
+        found = []
+        for segment_id, segment in self.segments.items():
+            vocabulary = segment['vocabulary']
+            start = np.searchsorted(vocabulary, token, side='left')
+            if is_prefix:
+                end = np.searchsorted(vocabulary, token + '￿', side='left')
+            else:
+                end = start + 1 if start < len(vocabulary) and vocabulary[start] == token else start
+            if end <= start:
+                continue
+
+            postings = segment['postings'][segment['offsets'][start]:segment['offsets'][end]]
+            # Only the segment that owns a ticket answers for it
+            if self.dead.get(segment_id):
+                owners = self.owner.reindex(postings >> POSITION_BITS).to_numpy()
+                postings = postings[owners == segment_id]
+            found.append(postings)
+
+        if not found:
+            return np.array([], dtype=np.int64)
+        # One exact token in one segment is already sorted
+        if len(found) == 1 and not is_prefix:
+            return found[0]
+        return np.sort(np.concatenate(found))
+
+    def _clear(self):
+        """Forget every indexed ticket."""
+        self.segments, self.dead = {}, {}
+        self.owner = pd.Series(dtype=np.int64)
+        self.hashes = pd.Series(dtype=np.uint64)
+        self.indexed_column = None
+
+    def _add(self, frame, hashes):
+        """Index a batch of tickets as a new segment."""
+        if len(frame) == 0:
+            return
+        keys = frame.index.to_numpy(dtype=np.int64)
+        self._mark_dead(frame.index)
+
+        segment_id = self._next_segment
+        self._next_segment += 1
+        self.segments[segment_id] = _build_segment(keys, frame, self.columns)
+        self.dead[segment_id] = 0
+
+        new_owner = pd.Series(segment_id, index=frame.index, dtype=np.int64)
+        self.owner = pd.concat([self.owner.drop(frame.index, errors='ignore'), new_owner])
+        self.hashes = pd.concat([self.hashes.drop(frame.index, errors='ignore'), hashes.astype(np.uint64)])
+
+    def _remove(self, keys):
+        """Forget tickets; their postings are skipped until the next compaction."""
+        if len(keys) == 0:
+            return
+        self._mark_dead(keys)
+        self.owner = self.owner.drop(keys, errors='ignore')
+        self.hashes = self.hashes.drop(keys, errors='ignore')
+
+        # Segments that no longer own any ticket can go right away
+        live = set(np.unique(self.owner.to_numpy()).tolist())
+        for segment_id in [segment_id for segment_id in self.segments if segment_id not in live]:
+            del self.segments[segment_id]
+            del self.dead[segment_id]
+
+    def _mark_dead(self, keys):
+        """Count tickets leaving the segments that currently own them."""
+        owners = self.owner.reindex(keys).dropna().astype(np.int64)
+        for segment_id, count in owners.value_counts().items():
+            self.dead[segment_id] = self.dead.get(segment_id, 0) + int(count)
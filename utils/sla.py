@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+# "Plan by Tue 03/18 5:28 PM UTC+05:30 Tue 03/18 7:58 AM EDT": the first
+# deadline carries an explicit UTC offset, so it is the one we parse
+SLA_DEADLINE_PATTERN = (
+    r'^(?P<kind>Plan|Resolve) by \w{3} (?P<date>\d{1,2}/\d{1,2}) '
+    r'(?P<time>\d{1,2}:\d{2} [AP]M) UTC(?P<sign>[+-])(?P<hours>\d{1,2}):(?P<minutes>\d{2})'
+)
+
+def parse_sla_deadlines(sla_status, reference=None):
+    """
+    Extract SLA deadlines from the export's SLA Status text in one pass.
+
+    The export leaves out the year, so each deadline gets the year that puts
+    it closest to the reference time (deadlines across New Year work out).
+
+    Args:
+        sla_status: Series with the raw SLA Status text
+        reference: Timestamp the export was taken around; defaults to now
+
+    Returns:
+        DataFrame with 'SLA Kind' ('Plan', 'Resolve' or NaN) and
+        'SLA Deadline' (tz-aware UTC timestamps, NaT without a deadline)
+    """
+    parts = sla_status.astype(str).str.extract(SLA_DEADLINE_PATTERN)
+
+    if reference is None or pd.isna(reference):
+        reference = pd.Timestamp.now(tz='UTC')
+    reference = pd.Timestamp(reference)
+    if reference.tzinfo is None:
+        reference = reference.tz_localize('UTC')
+
+    # Parse with the reference year, then move deadlines more than half a year away
+    local = pd.to_datetime(
+        str(reference.year) + '/' + parts['date'] + ' ' + parts['time'],
+        format='%Y/%m/%d %I:%M %p',
+        errors='coerce'
+    )
+    offset = pd.to_timedelta(parts['hours'].astype(float) * 60 + parts['minutes'].astype(float), unit='min')
+    offset = offset.where(parts['sign'] != '-', -offset)
+    deadline = (local - offset).dt.tz_localize('UTC')
+
+    half_year = pd.Timedelta(days=183)
+    deadline = deadline.where(deadline - reference <= half_year, deadline - pd.DateOffset(years=1))
+    deadline = deadline.where(reference - deadline <= half_year, deadline + pd.DateOffset(years=1))
+
+    return pd.DataFrame({
+        'SLA Kind': parts['kind'],
+        'SLA Deadline': deadline
+    }, index=sla_status.index)
+
+def time_to_breach(df, now=None):
+    """
+    Time left until each ticket's SLA deadline, negative once breached.
+
+    Args:
+        df: Cleaned DataFrame with an 'SLA Deadline' column
+        now: Tz-aware timestamp to measure from; defaults to now
+
+    Returns:
+        Series of Timedeltas (NaT for tickets without a deadline)
+    """
+    now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+    if 'SLA Deadline' not in df.columns:
+        return pd.Series(pd.NaT, index=df.index, dtype='timedelta64[ns]')
+    return df['SLA Deadline'] - now
+
+def breached_mask(df, now=None):
+    """Boolean mask of tickets whose SLA deadline has passed."""
+    return (time_to_breach(df, now) < pd.Timedelta(0)).fillna(False).astype(bool)
+
+class SlaBreachIndex:
+    """
+    Tickets ordered by SLA deadline for instant breach-window lookups.
+
+    The deadlines are sorted once when the index is built; every query is
+    then two binary searches, so "breaching in the next N hours" costs the
+    same whatever the board size. Rebuild it when the dataset changes.
+    """
+
+    def __init__(self, df):
+        if 'SLA Deadline' in df.columns:
+            deadlines = df['SLA Deadline'].dropna()
+        else:
+            deadlines = pd.Series([], dtype='datetime64[ns, UTC]')
+        order = np.argsort(deadlines.to_numpy(dtype='datetime64[ns]'), kind='stable')
+        self.deadlines = deadlines.to_numpy(dtype='datetime64[ns]')[order]
+        self.labels = deadlines.index.to_numpy()[order]
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def between(self, start, end):
+        """
+        Row labels of tickets with a deadline in [start, end).
+
+        Args:
+            start: Tz-aware timestamp (or None for the earliest deadline)
+            end: Tz-aware timestamp (or None for the latest deadline)
+
+        Returns:
+            Array of row labels in deadline order
+        """
+        low = 0 if start is None else np.searchsorted(self.deadlines, self._as_utc(start), side='left')
+        high = len(self.deadlines) if end is None else np.searchsorted(self.deadlines, self._as_utc(end), side='left')
+        return self.labels[low:high]
+
+    def breaching_within(self, hours, now=None):
+        """Row labels of tickets that breach within the next given number of hours."""
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        return self.between(now, now + pd.Timedelta(hours=hours))
+
+    def breached(self, now=None):
+        """Row labels of tickets already past their deadline, oldest breach first."""
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        return self.between(None, now)
+
+    @staticmethod
+    def _as_utc(timestamp):
+        """Timestamp as naive UTC datetime64 for comparison with the sorted array."""
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+        return np.datetime64(timestamp.to_datetime64(), 'ns')
@@ -0,0 +1,154 @@
+import pandas as pd
+import numpy as np
+
+from utils.categorizer import CATEGORY_COLUMN
+from utils.data_processor import DERIVED_COLUMNS
+
+# Columns whose changes are called out individually in the change table
+TRACKED_CHANGE_COLUMNS = ['Status', 'Resources', 'Priority']
+
+# Columns carried into the change table for context
+CONTEXT_COLUMNS = ['Ticket #', 'Company', 'Summary Description']
+
+# Columns computed from other columns or across tickets, left out of the fingerprints
+FINGERPRINT_IGNORED_COLUMNS = DERIVED_COLUMNS + [CATEGORY_COLUMN]
+
+def fingerprint_rows(df, key_column='Selected_Sr_Service_Recid', ignore=FINGERPRINT_IGNORED_COLUMNS):
+    """
+    Hash each cleaned row into a 64-bit fingerprint keyed by ticket ID.
+
+    Derived columns are left out, so a ticket only counts as updated when
+    a column of the export itself changed.
+
+    Args:
+        df: DataFrame with the cleaned Connectwise data
+        key_column: Column that uniquely identifies a ticket
+        ignore: Columns that don't take part in the fingerprint
+
+    Returns:
+        Series of uint64 fingerprints indexed by ticket key
+    """
+    if key_column not in df.columns:
+        raise KeyError(f"Snapshot has no '{key_column}' column")
+
+    # Keep the latest row if a ticket appears twice in one export
+    unique_df = df.drop_duplicates(subset=key_column, keep='last')
+
+    # hash_pandas_object factorizes object columns first, so each distinct
+    # string is hashed once and rows are combined with vectorized arithmetic
+    hashes = pd.util.hash_pandas_object(
+        unique_df.drop(columns=[key_column] + [col for col in ignore if col in unique_df.columns]),
+        index=False, categorize=True
+    )
+    return pd.Series(hashes.to_numpy(), index=unique_df[key_column].to_numpy(), name='fingerprint')
+
+def diff_snapshots(old_df, new_df, key_column='Selected_Sr_Service_Recid',
+                   old_fingerprints=None, new_fingerprints=None):
+    """
+    Find new, closed and updated tickets between two cleaned snapshots.
+
+    Args:
+        old_df: DataFrame with the previous cleaned export
+        new_df: DataFrame with the latest cleaned export
+        key_column: Column that uniquely identifies a ticket
+        old_fingerprints: Precomputed fingerprints of old_df (optional)
+        new_fingerprints: Precomputed fingerprints of new_df (optional)
+
+    Returns:
+        DataFrame with one row per changed ticket
+    """
+    if old_fingerprints is None:
+        old_fingerprints = fingerprint_rows(old_df, key_column)
+    if new_fingerprints is None:
+        new_fingerprints = fingerprint_rows(new_df, key_column)
+
+    # Outer hash join of the two fingerprint tables on the ticket key
+    joined = pd.merge(
+        old_fingerprints.rename('old_fp').rename_axis(key_column).reset_index(),
+        new_fingerprints.rename('new_fp').rename_axis(key_column).reset_index(),
+        on=key_column,
+        how='outer'
+    )
+
+    inserted = joined['old_fp'].isna()
+    deleted = joined['new_fp'].isna()
+    updated = ~inserted & ~deleted & (joined['old_fp'] != joined['new_fp'])
+
+    changed = joined.loc[inserted | deleted | updated, [key_column]].copy()
+    changed['Change'] = np.select(
+        [inserted[changed.index], deleted[changed.index]],
+        ['New', 'Closed'],
+        default='Updated'
+    )
+
+    if changed.empty:
+        return _empty_change_table(key_column)
+
+    # Only the changed tickets are looked up in the full snapshots
+    columns = CONTEXT_COLUMNS + TRACKED_CHANGE_COLUMNS
+    old_rows = _rows_for_keys(old_df, key_column, changed[key_column], columns)
+    new_rows = _rows_for_keys(new_df, key_column, changed[key_column], columns)
+
+    changes = changed.set_index(key_column)
+    for col in CONTEXT_COLUMNS:
+        changes[col] = new_rows[col].combine_first(old_rows[col])
+
+    # Flag which tracked fields moved on updated tickets
+    is_update = changes['Change'].eq('Updated').to_numpy()
+    changed_fields = pd.Series('', index=changes.index)
+    for col in TRACKED_CHANGE_COLUMNS:
+        old_values = old_rows[col]
+        new_values = new_rows[col]
+        changes[f'Old {col}'] = old_values
+        changes[f'New {col}'] = new_values
+
+        differs = ~((old_values == new_values) | (old_values.isna() & new_values.isna()))
+        differs = differs.to_numpy() & is_update
+        changed_fields[differs] = changed_fields[differs] + col + ', '
+
+    changes['Changed Fields'] = changed_fields.str.rstrip(', ')
+    # Updates outside the tracked columns are still reported
+    other = is_update & changes['Changed Fields'].eq('').to_numpy()
+    changes.loc[other, 'Changed Fields'] = 'Other'
+
+    return changes.reset_index()
+
+def summarize_changes(changes):
+    """
+    Summarize a change table into KPI counts.
+
+    Args:
+        changes: DataFrame returned by diff_snapshots
+
+    Returns:
+        Dictionary with counts of new, closed and updated tickets and per-field changes
+    """
+    summary = {
+        'new': int((changes['Change'] == 'New').sum()),
+        'closed': int((changes['Change'] == 'Closed').sum()),
+        'updated': int((changes['Change'] == 'Updated').sum())
+    }
+
+    fields = changes['Changed Fields'].fillna('')
+    for col in TRACKED_CHANGE_COLUMNS:
+        summary[f'{col.lower()}_changes'] = int(fields.str.contains(col, regex=False).sum())
+
+    return summary
+
+def _rows_for_keys(df, key_column, keys, columns):
+    """Look up the given columns for a set of ticket keys."""
+    available = [c for c in columns if c in df.columns]
+    rows = df.drop_duplicates(subset=key_column, keep='last').set_index(key_column)[available]
+    rows = rows.reindex(keys.to_numpy())
+    for col in columns:
+        if col not in rows.columns:
+            rows[col] = np.nan
+    return rows
+
+def _empty_change_table(key_column):
+    """Build an empty change table with the usual columns."""
+    columns = [key_column, 'Change'] + CONTEXT_COLUMNS
+    for col in TRACKED_CHANGE_COLUMNS:
+        columns += [f'Old {col}', f'New {col}']
+    columns.append('Changed Fields')
+    return pd.DataFrame(columns=columns)
@@ -0,0 +1,346 @@
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+from utils.filters import MULTI_ASSIGNEE_COLUMNS
+
+# Default location of the local analytics database
+DEFAULT_DB_PATH = os.environ.get('TICKET_DB_PATH', 'data/tickets.db')
+
+TICKETS_TABLE = 'tickets'
+
+# Prefix of the tables holding one session's tickets
+SESSION_TABLE_PREFIX = 'tickets_'
+
+# Seconds a session table is kept after its last use; Streamlit doesn't say when a session ends
+SESSION_TABLE_TTL = int(os.environ.get('TICKET_SESSION_TABLE_TTL', '3600'))
+
+# Statement parts an ad-hoc query may use; tables are checked separately
+QUERY_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+# Columns indexed for predicate and group-by pushdown
+INDEXED_COLUMNS = ['Company', 'Resources', 'Status', 'Last Update', 'Ticket #']
+
+# Example queries offered in the saved-query panel of a new database
+DEFAULT_SAVED_QUERIES = {
+    'Open tickets by company': (
+        'SELECT "Company", COUNT(*) AS tickets FROM tickets '
+        'GROUP BY "Company" ORDER BY tickets DESC'
+    ),
+    'Unassigned tickets by status': (
+        'SELECT "Status", COUNT(*) AS tickets FROM tickets '
+        'WHERE "Resources" IS NULL OR "Resources" = \'\' '
+        'GROUP BY "Status" ORDER BY tickets DESC'
+    ),
+    'Average age by resource': (
+        'SELECT "Resources", ROUND(AVG("Age"), 1) AS avg_age, COUNT(*) AS tickets '
+        'FROM tickets GROUP BY "Resources" ORDER BY avg_age DESC'
+    )
+}
+
+def quote_identifier(name):
+    """Quote a column name for SQLite."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+class TicketDatabase:
+    """
+    Embedded SQLite database holding cleaned tickets for pushed-down queries.
+
+    Filters built by ``utils.filters.build_filters`` are translated into a
+    WHERE clause, so filtering and counting run inside SQLite on indexed
+    columns instead of over a DataFrame held in memory.
+
+    One database is shared by every session, so each session loads its
+    tickets into its own table (see session_table) and passes that table to
+    the queries. Session tables not used for session_ttl seconds are
+    dropped the next time any session loads its tickets, and ad-hoc
+    queries can only read the caller's table. The single connection is
+    used from several threads and is guarded by a lock.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, session_ttl=SESSION_TABLE_TTL):
+        self.path = path
+        self.session_ttl = session_ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.RLock()
+        # Monotonic time of the last use of every session table
+        self._last_used = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS saved_queries (name TEXT PRIMARY KEY, sql TEXT NOT NULL)'
+        )
+        if self.conn.execute('SELECT COUNT(*) FROM saved_queries').fetchone()[0] == 0:
+            self.conn.executemany(
+                'INSERT INTO saved_queries (name, sql) VALUES (?, ?)',
+                DEFAULT_SAVED_QUERIES.items()
+            )
+        self.conn.commit()
+
+        # Session tables of an earlier run belong to sessions that no longer exist
+        for table in self.tables():
+            if table.startswith(SESSION_TABLE_PREFIX):
+                self.drop(table)
+
+    @staticmethod
+    def session_table(token):
+        """Name of the tickets table of one session, e.g. tickets_3f2a9c."""
+        return SESSION_TABLE_PREFIX + ''.join(c if c.isalnum() else '_' for c in str(token))
+
+    def tables(self):
+        """Names of the tables in the database."""
+        with self._lock:
+            rows = self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        return [row[0] for row in rows]
+
+    def drop(self, table):
+        """Remove a tickets table and its indexes."""
+        with self._lock:
+            self.conn.execute(f'DROP TABLE IF EXISTS {quote_identifier(table)}')
+            self.conn.commit()
+            self._last_used.pop(table, None)
+
+    def expire_session_tables(self, now=None):
+        """
+        Drop the session tables not used for more than session_ttl seconds.
+
+        Args:
+            now: time.monotonic() value to measure idle time from (defaults to now)
+
+        Returns:
+            Names of the dropped tables
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [table for table, used in self._last_used.items() if now - used > self.session_ttl]
+            for table in expired:
+                self.drop(table)
+        return expired
+
+    def _touch(self, table):
+        """Record the use of a session table."""
+        if table.startswith(SESSION_TABLE_PREFIX):
+            with self._lock:
+                self._last_used[table] = time.monotonic()
+
+    def load(self, df, table=TICKETS_TABLE, replace=True):
+        """
+        Load cleaned tickets into the database and index the filter columns.
+
+        Args:
+            df: DataFrame with the cleaned Connectwise data
+            table: Table to load into (one per session, see session_table)
+            replace: Replace the existing tickets instead of appending
+
+        Returns:
+            Number of rows loaded
+        """
+        stored_df = df.copy(deep=False)
+        # SQLite has no datetime type; ISO strings keep range comparisons correct
+        for col in stored_df.columns:
+            if pd.api.types.is_datetime64_any_dtype(stored_df[col]):
+                stored_df[col] = stored_df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+        with self._lock:
+            # Loading is rare enough to sweep out the tables of sessions that went away
+            self.expire_session_tables()
+            self._touch(table)
+            stored_df.to_sql(
+                table,
+                self.conn,
+                if_exists='replace' if replace else 'append',
+                index=False,
+                chunksize=50000
+            )
+
+            for col in INDEXED_COLUMNS:
+                if col in stored_df.columns:
+                    index_name = 'idx_' + table + '_' + ''.join(c if c.isalnum() else '_' for c in col.lower())
+                    self.conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS {quote_identifier(index_name)} '
+                        f'ON {quote_identifier(table)} ({quote_identifier(col)})'
+                    )
+            self.conn.commit()
+        return len(stored_df)
+
+    def has_tickets(self, table=TICKETS_TABLE):
+        """Check whether tickets have been loaded into a table."""
+        return table in self.tables()
+
+    def columns(self, table=TICKETS_TABLE):
+        """Column names of a tickets table."""
+        with self._lock:
+            rows = self.conn.execute(f'PRAGMA table_info({quote_identifier(table)})').fetchall()
+        return [row[1] for row in rows]
+
+    def fetch(self, filters=None, columns=None, limit=None, table=TICKETS_TABLE):
+        """
+        Fetch the tickets matching a filter dictionary.
+
+        Args:
+            filters: Dictionary returned by build_filters (optional)
+            columns: Columns to return (defaults to all)
+            limit: Maximum number of rows (optional)
+            table: Tickets table to read
+
+        Returns:
+            DataFrame with the matching tickets
+        """
+        self._touch(table)
+        where, params = self._where_clause(filters, table)
+        select = ', '.join(quote_identifier(c) for c in columns) if columns else '*'
+        sql = f'SELECT {select} FROM {quote_identifier(table)}{where}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+
+        with self._lock:
+            result = pd.read_sql_query(sql, self.conn, params=params)
+        for col in ('Last Update', 'Due Date', 'Next Date'):
+            if col in result.columns:
+                result[col] = pd.to_datetime(result[col], errors='coerce')
+        # SLA deadlines and the normalized '<column> UTC' dates are stored as UTC
+        for col in result.columns:
+            if col == 'SLA Deadline' or col.endswith(' UTC'):
+                result[col] = pd.to_datetime(result[col], errors='coerce', utc=True)
+        return result
+
+    def count_by(self, column, filters=None, limit=None, table=TICKETS_TABLE):
+        """
+        Count matching tickets per value of a column inside the database.
+
+        Tickets without a value are not counted, like pandas value_counts.
+
+        Args:
+            column: Column to group by
+            filters: Dictionary returned by build_filters (optional)
+            limit: Keep only the largest groups (optional)
+            table: Tickets table to read
+
+        Returns:
+            DataFrame with the column values and a 'Count' column, largest first
+        """
+        self._touch(table)
+        where, params = self._where_clause(filters, table)
+        quoted = quote_identifier(column)
+        where = (where + ' AND ' if where else ' WHERE ') + f'{quoted} IS NOT NULL'
+        sql = (
+            f'SELECT {quoted}, COUNT(*) AS "Count" FROM {quote_identifier(table)}{where} '
+            f'GROUP BY {quoted} ORDER BY "Count" DESC'
+        )
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        with self._lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def count(self, filters=None, table=TICKETS_TABLE):
+        """Count the tickets of a table matching a filter dictionary."""
+        self._touch(table)
+        where, params = self._where_clause(filters, table)
+        with self._lock:
+            return self.conn.execute(f'SELECT COUNT(*) FROM {quote_identifier(table)}{where}', params).fetchone()[0]
+
+    def run_query(self, sql, table=TICKETS_TABLE):
+        """
+        Run an ad-hoc read-only query.
+
+        The query can only read the given table, so one session can't see
+        the tickets of another.
+
+        Args:
+            sql: SELECT statement to run; 'tickets' refers to the given table
+            table: Tickets table the query runs against
+
+        Returns:
+            DataFrame with the query result
+
+        Raises:
+            pandas.errors.DatabaseError: If the query fails or reads another table
+        """
+        self._touch(table)
+        # A read-only connection keeps ad-hoc queries from changing the data
+        read_only = sqlite3.connect(f'file:{os.path.abspath(self.path)}?mode=ro', uri=True)
+        try:
+            if table != TICKETS_TABLE:
+                # Saved queries name 'tickets'; a temporary view points it at the session's table
+                read_only.execute(
+                    f'CREATE TEMP VIEW {TICKETS_TABLE} AS SELECT * FROM main.{quote_identifier(table)}'
+                )
+
+            # Only plain SELECTs over the session's table (or its view) get compiled
+            readable = {table, TICKETS_TABLE}
+            def authorize(action, name, column, database, source):
+                if action not in QUERY_ACTIONS:
+                    return sqlite3.SQLITE_DENY
+                if action == sqlite3.SQLITE_READ and name not in readable:
+                    return sqlite3.SQLITE_DENY
+                return sqlite3.SQLITE_OK
+            read_only.set_authorizer(authorize)
+            return pd.read_sql_query(sql, read_only)
+        finally:
+            read_only.close()
+
+    def saved_queries(self):
+        """Saved queries as a dictionary of name -> SQL."""
+        with self._lock:
+            return dict(self.conn.execute('SELECT name, sql FROM saved_queries ORDER BY name').fetchall())
+
+    def save_query(self, name, sql):
+        """Save or overwrite a named query."""
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO saved_queries (name, sql) VALUES (?, ?)', (name, sql)
+            )
+            self.conn.commit()
+
+    def delete_query(self, name):
+        """Remove a saved query."""
+        with self._lock:
+            self.conn.execute('DELETE FROM saved_queries WHERE name = ?', (name,))
+            self.conn.commit()
+
+    def _where_clause(self, filters, table=TICKETS_TABLE):
+        """Translate a filter dictionary into a WHERE clause and parameters."""
+        if not filters:
+            return '', []
+
+        available = set(self.columns(table))
+        conditions = []
+        params = []
+
+        if 'Last Update' in available:
+            if filters.get('date_min'):
+                conditions.append('"Last Update" >= ?')
+                params.append(pd.Timestamp(filters['date_min']).strftime('%Y-%m-%d %H:%M:%S'))
+            if filters.get('date_max'):
+                # Include the whole last day
+                day_after = pd.Timestamp(filters['date_max']) + pd.Timedelta(days=1)
+                conditions.append('"Last Update" < ?')
+                params.append(day_after.strftime('%Y-%m-%d %H:%M:%S'))
+
+        for col, value in filters.get('columns', {}).items():
+            if col not in available:
+                continue
+            if col in MULTI_ASSIGNEE_COLUMNS:
+                # Match an engineer anywhere in the comma-separated list, ignoring spaces
+                values = value if isinstance(value, list) else [value]
+                listed = "',' || REPLACE(" + quote_identifier(col) + ", ' ', '') || ','"
+                conditions.append('(' + ' OR '.join(f'{listed} LIKE ?' for _ in values) + ')')
+                params.extend('%,' + str(v).replace(' ', '') + ',%' for v in values)
+            elif isinstance(value, list):
+                placeholders = ', '.join('?' for _ in value)
+                conditions.append(f'CAST({quote_identifier(col)} AS TEXT) IN ({placeholders})')
+                params.extend(str(v) for v in value)
+            else:
+                # Compared as text, like the string comparison of the in-memory filters
+                conditions.append(f'CAST({quote_identifier(col)} AS TEXT) = ?')
+                params.append(str(value))
+
+        if filters.get('unassigned_only') and 'Resources' in available:
+            conditions.append('("Resources" IS NULL OR "Resources" = \'\')')
+
+        if not conditions:
+            return '', []
+        return ' WHERE ' + ' AND '.join(conditions), params
@@ -0,0 +1,264 @@
+import csv
+import numpy as np
+import pandas as pd
+
+from utils.connectwise_api import EXPORT_COLUMNS
+
+# Column headers as written by the Connectwise board export (duplicates included)
+EXPORT_HEADER = [col[:-2] if col.endswith('.1') else col for col in EXPORT_COLUMNS]
+
+PRIORITY_PATHS = {
+    'common/images/../../common/images/infoIcons/urgencyColors/lime.gif': 0.70,
+    'common/images/../../common/images/infoIcons/urgencyColors/yellow.gif': 0.14,
+    'common/images/../../common/images/infoIcons/urgencyColors/orange.gif': 0.05,
+    'common/images/../../common/images/infoIcons/urgencyColors/purple.gif': 0.11
+}
+
+SCHEDULE_PATHS = {
+    'common/images/infoIcons/SR4-schedule-past.gif': 0.43,
+    'common/images/infoIcons/SR6-schedule-today.gif': 0.40,
+    'common/images/infoIcons/SR8-schedule-future.gif': 0.14,
+    'common/images/infoIcons/SR2-person.gif': 0.03
+}
+
+STATUSES = {
+    'Ready to Schedule': 0.60,
+    'Waiting on Parts/Repair': 0.12,
+    'Working Ticket Now': 0.10,
+    'Waiting on Client~': 0.07,
+    'Scheduled Remote': 0.04,
+    'Done yet?': 0.03,
+    'Client Updated': 0.02,
+    'Manager Review': 0.01,
+    'Pending Closure~': 0.01
+}
+
+SUBTYPES = {
+    'Security': 0.54,
+    'App - Infection': 0.20,
+    'Software': 0.05,
+    'Other': 0.04,
+    'App - Security Suite': 0.04,
+    'Email / Office 365': 0.03,
+    'Workstation (LT, Desktop)': 0.03,
+    '': 0.07
+}
+
+ITEMS = {
+    '': 0.40,
+    'SIEM / SOC': 0.21,
+    'Fix': 0.20,
+    'Review': 0.06,
+    'Spam/Suspicious Email Filtering': 0.03,
+    'Review/Audit': 0.03,
+    'Workstation Replace/Upgrade': 0.02,
+    'Security Hardening - Generic': 0.05
+}
+
+SOURCES = {
+    'Phone': 0.83,
+    'Email': 0.11,
+    'Alert': 0.03,
+    'Service Template': 0.01,
+    'Portal': 0.01,
+    'Internal': 0.01
+}
+
+TIME_ZONES = {
+    'US Eastern (UTC-04)': 0.75,
+    'US Arizona (UTC-07)': 0.08,
+    'US Pacific (UTC-07)': 0.08,
+    'US Central (UTC-05)': 0.01,
+    '': 0.08
+}
+
+SUMMARY_TEMPLATES = [
+    '[Phish Alert] USA Helpdesk: Re: New Case Opened [Case #{case}] - [Ticket #{ticket}] New Case Assigned ',
+    '[Phish Alert] {contact}: Suspicious sign-in on {host}',
+    'QPM|AV - Third party AV installed',
+    'QPM|AV - Threat detected on {host}',
+    'SOC Alert: Critical - Malware quarantined on {host}',
+    'Warning: Disk space low on {host}',
+    'Urgent: {company} user locked out',
+    'Review firewall rules for {company}',
+    'Endgame detection on {host} - investigate',
+    'Workstation replacement request for {contact}'
+]
+
+FIRST_NAMES = ['Joseph', 'Ranjana', 'Maria', 'David', 'Priya', 'James', 'Linda', 'Robert', 'Anita', 'Kevin']
+LAST_NAMES = ['Stevens', 'Sinha', 'Garcia', 'Moore', 'Patel', 'Hoover', 'Kumar', 'Archer', 'Chetty', 'Lee']
+COMPANY_WORDS = ['Health', 'Family', 'Medical', 'Surgery', 'Clinic', 'Engineering', 'Cardiology', 'Dental', 'Care', 'Partners']
+CITY_WORDS = ['Atlanta', 'Virginia', 'Castle', 'Benson', 'Willis', 'Old Bridge', 'Phoenix', 'Charlotte', 'Newark', 'Georgia']
+TERRITORIES = ['ATL-1', 'ATL-2', 'ATL-3', 'CLT-1', 'CLT-2', 'PHX-1', 'PHX-2', 'NWK-1', '']
+
+def _pick(rng, options, size):
+    """Draw values from a dictionary of value -> probability."""
+    values = np.array(list(options.keys()), dtype=object)
+    weights = np.array(list(options.values()), dtype=float)
+    return values[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+def _zipf_pick(rng, values, size, exponent=1.2):
+    """Draw values with a heavy head, like companies and resources on a real board."""
+    ranks = np.arange(1, len(values) + 1, dtype=float)
+    weights = ranks ** -exponent
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+def _format_export_dates(timestamps):
+    """Format timestamps like the export, e.g. "04/21/2025 7:54 pm"."""
+    series = pd.Series(timestamps)
+    hours = series.dt.hour % 12
+    hours = hours.where(hours != 0, 12).astype(str)
+    am_pm = np.where(series.dt.hour < 12, 'am', 'pm')
+    return (series.dt.strftime('%m/%d/%Y ') + hours + series.dt.strftime(':%M ') + am_pm).to_numpy()
+
+def _format_sla_times(timestamps, offset, label):
+    """Format SLA deadlines like "Wed 04/23 3:00 AM UTC+05:30"."""
+    series = pd.Series(timestamps) + pd.Timedelta(hours=offset)
+    hours = series.dt.hour % 12
+    hours = hours.where(hours != 0, 12).astype(str)
+    am_pm = np.where(series.dt.hour < 12, 'AM', 'PM')
+    return (series.dt.strftime('%a %m/%d ') + hours + series.dt.strftime(':%M ') + am_pm + ' ' + label).to_numpy()
+
+def generate_srboard(n_rows, seed=0, reference_date='2025-04-22 20:00', n_companies=None, n_resources=None):
+    """
+    Generate a realistic synthetic Connectwise board export.
+
+    Args:
+        n_rows: Number of tickets
+        seed: Random seed; the same seed always gives the same export
+        reference_date: Time the export is taken at
+        n_companies: Number of distinct companies (scales with n_rows by default)
+        n_resources: Number of distinct engineers (scales with n_rows by default)
+
+    Returns:
+        DataFrame with the raw export columns as pd.read_csv would return them
+    """
+    rng = np.random.default_rng(seed)
+    reference = pd.Timestamp(reference_date)
+
+    n_companies = n_companies or max(20, int(n_rows ** 0.6))
+    n_resources = n_resources or max(10, int(n_rows ** 0.35))
+
+    companies = [
+        f"{CITY_WORDS[i % len(CITY_WORDS)]} {COMPANY_WORDS[(i // len(CITY_WORDS)) % len(COMPANY_WORDS)]}"
+        + (f" {i // 100 + 1}" if i >= 100 else '')
+        for i in range(n_companies)
+    ]
+    resources = [
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)][0]}{LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+        + (str(i // 100) if i >= 100 else '')
+        for i in range(n_resources)
+    ]
+
+    recids = 8_400_000 + rng.choice(n_rows * 4, size=n_rows, replace=False)
+    recids.sort()
+
+    # Older tickets are rarer; ages are in days with one decimal like the export
+    ages = np.round(rng.lognormal(mean=1.5, sigma=1.3, size=n_rows), 1)
+    last_update = reference - pd.to_timedelta(
+        np.minimum(ages, rng.exponential(2.0, size=n_rows)) * 86400, unit='s'
+    )
+    last_update = last_update.floor('min')
+
+    company = _zipf_pick(rng, companies, n_rows)
+    contact = (
+        np.asarray(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n_rows)] + ' ' +
+        np.asarray(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n_rows)]
+    )
+
+    # Mostly single assignees, some pairs, a few unassigned tickets
+    primary = _zipf_pick(rng, resources, n_rows)
+    secondary = _zipf_pick(rng, resources, n_rows)
+    assignment = rng.random(n_rows)
+    resource_values = np.where(assignment < 0.05, '', primary)
+    multi = (assignment > 0.95) & (primary != secondary)
+    resource_values = np.where(multi, primary + ', ' + secondary, resource_values)
+
+    # Summaries from templates; the phishing templates produce near-duplicate storms
+    template_ids = rng.choice(len(SUMMARY_TEMPLATES), size=n_rows, p=[0.2, 0.1, 0.15, 0.1, 0.1, 0.08, 0.07, 0.08, 0.05, 0.07])
+    hosts = np.char.add('WS-', rng.integers(1000, 9999, n_rows).astype(str))
+    cases = np.char.zfill(rng.integers(0, 999999, n_rows).astype(str), 8)
+    summary = np.empty(n_rows, dtype=object)
+    for template_id, template in enumerate(SUMMARY_TEMPLATES):
+        rows = np.flatnonzero(template_ids == template_id)
+        summary[rows] = [
+            template.format(case=cases[i], ticket=ticket_no, host=hosts[i], contact=contact[i], company=company[i])
+            for i, ticket_no in zip(rows, rng.integers(1000, 9999, len(rows)))
+        ]
+
+    # SLA text: waiting, blank, or a plan/resolve deadline shown in two zones
+    deadlines = (last_update + pd.to_timedelta(rng.integers(-48, 96, n_rows), unit='h')).floor('min')
+    sla_kind = rng.choice(4, size=n_rows, p=[0.21, 0.06, 0.63, 0.10])
+    deadline_text = (
+        _format_sla_times(deadlines, 9.5, 'UTC+05:30') + ' ' + _format_sla_times(deadlines, 0, 'EDT')
+    )
+    sla_status = np.select(
+        [sla_kind == 0, sla_kind == 1, sla_kind == 2],
+        ['Waiting', '', 'Plan by ' + deadline_text],
+        default='Resolve by ' + deadline_text
+    )
+
+    next_date = (last_update.normalize() + pd.to_timedelta(rng.integers(-7, 3, n_rows), unit='D'))
+    next_date_text = np.where(rng.random(n_rows) < 0.05, '', pd.Series(next_date).dt.strftime('%m/%d/%Y 12:00 am'))
+
+    hours = np.round(np.where(rng.random(n_rows) < 0.6, 0, rng.gamma(1.5, 0.5, n_rows)) * 4) / 4
+    budget = np.round(np.where(rng.random(n_rows) < 0.65, 0, rng.choice([0.5, 1.0, 1.0, 2.5], n_rows)), 2)
+
+    data = {
+        'Selected_Sr_Service_Recid': recids,
+        'Ticket #': recids,
+        'Priority': _pick(rng, PRIORITY_PATHS, n_rows),
+        'Age': ages.astype(str),
+        'Status': _pick(rng, STATUSES, n_rows),
+        'Schedule': _pick(rng, SCHEDULE_PATHS, n_rows),
+        'Company': company,
+        'Summary Description': summary,
+        'Resources': resource_values,
+        'Total Hours': np.char.mod('%.2f', hours),
+        'Budget': np.char.mod('%.2f', budget),
+        'SLA Status': sla_status,
+        'Contact': contact,
+        'Subtype': _pick(rng, SUBTYPES, n_rows),
+        'Item': _pick(rng, ITEMS, n_rows),
+        'Last Update': _format_export_dates(last_update),
+        'Due Date': '',
+        'Next Date': next_date_text,
+        'Board Icon': '',
+        'Site Time Zone': _pick(rng, TIME_ZONES, n_rows),
+        'Site': 'Main',
+        'Level': '0',
+        'Source': _pick(rng, SOURCES, n_rows),
+        'Customer Updated': 'False',
+        'Escalated From Client IT': 'false',
+        'Assign to Tech Bench': '',
+        'Required Skill Level': '',
+        'Solution Design ': '',
+        'Vendor Tkt#': '',
+        'Territory Team': _pick(rng, dict.fromkeys(TERRITORIES, 1.0), n_rows),
+        'Change Mgmt Date': '',
+        'Change Mgmt Time': '',
+        'Change Mgmt Date.1': '',
+        'Change Mgmt Time.1': ''
+    }
+    return pd.DataFrame(data, columns=EXPORT_COLUMNS)
+
+def write_srboard_csv(path, n_rows, seed=0, **kwargs):
+    """
+    Write a synthetic export to disk in the board's CSV format.
+
+    Args:
+        path: Output file path
+        n_rows: Number of tickets
+        seed: Random seed
+        **kwargs: Passed on to generate_srboard
+
+    Returns:
+        The generated DataFrame
+    """
+    df = generate_srboard(n_rows, seed=seed, **kwargs)
+    # The export quotes every field and repeats the change management headers
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(EXPORT_HEADER)
+        writer.writerows(df.itertuples(index=False, name=None))
+    return df
@@ -0,0 +1,465 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+import requests
+
+from utils.kpis import numeric_age, sla_issue_mask, unassigned_mask
+from utils.sla import time_to_breach
+from utils.workload import open_mask
+
+# Rules evaluated when no TICKET_THRESHOLD_RULES file is configured. Each
+# rule keeps the tickets matching "where", groups them by "group_by" (all
+# tickets together when missing), reduces each group with "stat" over a
+# "measure", and fires for the groups where the value passes "op" threshold.
+# "compare": "increase" tests the change since the previous evaluation.
+DEFAULT_THRESHOLD_RULES = [
+    {
+        'name': 'Unassigned tickets per company',
+        'where': {'unassigned': True},
+        'group_by': 'Company',
+        'stat': 'count',
+        'op': '>',
+        'threshold': 5
+    },
+    {
+        'name': 'Urgent ticket aging',
+        'where': {'Priority': ['Urgent'], 'open': True},
+        'group_by': 'Ticket #',
+        'stat': 'max',
+        'measure': 'age',
+        'op': '>',
+        'threshold': 3
+    },
+    {
+        'name': 'Team SLA risk spike',
+        'group_by': 'Territory Team',
+        'stat': 'sum',
+        'measure': 'sla_at_risk',
+        'compare': 'increase',
+        'op': '>=',
+        'threshold': 3
+    }
+]
+
+# Tickets breaching within this many hours count toward sla_at_risk
+SLA_RISK_HOURS = 24
+
+COMPARISONS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+STATS = ['count', 'sum', 'mean', 'max', 'min']
+
+# Per-ticket measures computed by ticket_measures()
+MEASURES = ['age', 'unassigned', 'open', 'sla_issue', 'sla_at_risk', 'hours']
+
+DEFAULT_ALERT_LOG = 'data/alerts.log'
+
+# State changes kept in memory for the dashboard
+RECENT_EVENTS = 100
+
+def ticket_measures(df, now=None):
+    """
+    Per-ticket measures the rules can filter and aggregate on.
+
+    Args:
+        df: Cleaned DataFrame
+        now: Tz-aware time SLA deadlines are measured from; defaults to now
+
+    Returns:
+        Dictionary of measure name -> numpy array aligned to df's rows
+    """
+    now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+    left = time_to_breach(df, now)
+    hours = pd.to_numeric(df['Total Hours'], errors='coerce') if 'Total Hours' in df.columns else pd.Series(np.nan, index=df.index)
+    return {
+        'age': numeric_age(df).to_numpy(dtype=float),
+        'unassigned': unassigned_mask(df).to_numpy(dtype=bool),
+        'open': open_mask(df),
+        'sla_issue': sla_issue_mask(df, now).to_numpy(dtype=bool),
+        'sla_at_risk': ((left >= pd.Timedelta(0)) & (left < pd.Timedelta(hours=SLA_RISK_HOURS))).to_numpy(dtype=bool),
+        'hours': hours.to_numpy(dtype=float)
+    }
+
+class ThresholdRule:
+    """
+    One declarative threshold rule, validated and compiled once.
+
+    The "where" conditions become a list of (name, test) pairs; a measure is
+    compared to a number (or matched to a bool), and a column is matched
+    against its allowed values through a lookup over its distinct values.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Dictionary with 'name', 'stat', 'op', 'threshold' and
+                optionally 'where', 'group_by', 'measure' and 'compare'
+        """
+        self.name = config.get('name')
+        if not self.name:
+            raise ValueError("Every threshold rule needs a name")
+        self.group_by = config.get('group_by')
+        self.stat = config.get('stat', 'count')
+        self.measure = config.get('measure')
+        self.op = config.get('op', '>')
+        self.threshold = float(config['threshold'])
+        self.compare = config.get('compare', 'value')
+
+        if self.stat not in STATS:
+            raise ValueError(f"Rule '{self.name}': stat must be one of {', '.join(STATS)}")
+        if self.stat != 'count' and self.measure not in MEASURES:
+            raise ValueError(f"Rule '{self.name}': stat '{self.stat}' needs a measure from {', '.join(MEASURES)}")
+        if self.op not in COMPARISONS:
+            raise ValueError(f"Rule '{self.name}': op must be one of {', '.join(COMPARISONS)}")
+        if self.compare not in ('value', 'increase'):
+            raise ValueError(f"Rule '{self.name}': compare must be 'value' or 'increase'")
+
+        # Measure conditions are {op: number} or a bool; column conditions are value lists
+        self.conditions = []
+        for name, condition in (config.get('where') or {}).items():
+            if isinstance(condition, (dict, bool)) and name not in MEASURES:
+                raise ValueError(f"Rule '{self.name}': unknown measure '{name}'")
+            if isinstance(condition, dict):
+                for op, value in condition.items():
+                    if op not in COMPARISONS:
+                        raise ValueError(f"Rule '{self.name}': unknown comparison '{op}' on {name}")
+                    self.conditions.append((name, op, float(value)))
+            elif isinstance(condition, bool):
+                self.conditions.append((name, '==', condition))
+            else:
+                values = condition if isinstance(condition, list) else [condition]
+                self.conditions.append((name, 'in', frozenset(str(v).lower() for v in values)))
+
+    def columns(self):
+        """Dataset columns the rule reads (measures aside)."""
+        columns = [name for name, op, _ in self.conditions if op == 'in']
+        if self.group_by:
+            columns.append(self.group_by)
+        return columns
+
+    def describe(self):
+        """Human-readable condition, e.g. "count > 5 per Company"."""
+        value = f"{self.stat}({self.measure})" if self.measure else self.stat
+        if self.compare == 'increase':
+            value = f"increase in {value}"
+        scope = f" per {self.group_by}" if self.group_by else ''
+        return f"{value} {self.op} {self.threshold:g}{scope}"
+
+class AlertState:
+    """
+    Firing groups and last values of the rules for one source of data.
+
+    Transitions and increases are only meaningful between evaluations of
+    the same source, so the shared dataset and every session's own uploads
+    each keep a state of their own.
+    """
+
+    def __init__(self, source='shared'):
+        self.source = source
+        # Rule name -> {group: value} of the groups currently firing
+        self.active = {}
+        # Rule name -> Series of every group's value at the last evaluation
+        self.previous = {}
+        # Latest state changes, newest last
+        self.recent = deque(maxlen=RECENT_EVENTS)
+        self.last_evaluated = None
+
+    def active_frame(self):
+        """Groups currently firing, one row per rule and group."""
+        rows = [
+            {'Rule': name, 'Group': group, 'Value': value}
+            for name, groups in self.active.items()
+            for group, value in groups.items()
+        ]
+        return pd.DataFrame(rows, columns=['Rule', 'Group', 'Value'])
+
+class AlertEngine:
+    """
+    Threshold rules evaluated together over each refreshed dataset.
+
+    Per-ticket measures, the distinct values of every column a rule reads
+    and the group codes of every group_by column are computed once per
+    evaluation and shared by all rules; each rule is then a boolean mask
+    and one bincount. Only state changes are sent to the sinks: a group
+    fires when it starts passing its threshold and resolves when it stops,
+    not on every refresh in between. Events are handed to a delivery
+    thread, so a slow sink never holds up the thread that evaluated them.
+    """
+
+    def __init__(self, rules=None, sinks=None):
+        """
+        Args:
+            rules: List of rule dictionaries (defaults to DEFAULT_THRESHOLD_RULES)
+            sinks: Objects with a send(events) method to deliver state changes to
+        """
+        self.rules = [ThresholdRule(config) for config in (rules or DEFAULT_THRESHOLD_RULES)]
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Threshold rule names must be unique")
+        self.sinks = list(sinks or [])
+
+        # State of the shared dataset; other sources pass their own
+        self.state = AlertState()
+        self.last_error = None
+        self._lock = threading.Lock()
+
+        # Event batches waiting for the delivery thread
+        self._outbox = queue.Queue()
+        self._delivery_thread = None
+
+    @property
+    def active(self):
+        """Groups firing on the shared dataset, as rule name -> {group: value}."""
+        return self.state.active
+
+    @property
+    def recent(self):
+        """Latest state changes of the shared dataset, newest last."""
+        return self.state.recent
+
+    def evaluate(self, df, now=None, state=None):
+        """
+        Evaluate every rule over a dataset and send the state changes.
+
+        Args:
+            df: Cleaned DataFrame
+            now: Tz-aware evaluation time; defaults to now
+            state: AlertState of the source df comes from (defaults to the
+                shared dataset's)
+
+        Returns:
+            List of event dictionaries ('firing' or 'resolved') that changed state
+        """
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        state = self.state if state is None else state
+        with self._lock:
+            measures = ticket_measures(df, now)
+            columns = {}
+            for col in {col for rule in self.rules for col in rule.columns() if col in df.columns}:
+                # Missing values get code -1 and fall in no group
+                codes, values = pd.factorize(df[col])
+                columns[col] = (codes, pd.Index(values).astype(str))
+
+            events = []
+            for rule in self.rules:
+                values = self._rule_values(rule, df, measures, columns)
+                if values is None:
+                    continue
+                events.extend(self._transitions(rule, values, now, state))
+            state.recent.extend(events)
+            state.last_evaluated = now
+
+        if events:
+            self._send(events)
+        return events
+
+    def on_publish(self, snapshot):
+        """
+        SharedDataset listener evaluating every published dataset.
+
+        Errors are kept in last_error rather than raised, so a bad rule
+        never fails the refresh that published the data.
+        """
+        try:
+            self.evaluate(snapshot.data)
+        except Exception as e:
+            self.last_error = str(e)
+
+    def active_frame(self):
+        """Groups currently firing on the shared dataset, one row per rule and group."""
+        return self.state.active_frame()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued event batch has been handed to the sinks.
+
+        Returns:
+            True when the queue drained within the timeout
+        """
+        if timeout is None:
+            self._outbox.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._outbox.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _rule_values(self, rule, df, measures, columns):
+        """
+        Value of every group of a rule (a single '(all)' group without group_by).
+
+        Returns:
+            Series of values indexed by group, or None when the rule reads a
+            column the dataset doesn't have
+        """
+        if any(col not in columns for col in rule.columns()):
+            return None
+
+        mask = np.ones(len(df), dtype=bool)
+        for name, op, value in rule.conditions:
+            if op == 'in':
+                codes, distinct = columns[name]
+                allowed = np.append(distinct.str.lower().isin(value), False)
+                mask &= allowed[codes]
+            else:
+                mask &= COMPARISONS[op](measures[name], value)
+
+        if rule.group_by:
+            codes, groups = columns[rule.group_by]
+        else:
+            codes, groups = np.zeros(len(df), dtype=np.int64), pd.Index(['(all)'])
+        kept = mask & (codes >= 0)
+        group_codes = codes[kept]
+        counts = np.bincount(group_codes, minlength=len(groups)).astype(float)
+
+        if rule.stat == 'count':
+            values = counts
+        else:
+            measure = measures[rule.measure][kept].astype(float)
+            has_value = ~np.isnan(measure)
+            group_codes, measure = group_codes[has_value], measure[has_value]
+            if rule.stat in ('sum', 'mean'):
+                values = np.bincount(group_codes, weights=measure, minlength=len(groups))
+                if rule.stat == 'mean':
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        values = values / np.bincount(group_codes, minlength=len(groups))
+            else:
+                values = np.full(len(groups), -np.inf if rule.stat == 'max' else np.inf)
+                (np.maximum if rule.stat == 'max' else np.minimum).at(values, group_codes, measure)
+                values[~np.isfinite(values)] = np.nan
+            # Groups without matching tickets have no value to test
+            values = np.where(counts > 0, values, np.nan)
+        return pd.Series(values, index=groups)
+
+    def _transitions(self, rule, values, now, state):
+        """Firing and resolved events of one rule against its last state."""
+        tested = values
+        if rule.compare == 'increase':
+            previous = state.previous.get(rule.name)
+            state.previous[rule.name] = values
+            if previous is None:
+                # Nothing to compare the first evaluation with
+                tested = values * np.nan
+            else:
+                tested = values.fillna(0) - previous.reindex(values.index).fillna(0)
+
+        passing = tested.notna() & COMPARISONS[rule.op](tested.fillna(0).to_numpy(), rule.threshold)
+        firing = tested[passing]
+        was_firing = state.active.get(rule.name, {})
+        now_firing = {str(group): round(float(value), 2) for group, value in firing.items()}
+
+        events = []
+        for group, value in now_firing.items():
+            if group not in was_firing:
+                events.append(self._event(rule, group, value, 'firing', now, state.source))
+        for group, value in was_firing.items():
+            if group not in now_firing:
+                events.append(self._event(rule, group, value, 'resolved', now, state.source))
+        state.active[rule.name] = now_firing
+        return events
+
+    @staticmethod
+    def _event(rule, group, value, state, now, source):
+        """Alert event for one group of a rule."""
+        scope = f"{rule.group_by} {group}" if rule.group_by else 'All tickets'
+        verb = 'passed' if state == 'firing' else 'no longer passes'
+        return {
+            'rule': rule.name,
+            'group': group,
+            'state': state,
+            'source': source,
+            'value': value,
+            'condition': rule.describe(),
+            'time': now.isoformat(),
+            'message': f"{rule.name}: {scope} {verb} {rule.describe()} (value {value:g})"
+        }
+
+    def _send(self, events):
+        """Queue events for the delivery thread, starting it on first use."""
+        if not self.sinks:
+            return
+        with self._lock:
+            if self._delivery_thread is None:
+                self._delivery_thread = threading.Thread(target=self._deliver, name='alert-delivery', daemon=True)
+                self._delivery_thread.start()
+        self._outbox.put(events)
+
+    def _deliver(self):
+        """Hand queued event batches to every sink; one failing sink doesn't stop the others."""
+        while True:
+            events = self._outbox.get()
+            errors = []
+            for sink in self.sinks:
+                try:
+                    sink.send(events)
+                except Exception as e:
+                    errors.append(f"{type(sink).__name__}: {e}")
+            self.last_error = '; '.join(errors) or None
+            self._outbox.task_done()
+
+class LogSink:
+    """Append alert events to a local file, one JSON object per line."""
+
+    def __init__(self, path=DEFAULT_ALERT_LOG):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def send(self, events):
+        with self._lock, open(self.path, 'a') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+
+class WebhookSink:
+    """POST alert events as a JSON batch to a webhook URL."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, events):
+        response = self.session.post(self.url, json={'events': events}, timeout=self.timeout)
+        response.raise_for_status()
+
+def load_threshold_rules(path):
+    """Read a list of threshold rules from a JSON file."""
+    with open(path) as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError("The threshold rules file must hold a list of rules")
+    return rules
+
+def alert_engine_from_env():
+    """
+    Build the alert engine from TICKET_THRESHOLD_* and TICKET_ALERT_* variables.
+
+    TICKET_THRESHOLD_RULES points to a JSON list of rules (the defaults
+    otherwise). Events are appended to TICKET_ALERT_LOG (data/alerts.log
+    by default) and also POSTed to TICKET_ALERT_WEBHOOK when it is set.
+
+    Returns:
+        AlertEngine with a LogSink and optionally a WebhookSink
+    """
+    path = os.environ.get('TICKET_THRESHOLD_RULES')
+    rules = load_threshold_rules(path) if path else None
+
+    sinks = [LogSink(os.environ.get('TICKET_ALERT_LOG', DEFAULT_ALERT_LOG))]
+    if os.environ.get('TICKET_ALERT_WEBHOOK'):
+        sinks.append(WebhookSink(os.environ['TICKET_ALERT_WEBHOOK']))
+    return AlertEngine(rules, sinks)
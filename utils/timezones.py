@@ -0,0 +1,132 @@
+import os
+import re
+from datetime import timedelta, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+# Zone used for rows without a Site Time Zone
+DEFAULT_ZONE = os.environ.get('TICKET_DEFAULT_ZONE', 'America/New_York')
+
+# Zone the dashboard shows dates in and compares date ranges in
+DISPLAY_ZONE = os.environ.get('TICKET_DISPLAY_ZONE', DEFAULT_ZONE)
+
+# Export date columns holding wall times of the ticket's site
+SITE_DATE_COLUMNS = ['Last Update', 'Due Date', 'Next Date']
+
+# Connectwise zone names and the IANA zones they stand for
+ZONE_NAMES = {
+    'US Eastern': 'America/New_York',
+    'US Central': 'America/Chicago',
+    'US Mountain': 'America/Denver',
+    'US Arizona': 'America/Phoenix',
+    'US Pacific': 'America/Los_Angeles',
+    'US Alaska': 'America/Anchorage',
+    'US Hawaii': 'Pacific/Honolulu',
+    'India': 'Asia/Kolkata'
+}
+
+ZONE_LABEL_PATTERN = re.compile(r'^(?P<name>.*?)\s*\(UTC(?P<sign>[+-])(?P<hours>\d{1,2})(?::?(?P<minutes>\d{2}))?\)\s*$')
+
+def parse_zone_label(label):
+    """
+    Turn a Site Time Zone label like "US Eastern (UTC-04)" into a time zone.
+
+    Known zone names map to their IANA zone so daylight saving time is
+    handled; unknown names fall back to the fixed UTC offset in the label.
+
+    Args:
+        label: Site Time Zone value (blank or NaN for the default zone)
+
+    Returns:
+        tzinfo object
+    """
+    if label is None or pd.isna(label) or not str(label).strip():
+        return ZoneInfo(DEFAULT_ZONE)
+
+    label = str(label).strip()
+    match = ZONE_LABEL_PATTERN.match(label)
+    name = match.group('name') if match else label
+    if name in ZONE_NAMES:
+        return ZoneInfo(ZONE_NAMES[name])
+    if match:
+        minutes = int(match.group('hours')) * 60 + int(match.group('minutes') or 0)
+        sign = -1 if match.group('sign') == '-' else 1
+        return timezone(timedelta(minutes=sign * minutes), name or None)
+    return ZoneInfo(DEFAULT_ZONE)
+
+def zone_groups(zone_labels):
+    """
+    Group rows by time zone, parsing each distinct label only once.
+
+    Args:
+        zone_labels: Series of Site Time Zone labels
+
+    Returns:
+        Dictionary of tzinfo -> array of row positions
+    """
+    codes, labels = pd.factorize(zone_labels, use_na_sentinel=True)
+    groups = {}
+    # Position -1 holds the rows without a label
+    for code, label in [(-1, None)] + list(enumerate(labels)):
+        positions = np.flatnonzero(codes == code)
+        if len(positions) == 0:
+            continue
+        zone = parse_zone_label(label)
+        if zone in groups:
+            groups[zone] = np.concatenate([groups[zone], positions])
+        else:
+            groups[zone] = positions
+    return groups
+
+def display_now():
+    """Current wall time in the display zone, as a naive Timestamp."""
+    return pd.Timestamp.now(tz=DISPLAY_ZONE).tz_localize(None)
+
+def normalize_timezones(df, columns=SITE_DATE_COLUMNS, display_zone=DISPLAY_ZONE):
+    """
+    Convert site wall times to UTC and to the display zone, one zone at a time.
+
+    Each distinct Site Time Zone label is parsed once and its rows are
+    localized and converted as one vectorized block. For every date column
+    a '<column> UTC' column with tz-aware UTC timestamps is added, and the
+    column itself is replaced by naive wall times in the display zone, so
+    existing date filters and trends compare like with like across regions.
+
+    Args:
+        df: DataFrame with naive datetime columns and 'Site Time Zone'
+        columns: Date columns to normalize
+        display_zone: IANA name of the zone to display dates in
+
+    Returns:
+        DataFrame with the normalized columns (the input is not modified)
+    """
+    columns = [col for col in columns if col in df.columns]
+    if not columns:
+        return df
+
+    normalized = df.copy(deep=False)
+    zones = df['Site Time Zone'] if 'Site Time Zone' in df.columns else pd.Series(np.nan, index=df.index)
+    groups = zone_groups(zones)
+
+    for col in columns:
+        wall_times = pd.to_datetime(df[col], errors='coerce')
+        if wall_times.dt.tz is not None:
+            utc = wall_times.dt.tz_convert('UTC')
+        else:
+            utc_values = np.full(len(df), np.datetime64('NaT'), dtype='datetime64[ns]')
+            for zone, positions in groups.items():
+                block = wall_times.iloc[positions]
+                # Wall times repeated when clocks go back are read as standard time
+                localized = block.dt.tz_localize(
+                    zone,
+                    ambiguous=np.zeros(len(block), dtype=bool),
+                    nonexistent='shift_forward'
+                )
+                utc_values[positions] = localized.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+            utc = pd.Series(utc_values, index=df.index).dt.tz_localize('UTC')
+
+        normalized[col + ' UTC'] = utc
+        normalized[col] = utc.dt.tz_convert(display_zone).dt.tz_localize(None)
+
+    return normalized
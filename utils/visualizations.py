@@ -2,13 +2,17 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from utils.data_processor import derive_time_field, period_labels
+from utils.profiling import timed
+from utils.workload import AssignmentIndex
 
-def create_status_chart(df):
-    """Create a pie chart of ticket statuses."""
+@timed()
+def create_status_chart(df, counts=None):
+    """Create a pie chart of ticket statuses (from precomputed counts per status when given)."""
     if 'Status' not in df.columns:
         return go.Figure()
     
-    status_counts = df['Status'].value_counts().reset_index()
+    status_counts = counts if counts is not None else df['Status'].value_counts().reset_index()
     status_counts.columns = ['Status', 'Count']
     
     fig = px.pie(
@@ -16,6 +20,7 @@ def create_status_chart(df):
         names='Status',
         values='Count',
         title='Ticket Status Distribution',
+        custom_data=['Status'],
         color_discrete_sequence=px.colors.qualitative.Pastel
     )
     
@@ -32,8 +37,9 @@ def create_status_chart(df):
     
     return fig
 
-def create_priority_chart(df):
-    """Create a pie chart of ticket priorities."""
+@timed()
+def create_priority_chart(df, counts=None):
+    """Create a pie chart of ticket priorities (from precomputed counts per priority when given)."""
     if 'Priority' not in df.columns:
         return go.Figure()
     
@@ -41,7 +47,7 @@ def create_priority_chart(df):
     priority_order = ['Low', 'Medium', 'High', 'Urgent']
     
     # Count priorities
-    priority_counts = df['Priority'].value_counts().reset_index()
+    priority_counts = counts if counts is not None else df['Priority'].value_counts().reset_index()
     priority_counts.columns = ['Priority', 'Count']
     
     # Set color scheme based on priority
@@ -60,6 +66,7 @@ def create_priority_chart(df):
         names='Priority',
         values='Count',
         title='Ticket Priority Distribution',
+        custom_data=['Priority'],
         color='Priority',
         color_discrete_map=colors
     )
@@ -77,6 +84,7 @@ def create_priority_chart(df):
     
     return fig
 
+@timed()
 def create_age_histogram(df):
     """Create a histogram of ticket ages."""
     if 'Age' not in df.columns:
@@ -127,13 +135,17 @@ def create_age_histogram(df):
     
     return fig
 
-def create_company_bar_chart(df):
-    """Create a bar chart of tickets by company."""
+@timed()
+def create_company_bar_chart(df, counts=None):
+    """Create a bar chart of tickets by company (from precomputed counts per company when given)."""
     if 'Company' not in df.columns:
         return go.Figure()
     
     # Get top 10 companies by ticket count
-    company_counts = df['Company'].value_counts().nlargest(10).reset_index()
+    if counts is not None:
+        company_counts = counts.nlargest(10, 'Count')
+    else:
+        company_counts = df['Company'].value_counts().nlargest(10).reset_index()
     company_counts.columns = ['Company', 'Count']
     
     fig = px.bar(
@@ -142,6 +154,7 @@ def create_company_bar_chart(df):
         y='Count',
         title='Top 10 Companies by Ticket Count',
         labels={'Company': 'Company', 'Count': 'Number of Tickets'},
+        custom_data=['Company'],
         color='Count',
         color_continuous_scale='Viridis'
     )
@@ -159,18 +172,27 @@ def create_company_bar_chart(df):
     
     return fig
 
-def create_resource_allocation_chart(df):
-    """Create a bar chart of tickets by resource."""
+@timed()
+def create_resource_allocation_chart(df, index=None):
+    """
+    Create a bar chart of tickets by resource.
+    
+    Tickets with several resources count for each of them.
+    
+    Args:
+        df: DataFrame with the tickets to chart
+        index: AssignmentIndex of df (built when not given)
+    """
     if 'Resources' not in df.columns:
         return go.Figure()
     
-    # Count tickets per resource
-    resource_counts = df['Resources'].value_counts().nlargest(10).reset_index()
+    # Count tickets per engineer from the exploded assignments
+    index = index if index is not None else AssignmentIndex(df)
+    counts = index.ticket_counts()
+    counts['Unassigned'] = int((index.assignees == 0).sum())
+    resource_counts = counts[counts > 0].nlargest(10).reset_index()
     resource_counts.columns = ['Resource', 'Count']
     
-    # Replace empty resources with "Unassigned"
-    resource_counts.loc[resource_counts['Resource'].isin(['', np.nan]), 'Resource'] = 'Unassigned'
-    
     fig = px.bar(
         resource_counts,
         x='Resource',
@@ -194,36 +216,88 @@ def create_resource_allocation_chart(df):
     
     return fig
 
+@timed()
+def create_workload_heatmap(matrix, top=15):
+    """
+    Create a heatmap of tickets per engineer, priority and age bucket.
+    
+    Args:
+        matrix: DataFrame from workload_matrix
+        top: Number of busiest engineers to show
+    """
+    if matrix.empty:
+        return go.Figure()
+    
+    busiest = matrix.sum(axis=1).nlargest(top).index
+    matrix = matrix.loc[busiest]
+    columns = [f"{priority} · {age}" for priority, age in matrix.columns]
+    
+    fig = px.imshow(
+        matrix.to_numpy(),
+        x=columns,
+        y=list(matrix.index),
+        labels={'x': 'Priority · Age', 'y': 'Engineer', 'color': 'Tickets'},
+        title='Workload by Engineer, Priority and Age',
+        color_continuous_scale='YlOrRd',
+        aspect='auto',
+        text_auto=True
+    )
+    
+    fig.update_layout(
+        xaxis_tickangle=-45
+    )
+    
+    return fig
+
+@timed()
+def create_category_chart(df, counts=None):
+    """Create a bar chart of tickets by learned category (from precomputed counts per category when given)."""
+    if 'Category' not in df.columns:
+        return go.Figure()
+    
+    category_counts = counts if counts is not None else df['Category'].value_counts().reset_index()
+    category_counts.columns = ['Category', 'Count']
+    
+    fig = px.bar(
+        category_counts,
+        x='Count',
+        y='Category',
+        orientation='h',
+        title='Tickets by Category',
+        labels={'Category': 'Category', 'Count': 'Number of Tickets'},
+        custom_data=['Category'],
+        color='Count',
+        color_continuous_scale='Blues'
+    )
+    
+    fig.update_layout(
+        xaxis_title='Number of Tickets',
+        yaxis_title='Category',
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    
+    return fig
+
+@timed()
 def create_ticket_trend_chart(df, time_period='daily'):
     """Create a line chart showing ticket count trends over time."""
     if 'Last Update' not in df.columns:
         return go.Figure()
     
-    # Make a copy of the dataframe to avoid SettingWithCopyWarning
-    df_trend = df.copy()
-    
-    # Ensure Last Update is datetime
-    df_trend.loc[:, 'Last Update'] = pd.to_datetime(df_trend['Last Update'], errors='coerce')
-    
-    # Group by appropriate time period
-    if time_period == 'daily':
-        df_trend.loc[:, 'time_group'] = df_trend['Last Update'].dt.date
-        x_title = 'Date'
-    elif time_period == 'weekly':
-        df_trend.loc[:, 'time_group'] = df_trend['Last Update'].dt.to_period('W').astype(str)
-        x_title = 'Week'
-    elif time_period == 'monthly':
-        df_trend.loc[:, 'time_group'] = df_trend['Last Update'].dt.to_period('M').astype(str)
-        x_title = 'Month'
+    # Parse dates without copying the frame; rows with invalid dates are skipped
+    dates = pd.to_datetime(df['Last Update'], errors='coerce').dropna()
     
-    # Count tickets by time period
-    ticket_counts = df_trend.groupby('time_group').size().reset_index(name='Count')
+    x_titles = {'daily': 'Date', 'weekly': 'Week', 'monthly': 'Month'}
+    x_title = x_titles.get(time_period, 'Date')
     
-    # Convert time_group to string for plotting
-    ticket_counts['time_group'] = ticket_counts['time_group'].astype(str)
+    # Count tickets per integer period code, then label only the distinct periods
+    period_codes = derive_time_field(dates, 'time_group', time_period)
+    code_counts = period_codes.value_counts().sort_index()
     
-    # Sort by time period
-    ticket_counts = ticket_counts.sort_values('time_group')
+    ticket_counts = pd.DataFrame({
+        'time_group': period_labels(code_counts.index, time_period),
+        'Count': code_counts.to_numpy()
+    })
     
     fig = px.line(
         ticket_counts,
@@ -252,3 +326,103 @@ def create_ticket_trend_chart(df, time_period='daily'):
         )
     
     return fig
+
+@timed()
+def create_backlog_chart(backlog_df, dimension='Status'):
+    """Create a stacked area chart of open tickets per day from a backlog series."""
+    if backlog_df is None or backlog_df.empty:
+        return go.Figure()
+    
+    # Reshape the wide backlog series into long form for plotting
+    backlog_long = backlog_df.reset_index().melt(
+        id_vars='date',
+        var_name=dimension,
+        value_name='Open Tickets'
+    )
+    
+    fig = px.area(
+        backlog_long,
+        x='date',
+        y='Open Tickets',
+        color=dimension,
+        title=f'Open Ticket Backlog by {dimension}',
+        labels={'date': 'Date', 'Open Tickets': 'Open Tickets'}
+    )
+    
+    fig.update_layout(
+        xaxis_title='Date',
+        yaxis_title='Open Tickets',
+        legend_title_text=dimension
+    )
+    
+    return fig
+
+@timed()
+def create_burn_chart(summary, level='Company', top=15):
+    """
+    Create a grouped bar chart of hours against budget.
+    
+    Args:
+        summary: DataFrame of one level from burn_rollups
+        level: Name of the level, for the labels
+        top: Number of groups with the largest overrun to show
+    """
+    if summary is None or summary.empty:
+        return go.Figure()
+    
+    # Groups that ran furthest over budget, projected overrun breaking ties
+    top_groups = summary.head(top)
+    burn_long = top_groups[['Hours', 'Budget', 'Overrun Hours']].reset_index().melt(
+        id_vars=top_groups.index.name or 'index',
+        var_name='Measure',
+        value_name='Value'
+    )
+    burn_long.columns = [level, 'Measure', 'Hours']
+    
+    fig = px.bar(
+        burn_long,
+        x=level,
+        y='Hours',
+        color='Measure',
+        barmode='group',
+        title=f'Hours vs Budget by {level}',
+        color_discrete_map={'Hours': '#3B82F6', 'Budget': '#A7F3D0', 'Overrun Hours': '#EF4444'}
+    )
+    
+    fig.update_layout(
+        xaxis_title=level,
+        yaxis_title='Hours',
+        xaxis_tickangle=-45
+    )
+    
+    return fig
+
+@timed()
+def create_burn_history_chart(totals_df):
+    """Create a line chart of running hours, budget and overrun per snapshot day."""
+    if totals_df is None or totals_df.empty:
+        return go.Figure()
+    
+    burn_long = totals_df.melt(
+        id_vars='date',
+        value_vars=['Hours', 'Budget', 'Overrun Hours'],
+        var_name='Measure',
+        value_name='Value'
+    )
+    
+    fig = px.line(
+        burn_long,
+        x='date',
+        y='Value',
+        color='Measure',
+        markers=True,
+        title='Running Hours vs Budget',
+        labels={'date': 'Date', 'Value': 'Hours'}
+    )
+    
+    fig.update_layout(
+        xaxis_title='Date',
+        yaxis_title='Hours'
+    )
+    
+    return fig
@@ -0,0 +1,194 @@
+import copy
+import numpy as np
+import pandas as pd
+
+from utils.kpis import numeric_age
+
+# Resources of a ticket assigned to several engineers, e.g. "GHoover, mkumar"
+RESOURCE_SEPARATOR = ','
+
+# Age buckets of the workload matrix: edges in days and their labels
+AGE_BUCKET_EDGES = [0, 1, 3, 7, 14, 30, np.inf]
+AGE_BUCKET_LABELS = ['<1d', '1-3d', '3-7d', '7-14d', '14-30d', '30d+']
+
+PRIORITY_ORDER = ['Urgent', 'High', 'Medium', 'Low']
+
+# The board only lists open tickets; these statuses are on their way out
+CLOSING_STATUS_PATTERN = 'done yet|pending closure|closed|completed|resolved'
+
+def split_resources(values):
+    """
+    Split Resources values into the individual engineers, once per distinct value.
+
+    Args:
+        values: Series of raw Resources text
+
+    Returns:
+        Tuple of (value codes per row, -1 for blank; value code per
+        assignment; engineer name per assignment)
+    """
+    codes, distinct = pd.factorize(values)
+    names = pd.Series(distinct, dtype=str).str.split(RESOURCE_SEPARATOR).explode().str.strip()
+    names = names[names != '']
+    return codes, names.index.to_numpy(dtype=np.int64), names.to_numpy(dtype=object)
+
+class AssignmentIndex:
+    """
+    Exploded ticket-to-engineer assignments of a dataset.
+
+    Each distinct Resources value is split once; the rows of a value then
+    share its assignments through array lookups. Every assignment is a
+    (row position, engineer code) pair, so per-engineer views are
+    bincounts instead of string matching.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df: Cleaned DataFrame with a Resources column
+        """
+        resources = df['Resources'] if 'Resources' in df.columns else pd.Series(np.nan, index=df.index)
+        codes, value_ids, names = split_resources(resources)
+        engineer_codes, self.engineers = pd.factorize(names, sort=True)
+
+        # Rows of each value, repeated once per engineer of that value
+        row_order = np.argsort(codes, kind='stable')
+        value_starts = np.searchsorted(codes[row_order], np.arange(codes.max() + 2 if len(codes) else 1))
+        rows_per_value = np.diff(value_starts)
+        per_assignment = rows_per_value[value_ids]
+        total = int(per_assignment.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(per_assignment) - per_assignment, per_assignment)
+        self.rows = row_order[np.repeat(value_starts[value_ids], per_assignment) + offsets]
+        self.engineer_codes = np.repeat(engineer_codes, per_assignment)
+
+        # Number of engineers on every row, to share a ticket's hours between them
+        self.assignees = np.bincount(self.rows, minlength=len(df))
+        self.n_rows = len(df)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def positions(self):
+        """Dictionary of engineer -> row positions of their tickets."""
+        order = np.argsort(self.engineer_codes, kind='stable')
+        bounds = np.searchsorted(self.engineer_codes[order], np.arange(len(self.engineers) + 1))
+        return {
+            engineer: self.rows[order[bounds[i]:bounds[i + 1]]]
+            for i, engineer in enumerate(self.engineers)
+        }
+
+    def subset(self, positions):
+        """
+        Assignments of some rows, renumbered to a frame of just those rows.
+
+        Args:
+            positions: Row positions in the indexed frame, in the new frame's order
+
+        Returns:
+            AssignmentIndex aligned to the subset
+        """
+        new_rows = np.full(self.n_rows, -1, dtype=np.int64)
+        new_rows[positions] = np.arange(len(positions))
+        kept = new_rows[self.rows] >= 0
+
+        subset = copy.copy(self)
+        subset.rows = new_rows[self.rows[kept]]
+        subset.engineer_codes = self.engineer_codes[kept]
+        subset.assignees = np.bincount(subset.rows, minlength=len(positions))
+        subset.n_rows = len(positions)
+        return subset
+
+    def ticket_counts(self, row_mask=None):
+        """
+        Tickets per engineer, counting a shared ticket for each of its engineers.
+
+        Args:
+            row_mask: Boolean array of the rows to count (defaults to all)
+
+        Returns:
+            Series of counts indexed by engineer, largest first
+        """
+        keep = np.ones(len(self.rows), dtype=bool) if row_mask is None else row_mask[self.rows]
+        counts = np.bincount(self.engineer_codes[keep], minlength=len(self.engineers))
+        return pd.Series(counts, index=self.engineers).sort_values(ascending=False, kind='stable')
+
+def open_mask(df):
+    """Boolean array of tickets still being worked (not closing or closed)."""
+    if 'Status' not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    closing = df['Status'].astype(str).str.contains(CLOSING_STATUS_PATTERN, case=False, regex=True)
+    return ~closing.to_numpy(dtype=bool)
+
+def age_buckets(df):
+    """Age bucket code of every ticket (-1 without a numeric age)."""
+    age = numeric_age(df).to_numpy(dtype=float)
+    buckets = np.searchsorted(AGE_BUCKET_EDGES, age, side='right') - 1
+    buckets[np.isnan(age)] = -1
+    return np.minimum(buckets, len(AGE_BUCKET_LABELS) - 1)
+
+def workload_matrix(df, index=None):
+    """
+    Tickets per engineer, priority and age bucket, from one vectorized crosstab.
+
+    Args:
+        df: Cleaned DataFrame
+        index: AssignmentIndex of df (built when not given)
+
+    Returns:
+        DataFrame indexed by engineer with (Priority, Age bucket) columns
+    """
+    index = index if index is not None else AssignmentIndex(df)
+    priorities = df['Priority'].astype(str) if 'Priority' in df.columns else pd.Series('Unknown', index=df.index)
+    priority_codes, priority_names = pd.factorize(priorities)
+    buckets = age_buckets(df)
+
+    # One combined code per assignment; assignments without an age are left out
+    rows = index.rows[buckets[index.rows] >= 0]
+    engineers = index.engineer_codes[buckets[index.rows] >= 0]
+    n_priorities, n_buckets = len(priority_names), len(AGE_BUCKET_LABELS)
+    combined = (engineers * n_priorities + priority_codes[rows]) * n_buckets + buckets[rows]
+    counts = np.bincount(combined, minlength=len(index.engineers) * n_priorities * n_buckets)
+
+    matrix = pd.DataFrame(
+        counts.reshape(len(index.engineers), n_priorities * n_buckets),
+        index=pd.Index(index.engineers, name='Engineer'),
+        columns=pd.MultiIndex.from_product([priority_names, AGE_BUCKET_LABELS], names=['Priority', 'Age'])
+    )
+    if len(priority_names) == 0:
+        # No tickets: the empty column product has no levels to reorder
+        return matrix
+    # Known priorities first, most urgent first
+    ordered = [p for p in PRIORITY_ORDER if p in priority_names] + [p for p in priority_names if p not in PRIORITY_ORDER]
+    return matrix.reindex(columns=ordered, level='Priority')
+
+def workload_summary(df, index=None):
+    """
+    Ticket counts and open hours per engineer.
+
+    Hours of a ticket with several engineers are shared equally between them.
+
+    Args:
+        df: Cleaned DataFrame
+        index: AssignmentIndex of df (built when not given)
+
+    Returns:
+        DataFrame indexed by engineer with 'Tickets', 'Open Tickets',
+        'Open Hours' and 'Avg Age', busiest first
+    """
+    index = index if index is not None else AssignmentIndex(df)
+    n = len(index.engineers)
+    open_rows = open_mask(df)[index.rows]
+    hours = pd.to_numeric(df['Total Hours'], errors='coerce').fillna(0).to_numpy() if 'Total Hours' in df.columns else np.zeros(len(df))
+    shared_hours = hours[index.rows] / index.assignees[index.rows]
+    age = numeric_age(df).to_numpy(dtype=float)[index.rows]
+    has_age = ~np.isnan(age)
+
+    tickets = np.bincount(index.engineer_codes, minlength=n)
+    aged = np.bincount(index.engineer_codes[has_age], minlength=n)
+    summary = pd.DataFrame({
+        'Tickets': tickets,
+        'Open Tickets': np.bincount(index.engineer_codes[open_rows], minlength=n),
+        'Open Hours': np.bincount(index.engineer_codes[open_rows], weights=shared_hours[open_rows], minlength=n).round(2),
+        'Avg Age': np.round(np.bincount(index.engineer_codes[has_age], weights=age[has_age], minlength=n) / np.maximum(aged, 1), 1)
+    }, index=pd.Index(index.engineers, name='Engineer'))
+    return summary.sort_values(['Open Tickets', 'Tickets'], ascending=False, kind='stable')